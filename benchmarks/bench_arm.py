@@ -0,0 +1,139 @@
+"""SagittariusArmReal 每个方法的单次调用开销, 以及对仿真串口设备的端到端命令延迟
+
+真实驱动连接 SimSerialServer 提供的伪终端, 仿真设备不附加延迟, 测得的时间即为绑定和驱动本身的开销.
+"""
+
+import contextlib
+import threading
+import time
+
+import numpy as np
+
+from pysagittarius import protocol
+from pysagittarius.sim import SagittariusArmSim, SimSerialServer
+
+from .common import Result, calls_per_second, percentiles
+
+
+def _servo_list(ps):
+    servo = ps.ServoStruct()
+    servo.id = 1
+    servo.value = 0.1
+    return [servo]
+
+
+def _method_calls(ps, arm):
+    js = np.zeros(7, dtype=np.float32)
+    calls = {
+        "CheckUpperLower": lambda: arm.CheckUpperLower(js),
+        "SetAllServoRadian": lambda: arm.SetAllServoRadian(js),
+        "GetCurrentJointStatus": lambda: arm.GetCurrentJointStatus(),
+        "arm_set_gripper_linear_position": lambda: arm.arm_set_gripper_linear_position(0.0),
+        "SetAllServoRadianAndGripper": lambda: arm.SetAllServoRadianAndGripper(js),
+        "GetServoInfo": lambda: arm.GetServoInfo(1, 200),
+        "GetAllServoInfo": lambda: arm.GetAllServoInfo(),
+        "SetServoVelocity": lambda: arm.SetServoVelocity(500),
+        "SetServoAcceleration": lambda: arm.SetServoAcceleration(5),
+        "SetServoTorque": lambda: arm.SetServoTorque(np.full(7, 1000, dtype=np.int32)),
+        "ControlTorque": lambda: arm.ControlTorque("lock"),
+    }
+    if ps is not None and hasattr(ps, "ServoStruct"):
+        servos = _servo_list(ps)
+        calls["SetServoRadianWithIndex"] = lambda: arm.SetServoRadianWithIndex(servos, 1)
+        calls["CheckUpperLowerWithIndex"] = lambda: arm.CheckUpperLowerWithIndex(servos, 1)
+    if ps is not None and hasattr(ps, "ServoCommandBuffer"):
+        commands = np.zeros(6, dtype=ps.SERVO_COMMAND_DTYPE)
+        commands["id"] = np.arange(1, 7)
+        buffer = ps.ServoCommandBuffer()
+        buffer.assign(commands["id"], commands["value"])
+        calls["SetServoRadianWithIndex.array6"] = lambda: arm.SetServoRadianWithIndex(commands)
+        calls["SetServoRadianWithIndex.buffer6"] = lambda: arm.SetServoRadianWithIndex(buffer)
+    return calls
+
+
+def _overhead(prefix, ps, arm, min_time):
+    results = []
+    for name, fn in _method_calls(ps, arm).items():
+        rate = calls_per_second(fn, min_time=min_time)
+        results.append(Result("%s.%s" % (prefix, name), 1e6 / rate, "us/call", False))
+    return results
+
+
+def _command_latency(arm, server, samples):
+    """SetAllServoRadian 调用开始到仿真设备收到完整帧的时间"""
+    received = threading.Event()
+    stamps = []
+
+    def on_frame(msg_type, cmd, data, stamp):
+        if cmd == protocol.CMD_CONTROL_ALL_DEGREE:
+            stamps.append(stamp)
+            received.set()
+
+    server.on_frame = on_frame
+    latencies = []
+    js = np.zeros(7, dtype=np.float32)
+    for i in range(samples):
+        js[0] = 0.001 * (i % 100)
+        received.clear()
+        del stamps[:]
+        start = time.monotonic()
+        arm.SetAllServoRadian(js)
+        if received.wait(1.0):
+            latencies.append(stamps[0] - start)
+    server.on_frame = None
+    return latencies
+
+
+def _status_latency(arm, samples):
+    latencies = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        arm.GetCurrentJointStatus()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def _group(ps, ports, min_time):
+    """n 台机械臂: SagittariusArmGroup 一次调用 vs 逐台调用"""
+    results = []
+    with contextlib.ExitStack() as stack:
+        servers = [stack.enter_context(SimSerialServer()) for _ in range(ports)]
+        group = ps.SagittariusArmGroup([server.port for server in servers])
+        arms = [group[i] for i in range(ports)]
+        for arm in arms:
+            arm.SetFreeAfterDestructor(False)
+        js = np.zeros((ports, 6), dtype=np.float32)
+        calls = {
+            "SetAllServoRadian": lambda: group.SetAllServoRadian(js),
+            "GetCurrentJointStatus": lambda: group.GetCurrentJointStatus(),
+            "sequential.SetAllServoRadian": lambda: [arm.SetAllServoRadian(js[0]) for arm in arms],
+            "sequential.GetCurrentJointStatus": lambda: [arm.GetCurrentJointStatus() for arm in arms],
+        }
+        for name, fn in calls.items():
+            rate = calls_per_second(fn, min_time=min_time)
+            results.append(Result("group%d.%s" % (ports, name), 1e6 / rate, "us/call", False))
+        del arms, group
+    return results
+
+
+def run(ps, quick=False):
+    min_time = 0.05 if quick else 0.3
+    samples = 50 if quick else 500
+    results = _overhead("sim", None, SagittariusArmSim(), min_time)
+
+    if ps is None or not hasattr(ps, "SagittariusArmReal"):
+        return results
+
+    with SimSerialServer() as server:
+        arm = ps.SagittariusArmReal(server.port, 1000000, 500, 5)
+        arm.SetFreeAfterDestructor(False)
+        results += _overhead("arm", ps, arm, min_time)
+        latencies = _command_latency(arm, server, samples)
+        if latencies:
+            results += percentiles(latencies, "latency.SetAllServoRadian")
+        results += percentiles(_status_latency(arm, samples), "latency.GetCurrentJointStatus")
+        del arm
+    if hasattr(ps, "SagittariusArmGroup"):
+        for ports in (2, 4):
+            results += _group(ps, ports, min_time)
+    return results
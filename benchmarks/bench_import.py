@@ -0,0 +1,51 @@
+"""导入耗时: 每次在新的解释器中导入, 不受已缓存模块影响
+
+import pysagittarius 只加载扩展模块, 子模块在第一次访问时导入, 分别计时.
+"""
+
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+from .common import Result
+
+_SNIPPET = """
+import time
+t = time.perf_counter()
+import numpy
+t_numpy = time.perf_counter()
+import pysagittarius
+t_package = time.perf_counter()
+pysagittarius.{attr}
+t_attr = time.perf_counter()
+print(t_numpy - t, t_package - t_numpy, t_attr - t_package)
+"""
+
+
+def _import_times(attr, runs):
+    """返回 (numpy, import pysagittarius, 访问 attr) 的耗时中位数 (秒)"""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(p for p in sys.path if p))
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", _SNIPPET.format(attr=attr)], env=env, check=True,
+                             stdout=subprocess.PIPE, universal_newlines=True).stdout
+        # 导入时不应输出任何内容, 只有最后一行计时结果
+        lines = out.strip().splitlines()
+        if len(lines) != 1:
+            raise RuntimeError("import pysagittarius printed output: %r" % out)
+        samples.append([float(v) for v in lines[0].split()])
+    return np.median(samples, axis=0)
+
+
+def run(ps, quick=False):
+    runs = 3 if quick else 15
+    numpy_time, package_time, _ = _import_times("__version__", runs)
+    results = [
+        Result("import.numpy", numpy_time * 1e3, "ms", False),
+        Result("import.pysagittarius", package_time * 1e3, "ms", False),
+    ]
+    for name, attr in (("sim", "SagittariusArmSim"), ("aio", "AsyncSagittariusArm"), ("recording", "recording")):
+        results.append(Result("import.lazy.%s" % name, _import_times(attr, runs)[2] * 1e3, "ms", False))
+    return results
@@ -0,0 +1,81 @@
+"""IK/FK 吞吐量: 单次调用每秒次数和批量接口每秒位姿数"""
+
+import numpy as np
+
+from .common import Result, calls_per_second
+
+# 工作空间内的典型目标位姿 (x, y, z, roll, pitch, yaw), 角度为度
+POSE_EULER = (0.25, 0.0, 0.2, 0.0, 30.0, 0.0)
+POSE_QUATERNION = (0.25, 0.0, 0.2, 0.0, 0.258819, 0.0, 0.9659258)
+THETA = np.array([0.1, 0.2, -0.1, 0.0, 0.4, 0.0], dtype=np.float32)
+
+
+def _batch_rate(fn, n, min_time):
+    return calls_per_second(fn, min_time=min_time, min_calls=3) * n
+
+
+def run(ps, quick=False):
+    results = []
+    min_time = 0.05 if quick else 0.5
+    n = 200 if quick else 2000
+
+    if ps is not None and hasattr(ps, "SagittariusArmKinematics"):
+        k = ps.SagittariusArmKinematics(0, 0, 0)
+        ok, M_EE = k.getFKinMatrix(THETA)
+        single = {
+            "getIKinThetaEuler": lambda: k.getIKinThetaEuler(*POSE_EULER),
+            "getIKinThetaQuaternion": lambda: k.getIKinThetaQuaternion(*POSE_QUATERNION),
+            "getIKinThetaMatrix": lambda: k.getIKinThetaMatrix(M_EE),
+            "getFKinMatrix": lambda: k.getFKinMatrix(THETA),
+            "getFKinEuler": lambda: k.getFKinEuler(THETA),
+            "getFKinQuaternion": lambda: k.getFKinQuaternion(THETA),
+        }
+        for name, fn in single.items():
+            results.append(Result("kinematics.%s" % name, calls_per_second(fn, min_time), "calls/s", True))
+
+        euler = np.tile(np.array(POSE_EULER, dtype=np.float32), (n, 1))
+        quaternion = np.tile(np.array(POSE_QUATERNION, dtype=np.float32), (n, 1))
+        matrices = np.tile(np.asarray(M_EE), (n, 1, 1))
+        thetas = np.tile(THETA, (n, 1))
+        batch = {
+            "getIKinThetaEulerBatch": lambda: k.getIKinThetaEulerBatch(euler),
+            "getIKinThetaQuaternionBatch": lambda: k.getIKinThetaQuaternionBatch(quaternion),
+            "getIKinThetaMatrixBatch": lambda: k.getIKinThetaMatrixBatch(matrices),
+            "getFKinMatrixBatch": lambda: k.getFKinMatrixBatch(thetas),
+            "getFKinEulerBatch": lambda: k.getFKinEulerBatch(thetas),
+            "getFKinQuaternionBatch": lambda: k.getFKinQuaternionBatch(thetas),
+        }
+        for name, fn in batch.items():
+            results.append(Result("kinematics.%s" % name, _batch_rate(fn, n, min_time), "poses/s", True))
+
+        # 解析解引擎
+        ka = ps.SagittariusArmKinematics(0, 0, 0, solver="analytic")
+        analytic = {
+            "analytic.getIKinThetaEuler": lambda: ka.getIKinThetaEuler(*POSE_EULER),
+            "analytic.getIKinThetaBranchesEuler": lambda: ka.getIKinThetaBranchesEuler(*POSE_EULER),
+        }
+        for name, fn in analytic.items():
+            results.append(Result("kinematics.%s" % name, calls_per_second(fn, min_time), "calls/s", True))
+        results.append(Result("kinematics.analytic.getIKinThetaEulerBatch",
+                              _batch_rate(lambda: ka.getIKinThetaEulerBatch(euler), n, min_time), "poses/s", True))
+
+        # 轨迹校验: 关节限位, 自碰撞, 地面和禁入区
+        box = np.array([[0.15, -0.1, 0.0, 0.3, 0.1, 0.08]])
+        results.append(Result("kinematics.validateTrajectory",
+                              _batch_rate(lambda: k.validateTrajectory(thetas, floor=0.0, boxes=box), n, min_time),
+                              "poses/s", True))
+
+        # 笛卡尔轨迹规划: 取样, 一次批量逆解和时间缩放
+        from pysagittarius import trajectory
+        waypoints = [(0.25, 0.0, 0.15, 0.0, 60.0, 0.0), (0.28, 0.08, 0.12, 0.0, 60.0, 15.0),
+                     (0.22, -0.05, 0.2, 0.0, 45.0, -10.0)]
+        results.append(Result("trajectory.plan_cartesian",
+                              calls_per_second(lambda: trajectory.plan_cartesian(waypoints, kinematics=ka), min_time),
+                              "calls/s", True))
+
+    from pysagittarius.kinematics import NumpyKinematics
+    nk = NumpyKinematics()
+    thetas = np.tile(THETA, (n, 1))
+    results.append(Result("kinematics.numpy.getFKinMatrixBatch",
+                          _batch_rate(lambda: nk.getFKinMatrixBatch(thetas), n, min_time), "poses/s", True))
+    return results
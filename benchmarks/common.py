@@ -0,0 +1,49 @@
+"""基准测试的计时和结果记录工具"""
+
+import time
+
+import numpy as np
+
+
+class Result:
+    """一项基准测试结果, higher_is_better 决定与基线比较的方向;
+    tail 为 True 的结果 (尾部延迟) 波动大, 只在给出 --tail-threshold 时参与回归判断"""
+
+    def __init__(self, name, value, unit, higher_is_better, tail=False):
+        self.name = name
+        self.value = float(value)
+        self.unit = unit
+        self.higher_is_better = higher_is_better
+        self.tail = tail
+
+    def to_dict(self):
+        return {
+            "value": self.value,
+            "unit": self.unit,
+            "higher_is_better": self.higher_is_better,
+            "tail": self.tail,
+        }
+
+
+def calls_per_second(fn, min_time=0.2, min_calls=10):
+    """重复调用 fn 至少 min_time 秒, 返回每秒调用次数"""
+    fn()
+    calls = 0
+    start = time.perf_counter()
+    elapsed = 0.0
+    while elapsed < min_time or calls < min_calls:
+        fn()
+        calls += 1
+        elapsed = time.perf_counter() - start
+    return calls / elapsed
+
+
+def percentiles(samples, prefix, unit="us", scale=1e6):
+    """由耗时样本 (秒) 生成 p50/p95/p99/max 结果, p95/p99/max 标记为尾部延迟"""
+    samples = np.asarray(samples) * scale
+    return [
+        Result("%s.p50" % prefix, np.percentile(samples, 50), unit, False),
+        Result("%s.p95" % prefix, np.percentile(samples, 95), unit, False, tail=True),
+        Result("%s.p99" % prefix, np.percentile(samples, 99), unit, False, tail=True),
+        Result("%s.max" % prefix, np.max(samples), unit, False, tail=True),
+    ]
@@ -0,0 +1,101 @@
+"""基准测试入口
+
+    python -m benchmarks.run --output bench.json
+    python -m benchmarks.run --baseline benchmarks/baseline.json --threshold 0.2
+    python -m benchmarks.run --save-baseline benchmarks/baseline.json
+
+与基线相比变差超过 threshold (相对比例) 的项目视为回归, 此时返回码为 1.
+尾部延迟 (p95/p99/max) 在单次运行之间波动很大, 默认只输出不判断; 给出 --tail-threshold 时按这个更宽的阈值判断.
+"""
+
+import argparse
+import json
+import platform
+import sys
+
+from . import bench_arm, bench_import, bench_kinematics
+
+SUITES = {
+    "kinematics": bench_kinematics,
+    "arm": bench_arm,
+    "import": bench_import,
+}
+
+
+def load_extension():
+    try:
+        import pysagittarius as ps
+    except ImportError:
+        return None
+    if not hasattr(ps, "SagittariusArmKinematics"):
+        return None
+    return ps
+
+
+def compare(results, baseline, threshold, tail_threshold=None):
+    """返回 (名称, 基线值, 当前值, 变化比例) 的回归列表; 尾部延迟使用 tail_threshold, 为 None 时不判断"""
+    regressions = []
+    for name, current in results.items():
+        base = baseline.get(name)
+        if base is None or base["value"] == 0:
+            continue
+        limit = tail_threshold if current.get("tail") else threshold
+        if limit is None:
+            continue
+        change = (current["value"] - base["value"]) / base["value"]
+        worse = -change if current["higher_is_better"] else change
+        if worse > limit:
+            regressions.append((name, base["value"], current["value"], change))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="pysagittarius benchmarks")
+    parser.add_argument("--suite", choices=sorted(SUITES), action="append",
+                        help="suite to run, may be given more than once (default: all)")
+    parser.add_argument("--quick", action="store_true", help="shorter runs for smoke testing")
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--baseline", help="compare against this JSON file")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="relative slowdown that counts as a regression (default: 0.2)")
+    parser.add_argument("--tail-threshold", type=float,
+                        help="relative slowdown of p95/p99/max latencies that counts as a regression "
+                             "(default: tail latencies are not compared)")
+    parser.add_argument("--save-baseline", help="write results as a new baseline file")
+    args = parser.parse_args(argv)
+
+    ps = load_extension()
+    if ps is None:
+        print("pysagittarius extension not available, running fallback benchmarks only")
+
+    results = {}
+    for name in args.suite or sorted(SUITES):
+        for result in SUITES[name].run(ps, quick=args.quick):
+            results[result.name] = result.to_dict()
+            print("%-55s %14.2f %s%s" % (result.name, result.value, result.unit, " (tail)" if result.tail else ""))
+
+    report = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "extension": ps is not None,
+        "results": results,
+    }
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w") as f:
+                json.dump(report, f, indent=2, sort_keys=True)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold, args.tail_threshold)
+        for name, base, current, change in regressions:
+            print("REGRESSION %s: %.2f -> %.2f (%+.1f%%)" % (name, base, current, change * 100))
+        if regressions:
+            return 1
+        print("no regressions against %s (threshold %.0f%%)" % (args.baseline, args.threshold * 100))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,10 +1,10 @@
 import sys
-import os
-import importlib.util
 import numpy as np
 import time
 import pygame
 
+import pysagittarius as ps
+
 # 初始化pygame和手柄
 pygame.init()
 pygame.joystick.init()
@@ -19,29 +19,18 @@ joystick = pygame.joystick.Joystick(0)
 joystick.init()
 print(f"检测到手柄：{joystick.get_name()}")
 
-# 加载Sagittarius机械臂库
-so_file_path = os.path.abspath("./pysagittarius.so")
-
-# 检查文件是否存在
-if not os.path.exists(so_file_path):
-    print(f"错误：找不到 .so 文件：{so_file_path}")
-    sys.exit(1)
-
-print(f"正在加载 .so 文件：{so_file_path}")
-
-# 从文件加载模块
-spec = importlib.util.spec_from_file_location("pysagittarius", so_file_path)
-ps = importlib.util.module_from_spec(spec)
-spec.loader.exec_module(ps)
-
 # 设置日志级别
 ps.log_set_level(3)
 
 # 连接机械臂
 arm = ps.SagittariusArmReal("/dev/ttyACM0", 1000000, 500, 5)
+# 摇杆命令比串口发送快时只发送最新的设定值, 变化小于 0.002 弧度的关节不发送
+arm.EnableCommandCoalescing(0.002)
 
 # 初始化机械臂 IK 运算器
 kinematics = ps.SagittariusArmKinematics(0, 0, 0)
+# 摇杆每次只移动一小步, 用上一次的解作为初值
+kinematics.setTrackingMode(True)
 
 # 设置销毁对象时不释放舵机
 arm.SetFreeAfterDestructor(False)
@@ -64,11 +53,14 @@ def move_to_initial_position():
     else:
         print("无法计算初始位置的逆运动学")
 
-# 移动到指定位置
-def move_to_position(x, y, z, roll, pitch, yaw):
+# 移动到指定位置, gripper 不为 None 时夹爪与关节在同一次调用中设置
+def move_to_position(x, y, z, roll, pitch, yaw, gripper=None):
     success, joint_angles = kinematics.getIKinThetaEuler(x, y, z, roll, pitch, yaw)
     if success:
-        arm.SetAllServoRadian(joint_angles)
+        if gripper is None:
+            arm.SetAllServoRadian(joint_angles)
+        else:
+            arm.SetAllServoRadianAndGripper(joint_angles, gripper)
         return True
     else:
         print("无法计算逆运动学")
@@ -82,6 +74,7 @@ def set_gripper(position):
 move_to_initial_position()
 current_position = INITIAL_POSITION.copy()
 gripper_position = GRIPPER_OPEN
+pending_gripper = None  # 按键设置的夹爪位置, 与本周期的关节命令一起发送
 
 # 按键映射
 BUTTON_A = 0  # A按钮 - 夹爪关闭
@@ -114,12 +107,12 @@ try:
             if event.type == pygame.JOYBUTTONDOWN:
                 if event.button == BUTTON_A:  # A按钮 - 关闭夹爪
                     gripper_position = GRIPPER_CLOSE
-                    set_gripper(gripper_position)
+                    pending_gripper = gripper_position
                     print("夹爪关闭")
                 
                 elif event.button == BUTTON_B:  # B按钮 - 打开夹爪
                     gripper_position = GRIPPER_OPEN
-                    set_gripper(gripper_position)
+                    pending_gripper = gripper_position
                     print("夹爪打开")
                 
                 elif event.button == BUTTON_Y:  # Y按钮 - 回到初始位置
@@ -154,9 +147,15 @@ try:
             new_position[5] = max(-90, min(90, new_position[5]))  # 偏航角限制
             
             # 尝试移动到新位置
-            if move_to_position(*new_position):
+            if move_to_position(*new_position, gripper=pending_gripper):
                 current_position = new_position
+                pending_gripper = None
                 print(f"当前位置: X={current_position[0]:.3f}, Y={current_position[1]:.3f}, Z={current_position[2]:.3f}, Yaw={current_position[5]:.1f}")
+
+        # 本周期没有关节命令时单独设置夹爪
+        if pending_gripper is not None:
+            set_gripper(pending_gripper)
+            pending_gripper = None
         
         # 控制帧率
         time.sleep(0.05)
@@ -1,10 +1,10 @@
 import sys
-import os
-import importlib.util
 import numpy as np
 import time
 import pygame
 
+import pysagittarius as ps
+
 # 初始化pygame和手柄
 pygame.init()
 pygame.joystick.init()
@@ -19,30 +19,20 @@ joystick = pygame.joystick.Joystick(0)
 joystick.init()
 print(f"检测到手柄：{joystick.get_name()}")
 
-# 加载Sagittarius机械臂库
-so_file_path = os.path.abspath("./pysagittarius.so")
-
-# 检查文件是否存在
-if not os.path.exists(so_file_path):
-    print(f"错误：找不到 .so 文件：{so_file_path}")
-    sys.exit(1)
-
-print(f"正在加载 .so 文件：{so_file_path}")
-
-# 从文件加载模块
-spec = importlib.util.spec_from_file_location("pysagittarius", so_file_path)
-ps = importlib.util.module_from_spec(spec)
-spec.loader.exec_module(ps)
-
 # 设置日志级别
 ps.log_set_level(3)
 
 # 连接机械臂
 arm = ps.SagittariusArmReal("/dev/ttyACM0", 1000000, 500, 5)
+# 摇杆命令比串口发送快时只发送最新的设定值, 变化小于 0.002 弧度的关节不发送
+arm.EnableCommandCoalescing(0.002)
 
 # 设置销毁对象时不释放舵机
 arm.SetFreeAfterDestructor(False)
 
+# 后台轮询关节状态, 十字键控制时直接读取缓存, 超过 0.1 秒的缓存会重新读取
+arm.StartJointStatePoller(50, 0.1)
+
 print("Sagittarius机械臂已连接")
 
 # 定义初始位置（关节角度）
@@ -57,21 +47,32 @@ def move_to_initial_position():
     arm.SetAllServoRadian(INITIAL_JOINT_POSITION)
     print("已移动到初始位置")
 
-# 设置单个舵机角度
+# 设置单个舵机角度, 命令缓冲重复使用, 每次调用不创建新的 Python 对象
+servo_command = ps.ServoCommandBuffer()
+
 def set_servo_angle(servo_id, angle):
-    servo = ps.ServoStruct()
-    servo.id = servo_id
-    servo.value = angle
-    arm.SetServoRadianWithIndex([servo], 1)
+    servo_command.clear()
+    servo_command.set(servo_id, angle)
+    arm.SetServoRadianWithIndex(servo_command)
 
 # 控制夹爪
 def set_gripper(position):
     arm.arm_set_gripper_linear_position(position)
 
+# 设置关节 1~6, 有按键设置的夹爪位置时在同一次调用中一起发送
+def send_joint_angles(joint_angles):
+    global pending_gripper
+    if pending_gripper is None:
+        arm.SetAllServoRadian(joint_angles)
+    else:
+        arm.SetAllServoRadianAndGripper(joint_angles[:6], pending_gripper)
+        pending_gripper = None
+
 # 初始化机械臂位置
 move_to_initial_position()
 current_joint_angles = INITIAL_JOINT_POSITION.copy()
 gripper_position = GRIPPER_OPEN
+pending_gripper = None
 
 # 按键映射
 BUTTON_Y = 3  # Y按钮 - 回到初始位置
@@ -145,12 +146,12 @@ try:
             if event.type == pygame.JOYBUTTONDOWN:
                 if event.button == BUTTON_A:  # A按钮 - 关闭夹爪
                     gripper_position = GRIPPER_CLOSE
-                    set_gripper(gripper_position)
+                    pending_gripper = gripper_position
                     print("夹爪关闭")
                 
                 elif event.button == BUTTON_B:  # B按钮 - 打开夹爪
                     gripper_position = GRIPPER_OPEN
-                    set_gripper(gripper_position)
+                    pending_gripper = gripper_position
                     print("夹爪打开")
                 
                 elif event.button == BUTTON_Y:  # Y按钮 - 回到初始位置
@@ -230,7 +231,7 @@ try:
         # 如果有末端位置变化，使用逆运动学计算关节角度
         if end_effector_changed:
             # 获取当前关节状态
-            success, current_js = arm.GetCurrentJointStatus()
+            success, current_js, _, _ = arm.GetCachedJointStatus()
             if success:
                 # 初始化运动学计算器
                 kinematics = ps.SagittariusArmKinematics(0, 0, 0)
@@ -253,7 +254,7 @@ try:
                     
                     if success:
                         # 设置新的关节角度
-                        arm.SetAllServoRadian(new_joint_angles)
+                        send_joint_angles(new_joint_angles)
                         # 更新当前关节角度
                         current_joint_angles = np.array(new_joint_angles)
                         print(f"末端位置: X={new_xyz[0]:.3f}, Y={new_xyz[1]:.3f}, Z={new_xyz[2]:.3f}")
@@ -271,12 +272,17 @@ try:
                 new_joint_angles[i] = max(JOINT_LIMITS[i][0], min(JOINT_LIMITS[i][1], new_joint_angles[i]))
             
             # 设置新的关节角度
-            arm.SetAllServoRadian(new_joint_angles)
+            send_joint_angles(new_joint_angles)
             current_joint_angles = new_joint_angles
             
             # 打印当前关节角度
             print(f"当前关节角度: {', '.join([f'{angle:.2f}' for angle in current_joint_angles])}")
         
+        # 本周期没有关节命令时单独设置夹爪
+        if pending_gripper is not None:
+            set_gripper(pending_gripper)
+            pending_gripper = None
+
         # 控制帧率
         time.sleep(0.05)
 
@@ -284,5 +290,6 @@ except KeyboardInterrupt:
     print("程序已中断")
 finally:
     # 清理资源
+    arm.StopJointStatePoller()
     pygame.quit()
     print("程序结束")
@@ -1,214 +1,1465 @@
+#include <cstring>
+#include <cmath>
+
 #include "pybind11/numpy.h"
 #include "pybind11/pybind11.h"
 #include "pybind11/eigen.h"
 #include "pybind11/stl.h"
 #include "sagittarius_sdk/sdk_sagittarius_arm/sdk_sagittarius_arm_real.h"
 #include "sagittarius_sdk/sdk_sagittarius_arm/sdk_sagittarius_arm_log.h"
+#include "src/arm_group.h"
+#include "src/arm_kinematics.h"
+#include "src/arm_real.h"
+#include "src/call_metrics.h"
+#include "src/collision.h"
+#include "src/parallel_for.h"
+#include "src/servo_command.h"
+#include "src/shm_arm.h"
 
 namespace py = pybind11;
 
+using FloatArray = py::array_t<float, py::array::c_style | py::array::forcecast>;
+using DoubleArray = py::array_t<double, py::array::c_style | py::array::forcecast>;
+
+namespace {
+
+// 读取 1 维数组的前 n 个元素到 dst
+// float32/float64/int32/int64/uint8 数组按步长直接读取, 不生成转换后的临时数组; 列表等其他输入先转换
+// 结构化数组的字段视图可能不对齐, 逐个元素按字节复制
+template <typename T, typename Src>
+bool read_strided(const py::array &a, T *dst, size_t n) {
+    if (!py::isinstance<py::array_t<Src>>(a)) {
+        return false;
+    }
+    const char *p = static_cast<const char *>(a.data());
+    for (size_t i = 0; i < n; i++) {
+        Src v;
+        std::memcpy(&v, p + i * a.strides(0), sizeof(Src));
+        dst[i] = static_cast<T>(v);
+    }
+    return true;
+}
+
+template <typename T>
+void read_vector(const py::handle &obj, T *dst, size_t n) {
+    py::array a;
+    if (py::isinstance<py::array>(obj)) {
+        a = py::reinterpret_borrow<py::array>(obj);
+    } else {
+        // ensure() 转换失败时返回空对象并清除 Python 异常
+        auto converted = py::array_t<T, py::array::forcecast>::ensure(obj);
+        if (!converted) {
+            throw py::type_error(std::string("Input must be an array or sequence of numbers, got ") +
+                                 Py_TYPE(obj.ptr())->tp_name);
+        }
+        a = std::move(converted);
+    }
+    if (a.ndim() != 1 || static_cast<size_t>(a.shape(0)) < n) {
+        throw std::runtime_error("Input array must have at least " + std::to_string(n) + " elements");
+    }
+    if (read_strided<T, float>(a, dst, n) || read_strided<T, double>(a, dst, n) ||
+        read_strided<T, int32_t>(a, dst, n) || read_strided<T, int64_t>(a, dst, n) ||
+        read_strided<T, uint8_t>(a, dst, n)) {
+        return;
+    }
+    auto converted = py::array_t<T, py::array::c_style | py::array::forcecast>::ensure(a);
+    if (!converted) {
+        throw py::type_error("Input array of dtype " + py::str(a.dtype()).cast<std::string>() +
+                             " cannot be converted to numbers");
+    }
+    std::copy(converted.data(), converted.data() + n, dst);
+}
+
+// 批量输入: float32/float64 的 C 连续数组原样使用, 其他输入转换为 float32
+py::array float_input(const py::handle &obj) {
+    if (py::isinstance<py::array_t<float, py::array::c_style>>(obj) ||
+        py::isinstance<py::array_t<double, py::array::c_style>>(obj)) {
+        return py::reinterpret_borrow<py::array>(obj);
+    }
+    return py::cast<FloatArray>(obj);
+}
+
+// 按 float_input 返回数组的元素类型调用 fn(const float *) 或 fn(const double *)
+template <typename Fn>
+void with_float_data(const py::array &a, Fn fn) {
+    if (py::isinstance<py::array_t<double>>(a)) {
+        fn(static_cast<const double *>(a.data()));
+    } else {
+        fn(static_cast<const float *>(a.data()));
+    }
+}
+
+// 行优先存放的 4x4 数组转换为齐次变换
+template <typename T>
+Eigen::Matrix4d matrix_from_rows(const T *p) {
+    return Eigen::Map<const Eigen::Matrix<T, 4, 4, Eigen::RowMajor>>(p).template cast<double>();
+}
+
+// 输出数组: out 为 None 时新建; 否则 out 必须是可写的 C 连续数组, 类型和形状与输出一致, 结果直接写入 out
+template <typename T>
+py::array_t<T> output_array(const py::object &out, const std::vector<py::ssize_t> &shape, const char *name = "out") {
+    if (out.is_none()) {
+        return py::array_t<T>(shape);
+    }
+    if (!py::isinstance<py::array_t<T, py::array::c_style>>(out)) {
+        throw std::runtime_error(std::string(name) + " must be a C-contiguous " +
+                                 py::str(py::dtype::of<T>()).cast<std::string>() + " array");
+    }
+    auto a = py::reinterpret_borrow<py::array_t<T>>(out);
+    bool same_shape = a.ndim() == static_cast<py::ssize_t>(shape.size());
+    for (size_t d = 0; same_shape && d < shape.size(); d++) {
+        same_shape = a.shape(d) == shape[d];
+    }
+    if (!same_shape) {
+        std::string expected;
+        for (size_t d = 0; d < shape.size(); d++) {
+            expected += (d ? ", " : "") + std::to_string(shape[d]);
+        }
+        if (shape.size() == 1) {
+            expected += ",";
+        }
+        throw std::runtime_error(std::string(name) + " must have shape (" + expected + ")");
+    }
+    if (!a.writeable()) {
+        throw std::runtime_error(std::string(name) + " is read-only");
+    }
+    return a;
+}
+
+// 解析 IK 初值: None, (6,) 或 (n, 6), 返回数据指针和行步长 (单个初值时步长为 0)
+const float *ik_seed(const py::object &seed, FloatArray &holder, size_t n, size_t &stride) {
+    stride = 0;
+    if (seed.is_none()) {
+        return nullptr;
+    }
+    holder = py::cast<FloatArray>(seed);
+    if (holder.ndim() == 1 && holder.shape(0) >= 6) {
+        return holder.data();
+    }
+    if (holder.ndim() == 2 && static_cast<size_t>(holder.shape(0)) == n && holder.shape(1) >= 6) {
+        stride = static_cast<size_t>(holder.shape(1));
+        return holder.data();
+    }
+    throw std::runtime_error("seed must have shape (6,) or (N, 6)");
+}
+
+// 单次逆解: 有初值 (seed 参数或跟踪模式) 时先用带初值的数值解, 失败再退回 SDK 求解器
+// 选择解析解时直接返回离初值最近的解析解; 启用缓存且没有初值时先查缓存
+// pose() 返回目标位姿, sdk_solve(theta_result) 调用 SDK 求解器
+template <typename Pose, typename SdkSolve>
+bool ik_single(pysagittarius::ArmKinematics &self, const py::object &seed, double eomg, double ev,
+               float *theta_result, int &iterations, Pose pose, SdkSolve sdk_solve) {
+    FloatArray holder;
+    size_t stride;
+    const float *start = ik_seed(seed, holder, 1, stride);
+    bool success = false;
+    iterations = 0;
+    if (start == nullptr && self.tracking && self.have_tracking_seed) {
+        start = self.tracking_seed;
+    }
+    // 缓存只保存和返回没有初值时的解; 有初值时要求离初值近的解, 不使用缓存
+    std::shared_ptr<pysagittarius::IkCache> cache = start == nullptr ? self.cache : nullptr;
+    pysagittarius::IkCache::Key key;
+    float hit[6];
+    if (cache) {
+        key = cache->MakeKey(pose(), self.offset);
+        // 命中的是同一量化格内某个位姿的解: 以它为初值求解目标位姿, 满足 eomg/ev 才算成功, 分支与缓存的解相同
+        if (cache->Get(key, hit)) {
+            start = hit;
+        }
+    }
+    if (self.analytic) {
+        // 解析解不需要初值, 初值只用来在多组解中挑选
+        success = self.SolveAnalytic(pose(), start, theta_result, eomg, ev).success;
+    } else {
+        if (start != nullptr) {
+            pysagittarius::IkResult r = self.SolveSeeded(pose(), start, theta_result, eomg, ev);
+            iterations = r.iterations;
+            success = r.success;
+        }
+        if (!success) {
+            success = sdk_solve(theta_result);
+        }
+    }
+    if (success) {
+        self.Track(theta_result);
+        if (cache) {
+            cache->Put(key, theta_result);
+        }
+    }
+    return success;
+}
+
+// 雅可比所在坐标系: "space" 或 "body"
+bool body_frame(const std::string &frame) {
+    if (frame == "space") {
+        return false;
+    }
+    if (frame == "body") {
+        return true;
+    }
+    throw std::runtime_error("frame must be 'space' or 'body'");
+}
+
+// 返回 (K, 6) 的全部解析解, 按与 reference 的距离从近到远排序
+py::array_t<float> ik_branches(const pysagittarius::ArmKinematics &self, const Eigen::Matrix4d &T, double eomg,
+                               double ev, const py::object &reference) {
+    FloatArray holder;
+    size_t stride;
+    const float *ref = ik_seed(reference, holder, 1, stride);
+    double branches[pysagittarius::kMaxIkBranches][6];
+    int count = self.Branches(T, ref, eomg, ev, branches);
+    py::array_t<float> result({static_cast<py::ssize_t>(count), static_cast<py::ssize_t>(6)});
+    auto r = result.mutable_unchecked<2>();
+    for (int k = 0; k < count; k++) {
+        for (int j = 0; j < 6; j++) {
+            r(k, j) = static_cast<float>(branches[k][j]);
+        }
+    }
+    return result;
+}
+
+// 批量逆运动学: poses 为 (N, row_shape...) 数组, pose(row) 把一行转换为齐次变换,
+// sdk_solve(kinematics, row, theta_result) 调用 SDK 求解器
+// seed 为 None, (6,) 或 (N, 6); chain 为 True 时每行以同一线程内上一行的解为初值 (解析解时作为参考构型)
+// 计算期间释放 GIL, 并按 num_threads 切分到多个工作线程, 每个线程使用独立的运动学对象副本
+// poses 可以是 float32 或 float64 数组, pose 和 sdk_solve 需要接受两种指针; out 为可选的 (N, 6) 输出数组
+template <typename Pose, typename SdkSolve>
+py::tuple ik_batch(const char *name, const pysagittarius::ArmKinematics &self, const py::array &poses,
+                   const std::vector<py::ssize_t> &row_shape, const py::object &seed, bool chain, double eomg,
+                   double ev, int num_threads, const py::object &out_array, Pose pose, SdkSolve sdk_solve) {
+    PYSAG_METRIC_CALL_DYNAMIC(name);
+    if (poses.ndim() != static_cast<py::ssize_t>(row_shape.size()) + 1) {
+        throw std::runtime_error("Input array has wrong number of dimensions");
+    }
+    py::ssize_t row_size = 1;
+    for (size_t d = 0; d < row_shape.size(); d++) {
+        if (poses.shape(d + 1) != row_shape[d]) {
+            throw std::runtime_error("Input array has wrong shape");
+        }
+        row_size *= row_shape[d];
+    }
+    const size_t n = static_cast<size_t>(poses.shape(0));
+    FloatArray seed_holder;
+    size_t seed_stride;
+    const float *seeds = ik_seed(seed, seed_holder, n, seed_stride);
+    py::array_t<bool> success(static_cast<py::ssize_t>(n));
+    py::array_t<float> result = output_array<float>(out_array, {static_cast<py::ssize_t>(n), 6});
+    bool *ok = success.mutable_data();
+    float *out = result.mutable_data();
+    std::atomic<uint64_t> iterations{0};
+    with_float_data(poses, [&](const auto *in) {
+        py::gil_scoped_release release;
+        pysagittarius::parallel_for(n, num_threads, 1, [&](size_t begin, size_t end) {
+            pysagittarius::ArmKinematics local(self);
+            uint64_t local_iterations = 0;
+            for (size_t i = begin; i < end; i++) {
+                const auto *row = in + i * row_size;
+                float *theta_result = out + i * 6;
+                const float *start = seeds != nullptr ? seeds + i * seed_stride : nullptr;
+                if (chain && i > begin && ok[i - 1]) {
+                    start = out + (i - 1) * 6;
+                }
+                if (local.analytic) {
+                    ok[i] = local.SolveAnalytic(pose(row), start, theta_result, eomg, ev).success;
+                    continue;
+                }
+                bool solved = false;
+                if (start != nullptr) {
+                    pysagittarius::IkResult r = local.SolveSeeded(pose(row), start, theta_result, eomg, ev);
+                    local_iterations += r.iterations;
+                    solved = r.success;
+                }
+                ok[i] = solved || sdk_solve(local, row, theta_result);
+            }
+            iterations += local_iterations;
+        });
+    });
+    PYSAG_METRIC_FAIL(std::count(ok, ok + n, false));
+    PYSAG_METRIC_ITERATIONS(iterations.load());
+    return py::make_tuple(success, result);
+}
+
+// 批量正运动学输入: float32/float64 的 (N, >=6) 关节数组, 返回 N
+py::ssize_t fk_batch_rows(const py::array &theta) {
+    if (theta.ndim() != 2 || theta.shape(1) < 6) {
+        throw std::runtime_error("Input array must have shape (N, 6)");
+    }
+    return theta.shape(0);
+}
+
+// 批量正运动学: theta 由 float_input 得到, 每行取前 6 个关节调用一次 solve(kinematics, theta_row, i)
+// solve 负责把结果写入调用方预先分配好的输出数组, 返回值写入成功掩码
+template <typename Solve>
+py::array_t<bool> fk_batch(const char *name, const pysagittarius::ArmKinematics &self,
+                           const py::array &theta, int num_threads, Solve solve) {
+    PYSAG_METRIC_CALL_DYNAMIC(name);
+    const size_t n = static_cast<size_t>(fk_batch_rows(theta));
+    const size_t stride = static_cast<size_t>(theta.shape(1));
+    py::array_t<bool> success(static_cast<py::ssize_t>(n));
+    bool *ok = success.mutable_data();
+    with_float_data(theta, [&](const auto *in) {
+        py::gil_scoped_release release;
+        pysagittarius::parallel_for(n, num_threads, 64, [&](size_t begin, size_t end) {
+            pysagittarius::ArmKinematics local(self);
+            float theta_arr[6];
+            for (size_t i = begin; i < end; i++) {
+                std::copy(in + i * stride, in + i * stride + 6, theta_arr);
+                ok[i] = solve(local, theta_arr, i);
+            }
+        });
+    });
+    PYSAG_METRIC_FAIL(std::count(ok, ok + n, false));
+    return success;
+}
+
+// 关节和夹爪: gripper 为 None 时 joint_positions 为 7 个值, 否则为 6 个关节弧度, 夹爪直线位置取 gripper
+void read_arm_gripper(const py::object &joint_positions, const py::object &gripper, float *js) {
+    if (gripper.is_none()) {
+        read_vector(joint_positions, js, 7);
+    } else {
+        read_vector(joint_positions, js, 6);
+        js[6] = gripper.cast<float>();
+    }
+}
+
+// 禁入区: None 或 (K, 6) 数组, 每行为 xmin, ymin, zmin, xmax, ymax, zmax
+std::vector<pysagittarius::Box> read_boxes(const py::object &boxes) {
+    std::vector<pysagittarius::Box> result;
+    if (boxes.is_none()) {
+        return result;
+    }
+    auto a = py::cast<DoubleArray>(boxes);
+    if (a.ndim() != 2 || a.shape(1) != 6) {
+        throw std::runtime_error("boxes must have shape (K, 6): xmin, ymin, zmin, xmax, ymax, zmax");
+    }
+    for (py::ssize_t k = 0; k < a.shape(0); k++) {
+        const double *p = a.data(k, 0);
+        pysagittarius::Box box{Eigen::Vector3d(p[0], p[1], p[2]), Eigen::Vector3d(p[3], p[4], p[5])};
+        if ((box.lo.array() > box.hi.array()).any()) {
+            throw std::runtime_error("box " + std::to_string(k) + " has min greater than max");
+        }
+        result.push_back(box);
+    }
+    return result;
+}
+
+// 与 ServoStruct 内存布局相同的结构化数组类型 (id: u1, value: f4)
+py::dtype servo_command_dtype() {
+    py::list names, formats, offsets;
+    names.append("id");
+    formats.append("u1");
+    offsets.append(offsetof(ServoStruct, id));
+    names.append("value");
+    formats.append("<f4");
+    offsets.append(offsetof(ServoStruct, value));
+    return py::dtype(names, formats, offsets, sizeof(ServoStruct));
+}
+
+// 与 shm::Command 内存布局相同的结构化数组类型
+py::dtype shm_command_dtype() {
+    py::list names, formats, offsets;
+    names.append("kind");
+    formats.append("<u4");
+    offsets.append(offsetof(pysagittarius::shm::Command, kind));
+    names.append("mask");
+    formats.append("<u4");
+    offsets.append(offsetof(pysagittarius::shm::Command, mask));
+    names.append("values");
+    formats.append("(7,)<f4");
+    offsets.append(offsetof(pysagittarius::shm::Command, values));
+    names.append("ints");
+    formats.append("(7,)<i4");
+    offsets.append(offsetof(pysagittarius::shm::Command, ints));
+    return py::dtype(names, formats, offsets, sizeof(pysagittarius::shm::Command));
+}
+
+pysagittarius::shm::Command make_command(uint32_t kind) {
+    pysagittarius::shm::Command command;
+    std::memset(&command, 0, sizeof(command));
+    command.kind = kind;
+    return command;
+}
+
+// 写入共享内存命令队列, 队列一直是满的 (服务进程没有及时处理) 时抛出异常
+void push_command(pysagittarius::SharedArmClient &client, const pysagittarius::shm::Command &command) {
+    bool queued;
+    {
+        py::gil_scoped_release release;
+        queued = client.Push(command, client.CommandTimeout());
+    }
+    if (!queued) {
+        throw std::runtime_error("Command queue of " + client.name() + " is full");
+    }
+}
+
+// 按共享内存段中的关节限位检查, 与 SagittariusArmReal 的 CheckUpperLower 相同
+bool within_limits(const pysagittarius::SharedArmClient &client, int index, float value) {
+    return index >= 0 && index < 7 && value >= client.LowerJointLimits()[index] &&
+           value <= client.UpperJointLimits()[index];
+}
+
+bool is_servo_array(const py::handle &obj) {
+    if (!py::isinstance<py::array>(obj)) {
+        return false;
+    }
+    py::object fields = py::reinterpret_borrow<py::array>(obj).dtype().attr("fields");
+    return !fields.is_none() && fields.attr("__contains__")("id").cast<bool>() &&
+           fields.attr("__contains__")("value").cast<bool>();
+}
+
+void read_servo_fields(const py::handle &ids, const py::handle &values, int count, ServoStruct *sv) {
+    unsigned char id_arr[pysagittarius::kMaxServoCommands];
+    float value_arr[pysagittarius::kMaxServoCommands];
+    read_vector(ids, id_arr, count);
+    read_vector(values, value_arr, count);
+    for (int i = 0; i < count; i++) {
+        sv[i].id = id_arr[i];
+        sv[i].value = value_arr[i];
+    }
+}
+
+// 索引舵机命令: ServoCommandBuffer, 含 id/value 字段的结构化数组, ServoStruct 列表, 或 ids 和 values 两个数组
+// 除 ServoStruct 列表外都按字段整体读取, 不逐个访问 Python 对象; num 为 None 时使用全部命令, 返回命令个数
+int read_servo_commands(const py::object &sv_list, const py::object &num, const py::object &ids,
+                        const py::object &values, ServoStruct *sv) {
+    int count = num.is_none() ? -1 : num.cast<int>();
+    if (count > pysagittarius::kMaxServoCommands) {
+        throw std::runtime_error("Number of servos cannot exceed 6");
+    }
+    if (!num.is_none() && count < 0) {
+        throw std::runtime_error("num must be non-negative");
+    }
+    auto resolve = [&count](size_t available) {
+        if (count < 0) {
+            if (available > static_cast<size_t>(pysagittarius::kMaxServoCommands)) {
+                throw std::runtime_error("Number of servos cannot exceed 6");
+            }
+            count = static_cast<int>(available);
+        } else if (static_cast<size_t>(count) > available) {
+            throw std::runtime_error("num exceeds the number of servo commands");
+        }
+    };
+    if (!ids.is_none() || !values.is_none()) {
+        if (!sv_list.is_none() || ids.is_none() || values.is_none()) {
+            throw std::runtime_error("Pass either sv_list or both ids and values");
+        }
+        resolve(std::min(py::len(ids), py::len(values)));
+        read_servo_fields(ids, values, count, sv);
+    } else if (py::isinstance<pysagittarius::ServoCommandBuffer>(sv_list)) {
+        const auto &buffer = sv_list.cast<const pysagittarius::ServoCommandBuffer &>();
+        resolve(buffer.count);
+        std::copy(buffer.servos, buffer.servos + count, sv);
+    } else if (is_servo_array(sv_list)) {
+        py::array a = py::reinterpret_borrow<py::array>(sv_list);
+        if (a.ndim() != 1) {
+            throw std::runtime_error("sv_list must be a 1-D structured array");
+        }
+        py::object id_field = a[py::str("id")], value_field = a[py::str("value")];
+        // id 必须是整数, 否则 1.5 之类的值会被截断成另一个舵机
+        const char id_kind = py::reinterpret_borrow<py::array>(id_field).dtype().kind();
+        const char value_kind = py::reinterpret_borrow<py::array>(value_field).dtype().kind();
+        if ((id_kind != 'u' && id_kind != 'i') || (value_kind != 'f' && value_kind != 'u' && value_kind != 'i')) {
+            throw py::type_error("sv_list must have an integer id field and a numeric value field, "
+                                 "got dtype " + py::str(a.dtype()).cast<std::string>());
+        }
+        resolve(static_cast<size_t>(a.shape(0)));
+        read_servo_fields(id_field, value_field, count, sv);
+    } else if (py::isinstance<py::array>(sv_list)) {
+        throw py::type_error("sv_list array must have id and value fields (SERVO_COMMAND_DTYPE), got dtype " +
+                             py::str(py::reinterpret_borrow<py::array>(sv_list).dtype()).cast<std::string>());
+    } else {
+        resolve(py::len(sv_list));
+        for (int i = 0; i < count; i++) {
+            py::object item = sv_list[py::int_(i)];
+            sv[i].id = item.attr("id").cast<unsigned char>();
+            sv[i].value = item.attr("value").cast<float>();
+        }
+    }
+    return count;
+}
+
+// 检查轨迹参数: times 为 (N,), points 为 (N, 6|7)
+size_t check_trajectory(const DoubleArray &times, const FloatArray &points) {
+    if (times.ndim() != 1 || points.ndim() != 2 || points.shape(0) != times.shape(0)) {
+        throw std::runtime_error("times must have shape (N,) and points shape (N, 6) or (N, 7)");
+    }
+    return static_cast<size_t>(times.shape(0));
+}
+
+// 延迟直方图的调用次数和分位数 (秒)
+py::dict latency_to_dict(const pysagittarius::LatencyHistogram &h) {
+    py::dict d;
+    const uint64_t calls = h.Count().Since();
+    d["calls"] = calls;
+    d["mean"] = calls ? h.Sum().Since() * 1e-9 / calls : 0.0;
+    d["p50"] = h.Quantile(0.5) * 1e-9;
+    d["p95"] = h.Quantile(0.95) * 1e-9;
+    d["p99"] = h.Quantile(0.99) * 1e-9;
+    d["max"] = h.Max() * 1e-9;
+    return d;
+}
+
+py::dict progress_to_dict(const pysagittarius::TrajectoryProgress &progress) {
+    py::dict d;
+    d["state"] = progress.state;
+    d["waypoint"] = progress.waypoint;
+    d["num_waypoints"] = progress.num_waypoints;
+    d["elapsed"] = progress.elapsed;
+    d["duration"] = progress.duration;
+    d["setpoints"] = progress.setpoints;
+    d["max_lateness"] = progress.max_lateness;
+    return d;
+}
+
+// 把 Python 回调包装为可在原生线程中调用的函数, 调用和析构时获取 GIL
+pysagittarius::TrajectoryExecutor::ProgressFn wrap_progress_callback(py::function fn) {
+    std::shared_ptr<py::function> callback(new py::function(std::move(fn)), [](py::function *f) {
+        py::gil_scoped_acquire gil;
+        delete f;
+    });
+    return [callback](const pysagittarius::TrajectoryProgress &progress) {
+        py::gil_scoped_acquire gil;
+        try {
+            (*callback)(progress_to_dict(progress));
+        } catch (py::error_already_set &e) {
+            e.discard_as_unraisable("trajectory progress callback");
+        }
+    };
+}
+
+}  // namespace
+
 PYBIND11_MODULE(pysagittarius, m) {
     m.doc() = "Python bindings for Sagittarius Arm SDK";
 
     // 设置日志级别函数
     m.def("log_set_level", &log_set_level, "Set log level (0-5)");
     
+    // 调用统计
+#ifdef PYSAGITTARIUS_METRICS
+    m.attr("metrics_enabled") = true;
+#else
+    m.attr("metrics_enabled") = false;
+#endif
+    m.def("get_metrics", []() {
+        py::dict result;
+        pysagittarius::metrics().ForEach([&result](const std::string &name, const std::string &source,
+                                                   pysagittarius::MethodStats &s) {
+            const pysagittarius::LatencyHistogram &h = s.latency;
+            const uint64_t calls = h.Count().Since();
+            py::dict d;
+            d["method"] = name;
+            d["source"] = source;
+            d["calls"] = calls;
+            d["failures"] = s.failures.Since();
+            d["timeouts"] = s.timeouts.Since();
+            d["ik_iterations"] = s.ik_iterations.Since();
+            d["total"] = h.Sum().Since() * 1e-9;
+            d["mean"] = calls ? h.Sum().Since() * 1e-9 / calls : 0.0;
+            d["p50"] = h.Quantile(0.5) * 1e-9;
+            d["p95"] = h.Quantile(0.95) * 1e-9;
+            d["p99"] = h.Quantile(0.99) * 1e-9;
+            d["max"] = h.Max() * 1e-9;
+            result[py::str(source == pysagittarius::kPythonSource ? name : name + "[" + source + "]")] = d;
+        });
+        return result;
+    }, "Per-method call counts, failures, timeouts, IK iterations and latency percentiles (seconds) since the\n"
+       "last reset_metrics(). Calls made from Python are keyed by method name; calls made by the background\n"
+       "threads are keyed 'method[source]' with source 'poller', 'coalescer' or 'executor'.\n"
+       "ik_iterations only counts seeded Newton solves; the SDK solver used without a seed reports none");
+    m.def("reset_metrics", []() { pysagittarius::metrics().Reset(); },
+          "Restart the statistics reported by get_metrics(). Prometheus counters keep counting");
+    m.def("metrics_prometheus", []() { return pysagittarius::metrics().Prometheus(); },
+          "Call statistics in Prometheus text exposition format, labelled by method and source.\n"
+          "Counters and summary _sum/_count are cumulative; quantiles and the max gauge restart on reset_metrics()");
+
     // 绑定 ServoStruct 结构体
     py::class_<ServoStruct>(m, "ServoStruct")
         .def(py::init<>())
         .def_readwrite("id", &ServoStruct::id)
         .def_readwrite("value", &ServoStruct::value);
 
+    m.attr("SERVO_COMMAND_DTYPE") = servo_command_dtype();
+
+    // validateTrajectory 的结果位
+    m.attr("VIOLATION_JOINT_LIMIT") = static_cast<int>(pysagittarius::kViolationJointLimit);
+    m.attr("VIOLATION_SELF_COLLISION") = static_cast<int>(pysagittarius::kViolationSelfCollision);
+    m.attr("VIOLATION_FLOOR") = static_cast<int>(pysagittarius::kViolationFloor);
+    m.attr("VIOLATION_KEEP_OUT") = static_cast<int>(pysagittarius::kViolationKeepOut);
+
+    // 可重复使用的索引舵机命令缓冲
+    py::class_<pysagittarius::ServoCommandBuffer>(m, "ServoCommandBuffer")
+        .def(py::init<>())
+        .def("set", &pysagittarius::ServoCommandBuffer::Set, py::arg("id"), py::arg("value"),
+             "Set the target of one servo; setting the same id again replaces its value")
+        .def("clear", &pysagittarius::ServoCommandBuffer::Clear)
+        .def("assign", [](pysagittarius::ServoCommandBuffer &self, py::object ids, py::object values) {
+            size_t n = std::min(py::len(ids), py::len(values));
+            if (n > static_cast<size_t>(pysagittarius::kMaxServoCommands)) {
+                throw std::runtime_error("Number of servos cannot exceed 6");
+            }
+            ServoStruct sv[pysagittarius::kMaxServoCommands];
+            read_servo_fields(ids, values, static_cast<int>(n), sv);
+            self.Clear();
+            for (size_t i = 0; i < n; i++) {
+                self.Set(sv[i].id, sv[i].value);
+            }
+        }, py::arg("ids"), py::arg("values"), "Replace all commands with the given ids and values")
+        .def("__len__", [](const pysagittarius::ServoCommandBuffer &self) { return self.count; })
+        .def_property_readonly("ids", [](const pysagittarius::ServoCommandBuffer &self) {
+            py::array_t<uint8_t> result(self.count);
+            for (int i = 0; i < self.count; i++) {
+                result.mutable_data()[i] = self.servos[i].id;
+            }
+            return result;
+        })
+        .def_property_readonly("values", [](const pysagittarius::ServoCommandBuffer &self) {
+            py::array_t<float> result(self.count);
+            for (int i = 0; i < self.count; i++) {
+                result.mutable_data()[i] = self.servos[i].value;
+            }
+            return result;
+        });
+
     // 绑定 SagittariusArmReal 类
-    py::class_<sdk_sagittarius_arm::SagittariusArmReal>(m, "SagittariusArmReal")
+    py::class_<pysagittarius::ArmReal, std::unique_ptr<pysagittarius::ArmReal, pysagittarius::ReleaseGilDeleter>>(m, "SagittariusArmReal")
         .def(py::init<std::string, int, int, int>(),
              py::arg("strSerialName") = "/dev/sagittarius",
              py::arg("Baudrate") = 1000000,
              py::arg("vel") = 500,
-             py::arg("acc") = 5)
-        .def("SetFreeAfterDestructor", &sdk_sagittarius_arm::SagittariusArmReal::SetFreeAfterDestructor,
+             py::arg("acc") = 5,
+             py::call_guard<py::gil_scoped_release>())
+        .def("SetFreeAfterDestructor", &pysagittarius::ArmReal::SetFreeAfterDestructor,
              "Set whether to free servos after destructor")
-        .def("CheckUpperLower", [](sdk_sagittarius_arm::SagittariusArmReal &self, py::array_t<float> js) {
-            auto r = js.unchecked<1>();
-            if (r.shape(0) < 6) {
-                throw std::runtime_error("Input array must have at least 6 elements");
-            }
+        .def("CheckUpperLower", [](pysagittarius::ArmReal &self, py::object js) {
             float js_arr[6];
-            for (int i = 0; i < 6; i++) {
-                js_arr[i] = r(i);
-            }
+            read_vector(js, js_arr, 6);
             return self.CheckUpperLower(js_arr);
         })
-        .def("CheckUpperLowerWithIndex", [](sdk_sagittarius_arm::SagittariusArmReal &self, py::list sv_list, int num) {
-            if (num > 6) {
-                throw std::runtime_error("Number of servos cannot exceed 6");
+        .def("CheckUpperLowerWithIndex", [](pysagittarius::ArmReal &self, py::object sv_list, py::object num,
+                                            py::object ids, py::object values) {
+            ServoStruct sv[pysagittarius::kMaxServoCommands];
+            int count = read_servo_commands(sv_list, num, ids, values, sv);
+            return self.CheckUpperLowerWithIndex(sv, count);
+        }, py::arg("sv_list") = py::none(), py::arg("num") = py::none(), py::arg("ids") = py::none(),
+           py::arg("values") = py::none(),
+           "sv_list is a ServoCommandBuffer, a SERVO_COMMAND_DTYPE array or a list of ServoStruct; "
+           "alternatively pass ids and values arrays. num defaults to all commands")
+        .def("arm_set_gripper_linear_position", &pysagittarius::ArmReal::arm_set_gripper_linear_position,
+             "Set gripper linear position (-0.068~0.0)", py::call_guard<py::gil_scoped_release>())
+        .def("SetAllServoRadian", [](pysagittarius::ArmReal &self, py::object joint_positions) {
+            float js_arr[6];
+            read_vector(joint_positions, js_arr, 6);
+            py::gil_scoped_release release;
+            if (!self.coalescer.Submit(js_arr, 0x3f)) {
+                self.SetAllServoRadian(js_arr);
+            }
+        })
+        .def("SetAllServoRadianAndGripper", [](pysagittarius::ArmReal &self, py::object joint_positions, py::object gripper) {
+            float js[7];
+            read_arm_gripper(joint_positions, gripper, js);
+            py::gil_scoped_release release;
+            if (!self.coalescer.Submit(js, 0x3f, js[6])) {
+                self.SendServoRadian(js, 0x3f, js[6]);
+            }
+        }, py::arg("joint_positions"), py::arg("gripper") = py::none(),
+           "Set joints 1-6 (radians) and the gripper linear position (-0.068~0.0) in one call. The protocol has no\n"
+           "7-servo frame, so this is still two frames (joints, then gripper) written back to back while holding\n"
+           "the serial port: no other call is interleaved, but the transaction count is the same as two calls.\n"
+           "Pass 7 values, or 6 joints and gripper. A NaN gripper leaves the gripper alone")
+        .def("GetCurrentJointStatus", [](pysagittarius::ArmReal &self, py::object out) {
+            py::array_t<float> result = output_array<float>(out, {7});
+            float *js = result.mutable_data();
+            bool success;
+            {
+                py::gil_scoped_release release;
+                success = self.GetCurrentJointStatus(js);
             }
-            ServoStruct sv[6];
-            for (int i = 0; i < num; i++) {
-                py::object item = sv_list[i];
-                sv[i].id = item.attr("id").cast<unsigned char>();
-                sv[i].value = item.attr("value").cast<float>();
+            return py::make_tuple(success, result);
+        }, py::arg("out") = py::none(),
+           "Return (success, js (7,)); js is written into out when a float32 (7,) array is given")
+        .def("SetServoRadianWithIndex", [](pysagittarius::ArmReal &self, py::object sv_list, py::object num,
+                                           py::object ids, py::object values) {
+            ServoStruct sv[pysagittarius::kMaxServoCommands];
+            int count = read_servo_commands(sv_list, num, ids, values, sv);
+            py::gil_scoped_release release;
+            // 编号不在 1~7 内的命令不经过合并器
+            float servo_values[7] = {0, 0, 0, 0, 0, 0, 0};
+            uint32_t mask = 0;
+            bool direct = count == 0;
+            for (int i = 0; i < count; i++) {
+                if (sv[i].id >= 1 && sv[i].id <= 7) {
+                    servo_values[sv[i].id - 1] = sv[i].value;
+                    mask |= 1u << (sv[i].id - 1);
+                } else {
+                    direct = true;
+                }
+            }
+            if (direct || !self.coalescer.Submit(servo_values, mask)) {
+                self.SetServoRadianWithIndex(sv, count);
+            }
+        }, py::arg("sv_list") = py::none(), py::arg("num") = py::none(), py::arg("ids") = py::none(),
+           py::arg("values") = py::none(),
+           "Same inputs as CheckUpperLowerWithIndex")
+        .def("ControlTorque", &pysagittarius::ArmReal::ControlTorque,
+             "Control torque ('free' or 'lock')", py::call_guard<py::gil_scoped_release>())
+        .def("GetServoInfo", [](pysagittarius::ArmReal &self, unsigned char id, int timeout_ms, py::object out) {
+            py::array_t<int16_t> result = output_array<int16_t>(out, {4});
+            int16_t *info_arr = result.mutable_data();
+            bool success;
+            {
+                py::gil_scoped_release release;
+                success = self.GetServoInfo(id, info_arr, timeout_ms);
+            }
+            return py::make_tuple(success, result);
+        }, py::arg("id"), py::arg("timeout_ms") = 500, py::arg("out") = py::none())
+        .def("GetAllServoInfo", [](pysagittarius::ArmReal &self, int timeout_ms, int servo_timeout_ms, py::object out) {
+            py::array_t<int16_t> info = output_array<int16_t>(out, {7, 4});
+            py::array_t<bool> valid(7);
+            int16_t *info_arr = info.mutable_data();
+            bool *valid_arr = valid.mutable_data();
+            {
+                py::gil_scoped_release release;
+                self.GetAllServoInfo(info_arr, valid_arr, timeout_ms, servo_timeout_ms);
             }
-            return self.CheckUpperLowerWithIndex(sv, num);
+            return py::make_tuple(valid, info);
+        }, py::arg("timeout_ms") = 100, py::arg("servo_timeout_ms") = 20, py::arg("out") = py::none(),
+           "Return (valid (7,) bool, info (7, 4) int16) for servos 1-7; all requests share the timeout_ms "
+           "deadline and each servo waits at most servo_timeout_ms. Rows of servos that did not answer are zero")
+        .def("SetServoAcceleration", &pysagittarius::ArmReal::SetServoAcceleration,
+             "Set servo acceleration (0-254)", py::call_guard<py::gil_scoped_release>())
+        .def("SetServoVelocity", &pysagittarius::ArmReal::SetServoVelocity,
+             "Set servo velocity (0-4096)", py::call_guard<py::gil_scoped_release>())
+        .def("SetServoTorque", [](pysagittarius::ArmReal &self, py::object arm_torque) {
+            int torque_arr[7];
+            read_vector(arm_torque, torque_arr, 7);
+            py::gil_scoped_release release;
+            return self.SetServoTorque(torque_arr);
+        })
+        .def("StartJointStatePoller", [](pysagittarius::ArmReal &self, double rate_hz, double max_age) {
+            py::gil_scoped_release release;
+            self.poller.Start(rate_hz, max_age);
+        }, py::arg("rate_hz") = 50.0, py::arg("max_age") = 0.1,
+           "Start refreshing the cached joint state in a background thread at rate_hz")
+        .def("StopJointStatePoller", [](pysagittarius::ArmReal &self) {
+            py::gil_scoped_release release;
+            self.poller.Stop();
         })
-        .def("arm_set_gripper_linear_position", &sdk_sagittarius_arm::SagittariusArmReal::arm_set_gripper_linear_position,
-             "Set gripper linear position (-0.068~0.0)")
-        .def("SetAllServoRadian", [](sdk_sagittarius_arm::SagittariusArmReal &self, py::array_t<float> joint_positions) {
-            auto r = joint_positions.unchecked<1>();
-            if (r.shape(0) < 6) {
-                throw std::runtime_error("Input array must have at least 6 elements");
+        .def_property_readonly("joint_state_poller_running", [](const pysagittarius::ArmReal &self) {
+            return self.poller.Running();
+        })
+        .def("EnableCommandCoalescing", [](pysagittarius::ArmReal &self, py::object deadband) {
+            float band[7];
+            // 与 sim.py 的 np.ndim(deadband) == 0 一致: 0 维数组也是标量
+            bool scalar = py::isinstance<py::array>(deadband) ? py::reinterpret_borrow<py::array>(deadband).ndim() == 0
+                                                             : !py::hasattr(deadband, "__len__");
+            if (scalar) {
+                std::fill(band, band + 7, deadband.cast<float>());
+            } else {
+                band[6] = 0.0f;
+                py::ssize_t n = py::len(deadband);
+                if (n != 6 && n != 7) {
+                    throw std::runtime_error("deadband must be a scalar or have 6 or 7 elements");
+                }
+                read_vector(deadband, band, static_cast<size_t>(n));
             }
-            float js_arr[6];
-            for (int i = 0; i < 6; i++) {
-                js_arr[i] = r(i);
+            py::gil_scoped_release release;
+            self.coalescer.Start(band);
+        }, py::arg("deadband") = 0.0,
+           "Send SetAllServoRadian / SetServoRadianWithIndex from a writer thread: the calls return at once, an\n"
+           "unsent setpoint is replaced by newer commands, and servos that moved no more than deadband (radians,\n"
+           "scalar or per servo) since their last write are left out. Calling again updates the deadband")
+        .def("DisableCommandCoalescing", [](pysagittarius::ArmReal &self) {
+            py::gil_scoped_release release;
+            self.coalescer.Stop();
+        }, "Send the pending setpoint, then write commands directly again")
+        .def_property_readonly("command_coalescing", [](pysagittarius::ArmReal &self) {
+            return self.coalescer.Running();
+        })
+        .def_property_readonly("command_coalescing_stats", [](pysagittarius::ArmReal &self) {
+            pysagittarius::CommandCoalescer::Stats stats = self.coalescer.GetStats();
+            py::dict d;
+            d["submitted"] = stats.submitted;
+            d["sent"] = stats.sent;
+            d["coalesced"] = stats.coalesced;
+            d["suppressed"] = stats.suppressed;
+            d["joints_skipped"] = stats.joints_skipped;
+            d["saved"] = stats.submitted - stats.sent;
+            return d;
+        }, "submitted commands, sent setpoints, commands merged before sending, setpoints dropped by the\n"
+           "deadband, servos left out by the deadband, and saved = submitted - sent")
+        .def("ResetCommandCoalescingStats", [](pysagittarius::ArmReal &self) { self.coalescer.ResetStats(); })
+        .def("StartRecording", [](pysagittarius::ArmReal &self, const std::string &path, uint64_t capacity) {
+            py::gil_scoped_release release;
+            self.StartRecording(path, capacity);
+        }, py::arg("path"), py::arg("capacity") = 100000,
+           "Record commands and joint states into a memory-mapped ring file of capacity records; "
+           "read it with pysagittarius.recording")
+        .def("StopRecording", [](pysagittarius::ArmReal &self) {
+            py::gil_scoped_release release;
+            self.StopRecording();
+        })
+        .def_property_readonly("recording_path", [](pysagittarius::ArmReal &self) -> py::object {
+            std::string path;
+            bool recording;
+            {
+                py::gil_scoped_release release;
+                std::lock_guard<std::mutex> lock(self.io_mutex);
+                recording = static_cast<bool>(self.recorder);
+                if (recording) {
+                    path = self.recorder->path();
+                }
             }
-            self.SetAllServoRadian(js_arr);
+            return recording ? py::object(py::str(path)) : py::object(py::none());
         })
-        .def("GetCurrentJointStatus", [](sdk_sagittarius_arm::SagittariusArmReal &self) {
-            float js[7];
-            bool success = self.GetCurrentJointStatus(js);
-            py::array_t<float> result(7);
-            auto r = result.mutable_unchecked<1>();
-            for (int i = 0; i < 7; i++) {
-                r(i) = js[i];
+        .def("GetCachedJointStatus", [](pysagittarius::ArmReal &self, py::object max_age, py::object out) {
+            pysagittarius::JointSample sample;
+            double age = max_age.is_none() ? -1.0 : max_age.cast<double>();
+            py::array_t<float> result = output_array<float>(out, {7});
+            {
+                py::gil_scoped_release release;
+                sample = self.poller.Fresh(age);
             }
-            return py::make_tuple(success, result);
+            std::copy(sample.js, sample.js + 7, result.mutable_data());
+            return py::make_tuple(sample.valid, result, sample.stamp, sample.seq);
+        }, py::arg("max_age") = py::none(), py::arg("out") = py::none(),
+           "Return (success, js, stamp, seq) from the poller cache, reading the arm if the sample is older than max_age seconds")
+        .def("ExecuteTrajectory", [](pysagittarius::ArmReal &self, DoubleArray times, FloatArray points, double rate_hz, py::object progress) {
+            size_t n = check_trajectory(times, points);
+            pysagittarius::TrajectoryExecutor::ProgressFn progress_fn;
+            if (!progress.is_none()) {
+                progress_fn = wrap_progress_callback(py::reinterpret_borrow<py::function>(progress));
+            }
+            const double *t = times.data();
+            const float *p = points.data();
+            size_t width = static_cast<size_t>(points.shape(1));
+            py::gil_scoped_release release;
+            self.executor.Execute(t, p, n, width, rate_hz, std::move(progress_fn));
+        }, py::arg("times"), py::arg("points"), py::arg("rate_hz") = 50.0, py::arg("progress") = py::none(),
+           "Stream an (N,6|7) joint trajectory (column 7 = gripper linear position) from a native thread, preempting any running one.\n"
+           "If times[0] > 0 the motion starts from the preempted trajectory's last setpoint, or else from the joint state\n"
+           "read from the arm (the poller cache when it is running); RuntimeError if that read fails")
+        .def("AppendTrajectory", [](pysagittarius::ArmReal &self, DoubleArray times, FloatArray points, double rate_hz) {
+            size_t n = check_trajectory(times, points);
+            const double *t = times.data();
+            const float *p = points.data();
+            size_t width = static_cast<size_t>(points.shape(1));
+            py::gil_scoped_release release;
+            self.executor.Append(t, p, n, width, rate_hz);
+        }, py::arg("times"), py::arg("points"), py::arg("rate_hz") = 50.0,
+           "Append waypoints to the running trajectory, times are relative to its last waypoint")
+        .def("CancelTrajectory", [](pysagittarius::ArmReal &self) {
+            py::gil_scoped_release release;
+            self.executor.Cancel();
         })
-        .def("SetServoRadianWithIndex", [](sdk_sagittarius_arm::SagittariusArmReal &self, py::list sv_list, int num) {
-            if (num > 6) {
-                throw std::runtime_error("Number of servos cannot exceed 6");
+        .def("WaitTrajectory", [](pysagittarius::ArmReal &self, py::object timeout) {
+            double timeout_s = timeout.is_none() ? -1.0 : timeout.cast<double>();
+            py::gil_scoped_release release;
+            return self.executor.Wait(timeout_s);
+        }, py::arg("timeout") = py::none(),
+           "Wait for the trajectory to finish, returns False on timeout")
+        .def("GetTrajectoryStatus", [](pysagittarius::ArmReal &self) {
+            pysagittarius::TrajectoryProgress progress;
+            {
+                py::gil_scoped_release release;
+                progress = self.executor.Status();
+            }
+            return progress_to_dict(progress);
+        })
+        .def_readonly("lower_joint_limits", &pysagittarius::ArmReal::lower_joint_limits)
+        .def_readonly("upper_joint_limits", &pysagittarius::ArmReal::upper_joint_limits);
+
+    // 绑定 SagittariusArmGroup 类, 每个串口一个 I/O 线程
+    py::class_<pysagittarius::ArmGroup, std::unique_ptr<pysagittarius::ArmGroup, pysagittarius::ReleaseGilDeleter>>(
+        m, "SagittariusArmGroup")
+        .def(py::init<std::vector<std::string>, int, int, int>(),
+             py::arg("ports"),
+             py::arg("Baudrate") = 1000000,
+             py::arg("vel") = 500,
+             py::arg("acc") = 5,
+             py::call_guard<py::gil_scoped_release>(),
+             "Open all ports in parallel, one SagittariusArmReal and one I/O thread per port")
+        .def("__len__", &pysagittarius::ArmGroup::Size)
+        .def("__getitem__", [](pysagittarius::ArmGroup &self, size_t i) -> pysagittarius::ArmReal & {
+            if (i >= self.Size()) {
+                throw py::index_error("arm index out of range");
+            }
+            return self.Arm(i);
+        }, py::return_value_policy::reference_internal)
+        .def_property_readonly("ports", &pysagittarius::ArmGroup::Ports)
+        .def("SetAllServoRadian", [](pysagittarius::ArmGroup &self, FloatArray joint_positions, py::object at) {
+            if (joint_positions.ndim() != 2 || static_cast<size_t>(joint_positions.shape(0)) != self.Size() ||
+                (joint_positions.shape(1) != 6 && joint_positions.shape(1) != 7)) {
+                throw std::runtime_error("joint_positions must have shape (" + std::to_string(self.Size()) +
+                                         ", 6) or (" + std::to_string(self.Size()) + ", 7)");
             }
-            ServoStruct sv[6];
-            for (int i = 0; i < num; i++) {
-                py::object item = sv_list[i];
-                sv[i].id = item.attr("id").cast<unsigned char>();
-                sv[i].value = item.attr("value").cast<float>();
+            double at_s = at.is_none() ? 0.0 : at.cast<double>();
+            const float *points = joint_positions.data();
+            size_t width = static_cast<size_t>(joint_positions.shape(1));
+            py::gil_scoped_release release;
+            return self.SetAllServoRadian(points, width, at_s);
+        }, py::arg("joint_positions"), py::arg("at") = py::none(),
+           "Send row i to arm i from all I/O threads at once; column 7, if present, is the gripper linear\n"
+           "position (NaN leaves the gripper alone). With at (time.monotonic() seconds) every thread waits\n"
+           "until that instant. Returns the spread of the send start times across ports (seconds)")
+        .def("GetCurrentJointStatus", [](pysagittarius::ArmGroup &self, py::object out) {
+            py::array_t<float> js = output_array<float>(out, {static_cast<py::ssize_t>(self.Size()), 7});
+            py::array_t<bool> valid(static_cast<py::ssize_t>(self.Size()));
+            float *js_arr = js.mutable_data();
+            bool *valid_arr = valid.mutable_data();
+            {
+                py::gil_scoped_release release;
+                self.GetCurrentJointStatus(js_arr, valid_arr);
             }
-            self.SetServoRadianWithIndex(sv, num);
+            return py::make_tuple(valid, js);
+        }, py::arg("out") = py::none(),
+           "Read all arms in parallel; returns (valid (N,) bool, js (N, 7) float32), failed rows are zero")
+        .def_property_readonly("latency_stats", [](const pysagittarius::ArmGroup &self) {
+            py::dict d;
+            d["SetAllServoRadian"] = latency_to_dict(self.CommandLatency());
+            d["GetCurrentJointStatus"] = latency_to_dict(self.ReadLatency());
+            d["skew"] = latency_to_dict(self.Skew());
+            py::list ports;
+            for (size_t i = 0; i < self.Size(); i++) {
+                py::dict port;
+                port["port"] = self.Ports()[i];
+                port["SetAllServoRadian"] = latency_to_dict(self.Stats(i).command);
+                port["GetCurrentJointStatus"] = latency_to_dict(self.Stats(i).read);
+                ports.append(port);
+            }
+            d["ports"] = ports;
+            return d;
+        }, "Whole-group call latency, send-time spread across ports, and per-port latency (seconds)")
+        .def("ResetStats", &pysagittarius::ArmGroup::ResetStats);
+
+    // 共享内存机械臂服务, 由 pysagittarius.server 中的服务进程使用
+    m.attr("SHM_COMMAND_DTYPE") = shm_command_dtype();
+    py::class_<pysagittarius::SharedArmServer,
+               std::unique_ptr<pysagittarius::SharedArmServer, pysagittarius::ReleaseGilDeleter>>(m, "SharedArmServer")
+        .def(py::init([](const std::string &name, py::object lower, py::object upper) {
+                 float lower_arr[7], upper_arr[7];
+                 read_vector(lower, lower_arr, 7);
+                 read_vector(upper, upper_arr, 7);
+                 py::gil_scoped_release release;
+                 return new pysagittarius::SharedArmServer(name, lower_arr, upper_arr);
+             }), py::arg("name"), py::arg("lower_joint_limits"), py::arg("upper_joint_limits"),
+             "Create the POSIX shared memory segment name; a segment left behind by a dead server is replaced")
+        .def_property_readonly("name", &pysagittarius::SharedArmServer::name)
+        .def_property_readonly("clients", &pysagittarius::SharedArmServer::Clients)
+        .def("PublishJointStatus", [](pysagittarius::SharedArmServer &self, bool valid, py::object js) {
+            float js_arr[7];
+            read_vector(js, js_arr, 7);
+            py::gil_scoped_release release;
+            self.PublishJointStatus(valid, js_arr);
+        }, py::arg("valid"), py::arg("js"))
+        .def("PublishServoInfo", [](pysagittarius::SharedArmServer &self, py::object valid,
+                                    py::array_t<int16_t, py::array::c_style | py::array::forcecast> info) {
+            if (info.ndim() != 2 || info.shape(0) != 7 || info.shape(1) != 4) {
+                throw std::runtime_error("info must have shape (7, 4)");
+            }
+            uint8_t valid_arr[7];
+            read_vector(valid, valid_arr, 7);
+            bool valid_flags[7];
+            std::copy(valid_arr, valid_arr + 7, valid_flags);
+            const int16_t *info_arr = info.data();
+            py::gil_scoped_release release;
+            self.PublishServoInfo(valid_flags, info_arr);
+        }, py::arg("valid"), py::arg("info"), "Publish GetAllServoInfo results: valid (7,), info (7, 4)")
+        .def("PopCommands", [](pysagittarius::SharedArmServer &self, size_t max) {
+            py::array commands(shm_command_dtype(), std::vector<py::ssize_t>{static_cast<py::ssize_t>(max)});
+            auto *out = static_cast<pysagittarius::shm::Command *>(commands.mutable_data());
+            size_t n;
+            {
+                py::gil_scoped_release release;
+                n = self.PopCommands(out, max);
+            }
+            py::object taken = commands[py::slice(0, static_cast<py::ssize_t>(n), 1)];
+            return taken;
+        }, py::arg("max") = 64,
+           "Take up to max queued commands as a SHM_COMMAND_DTYPE array, taking turns between clients")
+        .def("WaitCommands", [](pysagittarius::SharedArmServer &self, double timeout) {
+            py::gil_scoped_release release;
+            return self.WaitCommands(timeout);
+        }, py::arg("timeout"), "Sleep until a client queues a command or timeout seconds pass")
+        .def("Heartbeat", &pysagittarius::SharedArmServer::Heartbeat)
+        .def("ReapClients", &pysagittarius::SharedArmServer::ReapClients,
+             "Free the slots of exited clients and drop their queued commands")
+        .def("Close", &pysagittarius::SharedArmServer::Close, py::call_guard<py::gil_scoped_release>(),
+             "Unlink the shared memory segment; connected clients stop receiving updates. Safe to call twice,\n"
+             "other methods raise afterwards")
+        .def_property_readonly("closed", &pysagittarius::SharedArmServer::Closed);
+
+    // 绑定 SagittariusArmClient 类, 方法与 SagittariusArmReal 相同, 通过共享内存由服务进程执行
+    py::class_<pysagittarius::SharedArmClient,
+               std::unique_ptr<pysagittarius::SharedArmClient, pysagittarius::ReleaseGilDeleter>>(
+        m, "SagittariusArmClient")
+        .def(py::init<std::string>(), py::arg("name") = "/sagittarius", py::call_guard<py::gil_scoped_release>(),
+             "Connect to the arm server (python -m pysagittarius.server) owning shared memory segment name")
+        .def_property_readonly("name", &pysagittarius::SharedArmClient::name)
+        .def("SetFreeAfterDestructor", [](pysagittarius::SharedArmClient &self, bool sw) {
+            pysagittarius::shm::Command command = make_command(pysagittarius::shm::kCmdFreeAfterDestructor);
+            command.ints[0] = sw;
+            push_command(self, command);
         })
-        .def("ControlTorque", &sdk_sagittarius_arm::SagittariusArmReal::ControlTorque,
-             "Control torque ('free' or 'lock')")
-        .def("GetServoInfo", [](sdk_sagittarius_arm::SagittariusArmReal &self, unsigned char id, int timeout_ms) {
-            int16_t info_arr[4];
-            bool success = self.GetServoInfo(id, info_arr, timeout_ms);
-            py::array_t<int16_t> result(4);
-            auto r = result.mutable_unchecked<1>();
-            for (int i = 0; i < 4; i++) {
-                r(i) = info_arr[i];
+        .def("CheckUpperLower", [](pysagittarius::SharedArmClient &self, py::object js) {
+            float js_arr[6];
+            read_vector(js, js_arr, 6);
+            for (int i = 0; i < 6; i++) {
+                if (!within_limits(self, i, js_arr[i])) {
+                    return false;
+                }
             }
+            return true;
+        })
+        .def("CheckUpperLowerWithIndex", [](pysagittarius::SharedArmClient &self, py::object sv_list, py::object num,
+                                            py::object ids, py::object values) {
+            ServoStruct sv[pysagittarius::kMaxServoCommands];
+            int count = read_servo_commands(sv_list, num, ids, values, sv);
+            for (int i = 0; i < count; i++) {
+                if (!within_limits(self, sv[i].id - 1, sv[i].value)) {
+                    return false;
+                }
+            }
+            return true;
+        }, py::arg("sv_list") = py::none(), py::arg("num") = py::none(), py::arg("ids") = py::none(),
+           py::arg("values") = py::none())
+        .def("arm_set_gripper_linear_position", [](pysagittarius::SharedArmClient &self, float dist) {
+            pysagittarius::shm::Command command = make_command(pysagittarius::shm::kCmdGripper);
+            command.mask = 0x40;
+            command.values[6] = dist;
+            push_command(self, command);
+        })
+        .def("SetAllServoRadian", [](pysagittarius::SharedArmClient &self, py::object joint_positions) {
+            pysagittarius::shm::Command command = make_command(pysagittarius::shm::kCmdAllServoRadian);
+            read_vector(joint_positions, command.values, 6);
+            command.mask = 0x3f;
+            push_command(self, command);
+        })
+        .def("SetAllServoRadianAndGripper", [](pysagittarius::SharedArmClient &self, py::object joint_positions, py::object gripper) {
+            pysagittarius::shm::Command command = make_command(pysagittarius::shm::kCmdArmGripper);
+            read_arm_gripper(joint_positions, gripper, command.values);
+            command.mask = 0x7f;
+            if (std::isnan(command.values[6])) {
+                command.kind = pysagittarius::shm::kCmdAllServoRadian;
+                command.mask = 0x3f;
+            }
+            push_command(self, command);
+        }, py::arg("joint_positions"), py::arg("gripper") = py::none())
+        .def("GetCurrentJointStatus", [](pysagittarius::SharedArmClient &self, py::object out) {
+            py::array_t<float> result = output_array<float>(out, {7});
+            pysagittarius::shm::ArmState state = self.State();
+            std::copy(state.js, state.js + 7, result.mutable_data());
+            bool success = state.js_valid && pysagittarius::monotonic_seconds() - state.stamp <= self.MaxStateAge();
             return py::make_tuple(success, result);
-        }, py::arg("id"), py::arg("timeout_ms") = 500)
-        .def("SetServoAcceleration", &sdk_sagittarius_arm::SagittariusArmReal::SetServoAcceleration,
-             "Set servo acceleration (0-254)")
-        .def("SetServoVelocity", &sdk_sagittarius_arm::SagittariusArmReal::SetServoVelocity,
-             "Set servo velocity (0-4096)")
-        .def("SetServoTorque", [](sdk_sagittarius_arm::SagittariusArmReal &self, py::array_t<int> arm_torque) {
-            auto r = arm_torque.unchecked<1>();
-            if (r.shape(0) < 7) {
-                throw std::runtime_error("Input array must have at least 7 elements");
+        }, py::arg("out") = py::none(),
+           "Return (success, js (7,)) as last published by the server; success is False once the state is older\n"
+           "than max_state_age seconds")
+        .def("SetServoRadianWithIndex", [](pysagittarius::SharedArmClient &self, py::object sv_list, py::object num,
+                                           py::object ids, py::object values) {
+            ServoStruct sv[pysagittarius::kMaxServoCommands];
+            int count = read_servo_commands(sv_list, num, ids, values, sv);
+            pysagittarius::shm::Command command = make_command(pysagittarius::shm::kCmdServoRadianIndex);
+            for (int i = 0; i < count; i++) {
+                if (sv[i].id < 1 || sv[i].id > 7) {
+                    throw std::runtime_error("Servo id must be between 1 and 7");
+                }
+                command.values[sv[i].id - 1] = sv[i].value;
+                command.mask |= 1u << (sv[i].id - 1);
             }
-            int torque_arr[7];
-            for (int i = 0; i < 7; i++) {
-                torque_arr[i] = r(i);
+            push_command(self, command);
+        }, py::arg("sv_list") = py::none(), py::arg("num") = py::none(), py::arg("ids") = py::none(),
+           py::arg("values") = py::none())
+        .def("ControlTorque", [](pysagittarius::SharedArmClient &self, const std::string &msg) {
+            if (msg != "free" && msg != "lock") {
+                throw std::runtime_error("msg must be 'free' or 'lock'");
             }
-            return self.SetServoTorque(torque_arr);
+            pysagittarius::shm::Command command = make_command(pysagittarius::shm::kCmdControlTorque);
+            command.ints[0] = msg == "lock";
+            push_command(self, command);
+        })
+        .def("GetServoInfo", [](pysagittarius::SharedArmClient &self, unsigned char id, py::object out) {
+            py::array_t<int16_t> result = output_array<int16_t>(out, {4});
+            int16_t *info_arr = result.mutable_data();
+            std::fill(info_arr, info_arr + 4, 0);
+            if (id < 1 || id > 7) {
+                return py::make_tuple(false, result);
+            }
+            pysagittarius::shm::ArmState state = self.State();
+            std::copy(state.info[id - 1], state.info[id - 1] + 4, info_arr);
+            return py::make_tuple(static_cast<bool>(state.info_valid[id - 1]), result);
+        }, py::arg("id"), py::arg("out") = py::none(),
+           "Return the servo telemetry last published by the server; nothing is sent to the servo, so there is\n"
+           "no timeout")
+        .def("GetAllServoInfo", [](pysagittarius::SharedArmClient &self, py::object out) {
+            py::array_t<int16_t> info = output_array<int16_t>(out, {7, 4});
+            py::array_t<bool> valid(7);
+            pysagittarius::shm::ArmState state = self.State();
+            std::copy(&state.info[0][0], &state.info[0][0] + 28, info.mutable_data());
+            std::copy(state.info_valid, state.info_valid + 7, valid.mutable_data());
+            return py::make_tuple(valid, info);
+        }, py::arg("out") = py::none(),
+           "Return (valid (7,) bool, info (7, 4) int16) as last published by the server, without a timeout")
+        .def("SetServoAcceleration", [](pysagittarius::SharedArmClient &self, int arm_acceleration) {
+            pysagittarius::shm::Command command = make_command(pysagittarius::shm::kCmdServoAcceleration);
+            command.ints[0] = arm_acceleration;
+            push_command(self, command);
         })
-        .def_readonly("lower_joint_limits", &sdk_sagittarius_arm::SagittariusArmReal::lower_joint_limits)
-        .def_readonly("upper_joint_limits", &sdk_sagittarius_arm::SagittariusArmReal::upper_joint_limits);
+        .def("SetServoVelocity", [](pysagittarius::SharedArmClient &self, int arm_vel) {
+            pysagittarius::shm::Command command = make_command(pysagittarius::shm::kCmdServoVelocity);
+            command.ints[0] = arm_vel;
+            push_command(self, command);
+        })
+        .def("SetServoTorque", [](pysagittarius::SharedArmClient &self, py::object arm_torque) {
+            pysagittarius::shm::Command command = make_command(pysagittarius::shm::kCmdServoTorque);
+            read_vector(arm_torque, command.ints, 7);
+            push_command(self, command);
+            return true;
+        })
+        .def_property("max_state_age", &pysagittarius::SharedArmClient::MaxStateAge,
+                      &pysagittarius::SharedArmClient::SetMaxStateAge)
+        .def_property("command_timeout", &pysagittarius::SharedArmClient::CommandTimeout,
+                      &pysagittarius::SharedArmClient::SetCommandTimeout,
+                      "Seconds a command waits for room in a full queue before RuntimeError is raised")
+        .def("ServerAlive", &pysagittarius::SharedArmClient::ServerAlive, py::arg("max_age") = 1.0,
+             "True while the server process exists and was active within max_age seconds")
+        .def("GetServerState", [](pysagittarius::SharedArmClient &self) {
+            pysagittarius::shm::ArmState state = self.State();
+            py::dict d;
+            d["stamp"] = state.stamp;
+            d["reads"] = state.reads;
+            d["info_stamp"] = state.info_stamp;
+            d["commands"] = state.commands;
+            d["dropped"] = self.Dropped();
+            return d;
+        }, "Joint state and telemetry stamps (time.monotonic() seconds), joint state reads, commands taken by\n"
+           "the server, and commands of this client dropped because the queue was full")
+        .def_property_readonly("lower_joint_limits", [](const pysagittarius::SharedArmClient &self) {
+            return std::vector<float>(self.LowerJointLimits(), self.LowerJointLimits() + 7);
+        })
+        .def_property_readonly("upper_joint_limits", [](const pysagittarius::SharedArmClient &self) {
+            return std::vector<float>(self.UpperJointLimits(), self.UpperJointLimits() + 7);
+        });
 
     // 绑定 SagittariusArmKinematics 类
-    py::class_<sdk_sagittarius_arm::SagittariusArmKinematics>(m, "SagittariusArmKinematics")
-        .def(py::init<float, float, float>(),
+    py::class_<pysagittarius::ArmKinematics>(m, "SagittariusArmKinematics")
+        .def(py::init([](float x, float y, float z, const std::string &solver) {
+                 std::unique_ptr<pysagittarius::ArmKinematics> self(new pysagittarius::ArmKinematics(x, y, z));
+                 self->SetSolver(solver);
+                 return self;
+             }),
              py::arg("x") = 0.0f,
              py::arg("y") = 0.0f,
-             py::arg("z") = 0.0f)
-        .def("getIKinThetaMatrix", [](sdk_sagittarius_arm::SagittariusArmKinematics &self, const Eigen::MatrixXd& M_EE, double eomg, double ev) {
-            float theta_result[6];
-            bool success = self.getIKinThetaMatrix(M_EE, theta_result, eomg, ev);
-            py::array_t<float> result(6);
-            auto r = result.mutable_unchecked<1>();
-            for (int i = 0; i < 6; i++) {
-                r(i) = theta_result[i];
+             py::arg("z") = 0.0f,
+             py::arg("solver") = "numeric")
+        .def_property("solver", &pysagittarius::ArmKinematics::Solver, &pysagittarius::ArmKinematics::SetSolver,
+                      "IK engine used by the getIKinTheta* methods: 'numeric' or 'analytic'")
+        .def("getIKinThetaMatrix", [](pysagittarius::ArmKinematics &self, const Eigen::MatrixXd& M_EE, double eomg, double ev, py::object seed, py::object out) {
+            PYSAG_METRIC_CALL("SagittariusArmKinematics.getIKinThetaMatrix");
+            if (M_EE.rows() != 4 || M_EE.cols() != 4) {
+                throw std::runtime_error("M_EE must be a 4x4 matrix");
+            }
+            py::array_t<float> result = output_array<float>(out, {6});
+            float *theta_result = result.mutable_data();
+            int iterations;
+            bool success = ik_single(self, seed, eomg, ev, theta_result, iterations, [&]() {
+                return Eigen::Matrix4d(M_EE);
+            }, [&](float *theta) {
+                return self.getIKinThetaMatrix(M_EE, theta, eomg, ev);
+            });
+            PYSAG_METRIC_ITERATIONS(iterations);
+            if (!success) {
+                PYSAG_METRIC_FAIL(1);
             }
             return py::make_tuple(success, result);
-        }, py::arg("M_EE"), py::arg("eomg") = 0.001, py::arg("ev") = 0.001)
-        .def("getIKinThetaEuler", [](sdk_sagittarius_arm::SagittariusArmKinematics &self, float x, float y, float z, float roll, float pitch, float yaw, double eomg, double ev) {
-            float theta_result[6];
-            bool success = self.getIKinThetaEuler(x, y, z, roll, pitch, yaw, theta_result, eomg, ev);
-            py::array_t<float> result(6);
-            auto r = result.mutable_unchecked<1>();
-            for (int i = 0; i < 6; i++) {
-                r(i) = theta_result[i];
+        }, py::arg("M_EE"), py::arg("eomg") = 0.001, py::arg("ev") = 0.001, py::arg("seed") = py::none(), py::arg("out") = py::none())
+        .def("getIKinThetaEuler", [](pysagittarius::ArmKinematics &self, float x, float y, float z, float roll, float pitch, float yaw, double eomg, double ev, py::object seed, py::object out) {
+            PYSAG_METRIC_CALL("SagittariusArmKinematics.getIKinThetaEuler");
+            py::array_t<float> result = output_array<float>(out, {6});
+            float *theta_result = result.mutable_data();
+            int iterations;
+            bool success = ik_single(self, seed, eomg, ev, theta_result, iterations, [&]() {
+                return pysagittarius::pose_from_euler(x, y, z, roll, pitch, yaw);
+            }, [&](float *theta) {
+                return self.getIKinThetaEuler(x, y, z, roll, pitch, yaw, theta, eomg, ev);
+            });
+            PYSAG_METRIC_ITERATIONS(iterations);
+            if (!success) {
+                PYSAG_METRIC_FAIL(1);
             }
             return py::make_tuple(success, result);
-        }, py::arg("x"), py::arg("y"), py::arg("z"), py::arg("roll"), py::arg("pitch"), py::arg("yaw"), py::arg("eomg") = 0.001, py::arg("ev") = 0.001)
-        .def("getIKinThetaQuaternion", [](sdk_sagittarius_arm::SagittariusArmKinematics &self, float x, float y, float z, float ox, float oy, float oz, float ow, double eomg, double ev) {
-            float theta_result[6];
-            bool success = self.getIKinThetaQuaternion(x, y, z, ox, oy, oz, ow, theta_result, eomg, ev);
-            py::array_t<float> result(6);
-            auto r = result.mutable_unchecked<1>();
-            for (int i = 0; i < 6; i++) {
-                r(i) = theta_result[i];
+        }, py::arg("x"), py::arg("y"), py::arg("z"), py::arg("roll"), py::arg("pitch"), py::arg("yaw"), py::arg("eomg") = 0.001, py::arg("ev") = 0.001, py::arg("seed") = py::none(), py::arg("out") = py::none())
+        .def("getIKinThetaQuaternion", [](pysagittarius::ArmKinematics &self, float x, float y, float z, float ox, float oy, float oz, float ow, double eomg, double ev, py::object seed, py::object out) {
+            PYSAG_METRIC_CALL("SagittariusArmKinematics.getIKinThetaQuaternion");
+            py::array_t<float> result = output_array<float>(out, {6});
+            float *theta_result = result.mutable_data();
+            int iterations;
+            bool success = ik_single(self, seed, eomg, ev, theta_result, iterations, [&]() {
+                return pysagittarius::pose_from_quaternion(x, y, z, ox, oy, oz, ow);
+            }, [&](float *theta) {
+                return self.getIKinThetaQuaternion(x, y, z, ox, oy, oz, ow, theta, eomg, ev);
+            });
+            PYSAG_METRIC_ITERATIONS(iterations);
+            if (!success) {
+                PYSAG_METRIC_FAIL(1);
             }
             return py::make_tuple(success, result);
-        }, py::arg("x"), py::arg("y"), py::arg("z"), py::arg("ox"), py::arg("oy"), py::arg("oz"), py::arg("ow"), py::arg("eomg") = 0.001, py::arg("ev") = 0.001)
-        .def("getFKinMatrix", [](sdk_sagittarius_arm::SagittariusArmKinematics &self, py::array_t<float> theta) {
-            auto r = theta.unchecked<1>();
-            if (r.shape(0) < 6) {
-                throw std::runtime_error("Input array must have at least 6 elements");
+        }, py::arg("x"), py::arg("y"), py::arg("z"), py::arg("ox"), py::arg("oy"), py::arg("oz"), py::arg("ow"), py::arg("eomg") = 0.001, py::arg("ev") = 0.001, py::arg("seed") = py::none(), py::arg("out") = py::none())
+        .def("getIKinThetaMatrixBatch", [](pysagittarius::ArmKinematics &self, py::object M_EE, double eomg, double ev, int num_threads, py::object seed, bool chain, py::object out) {
+            return ik_batch("SagittariusArmKinematics.getIKinThetaMatrixBatch", self, float_input(M_EE), {4, 4}, seed, chain, eomg, ev, num_threads, out, [](const auto *p) {
+                return matrix_from_rows(p);
+            }, [eomg, ev](pysagittarius::ArmKinematics &k, const auto *p, float *theta_result) {
+                Eigen::MatrixXd T = matrix_from_rows(p);
+                return k.getIKinThetaMatrix(T, theta_result, eomg, ev);
+            });
+        }, py::arg("M_EE"), py::arg("eomg") = 0.001, py::arg("ev") = 0.001, py::arg("num_threads") = 0, py::arg("seed") = py::none(), py::arg("chain") = false, py::arg("out") = py::none(),
+           "Solve IK for an (N,4,4) array of poses, returns (success (N,), theta (N,6)).\n"
+           "seed is an optional (6,) or (N,6) initial guess; chain=True seeds each row with the previous solution")
+        .def("getIKinThetaEulerBatch", [](pysagittarius::ArmKinematics &self, py::object poses, double eomg, double ev, int num_threads, py::object seed, bool chain, py::object out) {
+            return ik_batch("SagittariusArmKinematics.getIKinThetaEulerBatch", self, float_input(poses), {6}, seed, chain, eomg, ev, num_threads, out, [](const auto *p) {
+                return pysagittarius::pose_from_euler(p[0], p[1], p[2], p[3], p[4], p[5]);
+            }, [eomg, ev](pysagittarius::ArmKinematics &k, const auto *p, float *theta_result) {
+                return k.getIKinThetaEuler(p[0], p[1], p[2], p[3], p[4], p[5], theta_result, eomg, ev);
+            });
+        }, py::arg("poses"), py::arg("eomg") = 0.001, py::arg("ev") = 0.001, py::arg("num_threads") = 0, py::arg("seed") = py::none(), py::arg("chain") = false, py::arg("out") = py::none(),
+           "Solve IK for an (N,6) array of x, y, z, roll, pitch, yaw, returns (success (N,), theta (N,6)).\n"
+           "seed is an optional (6,) or (N,6) initial guess; chain=True seeds each row with the previous solution")
+        .def("getIKinThetaQuaternionBatch", [](pysagittarius::ArmKinematics &self, py::object poses, double eomg, double ev, int num_threads, py::object seed, bool chain, py::object out) {
+            return ik_batch("SagittariusArmKinematics.getIKinThetaQuaternionBatch", self, float_input(poses), {7}, seed, chain, eomg, ev, num_threads, out, [](const auto *p) {
+                return pysagittarius::pose_from_quaternion(p[0], p[1], p[2], p[3], p[4], p[5], p[6]);
+            }, [eomg, ev](pysagittarius::ArmKinematics &k, const auto *p, float *theta_result) {
+                return k.getIKinThetaQuaternion(p[0], p[1], p[2], p[3], p[4], p[5], p[6], theta_result, eomg, ev);
+            });
+        }, py::arg("poses"), py::arg("eomg") = 0.001, py::arg("ev") = 0.001, py::arg("num_threads") = 0, py::arg("seed") = py::none(), py::arg("chain") = false, py::arg("out") = py::none(),
+           "Solve IK for an (N,7) array of x, y, z, ox, oy, oz, ow, returns (success (N,), theta (N,6)).\n"
+           "seed is an optional (6,) or (N,6) initial guess; chain=True seeds each row with the previous solution")
+        .def("getIKinThetaBranchesMatrix", [](pysagittarius::ArmKinematics &self, const Eigen::MatrixXd& M_EE, double eomg, double ev, py::object reference) {
+            PYSAG_METRIC_CALL("SagittariusArmKinematics.getIKinThetaBranchesMatrix");
+            if (M_EE.rows() != 4 || M_EE.cols() != 4) {
+                throw std::runtime_error("M_EE must be a 4x4 matrix");
             }
-            float theta_arr[6];
-            for (int i = 0; i < 6; i++) {
-                theta_arr[i] = r(i);
+            return ik_branches(self, Eigen::Matrix4d(M_EE), eomg, ev, reference);
+        }, py::arg("M_EE"), py::arg("eomg") = 0.001, py::arg("ev") = 0.001, py::arg("reference") = py::none(),
+           "All closed-form IK solutions within the joint limits as a (K,6) array, closest to reference first")
+        .def("getIKinThetaBranchesEuler", [](pysagittarius::ArmKinematics &self, float x, float y, float z, float roll, float pitch, float yaw, double eomg, double ev, py::object reference) {
+            PYSAG_METRIC_CALL("SagittariusArmKinematics.getIKinThetaBranchesEuler");
+            return ik_branches(self, pysagittarius::pose_from_euler(x, y, z, roll, pitch, yaw), eomg, ev, reference);
+        }, py::arg("x"), py::arg("y"), py::arg("z"), py::arg("roll"), py::arg("pitch"), py::arg("yaw"), py::arg("eomg") = 0.001, py::arg("ev") = 0.001, py::arg("reference") = py::none(),
+           "All closed-form IK solutions within the joint limits as a (K,6) array, closest to reference first")
+        .def("getIKinThetaBranchesQuaternion", [](pysagittarius::ArmKinematics &self, float x, float y, float z, float ox, float oy, float oz, float ow, double eomg, double ev, py::object reference) {
+            PYSAG_METRIC_CALL("SagittariusArmKinematics.getIKinThetaBranchesQuaternion");
+            return ik_branches(self, pysagittarius::pose_from_quaternion(x, y, z, ox, oy, oz, ow), eomg, ev, reference);
+        }, py::arg("x"), py::arg("y"), py::arg("z"), py::arg("ox"), py::arg("oy"), py::arg("oz"), py::arg("ow"), py::arg("eomg") = 0.001, py::arg("ev") = 0.001, py::arg("reference") = py::none(),
+           "All closed-form IK solutions within the joint limits as a (K,6) array, closest to reference first")
+        .def("getJacobian", [](pysagittarius::ArmKinematics &self, py::object theta, const std::string &frame, py::object out) {
+            PYSAG_METRIC_CALL("SagittariusArmKinematics.getJacobian");
+            double theta_arr[6];
+            read_vector(theta, theta_arr, 6);
+            py::array_t<double> result = output_array<double>(out, {6, 6});
+            Eigen::Map<Eigen::Matrix<double, 6, 6, Eigen::RowMajor>> J(result.mutable_data());
+            if (body_frame(frame)) {
+                J = pysagittarius::jacobian_body(self.model, theta_arr);
+            } else {
+                J = pysagittarius::jacobian_space(self.model, theta_arr);
             }
-            Eigen::MatrixXd M_EE;
-            bool success = self.getFKinMatrix(theta_arr, M_EE);
-            return py::make_tuple(success, M_EE);
+            return result;
+        }, py::arg("theta"), py::arg("frame") = "space", py::arg("out") = py::none(),
+           "6x6 Jacobian at theta in the 'space' or 'body' frame, rows are (wx, wy, wz, vx, vy, vz)")
+        .def("cartesianVelocityStep", [](pysagittarius::ArmKinematics &self, py::object theta, py::object twist, double dt, const std::string &frame, double damping, double margin, py::object out) {
+            PYSAG_METRIC_CALL("SagittariusArmKinematics.cartesianVelocityStep");
+            double theta_arr[6];
+            read_vector(theta, theta_arr, 6);
+            pysagittarius::Vector6d V;
+            read_vector(twist, V.data(), 6);
+            py::array_t<float> result = output_array<float>(out, {6});
+            pysagittarius::velocity_step(self.model, theta_arr, V, body_frame(frame), dt, damping, margin,
+                                         self.lower_joint_limits, self.upper_joint_limits);
+            std::copy(theta_arr, theta_arr + 6, result.mutable_data());
+            return result;
+        }, py::arg("theta"), py::arg("twist"), py::arg("dt"), py::arg("frame") = "space", py::arg("damping") = 0.01, py::arg("margin") = 0.1, py::arg("out") = py::none(),
+           "Differential IK step: joint angles after moving with twist (wx, wy, wz, vx, vy, vz) for dt seconds.\n"
+           "Uses damped least squares; joints within margin rad of a limit are slowed down and the result is clamped")
+        .def("enableCache", [](pysagittarius::ArmKinematics &self, size_t max_size, double position_resolution, double angle_resolution) {
+            self.cache = std::make_shared<pysagittarius::IkCache>(max_size, position_resolution, angle_resolution);
+        }, py::arg("max_size") = 1024, py::arg("position_resolution") = 1e-4, py::arg("angle_resolution") = 1e-3,
+           "Cache single-pose IK results in an LRU of max_size entries, keyed on the pose quantized to\n"
+           "position_resolution (m) and angle_resolution (rad) plus the tool offset. A hit seeds the solve for the\n"
+           "exact pose, so results still meet eomg/ev and keep the cached branch. Calls with a seed, or with a\n"
+           "tracking seed in tracking mode, bypass the cache")
+        .def("disableCache", [](pysagittarius::ArmKinematics &self) {
+            self.cache.reset();
         })
-        .def("getFKinEuler", [](sdk_sagittarius_arm::SagittariusArmKinematics &self, py::array_t<float> theta) {
-            auto r = theta.unchecked<1>();
-            if (r.shape(0) < 6) {
-                throw std::runtime_error("Input array must have at least 6 elements");
+        .def("clearCache", [](pysagittarius::ArmKinematics &self) {
+            if (self.cache) {
+                self.cache->Clear();
             }
-            float theta_arr[6];
-            for (int i = 0; i < 6; i++) {
-                theta_arr[i] = r(i);
-            }
-            float xyz[3], euler[3];
-            bool success = self.getFKinEuler(theta_arr, xyz, euler);
-            py::array_t<float> xyz_result(3);
-            py::array_t<float> euler_result(3);
-            auto xyz_r = xyz_result.mutable_unchecked<1>();
-            auto euler_r = euler_result.mutable_unchecked<1>();
-            for (int i = 0; i < 3; i++) {
-                xyz_r(i) = xyz[i];
-                euler_r(i) = euler[i];
+        }, "Drop all cached IK results")
+        .def("saveCache", [](pysagittarius::ArmKinematics &self, const std::string &path) {
+            if (!self.cache) {
+                throw std::runtime_error("IK cache is not enabled");
             }
-            return py::make_tuple(success, xyz_result, euler_result);
+            py::gil_scoped_release release;
+            self.cache->Save(path);
+        }, py::arg("path"))
+        .def("loadCache", [](pysagittarius::ArmKinematics &self, const std::string &path) {
+            if (!self.cache) {
+                throw std::runtime_error("IK cache is not enabled");
+            }
+            py::gil_scoped_release release;
+            return self.cache->Load(path);
+        }, py::arg("path"), "Load entries saved by saveCache, returns the number of entries read")
+        .def_property_readonly("cache_stats", [](pysagittarius::ArmKinematics &self) -> py::object {
+            if (!self.cache) {
+                return py::none();
+            }
+            pysagittarius::IkCache::Stats stats = self.cache->GetStats();
+            py::dict d;
+            d["size"] = stats.size;
+            d["max_size"] = self.cache->max_size();
+            d["hits"] = stats.hits;
+            d["misses"] = stats.misses;
+            d["evictions"] = stats.evictions;
+            d["position_resolution"] = self.cache->position_resolution();
+            d["angle_resolution"] = self.cache->angle_resolution();
+            return std::move(d);
         })
-        .def("getFKinQuaternion", [](sdk_sagittarius_arm::SagittariusArmKinematics &self, py::array_t<float> theta) {
-            auto r = theta.unchecked<1>();
-            if (r.shape(0) < 6) {
-                throw std::runtime_error("Input array must have at least 6 elements");
+        .def("setTrackingMode", [](pysagittarius::ArmKinematics &self, bool enabled, py::object seed) {
+            self.tracking = enabled;
+            self.have_tracking_seed = false;
+            if (!seed.is_none()) {
+                read_vector(seed, self.tracking_seed, 6);
+                self.have_tracking_seed = true;
+            }
+        }, py::arg("enabled"), py::arg("seed") = py::none(),
+           "In tracking mode every successful IK solve seeds the next one, for streaming nearby poses")
+        .def_property_readonly("tracking_seed", [](const pysagittarius::ArmKinematics &self) -> py::object {
+            if (!self.have_tracking_seed) {
+                return py::none();
             }
+            py::array_t<float> result(6);
+            std::copy(self.tracking_seed, self.tracking_seed + 6, result.mutable_data());
+            return std::move(result);
+        })
+        .def("getFKinMatrix", [](pysagittarius::ArmKinematics &self, py::object theta, py::object out) {
+            PYSAG_METRIC_CALL("SagittariusArmKinematics.getFKinMatrix");
             float theta_arr[6];
-            for (int i = 0; i < 6; i++) {
-                theta_arr[i] = r(i);
+            read_vector(theta, theta_arr, 6);
+            py::array_t<double> result = output_array<double>(out, {4, 4});
+            Eigen::MatrixXd M_EE;
+            bool success = self.getFKinMatrix(theta_arr, M_EE);
+            Eigen::Map<Eigen::Matrix<double, 4, 4, Eigen::RowMajor>> dst(result.mutable_data());
+            if (M_EE.rows() == 4 && M_EE.cols() == 4) {
+                dst = M_EE;
+            } else {
+                dst.setZero();
+                success = false;
             }
-            float xyz[3], quaternion[4];
-            bool success = self.getFKinQuaternion(theta_arr, xyz, quaternion);
-            py::array_t<float> xyz_result(3);
-            py::array_t<float> quaternion_result(4);
-            auto xyz_r = xyz_result.mutable_unchecked<1>();
-            auto quaternion_r = quaternion_result.mutable_unchecked<1>();
-            for (int i = 0; i < 3; i++) {
-                xyz_r(i) = xyz[i];
+            if (!success) {
+                PYSAG_METRIC_FAIL(1);
             }
-            for (int i = 0; i < 4; i++) {
-                quaternion_r(i) = quaternion[i];
+            return py::make_tuple(success, result);
+        }, py::arg("theta"), py::arg("out") = py::none())
+        .def("getFKinEuler", [](pysagittarius::ArmKinematics &self, py::object theta, py::object xyz_out, py::object euler_out) {
+            PYSAG_METRIC_CALL("SagittariusArmKinematics.getFKinEuler");
+            float theta_arr[6];
+            read_vector(theta, theta_arr, 6);
+            py::array_t<float> xyz_result = output_array<float>(xyz_out, {3}, "xyz_out");
+            py::array_t<float> euler_result = output_array<float>(euler_out, {3}, "euler_out");
+            bool success = self.getFKinEuler(theta_arr, xyz_result.mutable_data(), euler_result.mutable_data());
+            if (!success) {
+                PYSAG_METRIC_FAIL(1);
+            }
+            return py::make_tuple(success, xyz_result, euler_result);
+        }, py::arg("theta"), py::arg("xyz_out") = py::none(), py::arg("euler_out") = py::none())
+        .def("getFKinQuaternion", [](pysagittarius::ArmKinematics &self, py::object theta, py::object xyz_out, py::object quaternion_out) {
+            PYSAG_METRIC_CALL("SagittariusArmKinematics.getFKinQuaternion");
+            float theta_arr[6];
+            read_vector(theta, theta_arr, 6);
+            py::array_t<float> xyz_result = output_array<float>(xyz_out, {3}, "xyz_out");
+            py::array_t<float> quaternion_result = output_array<float>(quaternion_out, {4}, "quaternion_out");
+            bool success = self.getFKinQuaternion(theta_arr, xyz_result.mutable_data(), quaternion_result.mutable_data());
+            if (!success) {
+                PYSAG_METRIC_FAIL(1);
             }
             return py::make_tuple(success, xyz_result, quaternion_result);
-        })
-        .def_readonly("lower_joint_limits", &sdk_sagittarius_arm::SagittariusArmKinematics::lower_joint_limits)
-        .def_readonly("upper_joint_limits", &sdk_sagittarius_arm::SagittariusArmKinematics::upper_joint_limits);
+        }, py::arg("theta"), py::arg("xyz_out") = py::none(), py::arg("quaternion_out") = py::none())
+        .def("getFKinMatrixBatch", [](pysagittarius::ArmKinematics &self, py::object theta, int num_threads, py::object out) {
+            py::array input = float_input(theta);
+            py::array_t<double> M_EE = output_array<double>(out, {fk_batch_rows(input), 4, 4});
+            double *dst_data = M_EE.mutable_data();
+            auto success = fk_batch("SagittariusArmKinematics.getFKinMatrixBatch", self, input, num_threads, [dst_data](pysagittarius::ArmKinematics &k, float *theta_arr, size_t i) {
+                Eigen::MatrixXd T;
+                bool ok = k.getFKinMatrix(theta_arr, T);
+                Eigen::Map<Eigen::Matrix<double, 4, 4, Eigen::RowMajor>> dst(dst_data + i * 16);
+                if (ok && T.rows() == 4 && T.cols() == 4) {
+                    dst = T;
+                } else {
+                    dst.setZero();
+                    ok = false;
+                }
+                return ok;
+            });
+            return py::make_tuple(success, M_EE);
+        }, py::arg("theta"), py::arg("num_threads") = 0, py::arg("out") = py::none(),
+           "Forward kinematics for an (N,6) joint array, returns (success (N,), M_EE (N,4,4))")
+        .def("getFKinEulerBatch", [](pysagittarius::ArmKinematics &self, py::object theta, int num_threads, py::object xyz_out, py::object euler_out) {
+            py::array input = float_input(theta);
+            py::ssize_t n = fk_batch_rows(input);
+            py::array_t<float> xyz = output_array<float>(xyz_out, {n, 3}, "xyz_out");
+            py::array_t<float> euler = output_array<float>(euler_out, {n, 3}, "euler_out");
+            float *xyz_data = xyz.mutable_data();
+            float *euler_data = euler.mutable_data();
+            auto success = fk_batch("SagittariusArmKinematics.getFKinEulerBatch", self, input, num_threads, [xyz_data, euler_data](pysagittarius::ArmKinematics &k, float *theta_arr, size_t i) {
+                return k.getFKinEuler(theta_arr, xyz_data + i * 3, euler_data + i * 3);
+            });
+            return py::make_tuple(success, xyz, euler);
+        }, py::arg("theta"), py::arg("num_threads") = 0, py::arg("xyz_out") = py::none(), py::arg("euler_out") = py::none(),
+           "Forward kinematics for an (N,6) joint array, returns (success (N,), xyz (N,3), euler (N,3))")
+        .def("getFKinQuaternionBatch", [](pysagittarius::ArmKinematics &self, py::object theta, int num_threads, py::object xyz_out, py::object quaternion_out) {
+            py::array input = float_input(theta);
+            py::ssize_t n = fk_batch_rows(input);
+            py::array_t<float> xyz = output_array<float>(xyz_out, {n, 3}, "xyz_out");
+            py::array_t<float> quaternion = output_array<float>(quaternion_out, {n, 4}, "quaternion_out");
+            float *xyz_data = xyz.mutable_data();
+            float *quaternion_data = quaternion.mutable_data();
+            auto success = fk_batch("SagittariusArmKinematics.getFKinQuaternionBatch", self, input, num_threads, [xyz_data, quaternion_data](pysagittarius::ArmKinematics &k, float *theta_arr, size_t i) {
+                return k.getFKinQuaternion(theta_arr, xyz_data + i * 3, quaternion_data + i * 4);
+            });
+            return py::make_tuple(success, xyz, quaternion);
+        }, py::arg("theta"), py::arg("num_threads") = 0, py::arg("xyz_out") = py::none(), py::arg("quaternion_out") = py::none(),
+           "Forward kinematics for an (N,6) joint array, returns (success (N,), xyz (N,3), quaternion (N,4))")
+        .def("validateTrajectory", [](pysagittarius::ArmKinematics &self, py::object theta, py::object floor, py::object boxes, double margin, bool self_collision, int num_threads, py::object out) {
+            PYSAG_METRIC_CALL("SagittariusArmKinematics.validateTrajectory");
+            py::array input = float_input(theta);
+            const size_t n = static_cast<size_t>(fk_batch_rows(input));
+            const size_t stride = static_cast<size_t>(input.shape(1));
+            pysagittarius::CollisionModel collision(self.model);
+            collision.self_collision = self_collision;
+            collision.floor_enabled = !floor.is_none();
+            collision.floor = floor.is_none() ? 0.0 : floor.cast<double>();
+            collision.boxes = read_boxes(boxes);
+            collision.margin = margin;
+            py::array_t<uint8_t> codes = output_array<uint8_t>(out, {static_cast<py::ssize_t>(n)});
+            uint8_t *dst = codes.mutable_data();
+            with_float_data(input, [&](const auto *in) {
+                py::gil_scoped_release release;
+                pysagittarius::parallel_for(n, num_threads, 256, [&](size_t begin, size_t end) {
+                    for (size_t i = begin; i < end; i++) {
+                        dst[i] = pysagittarius::validate_sample(collision, self.model, self.lower_joint_limits,
+                                                                self.upper_joint_limits, in + i * stride,
+                                                                std::min<size_t>(stride, 7));
+                    }
+                });
+            });
+            PYSAG_METRIC_FAIL(n - std::count(dst, dst + n, 0));
+            return codes;
+        }, py::arg("theta"), py::arg("floor") = py::none(), py::arg("boxes") = py::none(), py::arg("margin") = 0.0,
+           py::arg("self_collision") = true, py::arg("num_threads") = 0, py::arg("out") = py::none(),
+           "Check an (N,6) or (N,7) joint trajectory in one call, returns uint8 violation flags (N,), 0 for valid "
+           "samples: VIOLATION_JOINT_LIMIT (joint or gripper out of range, NaN joint), VIOLATION_SELF_COLLISION "
+           "(capsule link model), VIOLATION_FLOOR (moving links below z=floor, None disables) and "
+           "VIOLATION_KEEP_OUT (moving links inside boxes, (K,6) xmin, ymin, zmin, xmax, ymax, zmax). "
+           "margin is the extra clearance in metres")
+        .def_readonly("lower_joint_limits", &pysagittarius::ArmKinematics::lower_joint_limits)
+        .def_readonly("upper_joint_limits", &pysagittarius::ArmKinematics::upper_joint_limits);
 }
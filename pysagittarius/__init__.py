@@ -1,65 +1,50 @@
-import os
-import sys
-import importlib.util
+"""Sagittarius 机械臂的 Python 绑定
 
-# 获取当前目录
-current_dir = os.path.dirname(os.path.abspath(__file__))
-print(f"Current directory: {current_dir}")
+扩展模块由 setup.py (pip install .) 编译到包内的 pysagittarius/pysagittarius*.so, 导入时直接加载, 不搜索文件系统.
+aio, sim, recording, server 等纯 Python 子模块在第一次访问时才导入, 没有编译扩展模块时仍然可以使用.
+"""
 
-# 查找 .so 文件
-so_file = None
-for root, dirs, files in os.walk(current_dir):
-    for file in files:
-        if file.endswith('.so') and file.startswith('pysagittarius'):
-            so_file = os.path.join(root, file)
-            print(f"Found .so file: {so_file}")
-            break
-    if so_file:
-        break
+import importlib as _importlib
+import typing as _typing
 
-if not so_file:
-    # 向上一级目录查找
-    parent_dir = os.path.dirname(current_dir)
-    for root, dirs, files in os.walk(parent_dir):
-        for file in files:
-            if file.endswith('.so') and file.startswith('pysagittarius'):
-                so_file = os.path.join(root, file)
-                print(f"Found .so file in parent directory: {so_file}")
-                break
-        if so_file:
-            break
-
-if so_file:
-    # 尝试直接从文件加载模块
-    spec = importlib.util.spec_from_file_location("pysagittarius", so_file)
-    pysagittarius = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(pysagittarius)
-    
-    # 将所有内容导入到当前命名空间
-    for name in dir(pysagittarius):
-        if not name.startswith('_'):
-            globals()[name] = getattr(pysagittarius, name)
-    
-    print(f"Successfully loaded module from {so_file}")
-    print(f"Available attributes: {[name for name in dir(pysagittarius) if not name.startswith('_')]}")
+try:
+    from .pysagittarius import *  # noqa: F401,F403
+except ImportError as e:
+    _extension_error = e
 else:
-    print("Could not find pysagittarius.so file")
-    # 尝试常规导入
-    try:
-        from pysagittarius import *
-        print("Imported using standard import")
-    except ImportError as e:
-        print(f"Import error: {e}")
-        try:
-            from .pysagittarius import *
-            print("Imported using relative import")
-        except ImportError as e:
-            print(f"Relative import error: {e}")
+    _extension_error = None
 
 __version__ = "0.1.0"
 
-def log_set_level(level):
-    """临时的 log_set_level 实现"""
-    print(f"Warning: Using dummy log_set_level({level})")
-    # 实际上什么也不做
-    pass
\ No newline at end of file
+# 按需导入的名称: 名称 -> 子模块
+_LAZY = {
+    "AsyncSagittariusArm": ".aio",
+    "SagittariusArmSim": ".sim",
+    "SimSerialServer": ".sim",
+    "ArmServer": ".server",
+}
+_SUBMODULES = ("aio", "kinematics", "limits", "protocol", "reachability", "recording", "server", "sim", "trajectory")
+
+if _typing.TYPE_CHECKING:
+    from . import aio, kinematics, limits, protocol, reachability, recording, server, sim, trajectory  # noqa: F401
+    from .aio import AsyncSagittariusArm  # noqa: F401
+    from .server import ArmServer  # noqa: F401
+    from .sim import SagittariusArmSim, SimSerialServer  # noqa: F401
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        value = getattr(_importlib.import_module(_LAZY[name], __name__), name)
+    elif name in _SUBMODULES:
+        value = _importlib.import_module("." + name, __name__)
+    elif _extension_error is not None and not name.startswith("__"):
+        raise AttributeError("pysagittarius has no attribute %r, the extension module failed to load: %s"
+                             % (name, _extension_error))
+    else:
+        raise AttributeError("module %r has no attribute %r" % (__name__, name))
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY) | set(_SUBMODULES))
@@ -0,0 +1,80 @@
+"""SagittariusArmReal 的 asyncio 接口
+
+所有串口调用都提交到同一个单线程执行器, 按提交顺序依次执行, 不会阻塞事件循环.
+超时或取消时, 尚未开始的调用会被丢弃; 已经开始的 SDK 调用无法中断, 会在后台执行完毕.
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import functools
+
+
+class AsyncSagittariusArm:
+    """包装一个 SagittariusArmReal (或接口相同的对象), 提供可 await 的方法"""
+
+    def __init__(self, arm, timeout=None):
+        self.arm = arm
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sagittarius-io")
+
+    @classmethod
+    async def open(cls, strSerialName="/dev/sagittarius", Baudrate=1000000, vel=500, acc=5,
+                   timeout=None, arm_class=None):
+        """在后台线程中打开串口, 返回 AsyncSagittariusArm"""
+        if arm_class is None:
+            from pysagittarius import SagittariusArmReal as arm_class
+        loop = asyncio.get_running_loop()
+        arm = await loop.run_in_executor(None, arm_class, strSerialName, Baudrate, vel, acc)
+        return cls(arm, timeout=timeout)
+
+    async def call(self, name, *args, timeout=None, **kwargs):
+        """在串口线程中调用 arm 的任意方法, timeout 为 None 时使用构造时的默认值"""
+        method = getattr(self.arm, name)
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._executor, functools.partial(method, *args, **kwargs))
+        if timeout is None:
+            timeout = self.timeout
+        if timeout is None:
+            return await future
+        return await asyncio.wait_for(future, timeout)
+
+    async def get_joint_status(self, timeout=None):
+        """返回 (success, js)"""
+        return await self.call("GetCurrentJointStatus", timeout=timeout)
+
+    async def get_servo_info(self, id, timeout_ms=500, timeout=None):
+        """返回 (success, [speed, payload, voltage, current])"""
+        return await self.call("GetServoInfo", id, timeout_ms, timeout=timeout)
+
+    async def get_all_servo_info(self, timeout_ms=100, servo_timeout_ms=20, timeout=None):
+        """返回 (valid (7,), info (7, 4)), 所有舵机共用 timeout_ms 的总时限"""
+        return await self.call("GetAllServoInfo", timeout_ms, servo_timeout_ms, timeout=timeout)
+
+    async def set_all_servo_radian(self, joint_positions, timeout=None):
+        await self.call("SetAllServoRadian", joint_positions, timeout=timeout)
+
+    async def set_all_servo_radian_and_gripper(self, joint_positions, gripper=None, timeout=None):
+        """关节 1~6 和夹爪直线位置在一次串口调用中设置, gripper 为 None 时 joint_positions 为 7 个值"""
+        await self.call("SetAllServoRadianAndGripper", joint_positions, gripper, timeout=timeout)
+
+    async def set_gripper(self, position, timeout=None):
+        """设置夹爪直线位置 (-0.068~0.0)"""
+        await self.call("arm_set_gripper_linear_position", position, timeout=timeout)
+
+    async def control_torque(self, msg, timeout=None):
+        """'free' 或 'lock'"""
+        await self.call("ControlTorque", msg, timeout=timeout)
+
+    def close(self, wait=True):
+        """关闭串口线程, 不会释放 arm 对象本身"""
+        self._executor.shutdown(wait=wait)
+
+    async def aclose(self):
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.close)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
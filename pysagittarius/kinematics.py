@@ -0,0 +1,183 @@
+"""纯 NumPy 实现的 Sagittarius 正运动学, 在没有编译扩展的机器上使用
+
+与 SagittariusArmKinematics 使用相同的指数积 (product of exponentials) 模型:
+空间坐标系下的螺旋轴 SLIST 和零位末端位姿 M_HOME, 工具偏移 (x, y, z) 叠加在 M_HOME 的平移上.
+欧拉角与 SDK 一致, 使用角度制, 按 roll(X) / pitch(Y) / yaw(Z) 顺序, R = Rz(yaw) Ry(pitch) Rx(roll).
+四元数顺序为 (x, y, z, w).
+"""
+
+import numpy as np
+
+# 空间坐标系螺旋轴, 每列为一个关节的 (wx, wy, wz, vx, vy, vz)
+SLIST = np.array([
+    [0.0, 0.0, 0.0, 1.0, 0.0, 1.0],
+    [0.0, 1.0, 1.0, 0.0, 1.0, 0.0],
+    [1.0, 0.0, 0.0, 0.0, 0.0, 0.0],
+    [0.0, -0.125, -0.304, 0.0, -0.304, 0.0],
+    [0.0, 0.0, 0.0, 0.304, 0.0, 0.304],
+    [0.0, 0.0, 0.045, 0.0, 0.1795, 0.0],
+])
+
+# 零位时末端位姿
+M_HOME = np.array([
+    [1.0, 0.0, 0.0, 0.2585],
+    [0.0, 1.0, 0.0, 0.0],
+    [0.0, 0.0, 1.0, 0.304],
+    [0.0, 0.0, 0.0, 1.0],
+])
+
+# 关节限位 (弧度)
+LOWER_JOINT_LIMITS = np.array([-2.0, -1.57, -1.48, -2.9, -1.8, -3.1])
+UPPER_JOINT_LIMITS = np.array([2.0, 1.4, 1.8, 2.9, 1.6, 3.1])
+
+
+def _as_theta(theta):
+    theta = np.asarray(theta, dtype=np.float64)
+    if theta.ndim == 1:
+        theta = theta[np.newaxis, :]
+    if theta.ndim != 2 or theta.shape[1] < 6:
+        raise ValueError("Input array must have shape (N, 6)")
+    return theta[:, :6]
+
+
+def home_matrix(x=0.0, y=0.0, z=0.0):
+    """返回叠加工具偏移后的零位末端位姿"""
+    M = M_HOME.copy()
+    M[:3, 3] += (x, y, z)
+    return M
+
+
+def _skew(w):
+    return np.array([
+        [0.0, -w[2], w[1]],
+        [w[2], 0.0, -w[0]],
+        [-w[1], w[0], 0.0],
+    ])
+
+
+def exp6(S, theta):
+    """单个转动螺旋轴 S 对 (N,) 个角度的矩阵指数, 返回 (N, 4, 4)"""
+    theta = np.asarray(theta, dtype=np.float64)
+    w_hat = _skew(S[:3])
+    w_hat2 = w_hat @ w_hat
+    v = S[3:]
+    s = np.sin(theta)[:, np.newaxis, np.newaxis]
+    c = (1.0 - np.cos(theta))[:, np.newaxis, np.newaxis]
+    t = theta[:, np.newaxis, np.newaxis]
+
+    T = np.zeros((theta.shape[0], 4, 4))
+    T[:, :3, :3] = np.eye(3) + s * w_hat + c * w_hat2
+    G = np.eye(3) * t + c * w_hat + (t - s) * w_hat2
+    T[:, :3, 3] = G @ v
+    T[:, 3, 3] = 1.0
+    return T
+
+
+def fkin_space(theta, x=0.0, y=0.0, z=0.0):
+    """(N, 6) 关节角的正运动学, 返回 (N, 4, 4) 末端位姿"""
+    theta = _as_theta(theta)
+    T = np.broadcast_to(np.eye(4), (theta.shape[0], 4, 4))
+    for j in range(6):
+        T = T @ exp6(SLIST[:, j], theta[:, j])
+    return T @ home_matrix(x, y, z)
+
+
+def matrix_to_euler(T):
+    """(N, 4, 4) 或 (N, 3, 3) 旋转转换为 (N, 3) 的 roll, pitch, yaw (角度)"""
+    R = np.asarray(T)[:, :3, :3]
+    roll = np.arctan2(R[:, 2, 1], R[:, 2, 2])
+    pitch = np.arctan2(-R[:, 2, 0], np.hypot(R[:, 2, 1], R[:, 2, 2]))
+    yaw = np.arctan2(R[:, 1, 0], R[:, 0, 0])
+    return np.degrees(np.stack([roll, pitch, yaw], axis=1))
+
+
+def euler_to_matrix(euler):
+    """(N, 3) 的 roll, pitch, yaw (角度) 转换为 (N, 3, 3) 旋转矩阵"""
+    euler = np.radians(np.asarray(euler, dtype=np.float64).reshape(-1, 3))
+    cr, sr = np.cos(euler[:, 0]), np.sin(euler[:, 0])
+    cp, sp = np.cos(euler[:, 1]), np.sin(euler[:, 1])
+    cy, sy = np.cos(euler[:, 2]), np.sin(euler[:, 2])
+    R = np.empty((euler.shape[0], 3, 3))
+    R[:, 0, 0] = cy * cp
+    R[:, 0, 1] = cy * sp * sr - sy * cr
+    R[:, 0, 2] = cy * sp * cr + sy * sr
+    R[:, 1, 0] = sy * cp
+    R[:, 1, 1] = sy * sp * sr + cy * cr
+    R[:, 1, 2] = sy * sp * cr - cy * sr
+    R[:, 2, 0] = -sp
+    R[:, 2, 1] = cp * sr
+    R[:, 2, 2] = cp * cr
+    return R
+
+
+def matrix_to_quaternion(T):
+    """(N, 4, 4) 或 (N, 3, 3) 旋转转换为 (N, 4) 的四元数 (x, y, z, w)"""
+    R = np.asarray(T)[:, :3, :3]
+    n = R.shape[0]
+    q = np.empty((n, 4))
+    trace = R[:, 0, 0] + R[:, 1, 1] + R[:, 2, 2]
+
+    # 按最大对角元素分支, 避免数值不稳定
+    case_w = trace > 0
+    case_x = ~case_w & (R[:, 0, 0] >= R[:, 1, 1]) & (R[:, 0, 0] >= R[:, 2, 2])
+    case_y = ~case_w & ~case_x & (R[:, 1, 1] >= R[:, 2, 2])
+    case_z = ~case_w & ~case_x & ~case_y
+
+    r = R[case_w]
+    s = np.sqrt(trace[case_w] + 1.0) * 2
+    q[case_w] = np.stack([(r[:, 2, 1] - r[:, 1, 2]) / s, (r[:, 0, 2] - r[:, 2, 0]) / s,
+                          (r[:, 1, 0] - r[:, 0, 1]) / s, 0.25 * s], axis=1)
+    r = R[case_x]
+    s = np.sqrt(1.0 + r[:, 0, 0] - r[:, 1, 1] - r[:, 2, 2]) * 2
+    q[case_x] = np.stack([0.25 * s, (r[:, 0, 1] + r[:, 1, 0]) / s,
+                          (r[:, 0, 2] + r[:, 2, 0]) / s, (r[:, 2, 1] - r[:, 1, 2]) / s], axis=1)
+    r = R[case_y]
+    s = np.sqrt(1.0 + r[:, 1, 1] - r[:, 0, 0] - r[:, 2, 2]) * 2
+    q[case_y] = np.stack([(r[:, 0, 1] + r[:, 1, 0]) / s, 0.25 * s,
+                          (r[:, 1, 2] + r[:, 2, 1]) / s, (r[:, 0, 2] - r[:, 2, 0]) / s], axis=1)
+    r = R[case_z]
+    s = np.sqrt(1.0 + r[:, 2, 2] - r[:, 0, 0] - r[:, 1, 1]) * 2
+    q[case_z] = np.stack([(r[:, 0, 2] + r[:, 2, 0]) / s, (r[:, 1, 2] + r[:, 2, 1]) / s,
+                          0.25 * s, (r[:, 1, 0] - r[:, 0, 1]) / s], axis=1)
+    return q
+
+
+def quaternion_to_matrix(q):
+    """(N, 4) 的四元数 (x, y, z, w) 转换为 (N, 3, 3) 旋转矩阵, 四元数不必归一化"""
+    q = np.asarray(q, dtype=np.float64).reshape(-1, 4)
+    x, y, z, w = (q / np.linalg.norm(q, axis=1, keepdims=True)).T
+    R = np.empty((q.shape[0], 3, 3))
+    R[:, 0, 0] = 1 - 2 * (y * y + z * z)
+    R[:, 0, 1] = 2 * (x * y - z * w)
+    R[:, 0, 2] = 2 * (x * z + y * w)
+    R[:, 1, 0] = 2 * (x * y + z * w)
+    R[:, 1, 1] = 1 - 2 * (x * x + z * z)
+    R[:, 1, 2] = 2 * (y * z - x * w)
+    R[:, 2, 0] = 2 * (x * z - y * w)
+    R[:, 2, 1] = 2 * (y * z + x * w)
+    R[:, 2, 2] = 1 - 2 * (x * x + y * y)
+    return R
+
+
+class NumpyKinematics:
+    """SagittariusArmKinematics 批量正运动学接口的 NumPy 版本"""
+
+    def __init__(self, x=0.0, y=0.0, z=0.0):
+        self.offset = (float(x), float(y), float(z))
+        self.lower_joint_limits = LOWER_JOINT_LIMITS.copy()
+        self.upper_joint_limits = UPPER_JOINT_LIMITS.copy()
+
+    def getFKinMatrixBatch(self, theta, num_threads=0):
+        theta = _as_theta(theta)
+        M_EE = fkin_space(theta, *self.offset)
+        return np.isfinite(theta).all(axis=1), M_EE
+
+    def getFKinEulerBatch(self, theta, num_threads=0):
+        success, M_EE = self.getFKinMatrixBatch(theta)
+        xyz = M_EE[:, :3, 3].astype(np.float32)
+        return success, xyz, matrix_to_euler(M_EE).astype(np.float32)
+
+    def getFKinQuaternionBatch(self, theta, num_threads=0):
+        success, M_EE = self.getFKinMatrixBatch(theta)
+        xyz = M_EE[:, :3, 3].astype(np.float32)
+        return success, xyz, matrix_to_quaternion(M_EE).astype(np.float32)
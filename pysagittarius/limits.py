@@ -0,0 +1,25 @@
+"""舵机单位, 速度/加速度上限和夹爪行程, 由 sim 和 trajectory 共用
+
+舵机一圈 4096 步; SetServoVelocity 的单位为 步/秒, SetServoAcceleration 的单位为 100 步/秒^2,
+两者为 0 时表示舵机的最大值. 夹爪直线位置 (GRIPPER_CLOSE~GRIPPER_OPEN 米) 按 GRIPPER_RAD_PER_M 换算为第 7 个舵机的弧度.
+"""
+
+import math
+
+STEPS_PER_RAD = 4096 / (2 * math.pi)
+MAX_VELOCITY = 4096 / STEPS_PER_RAD           # 速度为 0 时使用的最大速度 (rad/s)
+MAX_ACCELERATION = 254 * 100 / STEPS_PER_RAD  # 加速度为 0 时使用的最大加速度 (rad/s^2)
+
+GRIPPER_RAD_PER_M = 22.0
+GRIPPER_CLOSE = -0.068
+GRIPPER_OPEN = 0.0
+
+
+def servo_velocity_limit(arm_vel):
+    """SetServoVelocity(arm_vel) 对应的关节最大速度 (rad/s), 0 表示舵机的最大速度"""
+    return arm_vel / STEPS_PER_RAD if arm_vel > 0 else MAX_VELOCITY
+
+
+def servo_acceleration_limit(arm_acceleration):
+    """SetServoAcceleration(arm_acceleration) 对应的关节最大加速度 (rad/s^2), 0 表示舵机的最大加速度"""
+    return arm_acceleration * 100 / STEPS_PER_RAD if arm_acceleration > 0 else MAX_ACCELERATION
@@ -0,0 +1,92 @@
+"""Sagittarius 串口帧格式
+
+帧结构: 0x55 0xAA | len | type | cmd | data ... | checksum | 0x7D
+len = 2 + len(data), checksum 为 type, cmd, data 各字节之和的低 8 位.
+角度以 0.1 度为单位的 int16 小端发送. 命令字与 SDK 的 sdk_sagittarius_arm_constants.h 保持一致.
+"""
+
+import math
+import struct
+
+FRAME_HEAD = b"\x55\xaa"
+FRAME_TAIL = 0x7D
+
+TYPE_REQUEST_MESSAGE = 0x01
+TYPE_REPLY_MESSAGE = 0x02
+
+CMD_GET_CURRENT_JOINT_STATUS = 0x0A
+CMD_CONTROL_ALL_DEGREE = 0x10
+CMD_CONTROL_END_DEGREE = 0x11
+CMD_CONTROL_ID_DEGREE = 0x12
+CMD_CONTROL_LOCK_OR_FREE = 0x18
+CMD_GET_SERVO_RT_INFO = 0x19
+CMD_SET_SERVO_VEL = 0x1E
+CMD_SET_SERVO_ACC = 0x1F
+CMD_SET_SERVO_TORQUE = 0x20
+
+# CMD_CONTROL_LOCK_OR_FREE 的参数
+TORQUE_FREE = 0x00
+TORQUE_LOCK = 0x01
+
+
+def checksum(payload):
+    return sum(payload) & 0xFF
+
+
+def encode_frame(msg_type, cmd, data=b""):
+    payload = bytes([msg_type, cmd]) + bytes(data)
+    return FRAME_HEAD + bytes([len(payload)]) + payload + bytes([checksum(payload), FRAME_TAIL])
+
+
+def radian_to_decidegree(value):
+    return int(round(math.degrees(value) * 10))
+
+
+def decidegree_to_radian(value):
+    return math.radians(value / 10.0)
+
+
+def pack_radians(values):
+    """弧度列表打包为 int16 小端的 0.1 度数据"""
+    return struct.pack("<%dh" % len(values), *[radian_to_decidegree(v) for v in values])
+
+
+def unpack_radians(data):
+    count = len(data) // 2
+    return [decidegree_to_radian(v) for v in struct.unpack("<%dh" % count, data[:count * 2])]
+
+
+class FrameParser:
+    """从字节流中切分完整帧, 校验失败的帧会被丢弃"""
+
+    def __init__(self):
+        self._buf = bytearray()
+        self.errors = 0
+
+    def feed(self, data):
+        """追加数据, 返回解析出的 (type, cmd, data) 列表"""
+        self._buf.extend(data)
+        frames = []
+        while True:
+            start = self._buf.find(FRAME_HEAD)
+            if start < 0:
+                # 保留最后一个字节, 它可能是帧头的前半部分
+                del self._buf[:-1]
+                return frames
+            if start > 0:
+                del self._buf[:start]
+            if len(self._buf) < 3:
+                return frames
+            length = self._buf[2]
+            total = 3 + length + 2
+            if len(self._buf) < total:
+                return frames
+            payload = bytes(self._buf[3:3 + length])
+            valid = length >= 2 and self._buf[3 + length] == checksum(payload) and self._buf[total - 1] == FRAME_TAIL
+            if valid:
+                frames.append((payload[0], payload[1], payload[2:]))
+                del self._buf[:total]
+            else:
+                # 跳过当前帧头继续搜索
+                self.errors += 1
+                del self._buf[:2]
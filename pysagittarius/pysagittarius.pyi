@@ -0,0 +1,213 @@
+"""pysagittarius 扩展模块 (pysagittarius.cc) 的类型声明"""
+
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import numpy.typing as npt
+
+ArrayLike = npt.ArrayLike
+FloatArray = npt.NDArray[np.float32]
+DoubleArray = npt.NDArray[np.float64]
+BoolArray = npt.NDArray[np.bool_]
+Int16Array = npt.NDArray[np.int16]
+UInt8Array = npt.NDArray[np.uint8]
+ServoCommands = Union["ServoCommandBuffer", npt.NDArray[np.void], Sequence["ServoStruct"]]
+
+metrics_enabled: bool
+SERVO_COMMAND_DTYPE: np.dtype
+SHM_COMMAND_DTYPE: np.dtype
+VIOLATION_JOINT_LIMIT: int
+VIOLATION_SELF_COLLISION: int
+VIOLATION_FLOOR: int
+VIOLATION_KEEP_OUT: int
+
+def log_set_level(level: int) -> None: ...
+def get_metrics() -> Dict[str, Dict[str, Any]]: ...
+def reset_metrics() -> None: ...
+def metrics_prometheus() -> str: ...
+
+class ServoStruct:
+    id: int
+    value: float
+    def __init__(self) -> None: ...
+
+class ServoCommandBuffer:
+    def __init__(self) -> None: ...
+    def set(self, id: int, value: float) -> None: ...
+    def clear(self) -> None: ...
+    def assign(self, ids: ArrayLike, values: ArrayLike) -> None: ...
+    def __len__(self) -> int: ...
+    @property
+    def ids(self) -> npt.NDArray[np.uint8]: ...
+    @property
+    def values(self) -> FloatArray: ...
+
+class SagittariusArmReal:
+    def __init__(self, strSerialName: str = "/dev/sagittarius", Baudrate: int = 1000000, vel: int = 500,
+                 acc: int = 5) -> None: ...
+    @property
+    def lower_joint_limits(self) -> List[float]: ...
+    @property
+    def upper_joint_limits(self) -> List[float]: ...
+    def SetFreeAfterDestructor(self, sw: bool) -> None: ...
+    def CheckUpperLower(self, js: ArrayLike) -> bool: ...
+    def CheckUpperLowerWithIndex(self, sv_list: Optional[ServoCommands] = None, num: Optional[int] = None,
+                                 ids: Optional[ArrayLike] = None, values: Optional[ArrayLike] = None) -> bool: ...
+    def arm_set_gripper_linear_position(self, dist: float) -> None: ...
+    def SetAllServoRadian(self, joint_positions: ArrayLike) -> None: ...
+    def SetAllServoRadianAndGripper(self, joint_positions: ArrayLike, gripper: Optional[float] = None) -> None: ...
+    def GetCurrentJointStatus(self, out: Optional[FloatArray] = None) -> Tuple[bool, FloatArray]: ...
+    def SetServoRadianWithIndex(self, sv_list: Optional[ServoCommands] = None, num: Optional[int] = None,
+                                ids: Optional[ArrayLike] = None, values: Optional[ArrayLike] = None) -> None: ...
+    def ControlTorque(self, msg: str) -> None: ...
+    def GetServoInfo(self, id: int, timeout_ms: int = 500,
+                     out: Optional[Int16Array] = None) -> Tuple[bool, Int16Array]: ...
+    def GetAllServoInfo(self, timeout_ms: int = 100, servo_timeout_ms: int = 20,
+                        out: Optional[Int16Array] = None) -> Tuple[BoolArray, Int16Array]: ...
+    def SetServoAcceleration(self, arm_acceleration: int) -> None: ...
+    def SetServoVelocity(self, arm_vel: int) -> None: ...
+    def SetServoTorque(self, arm_torque: ArrayLike) -> bool: ...
+    def StartJointStatePoller(self, rate_hz: float = 50.0, max_age: float = 0.1) -> None: ...
+    def StopJointStatePoller(self) -> None: ...
+    @property
+    def joint_state_poller_running(self) -> bool: ...
+    def GetCachedJointStatus(self, max_age: Optional[float] = None,
+                             out: Optional[FloatArray] = None) -> Tuple[bool, FloatArray, float, int]: ...
+    def EnableCommandCoalescing(self, deadband: Union[float, ArrayLike] = 0.0) -> None: ...
+    def DisableCommandCoalescing(self) -> None: ...
+    @property
+    def command_coalescing(self) -> bool: ...
+    @property
+    def command_coalescing_stats(self) -> Dict[str, int]: ...
+    def ResetCommandCoalescingStats(self) -> None: ...
+    def StartRecording(self, path: str, capacity: int = 100000) -> None: ...
+    def StopRecording(self) -> None: ...
+    @property
+    def recording_path(self) -> Optional[str]: ...
+    def ExecuteTrajectory(self, times: ArrayLike, points: ArrayLike, rate_hz: float = 50.0,
+                          progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> None: ...
+    def AppendTrajectory(self, times: ArrayLike, points: ArrayLike, rate_hz: float = 50.0) -> None: ...
+    def CancelTrajectory(self) -> None: ...
+    def WaitTrajectory(self, timeout: Optional[float] = None) -> bool: ...
+    def GetTrajectoryStatus(self) -> Dict[str, Any]: ...
+
+class SagittariusArmGroup:
+    def __init__(self, ports: Sequence[str], Baudrate: int = 1000000, vel: int = 500, acc: int = 5) -> None: ...
+    def __len__(self) -> int: ...
+    def __getitem__(self, i: int) -> SagittariusArmReal: ...
+    @property
+    def ports(self) -> List[str]: ...
+    def SetAllServoRadian(self, joint_positions: ArrayLike, at: Optional[float] = None) -> float: ...
+    def GetCurrentJointStatus(self, out: Optional[FloatArray] = None) -> Tuple[BoolArray, FloatArray]: ...
+    @property
+    def latency_stats(self) -> Dict[str, Any]: ...
+    def ResetStats(self) -> None: ...
+
+class SharedArmServer:
+    def __init__(self, name: str, lower_joint_limits: ArrayLike, upper_joint_limits: ArrayLike) -> None: ...
+    @property
+    def name(self) -> str: ...
+    @property
+    def clients(self) -> int: ...
+    def PublishJointStatus(self, valid: bool, js: ArrayLike) -> None: ...
+    def PublishServoInfo(self, valid: ArrayLike, info: ArrayLike) -> None: ...
+    def PopCommands(self, max: int = 64) -> npt.NDArray[np.void]: ...
+    def WaitCommands(self, timeout: float) -> bool: ...
+    def Heartbeat(self) -> None: ...
+    def ReapClients(self) -> int: ...
+    def Close(self) -> None: ...
+    @property
+    def closed(self) -> bool: ...
+
+class SagittariusArmClient:
+    def __init__(self, name: str = "/sagittarius") -> None: ...
+    @property
+    def name(self) -> str: ...
+    @property
+    def lower_joint_limits(self) -> List[float]: ...
+    @property
+    def upper_joint_limits(self) -> List[float]: ...
+    max_state_age: float
+    command_timeout: float
+    def SetFreeAfterDestructor(self, sw: bool) -> None: ...
+    def CheckUpperLower(self, js: ArrayLike) -> bool: ...
+    def CheckUpperLowerWithIndex(self, sv_list: Optional[ServoCommands] = None, num: Optional[int] = None,
+                                 ids: Optional[ArrayLike] = None, values: Optional[ArrayLike] = None) -> bool: ...
+    def arm_set_gripper_linear_position(self, dist: float) -> None: ...
+    def SetAllServoRadian(self, joint_positions: ArrayLike) -> None: ...
+    def SetAllServoRadianAndGripper(self, joint_positions: ArrayLike, gripper: Optional[float] = None) -> None: ...
+    def GetCurrentJointStatus(self, out: Optional[FloatArray] = None) -> Tuple[bool, FloatArray]: ...
+    def SetServoRadianWithIndex(self, sv_list: Optional[ServoCommands] = None, num: Optional[int] = None,
+                                ids: Optional[ArrayLike] = None, values: Optional[ArrayLike] = None) -> None: ...
+    def ControlTorque(self, msg: str) -> None: ...
+    def GetServoInfo(self, id: int, out: Optional[Int16Array] = None) -> Tuple[bool, Int16Array]: ...
+    def GetAllServoInfo(self, out: Optional[Int16Array] = None) -> Tuple[BoolArray, Int16Array]: ...
+    def SetServoAcceleration(self, arm_acceleration: int) -> None: ...
+    def SetServoVelocity(self, arm_vel: int) -> None: ...
+    def SetServoTorque(self, arm_torque: ArrayLike) -> bool: ...
+    def ServerAlive(self, max_age: float = 1.0) -> bool: ...
+    def GetServerState(self) -> Dict[str, Any]: ...
+
+class SagittariusArmKinematics:
+    def __init__(self, x: float = 0.0, y: float = 0.0, z: float = 0.0, solver: str = "numeric") -> None: ...
+    solver: str
+    @property
+    def lower_joint_limits(self) -> List[float]: ...
+    @property
+    def upper_joint_limits(self) -> List[float]: ...
+    def getIKinThetaMatrix(self, M_EE: ArrayLike, eomg: float = 0.001, ev: float = 0.001,
+                           seed: Optional[ArrayLike] = None,
+                           out: Optional[FloatArray] = None) -> Tuple[bool, FloatArray]: ...
+    def getIKinThetaEuler(self, x: float, y: float, z: float, roll: float, pitch: float, yaw: float,
+                          eomg: float = 0.001, ev: float = 0.001, seed: Optional[ArrayLike] = None,
+                          out: Optional[FloatArray] = None) -> Tuple[bool, FloatArray]: ...
+    def getIKinThetaQuaternion(self, x: float, y: float, z: float, ox: float, oy: float, oz: float, ow: float,
+                               eomg: float = 0.001, ev: float = 0.001, seed: Optional[ArrayLike] = None,
+                               out: Optional[FloatArray] = None) -> Tuple[bool, FloatArray]: ...
+    def getIKinThetaMatrixBatch(self, M_EE: ArrayLike, eomg: float = 0.001, ev: float = 0.001, num_threads: int = 0,
+                                seed: Optional[ArrayLike] = None, chain: bool = False,
+                                out: Optional[FloatArray] = None) -> Tuple[BoolArray, FloatArray]: ...
+    def getIKinThetaEulerBatch(self, poses: ArrayLike, eomg: float = 0.001, ev: float = 0.001, num_threads: int = 0,
+                               seed: Optional[ArrayLike] = None, chain: bool = False,
+                               out: Optional[FloatArray] = None) -> Tuple[BoolArray, FloatArray]: ...
+    def getIKinThetaQuaternionBatch(self, poses: ArrayLike, eomg: float = 0.001, ev: float = 0.001,
+                                    num_threads: int = 0, seed: Optional[ArrayLike] = None, chain: bool = False,
+                                    out: Optional[FloatArray] = None) -> Tuple[BoolArray, FloatArray]: ...
+    def getIKinThetaBranchesMatrix(self, M_EE: ArrayLike, eomg: float = 0.001, ev: float = 0.001,
+                                   reference: Optional[ArrayLike] = None) -> FloatArray: ...
+    def getIKinThetaBranchesEuler(self, x: float, y: float, z: float, roll: float, pitch: float, yaw: float,
+                                  eomg: float = 0.001, ev: float = 0.001,
+                                  reference: Optional[ArrayLike] = None) -> FloatArray: ...
+    def getIKinThetaBranchesQuaternion(self, x: float, y: float, z: float, ox: float, oy: float, oz: float,
+                                       ow: float, eomg: float = 0.001, ev: float = 0.001,
+                                       reference: Optional[ArrayLike] = None) -> FloatArray: ...
+    def getJacobian(self, theta: ArrayLike, frame: str = "space", out: Optional[DoubleArray] = None) -> DoubleArray: ...
+    def cartesianVelocityStep(self, theta: ArrayLike, twist: ArrayLike, dt: float, frame: str = "space",
+                              damping: float = 0.01, margin: float = 0.1,
+                              out: Optional[FloatArray] = None) -> FloatArray: ...
+    def enableCache(self, max_size: int = 1024, position_resolution: float = 0.0001,
+                    angle_resolution: float = 0.001) -> None: ...
+    def disableCache(self) -> None: ...
+    def clearCache(self) -> None: ...
+    def saveCache(self, path: str) -> None: ...
+    def loadCache(self, path: str) -> int: ...
+    @property
+    def cache_stats(self) -> Optional[Dict[str, Union[int, float]]]: ...
+    def setTrackingMode(self, enabled: bool, seed: Optional[ArrayLike] = None) -> None: ...
+    @property
+    def tracking_seed(self) -> Optional[FloatArray]: ...
+    def getFKinMatrix(self, theta: ArrayLike, out: Optional[DoubleArray] = None) -> Tuple[bool, DoubleArray]: ...
+    def getFKinEuler(self, theta: ArrayLike, xyz_out: Optional[FloatArray] = None,
+                     euler_out: Optional[FloatArray] = None) -> Tuple[bool, FloatArray, FloatArray]: ...
+    def getFKinQuaternion(self, theta: ArrayLike, xyz_out: Optional[FloatArray] = None,
+                          quaternion_out: Optional[FloatArray] = None) -> Tuple[bool, FloatArray, FloatArray]: ...
+    def getFKinMatrixBatch(self, theta: ArrayLike, num_threads: int = 0,
+                           out: Optional[DoubleArray] = None) -> Tuple[BoolArray, DoubleArray]: ...
+    def getFKinEulerBatch(self, theta: ArrayLike, num_threads: int = 0, xyz_out: Optional[FloatArray] = None,
+                          euler_out: Optional[FloatArray] = None) -> Tuple[BoolArray, FloatArray, FloatArray]: ...
+    def getFKinQuaternionBatch(self, theta: ArrayLike, num_threads: int = 0, xyz_out: Optional[FloatArray] = None,
+                               quaternion_out: Optional[FloatArray] = None
+                               ) -> Tuple[BoolArray, FloatArray, FloatArray]: ...
+    def validateTrajectory(self, theta: ArrayLike, floor: Optional[float] = None, boxes: Optional[ArrayLike] = None,
+                           margin: float = 0.0, self_collision: bool = True, num_threads: int = 0,
+                           out: Optional[UInt8Array] = None) -> UInt8Array: ...
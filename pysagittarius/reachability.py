@@ -0,0 +1,264 @@
+"""预先计算的工作空间可达性地图和逆解初值索引
+
+在关节限位内随机采样, 用正运动学得到末端位姿, 按位置体素化:
+occupancy[i, j, k] 表示该体素内有可达的末端位置, 每个体素内的样本 (位姿 -> 关节角) 连续存放,
+查询时只需要访问目标所在体素及其相邻体素.
+
+地图保存为单个文件: 文件头 (魔数 + JSON 描述) 之后是按 64 字节对齐的数组,
+加载时用 np.memmap 映射, 不读入整个文件.
+
+只按位置判断可达性, 不考虑姿态; 位置可达但姿态不可达的目标仍需要逆解来判断.
+
+生成地图:
+    python -m pysagittarius.reachability build workspace.map --samples 500000 --voxel 0.01
+"""
+
+import argparse
+import json
+import struct
+import time
+
+import numpy as np
+
+from .kinematics import NumpyKinematics, euler_to_matrix, matrix_to_quaternion
+
+MAGIC = b"PSREACH1"
+_ALIGN = 64
+_ARRAYS = ("occupancy", "voxel_start", "theta", "position", "quaternion")
+
+
+def _align(offset):
+    return (offset + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+class ReachabilityMap:
+    """体素化的可达性地图, 由 build() 生成或 load() 加载"""
+
+    def __init__(self, origin, voxel_size, offset, occupancy, voxel_start, theta, position, quaternion):
+        self.origin = np.asarray(origin, dtype=np.float64)
+        self.voxel_size = float(voxel_size)
+        self.offset = tuple(float(v) for v in offset)
+        self.occupancy = occupancy
+        self.voxel_start = voxel_start
+        self.theta = theta
+        self.position = position
+        self.quaternion = quaternion
+
+    @property
+    def shape(self):
+        return self.occupancy.shape
+
+    def __len__(self):
+        return self.theta.shape[0]
+
+    # 位置 -> 体素下标, 超出网格时为 -1
+    def _voxel(self, xyz):
+        xyz = np.asarray(xyz, dtype=np.float64).reshape(-1, 3)
+        ijk = np.floor((xyz - self.origin) / self.voxel_size).astype(np.int64)
+        inside = np.all((ijk >= 0) & (ijk < self.shape), axis=1)
+        return ijk, inside
+
+    def reachable(self, xyz):
+        """(N, 3) 位置的可达性掩码"""
+        ijk, inside = self._voxel(xyz)
+        result = np.zeros(ijk.shape[0], dtype=bool)
+        i, j, k = ijk[inside].T
+        result[inside] = self.occupancy[i, j, k] != 0
+        return result
+
+    def is_reachable(self, x, y, z):
+        return bool(self.reachable((x, y, z))[0])
+
+    def _candidates(self, ijk, radius):
+        nx, ny, nz = self.shape
+        lo = np.maximum(ijk - radius, 0)
+        hi = np.minimum(ijk + radius + 1, self.shape)
+        ranges = []
+        for i in range(lo[0], hi[0]):
+            for j in range(lo[1], hi[1]):
+                start = (i * ny + j) * nz
+                ranges.append(np.arange(self.voxel_start[start + lo[2]], self.voxel_start[start + hi[2]]))
+        return np.concatenate(ranges) if ranges else np.empty(0, dtype=np.int64)
+
+    def nearest(self, xyz, quaternion=None, k=1, orientation_weight=0.3, radius=1):
+        """离目标位姿最近的 k 个样本的下标
+
+        距离 = 位置距离 (米) + orientation_weight * 姿态距离 (1 - |q . q_target|).
+        只搜索目标体素周围 radius 个体素以内的样本, 没有样本时返回空数组.
+        """
+        ijk, inside = self._voxel(xyz)
+        if not inside[0]:
+            return np.empty(0, dtype=np.int64)
+        idx = self._candidates(ijk[0], radius)
+        if idx.size == 0:
+            return idx
+        d = np.linalg.norm(self.position[idx] - np.asarray(xyz, dtype=np.float32), axis=1)
+        if quaternion is not None:
+            q = np.asarray(quaternion, dtype=np.float32)
+            q = q / np.linalg.norm(q)
+            d = d + orientation_weight * (1.0 - np.abs(self.quaternion[idx] @ q))
+        order = np.argsort(d)[:k]
+        return idx[order]
+
+    def seed(self, x, y, z, quaternion=None, orientation_weight=0.3):
+        """目标位姿的逆解初值, 目标附近没有样本时返回 None"""
+        idx = self.nearest((x, y, z), quaternion, 1, orientation_weight)
+        if idx.size == 0:
+            return None
+        return np.array(self.theta[idx[0]])
+
+    def getIKinThetaEuler(self, kinematics, x, y, z, roll, pitch, yaw, eomg=0.001, ev=0.001):
+        """先查地图: 位置不可达时直接返回失败, 否则用最近样本的关节角作为初值求逆解"""
+        if not self.is_reachable(x, y, z):
+            return False, np.zeros(6, dtype=np.float32)
+        q = matrix_to_quaternion(euler_to_matrix((roll, pitch, yaw)))[0]
+        return kinematics.getIKinThetaEuler(x, y, z, roll, pitch, yaw, eomg, ev, seed=self.seed(x, y, z, q))
+
+    def getIKinThetaQuaternion(self, kinematics, x, y, z, ox, oy, oz, ow, eomg=0.001, ev=0.001):
+        if not self.is_reachable(x, y, z):
+            return False, np.zeros(6, dtype=np.float32)
+        seed = self.seed(x, y, z, (ox, oy, oz, ow))
+        return kinematics.getIKinThetaQuaternion(x, y, z, ox, oy, oz, ow, eomg, ev, seed=seed)
+
+    def save(self, path):
+        header = {
+            "origin": self.origin.tolist(),
+            "voxel_size": self.voxel_size,
+            "offset": list(self.offset),
+            "arrays": {},
+        }
+        arrays = {name: np.ascontiguousarray(getattr(self, name)) for name in _ARRAYS}
+        # 数组偏移写在文件头里, 文件头长度又决定偏移, 重复计算直到不再变化
+        blob = b""
+        while True:
+            pos = _align(len(MAGIC) + 4 + len(blob))
+            for name, a in arrays.items():
+                header["arrays"][name] = {"dtype": a.dtype.str, "shape": list(a.shape), "offset": pos}
+                pos = _align(pos + a.nbytes)
+            new_blob = json.dumps(header).encode()
+            if len(new_blob) == len(blob):
+                break
+            blob = new_blob
+        with open(path, "wb") as f:
+            f.write(MAGIC + struct.pack("<I", len(blob)) + blob)
+            for name, a in arrays.items():
+                f.seek(header["arrays"][name]["offset"])
+                f.write(a.tobytes())
+
+    @classmethod
+    def load(cls, path):
+        """以只读方式映射地图文件"""
+        with open(path, "rb") as f:
+            head = f.read(len(MAGIC) + 4)
+            if head[:len(MAGIC)] != MAGIC:
+                raise ValueError("%s is not a reachability map" % path)
+            header = json.loads(f.read(struct.unpack("<I", head[len(MAGIC):])[0]))
+        arrays = {}
+        for name in _ARRAYS:
+            info = header["arrays"][name]
+            shape = tuple(info["shape"])
+            if np.prod(shape) == 0:
+                arrays[name] = np.empty(shape, dtype=info["dtype"])
+            else:
+                arrays[name] = np.memmap(path, dtype=info["dtype"], mode="r", offset=info["offset"], shape=shape)
+        return cls(header["origin"], header["voxel_size"], header["offset"], **arrays)
+
+
+# 26 邻域膨胀, 网格外视为空
+def _dilate(grid):
+    padded = np.pad(grid, 1)
+    out = np.zeros_like(grid)
+    nx, ny, nz = grid.shape
+    for di in range(3):
+        for dj in range(3):
+            for dk in range(3):
+                out |= padded[di:di + nx, dj:dj + ny, dk:dk + nz]
+    return out
+
+
+def _close(grid, iterations):
+    """闭运算: 填补随机采样在工作空间内部留下的空洞, 边界基本不变"""
+    closed = grid
+    for _ in range(iterations):
+        closed = _dilate(closed)
+    for _ in range(iterations):
+        closed = ~_dilate(~closed)
+    return closed | grid
+
+
+def build(samples=200000, voxel_size=0.01, x=0.0, y=0.0, z=0.0, kinematics=None, seed=None, batch=50000,
+          fill_holes=1):
+    """在关节限位内均匀采样 samples 个构型, 生成可达性地图
+
+    kinematics 需要提供 lower_joint_limits, upper_joint_limits 和 getFKinQuaternionBatch,
+    默认使用与工具偏移 (x, y, z) 对应的 NumpyKinematics.
+    fill_holes 为闭运算的次数, 用来填补内部没有采到样本的体素.
+    """
+    if kinematics is None:
+        kinematics = NumpyKinematics(x, y, z)
+    lower = np.asarray(kinematics.lower_joint_limits, dtype=np.float64)[:6]
+    upper = np.asarray(kinematics.upper_joint_limits, dtype=np.float64)[:6]
+    rng = np.random.default_rng(seed)
+
+    theta = rng.uniform(lower, upper, size=(samples, 6)).astype(np.float32)
+    position = np.empty((samples, 3), dtype=np.float32)
+    quaternion = np.empty((samples, 4), dtype=np.float32)
+    valid = np.empty(samples, dtype=bool)
+    for start in range(0, samples, batch):
+        chunk = slice(start, start + batch)
+        valid[chunk], position[chunk], quaternion[chunk] = kinematics.getFKinQuaternionBatch(theta[chunk])
+    theta, position, quaternion = theta[valid], position[valid], quaternion[valid]
+
+    # 网格覆盖所有样本, 四周留一个空体素
+    origin = np.floor(position.min(axis=0) / voxel_size) * voxel_size - voxel_size
+    shape = tuple((np.ceil((position.max(axis=0) - origin) / voxel_size) + 2).astype(np.int64))
+    ijk = np.floor((position - origin) / voxel_size).astype(np.int64)
+    flat = np.ravel_multi_index(ijk.T, shape)
+
+    order = np.argsort(flat, kind="stable")
+    flat = flat[order]
+    counts = np.bincount(flat, minlength=int(np.prod(shape)))
+    voxel_start = np.zeros(counts.size + 1, dtype=np.int64)
+    np.cumsum(counts, out=voxel_start[1:])
+    occupancy = _close((counts > 0).reshape(shape), fill_holes).astype(np.uint8)
+    return ReachabilityMap(origin, voxel_size, (x, y, z), occupancy, voxel_start,
+                           theta[order], position[order], quaternion[order])
+
+
+def load(path):
+    return ReachabilityMap.load(path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sagittarius 可达性地图")
+    sub = parser.add_subparsers(dest="command", required=True)
+    b = sub.add_parser("build", help="采样关节空间并保存地图")
+    b.add_argument("output")
+    b.add_argument("--samples", type=int, default=200000)
+    b.add_argument("--voxel", type=float, default=0.01, help="体素边长 (米)")
+    b.add_argument("--offset", type=float, nargs=3, default=(0.0, 0.0, 0.0), metavar=("X", "Y", "Z"),
+                   help="工具偏移, 与 SagittariusArmKinematics(x, y, z) 相同")
+    b.add_argument("--seed", type=int, default=None)
+    b.add_argument("--fill-holes", type=int, default=1, help="填补空洞的闭运算次数")
+    i = sub.add_parser("info", help="显示地图信息")
+    i.add_argument("path")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        t0 = time.perf_counter()
+        m = build(args.samples, args.voxel, *args.offset, seed=args.seed, fill_holes=args.fill_holes)
+        m.save(args.output)
+        print("%d 个样本, %d 个可达体素, 用时 %.1f 秒" % (len(m), int(m.occupancy.sum()), time.perf_counter() - t0))
+    else:
+        t0 = time.perf_counter()
+        m = load(args.path)
+        elapsed = (time.perf_counter() - t0) * 1000
+        print("样本数: %d" % len(m))
+        print("网格: %s, 体素 %.3f 米, 原点 %s" % (m.shape, m.voxel_size, np.round(m.origin, 4).tolist()))
+        print("可达体素: %d" % int(m.occupancy.sum()))
+        print("工具偏移: %s" % (m.offset,))
+        print("加载用时: %.2f 毫秒" % elapsed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""命令和关节状态记录文件的读取和回放
+
+SagittariusArmReal.StartRecording(path, capacity) 把每次 SetAllServoRadian, SetServoRadianWithIndex,
+arm_set_gripper_linear_position, SetAllServoRadianAndGripper 命令和 GetCurrentJointStatus 的结果连同时间戳写入内存映射的环形文件,
+写满后覆盖最旧的记录. 文件布局与 src/recorder.h 一致: 64 字节文件头之后是 capacity 条 64 字节的记录.
+
+Recording 用 np.memmap 映射文件, records 是整个环形缓冲的结构化数组, 不复制数据;
+ordered() 按写入顺序返回有效的记录. 记录进行中也可以读取.
+
+回放:
+    python -m pysagittarius.recording info run.rec
+    python -m pysagittarius.recording replay run.rec --port /dev/ttyACM0
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+MAGIC = b"PSREC001"
+VERSION = 1
+
+KIND_ALL_SERVO_RADIAN = 1    # values[0:6]
+KIND_SERVO_RADIAN_INDEX = 2  # values[id - 1], mask 中对应位为 1
+KIND_GRIPPER = 3             # values[6] 为夹爪直线位置 (米)
+KIND_JOINT_STATUS = 4        # values[0:7], status 为是否读取成功
+KIND_ARM_GRIPPER = 5         # values[0:6] 为关节, values[6] 为夹爪直线位置
+KIND_NAMES = {
+    KIND_ALL_SERVO_RADIAN: "SetAllServoRadian",
+    KIND_SERVO_RADIAN_INDEX: "SetServoRadianWithIndex",
+    KIND_GRIPPER: "arm_set_gripper_linear_position",
+    KIND_JOINT_STATUS: "GetCurrentJointStatus",
+    KIND_ARM_GRIPPER: "SetAllServoRadianAndGripper",
+}
+
+HEADER_DTYPE = np.dtype([
+    ("magic", "S8"),
+    ("version", "<u4"),
+    ("record_size", "<u4"),
+    ("capacity", "<u8"),
+    ("next", "<u8"),
+    ("reserved", "u1", (32,)),
+])
+RECORD_DTYPE = np.dtype([
+    ("stamp", "<f8"),   # 单调时钟秒数, 与 time.monotonic() 相同
+    ("seq", "<u8"),     # 第 n 条记录写完后为 n + 1
+    ("kind", "<u4"),
+    ("mask", "<u4"),    # values 中有效的元素
+    ("values", "<f4", (7,)),
+    ("status", "<i4"),
+    ("reserved", "<u4", (2,)),
+])
+
+
+def mask_ids(mask):
+    """mask 中为 1 的位对应的舵机编号 (1~7)"""
+    return np.flatnonzero((int(mask) >> np.arange(7)) & 1) + 1
+
+
+class Recording:
+    """以只读方式映射的记录文件"""
+
+    def __init__(self, path):
+        self.path = path
+        self._header = np.memmap(path, dtype=HEADER_DTYPE, mode="r", shape=(1,))
+        header = self._header[0]
+        if bytes(header["magic"]) != MAGIC:
+            raise ValueError("%s is not a recording" % path)
+        if header["version"] != VERSION or header["record_size"] != RECORD_DTYPE.itemsize:
+            raise ValueError("%s has an unsupported record layout" % path)
+        self.capacity = int(header["capacity"])
+        self.records = np.memmap(path, dtype=RECORD_DTYPE, mode="r", offset=HEADER_DTYPE.itemsize,
+                                 shape=(self.capacity,))
+
+    @property
+    def count(self):
+        """已写入的记录总数, 包括已被覆盖的"""
+        return int(self._header["next"][0])
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    def ordered(self):
+        """按写入顺序排列的有效记录; 环形缓冲尚未回绕时为 records 的切片, 不复制数据"""
+        n = self.count
+        if n <= self.capacity:
+            records = self.records[:n]
+        else:
+            start = n % self.capacity
+            records = np.concatenate([self.records[start:], self.records[:start]])
+        # 正在写入或刚被新记录覆盖的位置 seq 与序号不符, 丢弃
+        expected = np.arange(n - len(records) + 1, n + 1, dtype=np.uint64)
+        valid = records["seq"] == expected
+        return records if valid.all() else records[valid]
+
+    def commands(self):
+        records = self.ordered()
+        return records[records["kind"] != KIND_JOINT_STATUS]
+
+    def joint_states(self):
+        """成功读取的关节状态"""
+        records = self.ordered()
+        return records[(records["kind"] == KIND_JOINT_STATUS) & (records["status"] != 0)]
+
+
+class RecordingWriter:
+    """与原生记录器格式相同的 Python 实现, 供仿真后端使用"""
+
+    def __init__(self, path, capacity=100000):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.path = path
+        self.capacity = capacity
+        with open(path, "wb") as f:
+            f.truncate(HEADER_DTYPE.itemsize + capacity * RECORD_DTYPE.itemsize)
+        self._header = np.memmap(path, dtype=HEADER_DTYPE, mode="r+", shape=(1,))
+        self._header[0] = (MAGIC, VERSION, RECORD_DTYPE.itemsize, capacity, 0, 0)
+        self._records = np.memmap(path, dtype=RECORD_DTYPE, mode="r+", offset=HEADER_DTYPE.itemsize,
+                                  shape=(capacity,))
+        self._next = 0
+
+    def append(self, kind, mask, values, status=0):
+        n = self._next
+        values = np.where((mask >> np.arange(7)) & 1, np.resize(np.asarray(values, dtype=np.float32), 7), 0)
+        index = n % self.capacity
+        record = self._records[index:index + 1]
+        record["seq"] = 0
+        record["stamp"] = time.monotonic()
+        record["kind"] = kind
+        record["mask"] = mask
+        record["values"] = values
+        record["status"] = status
+        record["seq"] = n + 1
+        self._next = n + 1
+        self._header["next"] = self._next
+
+
+def replay(records, arm, speed=1.0):
+    """按记录的时间间隔把命令重新发送给 arm (SagittariusArmReal 或 SagittariusArmSim), 返回发送的命令数
+
+    records 为 Recording 或结构化数组, 关节状态记录被忽略.
+    speed 为回放速度倍数, 为 0 时不等待, 依次发送.
+    """
+    if isinstance(records, Recording):
+        records = records.commands()
+    else:
+        records = records[records["kind"] != KIND_JOINT_STATUS]
+    if len(records) == 0:
+        return 0
+    start = time.monotonic()
+    first = records["stamp"][0]
+    for record in records:
+        if speed > 0:
+            delay = (record["stamp"] - first) / speed - (time.monotonic() - start)
+            if delay > 0:
+                time.sleep(delay)
+        kind = record["kind"]
+        if kind == KIND_ALL_SERVO_RADIAN:
+            arm.SetAllServoRadian(record["values"][:6])
+        elif kind == KIND_SERVO_RADIAN_INDEX:
+            ids = mask_ids(record["mask"])
+            arm.SetServoRadianWithIndex(ids=ids, values=record["values"][ids - 1])
+        elif kind == KIND_GRIPPER:
+            arm.arm_set_gripper_linear_position(float(record["values"][6]))
+        elif kind == KIND_ARM_GRIPPER:
+            arm.SetAllServoRadianAndGripper(record["values"][:7])
+    return len(records)
+
+
+def load(path):
+    return Recording(path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sagittarius 命令和关节状态记录")
+    sub = parser.add_subparsers(dest="command", required=True)
+    i = sub.add_parser("info", help="显示记录信息")
+    i.add_argument("path")
+    r = sub.add_parser("replay", help="把记录的命令重新发送给机械臂")
+    r.add_argument("path")
+    target = r.add_mutually_exclusive_group(required=True)
+    target.add_argument("--port", help="真实机械臂的串口")
+    target.add_argument("--sim", action="store_true", help="发送给仿真机械臂")
+    r.add_argument("--baudrate", type=int, default=1000000)
+    r.add_argument("--speed", type=float, default=1.0, help="回放速度倍数, 0 表示不等待")
+    args = parser.parse_args(argv)
+
+    recording = load(args.path)
+    if args.command == "info":
+        records = recording.ordered()
+        print("记录数: %d / %d (共写入 %d)" % (len(records), recording.capacity, recording.count))
+        if len(records):
+            print("时长: %.3f 秒" % (records["stamp"][-1] - records["stamp"][0]))
+        for kind, name in KIND_NAMES.items():
+            print("%s: %d" % (name, int(np.count_nonzero(records["kind"] == kind))))
+        return
+
+    if args.sim:
+        from .sim import SagittariusArmSim
+        arm = SagittariusArmSim()
+    else:
+        from pysagittarius import SagittariusArmReal
+        arm = SagittariusArmReal(args.port, args.baudrate, 500, 5)
+    t0 = time.perf_counter()
+    sent = replay(recording, arm, args.speed)
+    print("回放 %d 条命令, 用时 %.2f 秒" % (sent, time.perf_counter() - t0))
+    if args.sim:
+        print("仿真机械臂关节状态: %s" % np.round(arm.GetCurrentJointStatus()[1], 4).tolist())
+
+
+if __name__ == "__main__":
+    main()
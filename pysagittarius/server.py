@@ -0,0 +1,207 @@
+"""多进程共享一台机械臂的服务进程
+
+服务进程独占串口, 把关节状态和舵机信息发布到 POSIX 共享内存 (/dev/shm), 并执行客户端写入共享内存队列的命令.
+其他进程用 SagittariusArmClient 连接, 方法与 SagittariusArmReal 相同: 读取关节状态不经过串口, 只复制共享内存;
+设置类命令写入队列后立即返回, 由服务进程按顺序执行. 共享内存布局见 src/shm_arm.h.
+
+    python -m pysagittarius.server --port /dev/ttyACM0
+    python -m pysagittarius.server --sim
+
+    arm = pysagittarius.SagittariusArmClient("/sagittarius")
+    arm.SetAllServoRadian([0, 0, 0, 0, 0, 0])
+    success, js = arm.GetCurrentJointStatus()
+"""
+
+import argparse
+import logging
+import signal
+import threading
+import time
+
+import numpy as np
+
+from .recording import mask_ids
+
+DEFAULT_NAME = "/sagittarius"
+
+# 命令种类, 与 src/shm_arm.h 的 CommandKind 一致
+CMD_ALL_SERVO_RADIAN = 1       # values[0:6]
+CMD_SERVO_RADIAN_INDEX = 2     # values[id - 1], mask 中对应位为 1
+CMD_GRIPPER = 3                # values[6] 为夹爪直线位置 (米)
+CMD_CONTROL_TORQUE = 4         # ints[0]: 1 为 lock, 0 为 free
+CMD_SERVO_VELOCITY = 5         # ints[0]
+CMD_SERVO_ACCELERATION = 6     # ints[0]
+CMD_SERVO_TORQUE = 7           # ints[0:7]
+CMD_FREE_AFTER_DESTRUCTOR = 8  # ints[0]
+CMD_ARM_GRIPPER = 9            # values[0:6] 为关节, values[6] 为夹爪直线位置
+
+logger = logging.getLogger(__name__)
+
+
+class ArmServer:
+    """把 arm (SagittariusArmReal 或 SagittariusArmSim) 通过共享内存段 name 提供给其他进程
+
+    rate_hz 为读取并发布关节状态的频率; info_rate_hz 为调用 GetAllServoInfo 发布舵机信息的频率, 0 表示不读取.
+    没有命令时在共享内存上等待, 客户端写入命令后立即被唤醒.
+    """
+
+    def __init__(self, arm, name=DEFAULT_NAME, rate_hz=100.0, info_rate_hz=10.0, info_timeout_ms=30,
+                 batch=64):
+        from pysagittarius import SharedArmServer
+
+        if rate_hz <= 0:
+            raise ValueError("rate_hz must be positive")
+        self.arm = arm
+        self.name = name
+        self.period = 1.0 / rate_hz
+        self.info_period = 1.0 / info_rate_hz if info_rate_hz > 0 else None
+        self.info_timeout_ms = info_timeout_ms
+        self.batch = batch
+        self.stats = {"commands": 0, "superseded": 0, "errors": 0, "reads": 0, "failed_reads": 0}
+        self._shm = SharedArmServer(name, arm.lower_joint_limits, arm.upper_joint_limits)
+        self._js = np.zeros(7, dtype=np.float32)
+        self._info = np.zeros((7, 4), dtype=np.int16)
+        self._stop = threading.Event()
+        now = time.monotonic()
+        self._next_state = now
+        self._next_info = now
+        self._next_reap = now
+
+    @property
+    def clients(self):
+        return self._shm.clients
+
+    def _publish_state(self):
+        success, _ = self.arm.GetCurrentJointStatus(out=self._js)
+        self.stats["reads"] += 1
+        if not success:
+            self.stats["failed_reads"] += 1
+        self._shm.PublishJointStatus(success, self._js)
+
+    def _publish_info(self):
+        valid, _ = self.arm.GetAllServoInfo(self.info_timeout_ms, out=self._info)
+        self._shm.PublishServoInfo(valid, self._info)
+
+    def _apply(self, command):
+        arm = self.arm
+        kind = command["kind"]
+        values = command["values"]
+        ints = command["ints"]
+        if kind == CMD_ALL_SERVO_RADIAN:
+            arm.SetAllServoRadian(values[:6])
+        elif kind == CMD_SERVO_RADIAN_INDEX:
+            ids = mask_ids(command["mask"])
+            if len(ids):
+                arm.SetServoRadianWithIndex(ids=ids, values=values[ids - 1])
+        elif kind == CMD_GRIPPER:
+            arm.arm_set_gripper_linear_position(float(values[6]))
+        elif kind == CMD_CONTROL_TORQUE:
+            arm.ControlTorque("lock" if ints[0] else "free")
+        elif kind == CMD_SERVO_VELOCITY:
+            arm.SetServoVelocity(int(ints[0]))
+        elif kind == CMD_SERVO_ACCELERATION:
+            arm.SetServoAcceleration(int(ints[0]))
+        elif kind == CMD_SERVO_TORQUE:
+            arm.SetServoTorque(ints)
+        elif kind == CMD_FREE_AFTER_DESTRUCTOR:
+            arm.SetFreeAfterDestructor(bool(ints[0]))
+        elif kind == CMD_ARM_GRIPPER:
+            arm.SetAllServoRadianAndGripper(values)
+        else:
+            raise ValueError("unknown command kind %d" % kind)
+
+    def _execute(self, commands):
+        kinds = commands["kind"]
+        for i, command in enumerate(commands):
+            # 紧接着的一条命令设置了同样的舵机 (SetAllServoRadian 之后是 SetAllServoRadian 或
+            # SetAllServoRadianAndGripper, SetAllServoRadianAndGripper 之后是 SetAllServoRadianAndGripper) 时
+            # 这条会被完全覆盖, 不再发送
+            following = kinds[i + 1] if i + 1 < len(commands) else None
+            if ((kinds[i] == CMD_ALL_SERVO_RADIAN and following in (CMD_ALL_SERVO_RADIAN, CMD_ARM_GRIPPER))
+                    or (kinds[i] == CMD_ARM_GRIPPER and following == CMD_ARM_GRIPPER)):
+                self.stats["superseded"] += 1
+                continue
+            try:
+                self._apply(command)
+            except Exception:
+                self.stats["errors"] += 1
+                logger.exception("command %d failed", kinds[i])
+        self.stats["commands"] += len(commands)
+
+    def step(self, timeout=None):
+        """执行一轮: 到时间时发布关节状态和舵机信息, 然后等待并执行命令; 返回执行的命令数
+
+        timeout 为等待命令的最长时间, 默认等到下次发布状态.
+        """
+        now = time.monotonic()
+        if now >= self._next_state:
+            self._publish_state()
+            self._next_state = max(self._next_state + self.period, now)
+        if self.info_period is not None and now >= self._next_info:
+            self._publish_info()
+            self._next_info = max(self._next_info + self.info_period, now)
+        if now >= self._next_reap:
+            self._shm.ReapClients()
+            self._next_reap = now + 1.0
+        if timeout is None:
+            deadline = self._next_state if self.info_period is None else min(self._next_state, self._next_info)
+            timeout = deadline - time.monotonic()
+        self._shm.Heartbeat()
+        if not self._shm.WaitCommands(max(timeout, 0.0)):
+            return 0
+        commands = self._shm.PopCommands(self.batch)
+        self._execute(commands)
+        return len(commands)
+
+    def serve_forever(self):
+        """循环执行 step 直到 stop() 被调用"""
+        while not self._stop.is_set():
+            self.step()
+
+    def stop(self):
+        """让 serve_forever 在当前一轮结束后返回, 可以从其他线程或信号处理函数调用"""
+        self._stop.set()
+
+    def close(self):
+        """删除共享内存段, 已连接的客户端不再收到更新; 可以重复调用"""
+        self._shm.Close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sagittarius 机械臂共享内存服务")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--port", help="真实机械臂的串口")
+    target.add_argument("--sim", action="store_true", help="使用仿真机械臂")
+    parser.add_argument("--name", default=DEFAULT_NAME, help="共享内存段名称")
+    parser.add_argument("--baudrate", type=int, default=1000000)
+    parser.add_argument("--vel", type=int, default=500)
+    parser.add_argument("--acc", type=int, default=5)
+    parser.add_argument("--rate", type=float, default=100.0, help="发布关节状态的频率 (Hz)")
+    parser.add_argument("--info-rate", type=float, default=10.0, help="发布舵机信息的频率 (Hz), 0 表示不读取")
+    args = parser.parse_args(argv)
+
+    if args.sim:
+        from .sim import SagittariusArmSim
+        arm = SagittariusArmSim(vel=args.vel, acc=args.acc)
+    else:
+        from pysagittarius import SagittariusArmReal
+        arm = SagittariusArmReal(args.port, args.baudrate, args.vel, args.acc)
+
+    with ArmServer(arm, args.name, args.rate, args.info_rate) as server:
+        signal.signal(signal.SIGTERM, lambda signum, frame: server.stop())
+        print("机械臂服务已启动: %s" % args.name)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        print("已执行 %d 条命令" % server.stats["commands"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,603 @@
+"""不需要硬件的 Sagittarius 仿真后端
+
+SagittariusArmSim 提供与 SagittariusArmReal 相同的方法和关节限位属性, 舵机按速度/加速度限制运动,
+每次串口调用可以附加固定延迟和随机抖动.
+SimSerialServer 在伪终端 (pty) 上按串口帧格式应答, 真实的 SagittariusArmReal 可以直接连接它的 port.
+
+舵机单位和速度/加速度上限见 limits.py; 夹爪直线位置 (-0.068~0.0 米) 按 GRIPPER_RAD_PER_M 换算为第 7 个舵机的弧度.
+"""
+
+import math
+import os
+import random
+import select
+import struct
+import threading
+import time
+import tty
+
+import numpy as np
+
+from . import protocol, recording
+from .kinematics import LOWER_JOINT_LIMITS, UPPER_JOINT_LIMITS
+from .limits import (GRIPPER_CLOSE, GRIPPER_OPEN, GRIPPER_RAD_PER_M, MAX_ACCELERATION, MAX_VELOCITY, STEPS_PER_RAD,
+                     servo_acceleration_limit, servo_velocity_limit)
+
+_EPS = 1e-6  # 到达目标的位置容差 (弧度)
+
+
+# 与扩展模块的 out= 参数一致: 给出 out 时原地写入并返回 out
+def _fill(out, value):
+    if out is None:
+        return value
+    if out.dtype != value.dtype or out.shape != value.shape:
+        raise RuntimeError("out must be a %s array of shape %s" % (value.dtype, value.shape))
+    out[...] = value
+    return out
+
+
+# 与扩展模块的 SetServoRadianWithIndex 输入一致: ServoCommandBuffer (有 ids/values 属性), 含 id/value 字段的
+# 结构化数组, ServoStruct 列表, 或 ids 和 values 两个数组; num 为 None 时使用全部命令
+def _servo_commands(sv_list, num, ids, values):
+    if ids is not None or values is not None:
+        if sv_list is not None or ids is None or values is None:
+            raise RuntimeError("Pass either sv_list or both ids and values")
+    elif hasattr(sv_list, "ids") and hasattr(sv_list, "values"):
+        ids, values = sv_list.ids, sv_list.values
+    elif isinstance(sv_list, np.ndarray) and {"id", "value"} <= set(sv_list.dtype.fields or ()):
+        if sv_list.ndim != 1:
+            raise RuntimeError("sv_list must be a 1-D structured array")
+        ids, values = sv_list["id"], sv_list["value"]
+        if ids.dtype.kind not in "ui" or values.dtype.kind not in "fui":
+            raise TypeError("sv_list must have an integer id field and a numeric value field, got dtype %s"
+                            % sv_list.dtype)
+    elif isinstance(sv_list, np.ndarray):
+        raise TypeError("sv_list array must have id and value fields (SERVO_COMMAND_DTYPE), got dtype %s"
+                        % sv_list.dtype)
+    else:
+        sv_list = list(sv_list)
+        ids, values = [sv.id for sv in sv_list], [sv.value for sv in sv_list]
+    ids = np.asarray(ids, dtype=np.uint8)
+    values = np.asarray(values, dtype=np.float32)
+    available = min(len(ids), len(values))
+    if num is None:
+        num = available
+    if num > 6:
+        raise RuntimeError("Number of servos cannot exceed 6")
+    if num < 0:
+        raise RuntimeError("num must be non-negative")
+    if num > available:
+        raise RuntimeError("num exceeds the number of servo commands")
+    return ids[:num], values[:num]
+
+
+def _trapezoid(pos, vel, target, max_vel, max_acc, t):
+    """单个舵机从 (pos, vel) 以梯形速度曲线 (加速/匀速/减速) 向 target 运动 t 秒后的 (位置, 速度, 加速度).
+    当前速度背离目标, 超过 max_vel 或来不及停下时先减速, 再重新规划"""
+    acc = 0.0
+    while t > 0:
+        error = target - pos
+        if abs(error) <= _EPS and vel == 0:
+            return target, 0.0, 0.0
+        direction = math.copysign(1.0, error) if error else -math.copysign(1.0, vel)
+        distance, speed = abs(error), vel * direction
+        if speed < 0 or speed * speed / (2 * max_acc) > distance + _EPS:
+            # 背离目标或会越过目标: 以最大加速度减速到 0
+            phase = [(abs(vel) / max_acc, -math.copysign(max_acc, vel))]
+        elif speed > max_vel + 1e-9:
+            phase = [((speed - max_vel) / max_acc, -direction * max_acc)]
+        else:
+            peak = max(speed, min(max_vel, math.sqrt(max_acc * distance + speed * speed / 2)))
+            cruise = max(0.0, distance - (2 * peak * peak - speed * speed) / (2 * max_acc))
+            phase = [((peak - speed) / max_acc, direction * max_acc),
+                     (cruise / peak if peak > 0 else 0.0, 0.0),
+                     (peak / max_acc, -direction * max_acc)]
+        for duration, acc in phase:
+            h = min(duration, t)
+            pos += vel * h + 0.5 * acc * h * h
+            vel += acc * h
+            t -= h
+            if t <= 0:
+                break
+        else:
+            if len(phase) == 3:
+                return target, 0.0, 0.0
+            # 减速段结束, 消除舍入误差后重新规划
+            vel = 0.0 if abs(vel) < 1e-9 else vel
+    return pos, vel, acc
+
+
+class _CommandCoalescer:
+    """与扩展模块的写入合并相同: 写线程发送最新的设定值, 与上次发送值相差不超过死区的舵机不发送;
+    夹爪直线位置单独保存, 不经过死区"""
+
+    def __init__(self, send):
+        self._send = send
+        self._cond = threading.Condition()
+        # start / stop 可能同时从多个线程调用, 由 _lifecycle 串行化, 保护 _thread
+        self._lifecycle = threading.Lock()
+        self._running = False
+        self._thread = None
+        self._pending = np.zeros(7, dtype=np.float32)
+        self._pending_mask = 0
+        self._pending_gripper = math.nan
+        self._sent = np.zeros(7, dtype=np.float32)
+        self._sent_mask = 0
+        self._deadband = np.zeros(7, dtype=np.float32)
+        self.stats = dict.fromkeys(("submitted", "sent", "coalesced", "suppressed", "joints_skipped"), 0)
+
+    @property
+    def running(self):
+        return self._running
+
+    def start(self, deadband):
+        with self._lifecycle:
+            with self._cond:
+                self._deadband[:] = deadband
+                if self._running:
+                    return
+            self._stop_locked()
+            with self._cond:
+                self._sent_mask = 0
+                self._running = True
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        with self._lifecycle:
+            self._stop_locked()
+
+    def _stop_locked(self):
+        # 需要持有 _lifecycle
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _has_pending(self):
+        return bool(self._pending_mask) or not math.isnan(self._pending_gripper)
+
+    def submit(self, values, mask, gripper=math.nan):
+        with self._cond:
+            if not self._running:
+                return False
+            self.stats["submitted"] += 1
+            if self._has_pending():
+                self.stats["coalesced"] += 1
+            bits = ((mask >> np.arange(7)) & 1).astype(bool)
+            self._pending[bits] = np.asarray(values, dtype=np.float32)[bits]
+            self._pending_mask |= mask
+            if not math.isnan(gripper):
+                self._pending_gripper = gripper
+            self._cond.notify()
+            return True
+
+    def _run(self):
+        with self._cond:
+            while True:
+                self._cond.wait_for(lambda: self._has_pending() or not self._running)
+                if not self._has_pending():
+                    break
+                values, mask, gripper = self._pending.copy(), self._pending_mask, self._pending_gripper
+                self._pending_mask = 0
+                self._pending_gripper = math.nan
+                send_mask = 0
+                for i in range(7):
+                    if not mask >> i & 1:
+                        continue
+                    if self._sent_mask >> i & 1 and abs(values[i] - self._sent[i]) <= self._deadband[i]:
+                        self.stats["joints_skipped"] += 1
+                    else:
+                        send_mask |= 1 << i
+                if not send_mask and math.isnan(gripper):
+                    self.stats["suppressed"] += 1
+                    continue
+                self._cond.release()
+                try:
+                    self._send(values, send_mask, gripper)
+                finally:
+                    self._cond.acquire()
+                for i in range(7):
+                    if send_mask >> i & 1:
+                        self._sent[i] = values[i]
+                self._sent_mask |= send_mask
+                self.stats["sent"] += 1
+
+
+class SagittariusArmSim:
+    """仿真机械臂, 方法签名与 SagittariusArmReal 一致"""
+
+    def __init__(self, strSerialName="/dev/sagittarius", Baudrate=1000000, vel=500, acc=5,
+                 latency=0.0, jitter=0.0, seed=None):
+        self.port = strSerialName
+        self.baudrate = Baudrate
+        self.latency = latency
+        self.jitter = jitter
+        self.lower_joint_limits = list(LOWER_JOINT_LIMITS) + [GRIPPER_CLOSE * GRIPPER_RAD_PER_M]
+        self.upper_joint_limits = list(UPPER_JOINT_LIMITS) + [GRIPPER_OPEN * GRIPPER_RAD_PER_M]
+        self.free_after_destructor = True
+        self.torque = [1000] * 7
+        self.transactions = 0
+        # 不应答 GetServoInfo 的舵机 id (1~7), 用于模拟掉线的舵机
+        self.offline_servos = set()
+        self._recorder = None
+        self._record_lock = threading.Lock()
+        self._coalescer = _CommandCoalescer(self._send_servo_radian)
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._pos = np.zeros(7)
+        self._vel = np.zeros(7)
+        self._acc = np.zeros(7)
+        self._target = np.zeros(7)
+        self._torque_on = True
+        self._stamp = time.monotonic()
+        self._max_vel = MAX_VELOCITY
+        self._max_acc = MAX_ACCELERATION
+        self._set_velocity(vel)
+        self._set_acceleration(acc)
+
+    def _record(self, kind, mask, values, status=0):
+        with self._record_lock:
+            if self._recorder is not None:
+                self._recorder.append(kind, mask, values, status)
+
+    # 串口往返延迟
+    def _io(self):
+        self.transactions += 1
+        delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay > 0:
+            time.sleep(delay)
+
+    # 把舵机状态推进到当前时刻, 需要持有 _lock; 每个舵机按解析解计算, 开销与经过的时间无关
+    def _advance(self):
+        now = time.monotonic()
+        elapsed = now - self._stamp
+        self._stamp = now
+        self._acc[:] = 0
+        if not self._torque_on:
+            self._vel[:] = 0
+            return
+        for j in range(7):
+            self._pos[j], self._vel[j], self._acc[j] = _trapezoid(
+                self._pos[j], self._vel[j], self._target[j], self._max_vel, self._max_acc, elapsed)
+
+    def _set_targets(self, ids, values):
+        with self._lock:
+            self._advance()
+            if self._torque_on:
+                self._target[ids] = values
+
+    def _set_velocity(self, arm_vel):
+        self._max_vel = servo_velocity_limit(arm_vel)
+
+    def _set_acceleration(self, arm_acceleration):
+        self._max_acc = servo_acceleration_limit(arm_acceleration)
+
+    def _joint_status(self):
+        with self._lock:
+            self._advance()
+            return self._pos.astype(np.float32)
+
+    def _servo_info(self, id):
+        with self._lock:
+            self._advance()
+            j = id - 1
+            speed = int(round(self._vel[j] * STEPS_PER_RAD))
+            payload = int(min(100, abs(self._acc[j]) / self._max_acc * 100)) if self._max_acc else 0
+        return np.array([speed, payload, 12, 100 + payload * 10], dtype=np.int16)
+
+    def _set_torque_state(self, lock):
+        with self._lock:
+            self._advance()
+            self._torque_on = lock
+            if not lock:
+                self._vel[:] = 0
+            self._target[:] = self._pos
+
+    def set_joint_state(self, js):
+        """把 7 个舵机直接放到 js (弧度, 夹爪为舵机弧度) 并停止, 目标也设为 js, 用于设置初始姿态"""
+        js = np.asarray(js, dtype=np.float64)
+        if js.shape != (7,):
+            raise ValueError("js must have 7 elements")
+        with self._lock:
+            self._advance()
+            self._pos[:] = js
+            self._target[:] = js
+            self._vel[:] = 0
+            self._acc[:] = 0
+
+    @property
+    def joint_targets(self):
+        """7 个舵机当前的目标弧度 (夹爪为舵机弧度), 即最后一次写入的设定值"""
+        with self._lock:
+            return self._target.copy()
+
+    def SetFreeAfterDestructor(self, sw):
+        self.free_after_destructor = sw
+
+    def CheckUpperLower(self, js):
+        js = np.asarray(js, dtype=np.float32)
+        if js.shape[0] < 6:
+            raise RuntimeError("Input array must have at least 6 elements")
+        return bool(np.all(js[:6] >= self.lower_joint_limits[:6]) and np.all(js[:6] <= self.upper_joint_limits[:6]))
+
+    def CheckUpperLowerWithIndex(self, sv_list=None, num=None, ids=None, values=None):
+        ids, values = _servo_commands(sv_list, num, ids, values)
+        for servo_id, value in zip(ids, values):
+            # 与共享内存客户端相同, 超出 1~7 的 id 不在限位内
+            j = int(servo_id) - 1
+            if not 0 <= j < 7 or not self.lower_joint_limits[j] <= value <= self.upper_joint_limits[j]:
+                return False
+        return True
+
+    def arm_set_gripper_linear_position(self, dist):
+        self._io()
+        self._record(recording.KIND_GRIPPER, 0x40, [0.0] * 6 + [dist])
+        self._set_targets([6], [dist * GRIPPER_RAD_PER_M])
+
+    def SetAllServoRadianAndGripper(self, joint_positions, gripper=None):
+        joint_positions = np.asarray(joint_positions, dtype=np.float32)
+        count = 7 if gripper is None else 6
+        if joint_positions.shape[0] < count:
+            raise RuntimeError("Input array must have at least %d elements" % count)
+        js = joint_positions[:7].copy() if gripper is None else np.append(joint_positions[:6], np.float32(gripper))
+        if not self._coalescer.submit(js, 0x3F, float(js[6])):
+            self._send_servo_radian(js, 0x3F, float(js[6]))
+
+    def _write_arm_gripper(self, js):
+        # 与扩展模块相同, 关节和夹爪是连续写出的两帧
+        self._io()
+        self._io()
+        self._record(recording.KIND_ARM_GRIPPER, 0x7F, js)
+        self._set_targets(slice(0, 7), np.append(js[:6], js[6] * GRIPPER_RAD_PER_M))
+
+    def SetAllServoRadian(self, joint_positions):
+        joint_positions = np.asarray(joint_positions, dtype=np.float32)
+        if joint_positions.shape[0] < 6:
+            raise RuntimeError("Input array must have at least 6 elements")
+        if not self._coalescer.submit(np.append(joint_positions[:6], 0), 0x3F):
+            self._write_all(joint_positions[:6])
+
+    def _write_all(self, joint_positions):
+        self._io()
+        self._record(recording.KIND_ALL_SERVO_RADIAN, 0x3F, joint_positions)
+        self._set_targets(slice(0, 6), joint_positions)
+
+    def GetCurrentJointStatus(self, out=None):
+        self._io()
+        js = self._joint_status()
+        self._record(recording.KIND_JOINT_STATUS, 0x7F, js, 1)
+        return True, _fill(out, js)
+
+    def SetServoRadianWithIndex(self, sv_list=None, num=None, ids=None, values=None):
+        ids, values = _servo_commands(sv_list, num, ids, values)
+        if len(ids) and np.all((ids >= 1) & (ids <= 7)):
+            full = np.zeros(7, dtype=np.float32)
+            full[ids.astype(np.intp) - 1] = values
+            if self._coalescer.submit(full, sum(1 << (int(i) - 1) for i in ids)):
+                return
+        self._write_index(ids, values)
+
+    def _write_index(self, ids, values):
+        self._io()
+        if self._recorder is not None:
+            full = np.zeros(7, dtype=np.float32)
+            full[ids.astype(np.intp) - 1] = values
+            self._record(recording.KIND_SERVO_RADIAN_INDEX, sum(1 << (int(i) - 1) for i in ids), full)
+        self._set_targets(ids.astype(np.intp) - 1, values)
+
+    # 与扩展模块的 ArmReal::SendServoRadian 相同
+    def _send_servo_radian(self, values, mask, gripper=math.nan):
+        if mask & 0x3F == 0x3F:
+            if math.isnan(gripper):
+                self._write_all(values[:6])
+            else:
+                self._write_arm_gripper(np.append(values[:6], np.float32(gripper)))
+                gripper = math.nan
+            mask &= ~0x3F
+        if not math.isnan(gripper):
+            self.arm_set_gripper_linear_position(gripper)
+        if mask:
+            ids = np.flatnonzero((mask >> np.arange(7)) & 1)
+            self._write_index((ids + 1).astype(np.uint8), values[ids])
+
+    def EnableCommandCoalescing(self, deadband=0.0):
+        if np.ndim(deadband) == 0:
+            band = np.full(7, deadband, dtype=np.float32)
+        else:
+            deadband = np.asarray(deadband, dtype=np.float32)
+            if deadband.shape not in ((6,), (7,)):
+                raise RuntimeError("deadband must be a scalar or have 6 or 7 elements")
+            band = np.zeros(7, dtype=np.float32)
+            band[:deadband.shape[0]] = deadband
+        self._coalescer.start(band)
+
+    def DisableCommandCoalescing(self):
+        self._coalescer.stop()
+
+    @property
+    def command_coalescing(self):
+        return self._coalescer.running
+
+    @property
+    def command_coalescing_stats(self):
+        with self._coalescer._cond:
+            stats = dict(self._coalescer.stats)
+        stats["saved"] = stats["submitted"] - stats["sent"]
+        return stats
+
+    def ResetCommandCoalescingStats(self):
+        with self._coalescer._cond:
+            self._coalescer.stats = dict.fromkeys(self._coalescer.stats, 0)
+
+    def ControlTorque(self, msg):
+        self._io()
+        if msg in ("free", "lock"):
+            self._set_torque_state(msg == "lock")
+
+    def GetServoInfo(self, id, timeout_ms=500, out=None):
+        if not 1 <= id <= 7 or id in self.offline_servos:
+            # 不存在或掉线的舵机不会应答, 等到超时
+            time.sleep(timeout_ms / 1000.0)
+            return False, _fill(out, np.zeros(4, dtype=np.int16))
+        self._io()
+        return True, _fill(out, self._servo_info(id))
+
+    def GetAllServoInfo(self, timeout_ms=100, servo_timeout_ms=20, out=None):
+        self._io()
+        deadline = time.monotonic() + timeout_ms / 1000.0
+        valid = np.ones(7, dtype=bool)
+        info = np.stack([self._servo_info(id) for id in range(1, 8)])
+        # 与扩展模块相同, 掉线的舵机排在最后查询, 每个最多等待 servo_timeout_ms 和剩余时间中较小者
+        for id in sorted(self.offline_servos):
+            remaining = deadline - time.monotonic()
+            if remaining > 0:
+                time.sleep(min(servo_timeout_ms / 1000.0, remaining))
+            valid[id - 1] = False
+            info[id - 1] = 0
+        return valid, _fill(out, info)
+
+    def StartRecording(self, path, capacity=100000):
+        recorder = recording.RecordingWriter(path, capacity)
+        with self._record_lock:
+            self._recorder = recorder
+
+    def StopRecording(self):
+        with self._record_lock:
+            self._recorder = None
+
+    @property
+    def recording_path(self):
+        recorder = self._recorder
+        return recorder.path if recorder is not None else None
+
+    def SetServoAcceleration(self, arm_acceleration):
+        self._io()
+        with self._lock:
+            self._advance()
+            self._set_acceleration(arm_acceleration)
+
+    def SetServoVelocity(self, arm_vel):
+        self._io()
+        with self._lock:
+            self._advance()
+            self._set_velocity(arm_vel)
+
+    def SetServoTorque(self, arm_torque):
+        arm_torque = list(arm_torque)
+        if len(arm_torque) < 7:
+            raise RuntimeError("Input array must have at least 7 elements")
+        self._io()
+        self.torque = [int(t) for t in arm_torque[:7]]
+        return True
+
+
+class SimSerialServer:
+    """在伪终端上运行的仿真下位机, 真实驱动连接 server.port 即可"""
+
+    def __init__(self, sim=None, latency=0.0, publish_rate=0.0, on_frame=None):
+        self.sim = sim if sim is not None else SagittariusArmSim()
+        self.latency = latency
+        self.publish_rate = publish_rate
+        # on_frame(msg_type, cmd, data, stamp) 在收到每一帧时调用, stamp 为 time.monotonic()
+        self.on_frame = on_frame
+        self.frames = 0
+        self._master, self._slave = os.openpty()
+        tty.setraw(self._slave)
+        self.port = os.ttyname(self._slave)
+        self._parser = protocol.FrameParser()
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="sagittarius-sim", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def close(self):
+        self.stop()
+        os.close(self._master)
+        os.close(self._slave)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _reply(self, cmd, data):
+        if self.latency > 0:
+            time.sleep(self.latency)
+        os.write(self._master, protocol.encode_frame(protocol.TYPE_REPLY_MESSAGE, cmd, data))
+
+    def _publish_status(self):
+        data = protocol.pack_radians(self.sim._joint_status())
+        os.write(self._master, protocol.encode_frame(protocol.TYPE_REPLY_MESSAGE,
+                                                     protocol.CMD_GET_CURRENT_JOINT_STATUS, data))
+
+    def _handle(self, msg_type, cmd, data):
+        self.frames += 1
+        sim = self.sim
+        if cmd == protocol.CMD_CONTROL_ALL_DEGREE:
+            sim._set_targets(slice(0, 6), protocol.unpack_radians(data)[:6])
+        elif cmd == protocol.CMD_CONTROL_END_DEGREE:
+            sim._set_targets([6], protocol.unpack_radians(data)[:1])
+        elif cmd == protocol.CMD_CONTROL_ID_DEGREE:
+            ids, values = [], []
+            for offset in range(0, len(data) - 2, 3):
+                id, value = struct.unpack_from("<Bh", data, offset)
+                # 总线上没有的舵机不响应
+                if 1 <= id <= 7:
+                    ids.append(id - 1)
+                    values.append(protocol.decidegree_to_radian(value))
+            sim._set_targets(ids, values)
+        elif cmd == protocol.CMD_CONTROL_LOCK_OR_FREE and data:
+            sim._set_torque_state(data[0] == protocol.TORQUE_LOCK)
+        elif cmd == protocol.CMD_SET_SERVO_VEL and len(data) >= 2:
+            with sim._lock:
+                sim._advance()
+                sim._set_velocity(struct.unpack_from("<h", data)[0])
+        elif cmd == protocol.CMD_SET_SERVO_ACC and data:
+            with sim._lock:
+                sim._advance()
+                sim._set_acceleration(data[0])
+        elif cmd == protocol.CMD_SET_SERVO_TORQUE and len(data) >= 14:
+            sim.torque = list(struct.unpack_from("<7h", data))
+        elif cmd == protocol.CMD_GET_CURRENT_JOINT_STATUS:
+            self._reply(cmd, protocol.pack_radians(sim._joint_status()))
+        elif cmd == protocol.CMD_GET_SERVO_RT_INFO and data:
+            id = data[0]
+            if 1 <= id <= 7 and id not in sim.offline_servos:
+                self._reply(cmd, bytes([id]) + struct.pack("<4h", *sim._servo_info(id)))
+
+    def _run(self):
+        period = 1.0 / self.publish_rate if self.publish_rate > 0 else None
+        next_publish = time.monotonic()
+        while self._running:
+            timeout = 0.05
+            if period is not None:
+                timeout = max(0.0, min(timeout, next_publish - time.monotonic()))
+            readable, _, _ = select.select([self._master], [], [], timeout)
+            if readable:
+                try:
+                    chunk = os.read(self._master, 4096)
+                except OSError:
+                    return
+                stamp = time.monotonic()
+                for msg_type, cmd, data in self._parser.feed(chunk):
+                    if self.on_frame is not None:
+                        self.on_frame(msg_type, cmd, data, stamp)
+                    self._handle(msg_type, cmd, data)
+            if period is not None and time.monotonic() >= next_publish:
+                self._publish_status()
+                next_publish += period
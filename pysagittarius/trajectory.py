@@ -0,0 +1,357 @@
+"""笛卡尔路点和关节路点的定时轨迹
+
+plan_cartesian 在相邻路点之间按直线 (位置) 和球面插值 (姿态) 取样, 所有样本一次调用 getIKinThetaMatrixBatch
+求逆解; 然后按最小加加速度 (minimum_jerk) 或梯形速度 (trapezoidal) 曲线给每段分配时间, 时长取满足舵机速度和
+加速度限制 (与 SetServoVelocity / SetServoAcceleration 的设定相同) 的最小值. 每段在路点处速度为 0.
+每段的关节路径是经过逆解样本的三次样条, 时长和输出样本用同一条样条计算; 输出样本再按差分检查一次限制,
+超出的段拉长时长后重新取样.
+
+结果 Trajectory 的 times 为 (N,) 秒, points 为 (N, 7): 6 个关节弧度和夹爪直线位置 (NaN 表示不控制夹爪),
+可以直接传给 SagittariusArmReal.ExecuteTrajectory:
+
+    traj = trajectory.plan_cartesian([[0.25, 0, 0.2, 0, 30, 0], [0.3, 0.1, 0.15, 0, 30, 0]],
+                                     kinematics=k, seed=js, vel=1000, acc=10)
+    traj.check(kinematics=k, floor=0.0)
+    arm.ExecuteTrajectory(traj.times, traj.points)
+
+check / validate 在发送前一次原生调用校验所有样本的关节限位, 自碰撞, 地面和禁入区.
+"""
+
+import math
+import time
+
+import numpy as np
+
+from .kinematics import euler_to_matrix, matrix_to_quaternion, quaternion_to_matrix
+from .limits import servo_acceleration_limit, servo_velocity_limit
+
+PROFILES = ("minimum_jerk", "trapezoidal")
+
+# validateTrajectory 的结果位, 与扩展模块的 VIOLATION_* 一致
+_VIOLATIONS = ((1, "joint limit"), (2, "self collision"), (4, "floor"), (8, "keep-out box"))
+
+_FINE = 256                                        # 计算每段时长时的时间采样数
+_ACCEL_FRACTIONS = np.linspace(0.05, 0.5, 10)      # 梯形曲线加速段占比的候选值
+_STRETCH_ATTEMPTS = 10                             # 差分检查超限后拉长时长重新取样的最多次数
+_LIMIT_TOLERANCE = 1e-6                            # 差分检查允许的相对超出量
+
+
+def minimum_jerk(u):
+    """最小加加速度曲线: 归一化时间 u (0~1) 对应的路径参数, 起止处速度和加速度为 0"""
+    u = np.clip(u, 0.0, 1.0)
+    return u * u * u * (10.0 - 15.0 * u + 6.0 * u * u)
+
+
+def trapezoidal(u, accel_fraction=0.25):
+    """梯形速度曲线: 加速和减速各占 accel_fraction (0~0.5] 的时间, 中间匀速"""
+    if not 0 < accel_fraction <= 0.5:
+        raise ValueError("accel_fraction must be in (0, 0.5]")
+    u = np.clip(u, 0.0, 1.0)
+    a = accel_fraction
+    peak = 1.0 / (1.0 - a)
+    return np.where(u < a, 0.5 * peak / a * u * u,
+                    np.where(u > 1.0 - a, 1.0 - 0.5 * peak / a * (1.0 - u) ** 2, peak * (u - 0.5 * a)))
+
+
+class Trajectory:
+    """定时关节轨迹: times (N,) 秒, points (N, 7) float32"""
+
+    def __init__(self, times, points):
+        self.times = np.ascontiguousarray(times, dtype=np.float64)
+        self.points = np.ascontiguousarray(points, dtype=np.float32)
+        if self.times.ndim != 1 or self.points.shape != (len(self.times), 7):
+            raise ValueError("times must have shape (N,) and points shape (N, 7)")
+
+    @property
+    def duration(self):
+        return float(self.times[-1] - self.times[0]) if len(self.times) else 0.0
+
+    def __len__(self):
+        return len(self.times)
+
+    def sample(self, t):
+        """在时刻 t (标量或数组) 线性插值, 返回 (..., 7)"""
+        t = np.asarray(t, dtype=np.float64)
+        return np.stack([np.interp(t, self.times, self.points[:, j]) for j in range(7)], axis=-1).astype(np.float32)
+
+    def validate(self, kinematics=None, floor=None, boxes=None, margin=0.0, self_collision=True):
+        """用 kinematics.validateTrajectory 校验所有样本, 返回 (N,) uint8 标志位, 0 表示通过
+
+        floor 为地面高度 (米, None 不检查), boxes 为 (K, 6) 禁入长方体 xmin, ymin, zmin, xmax, ymax, zmax,
+        margin 为额外保留的距离. kinematics 默认为 SagittariusArmKinematics().
+        """
+        if kinematics is None:
+            from pysagittarius import SagittariusArmKinematics
+            kinematics = SagittariusArmKinematics()
+        return kinematics.validateTrajectory(self.points, floor, boxes, margin, self_collision)
+
+    def check(self, kinematics=None, floor=None, boxes=None, margin=0.0, self_collision=True):
+        """与 validate 相同, 有样本不通过时抛出 ValueError, 说明第一个不通过的时刻和原因"""
+        codes = self.validate(kinematics, floor, boxes, margin, self_collision)
+        bad = np.flatnonzero(codes)
+        if len(bad):
+            i = int(bad[0])
+            reasons = ", ".join(name for flag, name in _VIOLATIONS if codes[i] & flag)
+            raise ValueError("trajectory is invalid at t=%.3f s (%d of %d samples): %s"
+                             % (self.times[i], len(bad), len(codes), reasons))
+
+    def execute(self, arm, rate_hz=50.0, wait=True):
+        """在 arm 上执行. SagittariusArmReal 由原生线程 (ExecuteTrajectory) 发送;
+        没有 ExecuteTrajectory 的 arm (如 SagittariusArmSim) 在当前线程按 rate_hz 发送, wait 不起作用
+        """
+        if hasattr(arm, "ExecuteTrajectory"):
+            arm.ExecuteTrajectory(self.times, self.points, rate_hz)
+            if wait:
+                arm.WaitTrajectory()
+            return
+        start = time.monotonic()
+        last_gripper = None
+        for t in np.append(np.arange(self.times[0], self.times[-1], 1.0 / rate_hz), self.times[-1]):
+            delay = start + (t - self.times[0]) - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            setpoint = self.sample(t)
+            # 夹爪有变化时与关节在同一次调用中发送
+            if not np.isnan(setpoint[6]) and setpoint[6] != last_gripper:
+                arm.SetAllServoRadianAndGripper(setpoint)
+                last_gripper = setpoint[6]
+            else:
+                arm.SetAllServoRadian(setpoint[:6])
+
+
+def _limits(vel, acc, max_velocity, max_acceleration):
+    v = servo_velocity_limit(vel) if max_velocity is None else max_velocity
+    a = servo_acceleration_limit(acc) if max_acceleration is None else max_acceleration
+    v = np.broadcast_to(np.asarray(v, dtype=np.float64), (6,))
+    a = np.broadcast_to(np.asarray(a, dtype=np.float64), (6,))
+    if np.any(v <= 0) or np.any(a <= 0):
+        raise ValueError("velocity and acceleration limits must be positive")
+    return v, a
+
+
+class _Path:
+    """经过样本 q (n, 6) 的关节路径 q(s): 对路径参数 s_grid 的自然三次样条, 二阶导数连续
+
+    时长和输出样本都由同一条样条计算, 输出样本的差分加速度不会超过计算时长时的估计.
+    """
+
+    def __init__(self, s_grid, q):
+        self.s = np.asarray(s_grid, dtype=np.float64)
+        self.q = np.asarray(q, dtype=np.float64)
+        self.h = np.diff(self.s)
+        # 节点处的二阶导数 m, 两端为 0; 内部满足三对角方程
+        n = len(self.s)
+        self.m = np.zeros_like(self.q)
+        if n > 2:
+            h = self.h
+            A = np.diag(2 * (h[:-1] + h[1:])) + np.diag(h[1:-1], 1) + np.diag(h[1:-1], -1)
+            slope = np.diff(self.q, axis=0) / h[:, np.newaxis]
+            self.m[1:-1] = np.linalg.solve(A, 6 * np.diff(slope, axis=0))
+
+    def __call__(self, s, derivative=0):
+        """s (k,) 处的值或 1, 2 阶导数, 返回 (k, 6)"""
+        i = np.clip(np.searchsorted(self.s, s, side="right") - 1, 0, len(self.s) - 2)
+        h = self.h[i][:, np.newaxis]
+        a = (self.s[i + 1] - s)[:, np.newaxis]
+        b = (s - self.s[i])[:, np.newaxis]
+        m0, m1, q0, q1 = self.m[i], self.m[i + 1], self.q[i], self.q[i + 1]
+        if derivative == 0:
+            return (m0 * a ** 3 + m1 * b ** 3) / (6 * h) + (q0 / h - m0 * h / 6) * a + (q1 / h - m1 * h / 6) * b
+        if derivative == 1:
+            return (m1 * b * b - m0 * a * a) / (2 * h) + (q1 - q0) / h - (m1 - m0) * h / 6
+        return (m0 * a + m1 * b) / h
+
+    def knots(self, profile):
+        """节点对应的归一化时间 u, 保证计算时长时取到样条二阶导数的极值 (在节点上)"""
+        u = np.linspace(0.0, 1.0, _FINE * 8)
+        return np.interp(self.s, profile(u), u)
+
+
+def _duration(path, profile, v_max, a_max):
+    """按 profile 走完关节路径 path 时满足速度和加速度限制的最短时间"""
+    u = np.union1d(np.linspace(0.0, 1.0, _FINE), path.knots(profile))
+    s = profile(u)
+    ds = np.gradient(s, u)
+    dds = np.gradient(ds, u)
+    dq, ddq = path(s, 1), path(s, 2)
+    # 时长为 T 时速度为 dq/du / T, 加速度为 d2q/du2 / T^2
+    velocity = np.abs(dq * ds[:, np.newaxis])
+    acceleration = np.abs(ddq * (ds * ds)[:, np.newaxis] + dq * dds[:, np.newaxis])
+    return max(float(np.max(velocity / v_max)), math.sqrt(float(np.max(acceleration / a_max))))
+
+
+def _profile(profile, path, v_max, a_max):
+    """选定每段的曲线, 返回 (曲线函数, 时长); 梯形曲线在候选加速段占比中取时长最短的"""
+    if profile == "minimum_jerk":
+        return minimum_jerk, _duration(path, minimum_jerk, v_max, a_max)
+    if profile == "trapezoidal":
+        best = None
+        for fraction in _ACCEL_FRACTIONS:
+            fn = (lambda f: lambda u: trapezoidal(u, f))(fraction)
+            T = _duration(path, fn, v_max, a_max)
+            if best is None or T < best[1]:
+                best = (fn, T)
+        return best
+    raise ValueError("profile must be one of %s" % ", ".join(PROFILES))
+
+
+def _sample(paths, curves, durations, gripper, dt):
+    """按每段的曲线和时长取样, 返回 (Trajectory, 每个样本所在的段)"""
+    times = [np.zeros(1)]
+    points = [np.append(paths[0].q[0], gripper[0])[np.newaxis, :]]
+    owner = [np.zeros(1, dtype=np.int64)]
+    t0 = 0.0
+    for k, (path, fn, T) in enumerate(zip(paths, curves, durations)):
+        if T <= 0:
+            continue
+        u = np.linspace(0.0, 1.0, max(int(math.ceil(T / dt)), 1) + 1)[1:]
+        s = fn(u)
+        g = gripper[k] + s * (gripper[k + 1] - gripper[k])
+        times.append(t0 + u * T)
+        points.append(np.column_stack([path(s), g]))
+        owner.append(np.full(len(u), k))
+        t0 += T
+    return Trajectory(np.concatenate(times), np.concatenate(points)), np.concatenate(owner)
+
+
+def _limit_ratio(traj, v_max, a_max):
+    """输出样本的差分速度和加速度相对限制的倍数, 换算为时长需要拉长的倍数; 返回 (区间 (N-1,), 样本 (N-2,))"""
+    q = traj.points[:, :6].astype(np.float64)
+    v = np.diff(q, axis=0) / np.diff(traj.times)[:, np.newaxis]
+    a = 2 * np.diff(v, axis=0) / (traj.times[2:] - traj.times[:-2])[:, np.newaxis]
+    return np.max(np.abs(v) / v_max, axis=1), np.sqrt(np.max(np.abs(a) / a_max, axis=1))
+
+
+def _time_segments(segments, gripper, profile, v_max, a_max, dt, min_duration):
+    """segments 为每段的 (s_grid, q), 返回 Trajectory
+
+    时长由样条的导数解析估计; 取样后再用差分检查输出样本, 超出限制的段按比例拉长后重新取样.
+    """
+    paths = [_Path(s_grid, q) for s_grid, q in segments]
+    curves, durations = [], []
+    for path in paths:
+        fn, T = _profile(profile, path, v_max, a_max)
+        curves.append(fn)
+        durations.append(max(T, min_duration))
+    durations = np.array(durations)
+    for _ in range(_STRETCH_ATTEMPTS):
+        traj, owner = _sample(paths, curves, durations, gripper, dt)
+        if len(traj) < 3:
+            return traj
+        velocity, acceleration = _limit_ratio(traj, v_max, a_max)
+        # 区间 i 属于后一个样本所在的段; 样本 i 的加速度同时涉及前后两个区间
+        stretch = np.ones(len(durations))
+        np.maximum.at(stretch, owner[1:], velocity)
+        np.maximum.at(stretch, owner[1:-1], acceleration)
+        np.maximum.at(stretch, owner[2:], acceleration)
+        if np.all(stretch <= 1.0 + _LIMIT_TOLERANCE):
+            return traj
+        durations = np.where(stretch > 1.0 + _LIMIT_TOLERANCE, durations * stretch * 1.001, durations)
+    return traj
+
+
+def _gripper(gripper, m):
+    if gripper is None:
+        return np.full(m, np.nan)
+    gripper = np.asarray(gripper, dtype=np.float64)
+    if gripper.shape != (m,):
+        raise ValueError("gripper must have one value per waypoint")
+    return gripper
+
+
+def plan_joint(points, profile="minimum_jerk", vel=500, acc=5, max_velocity=None, max_acceleration=None,
+               dt=0.02, min_duration=0.0):
+    """关节空间路点 (M, 6) 或 (M, 7, 第 7 列为夹爪直线位置) 之间按 profile 插值
+
+    vel / acc 为 SetServoVelocity / SetServoAcceleration 的设定值; max_velocity / max_acceleration
+    (rad/s, rad/s^2, 标量或每个关节) 给出时代替它们. dt 为输出的采样间隔 (秒).
+    """
+    points = np.asarray(points, dtype=np.float64)
+    if points.ndim != 2 or points.shape[0] < 2 or points.shape[1] not in (6, 7):
+        raise ValueError("points must have shape (M, 6) or (M, 7) with M >= 2")
+    v_max, a_max = _limits(vel, acc, max_velocity, max_acceleration)
+    gripper = points[:, 6] if points.shape[1] == 7 else np.full(len(points), np.nan)
+    s_grid = np.array([0.0, 1.0])
+    segments = [(s_grid, points[k:k + 2, :6]) for k in range(len(points) - 1)]
+    return _time_segments(segments, gripper, profile, v_max, a_max, dt, min_duration)
+
+
+def _poses(waypoints):
+    """路点转换为 (M, 3) 位置和 (M, 4) 四元数 (x, y, z, w)"""
+    waypoints = np.asarray(waypoints, dtype=np.float64)
+    if waypoints.ndim == 3 and waypoints.shape[1:] == (4, 4):
+        return waypoints[:, :3, 3], matrix_to_quaternion(waypoints)
+    if waypoints.ndim == 2 and waypoints.shape[1] == 6:
+        return waypoints[:, :3], matrix_to_quaternion(euler_to_matrix(waypoints[:, 3:]))
+    if waypoints.ndim == 2 and waypoints.shape[1] == 7:
+        return waypoints[:, :3], waypoints[:, 3:] / np.linalg.norm(waypoints[:, 3:], axis=1, keepdims=True)
+    raise ValueError("waypoints must have shape (M, 6) x, y, z, roll, pitch, yaw (degrees), "
+                     "(M, 7) x, y, z, ox, oy, oz, ow, or (M, 4, 4)")
+
+
+def _slerp(q0, q1, s):
+    """四元数球面插值, s 为 (n,)"""
+    dot = float(np.dot(q0, q1))
+    if dot < 0:
+        q1, dot = -q1, -dot
+    if dot > 0.9995:
+        q = q0 + s[:, np.newaxis] * (q1 - q0)
+    else:
+        theta = math.acos(dot)
+        q = (np.sin((1 - s) * theta)[:, np.newaxis] * q0 + np.sin(s * theta)[:, np.newaxis] * q1) / math.sin(theta)
+    return q / np.linalg.norm(q, axis=1, keepdims=True)
+
+
+def plan_cartesian(waypoints, kinematics=None, seed=None, gripper=None, profile="minimum_jerk", vel=500, acc=5,
+                   max_velocity=None, max_acceleration=None, dt=0.02, min_duration=0.0, position_step=0.005,
+                   angle_step=2.0, max_joint_step=0.5, eomg=0.001, ev=0.001, num_threads=1):
+    """末端沿笛卡尔路点直线运动的定时关节轨迹
+
+    waypoints 为 (M, 6) 的 x, y, z, roll, pitch, yaw (角度, 与 getIKinThetaEuler 相同), (M, 7) 的位置和四元数,
+    或 (M, 4, 4) 位姿; gripper 为每个路点的夹爪直线位置, 默认不控制夹爪.
+    kinematics 默认为 SagittariusArmKinematics(); seed 为第一个路点的逆解初值 (通常是当前关节角),
+    之后每个样本以前一个样本的解为初值 (chain=True), 保证关节连续; 多线程求解时每个线程的第一个样本只能使用 seed,
+    所以 num_threads 默认为 1. 相邻路点之间每 position_step 米或 angle_step 度取一个样本;
+    相邻样本有关节变化超过 max_joint_step 弧度时视为逆解跳到了另一个分支, 抛出 ValueError.
+    其余参数与 plan_joint 相同.
+    """
+    if kinematics is None:
+        from pysagittarius import SagittariusArmKinematics
+        kinematics = SagittariusArmKinematics()
+    position, quaternion = _poses(waypoints)
+    m = len(position)
+    if m < 2:
+        raise ValueError("at least two waypoints are required")
+    gripper = _gripper(gripper, m)
+    v_max, a_max = _limits(vel, acc, max_velocity, max_acceleration)
+
+    # 所有段的样本一起求逆解
+    grids, matrices = [], []
+    for k in range(m - 1):
+        distance = float(np.linalg.norm(position[k + 1] - position[k]))
+        angle = math.degrees(2 * math.acos(min(1.0, abs(float(np.dot(quaternion[k], quaternion[k + 1]))))))
+        n = max(int(math.ceil(distance / position_step)), int(math.ceil(angle / angle_step)), 1) + 1
+        s = np.linspace(0.0, 1.0, n)
+        T = np.zeros((n, 4, 4))
+        T[:, :3, :3] = quaternion_to_matrix(_slerp(quaternion[k], quaternion[k + 1], s))
+        T[:, :3, 3] = position[k] + s[:, np.newaxis] * (position[k + 1] - position[k])
+        T[:, 3, 3] = 1.0
+        grids.append(s)
+        matrices.append(T)
+    success, theta = kinematics.getIKinThetaMatrixBatch(np.concatenate(matrices), eomg, ev, num_threads, seed, True)
+    if not np.all(success):
+        first = int(np.argmin(success))
+        segment = int(np.searchsorted(np.cumsum([len(s) for s in grids]), first, side="right"))
+        raise ValueError("no IK solution between waypoints %d and %d" % (segment, segment + 1))
+    theta = theta.astype(np.float64)
+    jumps = np.flatnonzero(np.max(np.abs(np.diff(theta, axis=0)), axis=1) > max_joint_step)
+    if len(jumps):
+        segment = int(np.searchsorted(np.cumsum([len(s) for s in grids]), jumps[0] + 1, side="right"))
+        raise ValueError("IK switched branches between waypoints %d and %d" % (segment, segment + 1))
+
+    segments = []
+    start = 0
+    for s in grids:
+        segments.append((s, theta[start:start + len(s)]))
+        start += len(s)
+    return _time_segments(segments, gripper, profile, v_max, a_max, dt, min_duration)
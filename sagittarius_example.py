@@ -1,25 +1,7 @@
-import sys
-import os
-import importlib.util
 import numpy as np
 import time
 
-# 指定 .so 文件的路径（替换为你的实际路径）
-so_file_path = os.path.abspath("./pysagittarius.so")
-
-# 检查文件是否存在
-if not os.path.exists(so_file_path):
-    print(f"错误：找不到 .so 文件：{so_file_path}")
-    sys.exit(1)
-
-print(f"正在加载 .so 文件：{so_file_path}")
-
-# 从文件加载模块
-spec = importlib.util.spec_from_file_location("pysagittarius", so_file_path)
-ps = importlib.util.module_from_spec(spec)
-spec.loader.exec_module(ps)
-
-print(f"可用的属性：{[name for name in dir(ps) if not name.startswith('_')]}")
+import pysagittarius as ps
 
 # 设置日志级别
 ps.log_set_level(3)
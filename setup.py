@@ -25,11 +25,17 @@ class CMakeBuild(build_ext):
     def build_extension(self, ext):
         extdir = os.path.abspath(os.path.dirname(self.get_ext_fullpath(ext.name)))
         
-        # 必要的CMake参数
+        # 必要的CMake参数, 扩展模块直接输出到包目录 (pysagittarius/pysagittarius*.so)
         cmake_args = [
             '-DCMAKE_LIBRARY_OUTPUT_DIRECTORY=' + extdir,
+            '-DPython3_EXECUTABLE=' + sys.executable,
             '-DPYTHON_EXECUTABLE=' + sys.executable
         ]
+        try:
+            import pybind11
+            cmake_args.append('-Dpybind11_DIR=' + pybind11.get_cmake_dir())
+        except ImportError:
+            pass
 
         # 配置参数
         cfg = 'Debug' if self.debug else 'Release'
@@ -51,19 +57,9 @@ class CMakeBuild(build_ext):
         subprocess.check_call(['cmake', ext.sourcedir] + cmake_args, cwd=self.build_temp)
         subprocess.check_call(['cmake', '--build', '.'] + build_args, cwd=self.build_temp)
 
-        # 复制.so文件到包目录
-        if not os.path.exists(os.path.join(extdir, 'pysagittarius')):
-            os.makedirs(os.path.join(extdir, 'pysagittarius'))
-        
-        # 确保__init__.py存在
-        init_path = os.path.join(extdir, 'pysagittarius', '__init__.py')
-        if not os.path.exists(init_path):
-            with open(init_path, 'w') as f:
-                f.write('from pysagittarius import *\n\n__version__ = "0.1.0"\n')
-
 
 # 获取长描述
-with open('README.md', 'r', encoding='utf-8') as f:
+with open('Readme.md', 'r', encoding='utf-8') as f:
     long_description = f.read()
 
 setup(
@@ -75,10 +71,10 @@ setup(
     author="Chengleng Han",
     author_email="hanchengleng@whut.edu.cn",
     url="https://github.com/yourusername/pysagittarius",
-    packages=find_packages(),
-    ext_modules=[CMakeExtension('pysagittarius')],
+    packages=find_packages(include=['pysagittarius', 'pysagittarius.*']),
+    ext_modules=[CMakeExtension('pysagittarius.pysagittarius')],
     cmdclass=dict(build_ext=CMakeBuild),
-    python_requires=">=3.6",
+    python_requires=">=3.7",
     install_requires=[
         'numpy',
     ],
@@ -87,9 +83,9 @@ setup(
         "License :: OSI Approved :: MIT License",
         "Operating System :: POSIX :: Linux",
     ],
-    # 包含额外文件
+    # 扩展模块的类型声明
     package_data={
-        "": ["*.so", "*.md"],
+        "pysagittarius": ["*.pyi", "py.typed"],
     },
-    include_package_data=True,
+    zip_safe=False,
 ) 
\ No newline at end of file
@@ -0,0 +1,177 @@
+#pragma once
+
+// Sagittarius 的解析逆解
+// 关节 4, 5, 6 的轴线交于一点 (球形手腕): 先由手腕中心在臂平面内求关节 1~3,
+// 再把剩余姿态按 X-Y-X 欧拉角分解得到关节 4~6. 尺寸与 kinematics_model.h 中的螺旋轴一致
+
+#include <algorithm>
+#include <cmath>
+
+#include "src/kinematics_model.h"
+
+namespace pysagittarius {
+
+// 关节 1 正对/背对 x 肘部上/下 x 手腕翻转
+constexpr int kMaxIkBranches = 8;
+
+namespace analytic {
+
+constexpr double kShoulderZ = 0.125;  // 关节 2 轴线高度
+constexpr double kElbowX = 0.045;     // 关节 3 轴线位置
+constexpr double kElbowZ = 0.304;
+constexpr double kWristX = 0.1795;    // 手腕中心 (关节 4, 5, 6 轴线交点)
+constexpr double kWristZ = 0.304;
+constexpr double kSingular = 1e-9;
+
+inline double clamp_unit(double v) { return std::max(-1.0, std::min(1.0, v)); }
+
+constexpr double kLimitReach = 0.2;     // 超出限位不超过这么多弧度的解会尝试投影回限位内
+constexpr int kProjectIterations = 10;
+
+inline bool within_tolerance(const ArmModel &model, const Eigen::Matrix4d &T, const double *theta, double eomg,
+                             double ev) {
+    Vector6d err = log6(trans_inv(fkin_space(model, theta)) * T);
+    return err.head<3>().norm() <= eomg && err.tail<3>().norm() <= ev;
+}
+
+// 精确解略超出限位时, 限位边界上可能仍有误差在 eomg/ev 以内的解 (数值解法会停在那里):
+// 把超限的关节固定在限位上, 只用其余关节做牛顿迭代, 迭代中新超限的关节同样固定
+inline bool project_to_limits(const ArmModel &model, const Eigen::Matrix4d &T, const float *lower,
+                              const float *upper, double eomg, double ev, double theta[6]) {
+    Eigen::Map<Vector6d> th(theta);
+    Vector6d free = Vector6d::Ones();
+    for (int i = 0; i <= kProjectIterations; i++) {
+        for (int j = 0; j < 6; j++) {
+            if (theta[j] < lower[j] || theta[j] > upper[j]) {
+                theta[j] = std::max<double>(lower[j], std::min<double>(upper[j], theta[j]));
+                free[j] = 0;
+            }
+        }
+        if (within_tolerance(model, T, theta, eomg, ev)) {
+            return true;
+        }
+        Eigen::Matrix4d Tsb = fkin_space(model, theta);
+        Vector6d Vs = adjoint(Tsb) * log6(trans_inv(Tsb) * T);
+        Matrix6d J = jacobian_space(model, theta) * free.asDiagonal();
+        th += free.asDiagonal() * (J.completeOrthogonalDecomposition().pseudoInverse() * Vs);
+    }
+    return false;
+}
+
+// 与已有的解不重复时追加到 branches
+inline void append_branch(const double *theta, double branches[][6], int &count) {
+    for (int k = 0; k < count; k++) {
+        double diff = 0;
+        for (int j = 0; j < 6; j++) {
+            diff = std::max(diff, std::abs(branches[k][j] - theta[j]));
+        }
+        if (diff < 1e-6) {
+            return;
+        }
+    }
+    std::copy(theta, theta + 6, branches[count++]);
+}
+
+// 检查限位和正解误差后追加到 branches; 略超出限位的解放进 outside, 没有精确解时再投影
+inline void add_branch(const ArmModel &model, const Eigen::Matrix4d &T, const float *lower, const float *upper,
+                       double eomg, double ev, const double *candidate, double branches[][6], int &count,
+                       double outside[][6], int &outside_count) {
+    double theta[6];
+    bool inside = true;
+    for (int j = 0; j < 6; j++) {
+        theta[j] = wrap_angle(candidate[j]);
+        if (theta[j] < lower[j] - kLimitReach || theta[j] > upper[j] + kLimitReach) {
+            return;
+        }
+        inside = inside && theta[j] >= lower[j] && theta[j] <= upper[j];
+    }
+    if (!inside) {
+        std::copy(theta, theta + 6, outside[outside_count++]);
+    } else if (within_tolerance(model, T, theta, eomg, ev)) {
+        append_branch(theta, branches, count);
+    }
+}
+
+}  // namespace analytic
+
+// 求出位姿 T 的所有解, 返回解的个数; 只保留关节限位内且正解误差在 eomg/ev 以内的解,
+// 限位内没有精确解时, 把略超出限位的解投影到限位上
+// reference 只在奇异位形下用来确定不唯一的关节角 (关节 1 或关节 4), 可以为 nullptr
+inline int ikin_analytic(const ArmModel &model, const Eigen::Matrix4d &T, double eomg, double ev,
+                         const float *lower, const float *upper, const double *reference,
+                         double branches[kMaxIkBranches][6]) {
+    using namespace analytic;
+    const double ref[6] = {reference ? reference[0] : 0.0, 0, 0, reference ? reference[3] : 0.0, 0, 0};
+    Eigen::Matrix3d R = T.topLeftCorner<3, 3>();
+    // 手腕中心 = 末端位置减去末端坐标系下的手腕到末端偏移
+    Eigen::Vector3d offset = model.M.topRightCorner<3, 1>() - Eigen::Vector3d(kWristX, 0, kWristZ);
+    Eigen::Vector3d pc = T.topRightCorner<3, 1>() - R * offset;
+
+    double base = std::hypot(pc.x(), pc.y()) < kSingular ? ref[0] : std::atan2(pc.y(), pc.x());
+    // 臂平面内: 关节 2 到关节 3 为 a, 关节 3 到手腕中心为 b
+    const double ar = kElbowX, ah = kElbowZ - kShoulderZ, b = kWristX - kElbowX;
+    const double la = std::hypot(ar, ah), alpha = std::atan2(ah, ar);
+
+    int count = 0;
+    double outside[kMaxIkBranches][6];
+    int outside_count = 0;
+    for (double t1 : {base, base + M_PI}) {
+        double r = pc.x() * std::cos(t1) + pc.y() * std::sin(t1);
+        double h = pc.z() - kShoulderZ;
+        double c = (r * r + h * h - la * la - b * b) / (2 * la * b);
+        if (std::abs(c) > 1 + 1e-6) {
+            continue;
+        }
+        double phi = std::acos(clamp_unit(c));
+        for (double elbow : {phi, -phi}) {
+            double t3 = elbow - alpha;
+            double t2 = std::atan2(ah - b * std::sin(t3), ar + b * std::cos(t3)) - std::atan2(h, r);
+            // Rx(t4) Ry(t5) Rx(t6) = (Rz(t1) Ry(t2 + t3))^T R
+            Eigen::Matrix3d Rw = (Eigen::AngleAxisd(t1, Eigen::Vector3d::UnitZ()) *
+                                  Eigen::AngleAxisd(t2 + t3, Eigen::Vector3d::UnitY()))
+                                     .toRotationMatrix()
+                                     .transpose() *
+                                 R;
+            double t5 = std::acos(clamp_unit(Rw(0, 0)));
+            if (std::sin(t5) < kSingular) {
+                // 关节 4, 6 共轴, 只能确定两者之和
+                double candidate[6] = {t1, t2, t3, ref[3], t5, std::atan2(Rw(2, 1), Rw(1, 1)) - ref[3]};
+                add_branch(model, T, lower, upper, eomg, ev, candidate, branches, count, outside, outside_count);
+                continue;
+            }
+            for (double s : {1.0, -1.0}) {
+                double candidate[6] = {t1, t2, t3, std::atan2(s * Rw(1, 0), -s * Rw(2, 0)), s * t5,
+                                       std::atan2(s * Rw(0, 1), s * Rw(0, 2))};
+                add_branch(model, T, lower, upper, eomg, ev, candidate, branches, count, outside, outside_count);
+            }
+        }
+    }
+    if (count == 0) {
+        for (int k = 0; k < outside_count; k++) {
+            if (project_to_limits(model, T, lower, upper, eomg, ev, outside[k])) {
+                append_branch(outside[k], branches, count);
+            }
+        }
+    }
+    return count;
+}
+
+// 把解按与 reference 的距离从近到远排序, reference 为 nullptr 时以零位为参考
+inline void sort_branches(double branches[][6], int count, const double *reference) {
+    const double zero[6] = {0, 0, 0, 0, 0, 0};
+    const double *ref = reference ? reference : zero;
+    auto distance = [ref](const double *theta) {
+        double d = 0;
+        for (int j = 0; j < 6; j++) {
+            d += (theta[j] - ref[j]) * (theta[j] - ref[j]);
+        }
+        return d;
+    };
+    for (int i = 1; i < count; i++) {
+        for (int k = i; k > 0 && distance(branches[k]) < distance(branches[k - 1]); k--) {
+            std::swap_ranges(branches[k], branches[k] + 6, branches[k - 1]);
+        }
+    }
+}
+
+}  // namespace pysagittarius
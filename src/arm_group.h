@@ -0,0 +1,228 @@
+#pragma once
+
+// 多台机械臂的并行控制
+// 每个串口一个常驻 I/O 线程, 一次调用把任务分发给所有线程并等待全部完成,
+// 总耗时取决于最慢的串口, 而不是逐台调用的耗时之和
+
+#include <algorithm>
+#include <chrono>
+#include <cmath>
+#include <condition_variable>
+#include <exception>
+#include <functional>
+#include <memory>
+#include <mutex>
+#include <string>
+#include <thread>
+#include <vector>
+
+#include "src/arm_real.h"
+#include "src/call_metrics.h"
+
+namespace pysagittarius {
+
+// 常驻工作线程, 每次执行一个任务, Wait 时重新抛出任务中的异常
+class PortWorker {
+public:
+    PortWorker() : thread_(&PortWorker::Run, this) {}
+
+    ~PortWorker() {
+        {
+            std::lock_guard<std::mutex> lock(mutex_);
+            stop_ = true;
+        }
+        wake_.notify_all();
+        thread_.join();
+    }
+
+    PortWorker(const PortWorker &) = delete;
+    PortWorker &operator=(const PortWorker &) = delete;
+
+    void Post(std::function<void()> job) {
+        {
+            std::lock_guard<std::mutex> lock(mutex_);
+            job_ = std::move(job);
+            done_ = false;
+        }
+        wake_.notify_all();
+    }
+
+    void Wait() {
+        std::unique_lock<std::mutex> lock(mutex_);
+        done_cv_.wait(lock, [this] { return done_; });
+        if (error_) {
+            std::exception_ptr error = error_;
+            error_ = nullptr;
+            std::rethrow_exception(error);
+        }
+    }
+
+private:
+    void Run() {
+        std::unique_lock<std::mutex> lock(mutex_);
+        while (true) {
+            wake_.wait(lock, [this] { return static_cast<bool>(job_) || stop_; });
+            if (!job_) {
+                break;
+            }
+            std::function<void()> job = std::move(job_);
+            job_ = nullptr;
+            lock.unlock();
+            std::exception_ptr error;
+            try {
+                job();
+            } catch (...) {
+                error = std::current_exception();
+            }
+            lock.lock();
+            error_ = error;
+            done_ = true;
+            done_cv_.notify_all();
+        }
+    }
+
+    std::mutex mutex_;
+    std::condition_variable wake_;
+    std::condition_variable done_cv_;
+    std::function<void()> job_;
+    bool done_ = true;
+    bool stop_ = false;
+    std::exception_ptr error_;
+    std::thread thread_;  // 最后初始化, 线程启动时其他成员已经构造完成
+};
+
+// 每个串口的调用延迟
+struct PortStats {
+    LatencyHistogram command;
+    LatencyHistogram read;
+};
+
+class ArmGroup {
+public:
+    ArmGroup(const std::vector<std::string> &ports, int Baudrate, int vel, int acc)
+        : ports_(ports), arms_(ports.size()), stats_(new PortStats[ports.size()]) {
+        if (ports.empty()) {
+            throw std::runtime_error("ports must not be empty");
+        }
+        for (size_t i = 0; i < ports.size(); i++) {
+            workers_.emplace_back(new PortWorker());
+        }
+        // 各串口并行打开, 有一个失败时已打开的机械臂随 ArmGroup 一起释放
+        ForEach([&](size_t i) { arms_[i].reset(new ArmReal(ports_[i], Baudrate, vel, acc)); });
+    }
+
+    ~ArmGroup() {
+        // 先停止工作线程, 再释放机械臂
+        workers_.clear();
+    }
+
+    ArmGroup(const ArmGroup &) = delete;
+    ArmGroup &operator=(const ArmGroup &) = delete;
+
+    size_t Size() const { return arms_.size(); }
+    const std::vector<std::string> &Ports() const { return ports_; }
+    ArmReal &Arm(size_t i) { return *arms_.at(i); }
+
+    // points 为 Size() 行, 每行 width (6 或 7) 个值: 6 个关节弧度和夹爪直线位置 (NaN 表示不控制夹爪)
+    // at > 0 时所有 I/O 线程等到单调时钟 at 秒 (与 time.monotonic() 相同) 再同时发送
+    // 返回各串口开始发送的最大时间差 (秒)
+    double SetAllServoRadian(const float *points, size_t width, double at) {
+        using Clock = std::chrono::steady_clock;
+        const Clock::time_point start = Clock::now();
+        const Clock::time_point target(std::chrono::duration_cast<Clock::duration>(std::chrono::duration<double>(at)));
+        std::vector<Clock::time_point> sent(Size());
+        ForEach([&](size_t i) {
+            if (at > 0) {
+                std::this_thread::sleep_until(target);
+            }
+            const float *p = points + i * width;
+            float js[7];
+            std::copy(p, p + 6, js);
+            sent[i] = Clock::now();
+            if (width > 6 && !std::isnan(p[6])) {
+                js[6] = p[6];
+                arms_[i]->SetAllServoRadianAndGripper(js);
+            } else {
+                arms_[i]->SetAllServoRadian(js);
+            }
+            stats_[i].command.Record(Elapsed(sent[i]));
+        });
+        command_.Record(Elapsed(start));
+        auto range = std::minmax_element(sent.begin(), sent.end());
+        uint64_t skew = static_cast<uint64_t>(
+            std::chrono::duration_cast<std::chrono::nanoseconds>(*range.second - *range.first).count());
+        skew_.Record(skew);
+        return skew * 1e-9;
+    }
+
+    // js 为 Size() x 7, valid 为 Size(); 读取失败的行置零, 返回成功的机械臂数
+    int GetCurrentJointStatus(float *js, bool *valid) {
+        const auto start = std::chrono::steady_clock::now();
+        ForEach([&](size_t i) {
+            const auto t0 = std::chrono::steady_clock::now();
+            valid[i] = arms_[i]->GetCurrentJointStatus(js + 7 * i);
+            if (!valid[i]) {
+                std::fill(js + 7 * i, js + 7 * i + 7, 0.0f);
+            }
+            stats_[i].read.Record(Elapsed(t0));
+        });
+        read_.Record(Elapsed(start));
+        return static_cast<int>(std::count(valid, valid + Size(), true));
+    }
+
+    // 整组调用的耗时 (分发到全部完成) 和同步发送的时间差
+    const LatencyHistogram &CommandLatency() const { return command_; }
+    const LatencyHistogram &ReadLatency() const { return read_; }
+    const LatencyHistogram &Skew() const { return skew_; }
+    const PortStats &Stats(size_t i) const { return stats_[i]; }
+
+    void ResetStats() {
+        command_.Reset();
+        read_.Reset();
+        skew_.Reset();
+        for (size_t i = 0; i < Size(); i++) {
+            stats_[i].command.Reset();
+            stats_[i].read.Reset();
+        }
+    }
+
+private:
+    static uint64_t Elapsed(std::chrono::steady_clock::time_point since) {
+        return static_cast<uint64_t>(
+            std::chrono::duration_cast<std::chrono::nanoseconds>(std::chrono::steady_clock::now() - since).count());
+    }
+
+    // fn(i) 在第 i 个串口的线程中执行, 全部完成后返回; 第一个异常在所有线程结束后重新抛出
+    // 多个 Python 线程同时调用时依次执行
+    template <typename Fn>
+    void ForEach(Fn fn) {
+        std::lock_guard<std::mutex> lock(call_mutex_);
+        for (size_t i = 0; i < workers_.size(); i++) {
+            workers_[i]->Post([&fn, i] { fn(i); });
+        }
+        std::exception_ptr error;
+        for (auto &worker : workers_) {
+            try {
+                worker->Wait();
+            } catch (...) {
+                if (!error) {
+                    error = std::current_exception();
+                }
+            }
+        }
+        if (error) {
+            std::rethrow_exception(error);
+        }
+    }
+
+    std::vector<std::string> ports_;
+    std::vector<std::unique_ptr<ArmReal>> arms_;
+    std::unique_ptr<PortStats[]> stats_;
+    LatencyHistogram command_;
+    LatencyHistogram read_;
+    LatencyHistogram skew_;
+    std::mutex call_mutex_;
+    std::vector<std::unique_ptr<PortWorker>> workers_;  // 在 arms_ 之后声明, 先于 arms_ 析构
+};
+
+}  // namespace pysagittarius
@@ -0,0 +1,90 @@
+#pragma once
+
+#include <algorithm>
+#include <memory>
+#include <stdexcept>
+#include <string>
+
+#include "sagittarius_sdk/sdk_sagittarius_arm/sdk_sagittarius_arm_real.h"
+#include "src/analytic_ik.h"
+#include "src/ik_cache.h"
+#include "src/kinematics_model.h"
+
+namespace pysagittarius {
+
+// 在 SDK 的 SagittariusArmKinematics 上增加 Python 绑定需要的状态
+class ArmKinematics : public sdk_sagittarius_arm::SagittariusArmKinematics {
+public:
+    using Base = sdk_sagittarius_arm::SagittariusArmKinematics;
+
+    ArmKinematics(float x, float y, float z) : Base(x, y, z), model(x, y, z), offset{x, y, z} {}
+
+    // 以 seed 为初值数值求解, 结果写入 theta_result
+    IkResult SolveSeeded(const Eigen::Matrix4d &T, const float *seed, float *theta_result, double eomg,
+                         double ev) const {
+        double theta[6];
+        std::copy(seed, seed + 6, theta);
+        IkResult result = ikin_space(model, T, theta, eomg, ev, lower_joint_limits, upper_joint_limits);
+        if (result.success) {
+            std::copy(theta, theta + 6, theta_result);
+        }
+        return result;
+    }
+
+    // 解析解中离 reference 最近的一个, reference 为 nullptr 时以零位为参考
+    IkResult SolveAnalytic(const Eigen::Matrix4d &T, const float *reference, float *theta_result, double eomg,
+                           double ev) const {
+        double branches[kMaxIkBranches][6];
+        IkResult result;
+        result.success = Branches(T, reference, eomg, ev, branches) > 0;
+        if (result.success) {
+            std::copy(branches[0], branches[0] + 6, theta_result);
+        }
+        return result;
+    }
+
+    // 所有解析解, 按与 reference 的距离从近到远排序
+    int Branches(const Eigen::Matrix4d &T, const float *reference, double eomg, double ev,
+                 double branches[kMaxIkBranches][6]) const {
+        double ref[6];
+        if (reference != nullptr) {
+            std::copy(reference, reference + 6, ref);
+        }
+        const double *r = reference != nullptr ? ref : nullptr;
+        int count = ikin_analytic(model, T, eomg, ev, lower_joint_limits, upper_joint_limits, r, branches);
+        sort_branches(branches, count, r);
+        return count;
+    }
+
+    void SetSolver(const std::string &name) {
+        if (name == "numeric") {
+            analytic = false;
+        } else if (name == "analytic") {
+            analytic = true;
+        } else {
+            throw std::runtime_error("solver must be 'numeric' or 'analytic'");
+        }
+    }
+
+    std::string Solver() const { return analytic ? "analytic" : "numeric"; }
+
+    // 跟踪模式下记录最近一次成功的解, 作为下一次求解的初值
+    void Track(const float *theta) {
+        if (tracking) {
+            std::copy(theta, theta + 6, tracking_seed);
+            have_tracking_seed = true;
+        }
+    }
+
+    ArmModel model;
+    float offset[3];
+
+    bool analytic = false;  // 逆解使用解析解而不是数值迭代
+    bool tracking = false;
+    bool have_tracking_seed = false;
+    float tracking_seed[6] = {0, 0, 0, 0, 0, 0};
+
+    std::shared_ptr<IkCache> cache;  // 为空时不缓存, 批量计算的工作线程副本共享同一个缓存
+};
+
+}  // namespace pysagittarius
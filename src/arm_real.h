@@ -0,0 +1,269 @@
+#pragma once
+
+#include <Python.h>
+
+#include <algorithm>
+#include <atomic>
+#include <chrono>
+#include <cmath>
+#include <memory>
+#include <mutex>
+#include <string>
+
+#include "sagittarius_sdk/sdk_sagittarius_arm/sdk_sagittarius_arm_real.h"
+#include "src/call_metrics.h"
+#include "src/command_coalescer.h"
+#include "src/joint_state_poller.h"
+#include "src/recorder.h"
+#include "src/trajectory_executor.h"
+
+namespace pysagittarius {
+
+// 在 SDK 的 SagittariusArmReal 上增加 Python 绑定需要的状态
+// 所有串口读写都经过 io_mutex, 后台线程和 Python 线程可以同时调用
+class ArmReal : public sdk_sagittarius_arm::SagittariusArmReal {
+public:
+    using Base = sdk_sagittarius_arm::SagittariusArmReal;
+
+    ArmReal(std::string strSerialName, int Baudrate, int vel, int acc)
+        : Base(strSerialName, Baudrate, vel, acc),
+          poller([this](float *js) {
+              PYSAG_METRIC_SOURCE("poller");
+              return GetCurrentJointStatus(js);
+          }),
+          executor([this](const float *setpoint, bool send_gripper) {
+              PYSAG_METRIC_SOURCE("executor");
+              float js[7];
+              std::copy(setpoint, setpoint + 7, js);
+              if (send_gripper) {
+                  SetAllServoRadianAndGripper(js);
+              } else {
+                  SetAllServoRadian(js);
+              }
+          }, [this](float *js) {
+              PYSAG_METRIC_SOURCE("executor");
+              // 轮询器运行时使用不超过 max_age 的缓存, 否则读取一次
+              JointSample sample = poller.Running() ? poller.Fresh(-1.0) : poller.Poll();
+              std::copy(sample.js, sample.js + 7, js);
+              return sample.valid;
+          }),
+          coalescer([this](const float *values, uint32_t mask, float gripper) {
+              PYSAG_METRIC_SOURCE("coalescer");
+              SendServoRadian(values, mask, gripper);
+          }) {}
+
+    ~ArmReal() {
+        coalescer.Stop();
+        executor.Shutdown();
+        poller.Stop();
+    }
+
+    void arm_set_gripper_linear_position(const float dist) {
+        PYSAG_METRIC_CALL("SagittariusArmReal.arm_set_gripper_linear_position");
+        std::lock_guard<std::mutex> lock(io_mutex);
+        if (recorder) {
+            float values[7] = {0, 0, 0, 0, 0, 0, dist};
+            recorder->Append(kRecordGripper, 0x40, values);
+        }
+        Base::arm_set_gripper_linear_position(dist);
+    }
+
+    void SetAllServoRadian(float *joint_positions) {
+        PYSAG_METRIC_CALL("SagittariusArmReal.SetAllServoRadian");
+        std::lock_guard<std::mutex> lock(io_mutex);
+        if (recorder) {
+            recorder->Append(kRecordAllServoRadian, 0x3f, joint_positions);
+        }
+        Base::SetAllServoRadian(joint_positions);
+    }
+
+    // js[0..5] 为关节弧度, js[6] 为夹爪直线位置
+    // SDK 没有同时包含 7 个舵机的帧, 两帧在同一次持有串口锁时连续写出, 中间不会插入其他线程的读写;
+    // 串口事务数与分别调用 SetAllServoRadian 和 arm_set_gripper_linear_position 相同
+    void SetAllServoRadianAndGripper(float *js) {
+        PYSAG_METRIC_CALL("SagittariusArmReal.SetAllServoRadianAndGripper");
+        std::lock_guard<std::mutex> lock(io_mutex);
+        if (recorder) {
+            recorder->Append(kRecordArmGripper, 0x7f, js);
+        }
+        Base::SetAllServoRadian(js);
+        Base::arm_set_gripper_linear_position(js[6]);
+    }
+
+    bool GetCurrentJointStatus(float *js) {
+        PYSAG_METRIC_CALL("SagittariusArmReal.GetCurrentJointStatus");
+        std::lock_guard<std::mutex> lock(io_mutex);
+        bool success = Base::GetCurrentJointStatus(js);
+        if (recorder) {
+            recorder->Append(kRecordJointStatus, 0x7f, js, success);
+        }
+        if (!success) {
+            PYSAG_METRIC_FAIL(1);
+        }
+        return success;
+    }
+
+    void SetServoRadianWithIndex(ServoStruct *sv, int num) {
+        PYSAG_METRIC_CALL("SagittariusArmReal.SetServoRadianWithIndex");
+        std::lock_guard<std::mutex> lock(io_mutex);
+        if (recorder) {
+            float values[7] = {0, 0, 0, 0, 0, 0, 0};
+            uint32_t mask = 0;
+            for (int i = 0; i < num; i++) {
+                if (sv[i].id >= 1 && sv[i].id <= 7) {
+                    values[sv[i].id - 1] = sv[i].value;
+                    mask |= 1u << (sv[i].id - 1);
+                }
+            }
+            recorder->Append(kRecordServoRadianIndex, mask, values);
+        }
+        Base::SetServoRadianWithIndex(sv, num);
+    }
+
+    // 发送 mask 中的舵机: 关节 1~6 都在 mask 中时用 SetAllServoRadian, 其余用 SetServoRadianWithIndex
+    // gripper 不是 NaN 时同时设置夹爪直线位置, 与关节 1~6 一起时用 SetAllServoRadianAndGripper
+    void SendServoRadian(const float *values, uint32_t mask, float gripper = NAN) {
+        if ((mask & 0x3f) == 0x3f) {
+            float js[7];
+            std::copy(values, values + 6, js);
+            js[6] = gripper;
+            if (std::isnan(gripper)) {
+                SetAllServoRadian(js);
+            } else {
+                SetAllServoRadianAndGripper(js);
+                gripper = NAN;
+            }
+            mask &= ~0x3fu;
+        }
+        if (!std::isnan(gripper)) {
+            arm_set_gripper_linear_position(gripper);
+        }
+        if (mask == 0) {
+            return;
+        }
+        ServoStruct sv[7];
+        int num = 0;
+        for (int i = 0; i < 7; i++) {
+            if ((mask >> i) & 1u) {
+                sv[num].id = static_cast<unsigned char>(i + 1);
+                sv[num].value = values[i];
+                num++;
+            }
+        }
+        SetServoRadianWithIndex(sv, num);
+    }
+
+    void ControlTorque(std::string msg) {
+        PYSAG_METRIC_CALL("SagittariusArmReal.ControlTorque");
+        std::lock_guard<std::mutex> lock(io_mutex);
+        Base::ControlTorque(msg);
+    }
+
+    bool GetServoInfo(unsigned char id, int16_t *info_arr, int timeout_ms) {
+        PYSAG_METRIC_CALL("SagittariusArmReal.GetServoInfo");
+        std::lock_guard<std::mutex> lock(io_mutex);
+        bool success = Base::GetServoInfo(id, info_arr, timeout_ms);
+        if (!success) {
+            PYSAG_METRIC_TIMEOUT();
+        }
+        return success;
+    }
+
+    // 读取 7 个舵机的实时信息 (速度, 负载, 电压, 电流) 到 info[7][4], 所有查询共用 timeout_ms 的总时限
+    // 每个舵机最多等待 servo_timeout_ms 和剩余时间中较小者, 时限用完后剩下的舵机不再查询
+    // 上一次没有应答的舵机排在最后查询, 掉线的舵机不会耽误其他舵机; 返回应答的舵机个数
+    int GetAllServoInfo(int16_t *info, bool *valid, int timeout_ms, int servo_timeout_ms) {
+        PYSAG_METRIC_CALL("SagittariusArmReal.GetAllServoInfo");
+        using Clock = std::chrono::steady_clock;
+        const Clock::time_point deadline = Clock::now() + std::chrono::milliseconds(timeout_ms);
+        unsigned missing = missing_servos.load();
+        int order[7], n = 0;
+        for (unsigned pass = 0; pass < 2; pass++) {
+            for (int i = 0; i < 7; i++) {
+                if (((missing >> i) & 1u) == pass) {
+                    order[n++] = i;
+                }
+            }
+        }
+        int answered = 0;
+        for (int i : order) {
+            int remaining = static_cast<int>(
+                std::chrono::duration_cast<std::chrono::milliseconds>(deadline - Clock::now()).count());
+            int wait = std::min(servo_timeout_ms, remaining);
+            valid[i] = false;
+            if (wait > 0) {
+                std::lock_guard<std::mutex> lock(io_mutex);
+                valid[i] = Base::GetServoInfo(static_cast<unsigned char>(i + 1), info + 4 * i, wait);
+                missing = valid[i] ? missing & ~(1u << i) : missing | (1u << i);
+            }
+            if (valid[i]) {
+                answered++;
+            } else {
+                std::fill(info + 4 * i, info + 4 * i + 4, 0);
+            }
+        }
+        missing_servos = missing;
+        if (answered < 7) {
+            PYSAG_METRIC_TIMEOUT();
+        }
+        return answered;
+    }
+
+    void SetServoAcceleration(int arm_acceleration) {
+        PYSAG_METRIC_CALL("SagittariusArmReal.SetServoAcceleration");
+        std::lock_guard<std::mutex> lock(io_mutex);
+        Base::SetServoAcceleration(arm_acceleration);
+    }
+
+    void SetServoVelocity(int arm_vel) {
+        PYSAG_METRIC_CALL("SagittariusArmReal.SetServoVelocity");
+        std::lock_guard<std::mutex> lock(io_mutex);
+        Base::SetServoVelocity(arm_vel);
+    }
+
+    bool SetServoTorque(int *arm_torque) {
+        PYSAG_METRIC_CALL("SagittariusArmReal.SetServoTorque");
+        std::lock_guard<std::mutex> lock(io_mutex);
+        bool success = Base::SetServoTorque(arm_torque);
+        if (!success) {
+            PYSAG_METRIC_FAIL(1);
+        }
+        return success;
+    }
+
+    // 开始记录到 path, 替换正在进行的记录; 文件在锁外创建, 不阻塞串口调用
+    void StartRecording(const std::string &path, uint64_t capacity) {
+        std::unique_ptr<Recorder> next(new Recorder(path, capacity));
+        std::lock_guard<std::mutex> lock(io_mutex);
+        recorder.swap(next);
+    }
+
+    void StopRecording() {
+        std::unique_ptr<Recorder> previous;
+        std::lock_guard<std::mutex> lock(io_mutex);
+        recorder.swap(previous);
+    }
+
+    std::mutex io_mutex;
+    std::unique_ptr<Recorder> recorder;  // 由 io_mutex 保护
+    std::atomic<unsigned> missing_servos{0};  // GetAllServoInfo 中上一次没有应答的舵机, 第 i 位对应舵机 i + 1
+    JointStatePoller poller;
+    TrajectoryExecutor executor;
+    CommandCoalescer coalescer;  // 开启后 Python 调用的舵机弧度命令经过合并器发送
+};
+
+// Python 对象析构时释放 GIL, 等待后台线程退出 (进度回调线程可能正在等待 GIL)
+struct ReleaseGilDeleter {
+    template <typename T>
+    void operator()(T *p) const {
+        if (PyGILState_Check()) {
+            PyThreadState *state = PyEval_SaveThread();
+            delete p;
+            PyEval_RestoreThread(state);
+        } else {
+            delete p;
+        }
+    }
+};
+
+}  // namespace pysagittarius
@@ -0,0 +1,301 @@
+#pragma once
+
+// 绑定层的调用计数和延迟直方图
+// 编译时定义 PYSAGITTARIUS_METRICS 才会启用, 否则 PYSAG_METRIC_* 宏全部展开为空
+// 每个方法按调用来源分别统计: Python 调用为 "python", 后台线程 (轮询器, 写入合并, 轨迹执行器) 用 PYSAG_METRIC_SOURCE 标记
+
+#include <atomic>
+#include <chrono>
+#include <cstdint>
+#include <map>
+#include <memory>
+#include <mutex>
+#include <sstream>
+#include <string>
+#include <utility>
+#include <vector>
+
+namespace pysagittarius {
+
+// 单调递增的计数, Reset 只移动起点: Prometheus 导出的累计值不会变小, Since() 为上次重置以来的增量
+class MetricCounter {
+public:
+    void Add(uint64_t n) { total_.fetch_add(n, std::memory_order_relaxed); }
+    void Reset() { base_.store(Total(), std::memory_order_relaxed); }
+    uint64_t Total() const { return total_.load(std::memory_order_relaxed); }
+    uint64_t Since() const { return Total() - base_.load(std::memory_order_relaxed); }
+
+private:
+    std::atomic<uint64_t> total_{0};
+    std::atomic<uint64_t> base_{0};
+};
+
+// 对数分桶的延迟直方图 (纳秒), 每个 2 的幂区间分 4 个子桶, 相对误差约 25%
+// 记录只使用原子加法, 不加锁; Reset 清空分桶和最大值, 调用次数和总耗时保留累计值
+class LatencyHistogram {
+public:
+    static constexpr int kBuckets = 160;
+
+    void Record(uint64_t ns) {
+        buckets_[Index(ns)].fetch_add(1, std::memory_order_relaxed);
+        count_.Add(1);
+        sum_.Add(ns);
+        uint64_t prev = max_.load(std::memory_order_relaxed);
+        while (ns > prev && !max_.compare_exchange_weak(prev, ns, std::memory_order_relaxed)) {
+        }
+    }
+
+    void Reset() {
+        for (auto &b : buckets_) {
+            b.store(0, std::memory_order_relaxed);
+        }
+        count_.Reset();
+        sum_.Reset();
+        max_.store(0, std::memory_order_relaxed);
+    }
+
+    const MetricCounter &Count() const { return count_; }
+    const MetricCounter &Sum() const { return sum_; }
+    uint64_t Max() const { return max_.load(std::memory_order_relaxed); }
+
+    // q 分位数的近似值 (纳秒), 取所在桶的上界, 不超过最大值
+    uint64_t Quantile(double q) const {
+        uint64_t counts[kBuckets];
+        uint64_t total = 0;
+        for (int i = 0; i < kBuckets; i++) {
+            counts[i] = buckets_[i].load(std::memory_order_relaxed);
+            total += counts[i];
+        }
+        if (total == 0) {
+            return 0;
+        }
+        uint64_t target = static_cast<uint64_t>(q * total);
+        if (target < 1) {
+            target = 1;
+        }
+        uint64_t seen = 0;
+        for (int i = 0; i < kBuckets; i++) {
+            seen += counts[i];
+            if (seen >= target) {
+                uint64_t upper = UpperBound(i);
+                uint64_t max = Max();
+                return upper < max ? upper : max;
+            }
+        }
+        return Max();
+    }
+
+private:
+    static int Index(uint64_t v) {
+        if (v < 4) {
+            return static_cast<int>(v);
+        }
+        int msb = 63 - __builtin_clzll(v);
+        int idx = msb * 4 + static_cast<int>((v >> (msb - 2)) & 3) - 4;
+        return idx < kBuckets ? idx : kBuckets - 1;
+    }
+
+    static uint64_t UpperBound(int idx) {
+        if (idx < 4) {
+            return static_cast<uint64_t>(idx);
+        }
+        int msb = (idx + 4) / 4;
+        uint64_t sub = static_cast<uint64_t>((idx + 4) % 4);
+        return ((4 + sub + 1) << (msb - 2)) - 1;
+    }
+
+    std::atomic<uint64_t> buckets_[kBuckets] = {};
+    MetricCounter count_;
+    MetricCounter sum_;
+    std::atomic<uint64_t> max_{0};
+};
+
+// 单个方法的统计
+// ik_iterations 只统计绑定层自己的牛顿迭代 (有初值或跟踪初值时), SDK 求解器不返回迭代次数, 默认无初值的调用不计入
+struct MethodStats {
+    MetricCounter failures;
+    MetricCounter timeouts;
+    MetricCounter ik_iterations;
+    LatencyHistogram latency;
+
+    void Reset() {
+        failures.Reset();
+        timeouts.Reset();
+        ik_iterations.Reset();
+        latency.Reset();
+    }
+};
+
+constexpr const char *kPythonSource = "python";
+
+// 当前线程的调用来源, nullptr 表示 Python 调用
+inline const char *&metric_source() {
+    static thread_local const char *source = nullptr;
+    return source;
+}
+
+// 作用域内把当前线程的调用记到 source 下, 退出时恢复
+class ScopedMetricSource {
+public:
+    explicit ScopedMetricSource(const char *source) : previous_(metric_source()) { metric_source() = source; }
+    ~ScopedMetricSource() { metric_source() = previous_; }
+
+    ScopedMetricSource(const ScopedMetricSource &) = delete;
+    ScopedMetricSource &operator=(const ScopedMetricSource &) = delete;
+
+private:
+    const char *previous_;
+};
+
+// 全局统计表, 以 (方法, 来源) 为键, 首次调用时注册, 之后 Python 调用通过缓存的引用直接记录
+class MetricsRegistry {
+public:
+    MethodStats &Get(const std::string &name, const std::string &source = kPythonSource) {
+        std::lock_guard<std::mutex> lock(mutex_);
+        auto &entry = stats_[std::make_pair(name, source)];
+        if (!entry) {
+            entry.reset(new MethodStats());
+        }
+        return *entry;
+    }
+
+    void Reset() {
+        std::lock_guard<std::mutex> lock(mutex_);
+        for (auto &it : stats_) {
+            it.second->Reset();
+        }
+    }
+
+    // 在锁内遍历所有方法, fn(方法, 来源, 统计)
+    template <typename Fn>
+    void ForEach(Fn fn) {
+        std::lock_guard<std::mutex> lock(mutex_);
+        for (auto &it : stats_) {
+            fn(it.first.first, it.first.second, *it.second);
+        }
+    }
+
+    // Prometheus 文本格式; counter 和 summary 的 _sum/_count 是进程启动以来的累计值, 不受 Reset 影响,
+    // 分位数和最大值是上次 Reset 以来的
+    std::string Prometheus() {
+        std::ostringstream out;
+        std::vector<Item> items;
+        ForEach([&items](const std::string &name, const std::string &source, MethodStats &s) {
+            items.push_back(Item{"method=\"" + name + "\",source=\"" + source + "\"", &s});
+        });
+
+        out << "# HELP pysagittarius_call_latency_seconds Latency of pysagittarius binding calls "
+               "(quantiles since the last reset).\n";
+        out << "# TYPE pysagittarius_call_latency_seconds summary\n";
+        const double quantiles[] = {0.5, 0.95, 0.99};
+        for (auto &item : items) {
+            const LatencyHistogram &h = item.stats->latency;
+            for (double q : quantiles) {
+                out << "pysagittarius_call_latency_seconds{" << item.labels << ",quantile=\"" << q << "\"} "
+                    << h.Quantile(q) * 1e-9 << "\n";
+            }
+            out << "pysagittarius_call_latency_seconds_sum{" << item.labels << "} " << h.Sum().Total() * 1e-9 << "\n";
+            out << "pysagittarius_call_latency_seconds_count{" << item.labels << "} " << h.Count().Total() << "\n";
+        }
+        WriteMetric(out, items, "pysagittarius_call_latency_max_seconds", "gauge",
+                    "Slowest pysagittarius binding call since the last reset.",
+                    [](MethodStats &s) { return s.latency.Max() * 1e-9; });
+        WriteMetric(out, items, "pysagittarius_calls_total", "counter", "Number of pysagittarius binding calls.",
+                    [](MethodStats &s) { return static_cast<double>(s.latency.Count().Total()); });
+        WriteMetric(out, items, "pysagittarius_failures_total", "counter", "Calls that reported failure.",
+                    [](MethodStats &s) { return static_cast<double>(s.failures.Total()); });
+        WriteMetric(out, items, "pysagittarius_timeouts_total", "counter", "Calls that timed out waiting for the arm.",
+                    [](MethodStats &s) { return static_cast<double>(s.timeouts.Total()); });
+        WriteMetric(out, items, "pysagittarius_ik_iterations_total", "counter",
+                    "Newton iterations of seeded IK solves (SDK solves report no iterations).",
+                    [](MethodStats &s) { return static_cast<double>(s.ik_iterations.Total()); });
+        return out.str();
+    }
+
+private:
+    struct Item {
+        std::string labels;
+        MethodStats *stats;
+    };
+
+    template <typename Value>
+    static void WriteMetric(std::ostringstream &out, const std::vector<Item> &items, const char *metric,
+                            const char *type, const char *help, Value value) {
+        out << "# HELP " << metric << " " << help << "\n";
+        out << "# TYPE " << metric << " " << type << "\n";
+        for (auto &item : items) {
+            out << metric << "{" << item.labels << "} " << value(*item.stats) << "\n";
+        }
+    }
+
+    std::mutex mutex_;
+    std::map<std::pair<std::string, std::string>, std::unique_ptr<MethodStats>> stats_;
+};
+
+inline MetricsRegistry &metrics() {
+    static MetricsRegistry registry;
+    return registry;
+}
+
+// 作用域计时器, 析构时记录一次调用
+class ScopedCall {
+public:
+    explicit ScopedCall(MethodStats &stats) : stats_(stats), start_(std::chrono::steady_clock::now()) {}
+    ~ScopedCall() {
+        auto ns = std::chrono::duration_cast<std::chrono::nanoseconds>(std::chrono::steady_clock::now() - start_);
+        stats_.latency.Record(static_cast<uint64_t>(ns.count()));
+    }
+
+    ScopedCall(const ScopedCall &) = delete;
+    ScopedCall &operator=(const ScopedCall &) = delete;
+
+    void Fail(uint64_t n = 1) { stats_.failures.Add(n); }
+    void Timeout() { stats_.timeouts.Add(1); }
+    void Iterations(uint64_t n) { stats_.ik_iterations.Add(n); }
+
+private:
+    MethodStats &stats_;
+    std::chrono::steady_clock::time_point start_;
+};
+
+}  // namespace pysagittarius
+
+#ifdef PYSAGITTARIUS_METRICS
+// 在函数开头使用, 统计本次调用的耗时; Python 调用使用缓存的引用, 后台线程的调用按来源查表
+#define PYSAG_METRIC_CALL(name)                                                                       \
+    static pysagittarius::MethodStats &pysag_metric_stats_ = pysagittarius::metrics().Get(name);       \
+    pysagittarius::ScopedCall pysag_metric_call_(                                                     \
+        pysagittarius::metric_source() == nullptr                                                     \
+            ? pysag_metric_stats_                                                                     \
+            : pysagittarius::metrics().Get(name, pysagittarius::metric_source()))
+// 方法名在运行时确定时使用, 每次调用查一次表
+#define PYSAG_METRIC_CALL_DYNAMIC(name)                                                   \
+    pysagittarius::ScopedCall pysag_metric_call_(pysagittarius::metrics().Get(            \
+        name, pysagittarius::metric_source() == nullptr ? pysagittarius::kPythonSource   \
+                                                        : pysagittarius::metric_source()))
+// 在后台线程调用的回调开头使用, 作用域内的调用记到 source 下
+#define PYSAG_METRIC_SOURCE(source) pysagittarius::ScopedMetricSource pysag_metric_source_(source)
+#define PYSAG_METRIC_FAIL(n) pysag_metric_call_.Fail(n)
+#define PYSAG_METRIC_TIMEOUT() pysag_metric_call_.Timeout()
+#define PYSAG_METRIC_ITERATIONS(n) pysag_metric_call_.Iterations(n)
+#else
+#define PYSAG_METRIC_CALL(name) \
+    do {                        \
+    } while (0)
+#define PYSAG_METRIC_CALL_DYNAMIC(name) \
+    do {                                \
+        (void)(name);                   \
+    } while (0)
+#define PYSAG_METRIC_SOURCE(source) \
+    do {                            \
+    } while (0)
+#define PYSAG_METRIC_FAIL(n) \
+    do {                     \
+    } while (0)
+#define PYSAG_METRIC_TIMEOUT() \
+    do {                       \
+    } while (0)
+#define PYSAG_METRIC_ITERATIONS(n) \
+    do {                           \
+    } while (0)
+#endif
@@ -0,0 +1,191 @@
+#pragma once
+
+// 轨迹批量校验: 关节限位, 胶囊体自碰撞, 地面和长方体禁入区
+// 连杆用胶囊体 (线段加半径) 近似, 端点在零位的空间坐标系下给出, 随前 link 个关节的指数积运动,
+// 正运动学与 kinematics_model.h 的螺旋轴一致
+
+#include <algorithm>
+#include <array>
+#include <cmath>
+#include <cstdint>
+#include <utility>
+#include <vector>
+
+#include "src/kinematics_model.h"
+
+namespace pysagittarius {
+
+// 校验结果, 按位组合, 0 表示通过
+enum ValidationFlag : uint8_t {
+    kViolationJointLimit = 1,     // 关节超出限位或为 NaN, 夹爪位置超出范围
+    kViolationSelfCollision = 2,  // 不相邻的连杆胶囊体相交
+    kViolationFloor = 4,          // 运动连杆低于地面
+    kViolationKeepOut = 8,        // 运动连杆进入长方体禁入区
+};
+
+// 夹爪直线位置范围 (米), 与 pysagittarius/limits.py 的 GRIPPER_CLOSE / GRIPPER_OPEN 一致
+constexpr float kGripperLinearMin = -0.068f;
+constexpr float kGripperLinearMax = 0.0f;
+
+struct Capsule {
+    int link;  // 0 为固定的底座, k 表示随关节 1~k 运动
+    Eigen::Vector3d a, b;
+    double radius;
+};
+
+// 轴对齐长方体, 空间坐标系
+struct Box {
+    Eigen::Vector3d lo, hi;
+};
+
+namespace collision {
+
+// 线段 p1q1 与 p2q2 的最近距离 (Ericson, Real-Time Collision Detection 5.1.9)
+inline double segment_distance(const Eigen::Vector3d &p1, const Eigen::Vector3d &q1, const Eigen::Vector3d &p2,
+                               const Eigen::Vector3d &q2) {
+    const double eps = 1e-12;
+    Eigen::Vector3d d1 = q1 - p1, d2 = q2 - p2, r = p1 - p2;
+    double a = d1.squaredNorm(), e = d2.squaredNorm(), f = d2.dot(r);
+    double s = 0, t = 0;
+    if (a <= eps && e <= eps) {
+        return r.norm();
+    }
+    if (a <= eps) {
+        t = std::max(0.0, std::min(1.0, f / e));
+    } else {
+        double c = d1.dot(r);
+        if (e <= eps) {
+            s = std::max(0.0, std::min(1.0, -c / a));
+        } else {
+            double b = d1.dot(d2), denom = a * e - b * b;
+            s = denom > eps ? std::max(0.0, std::min(1.0, (b * f - c * e) / denom)) : 0.0;
+            t = (b * s + f) / e;
+            if (t < 0) {
+                t = 0;
+                s = std::max(0.0, std::min(1.0, -c / a));
+            } else if (t > 1) {
+                t = 1;
+                s = std::max(0.0, std::min(1.0, (b - c) / a));
+            }
+        }
+    }
+    return ((p1 + d1 * s) - (p2 + d2 * t)).norm();
+}
+
+inline double point_box_distance(const Eigen::Vector3d &p, const Box &box) {
+    return (p - p.cwiseMax(box.lo).cwiseMin(box.hi)).norm();
+}
+
+// 线段到长方体的距离: 沿线段的距离是凸函数, 黄金分割搜索
+inline double segment_box_distance(const Eigen::Vector3d &a, const Eigen::Vector3d &b, const Box &box) {
+    const double ratio = 0.6180339887498949;
+    double lo = 0, hi = 1;
+    double x1 = hi - ratio * (hi - lo), x2 = lo + ratio * (hi - lo);
+    double f1 = point_box_distance(a + (b - a) * x1, box), f2 = point_box_distance(a + (b - a) * x2, box);
+    for (int i = 0; i < 40 && f1 > 0 && f2 > 0; i++) {
+        if (f1 < f2) {
+            hi = x2;
+            x2 = x1;
+            f2 = f1;
+            x1 = hi - ratio * (hi - lo);
+            f1 = point_box_distance(a + (b - a) * x1, box);
+        } else {
+            lo = x1;
+            x1 = x2;
+            f1 = f2;
+            x2 = lo + ratio * (hi - lo);
+            f2 = point_box_distance(a + (b - a) * x2, box);
+        }
+    }
+    return std::min({f1, f2, point_box_distance(a, box), point_box_distance(b, box)});
+}
+
+}  // namespace collision
+
+// Sagittarius 的胶囊体模型和校验参数
+struct CollisionModel {
+    static constexpr int kCapsules = 4;
+    std::array<Capsule, kCapsules> capsules;   // 底座, 大臂, 小臂, 夹爪
+    std::array<std::pair<int, int>, 3> pairs;  // 需要检查自碰撞的胶囊体 (不相邻的连杆)
+    bool self_collision = true;
+    bool floor_enabled = false;
+    double floor = 0;
+    std::vector<Box> boxes;
+    double margin = 0;  // 胶囊体之间以及与障碍物之间至少保留的距离
+
+    // 尺寸取自螺旋轴的关节位置, 夹爪胶囊体延伸到含工具偏移的末端
+    explicit CollisionModel(const ArmModel &model) {
+        const Eigen::Vector3d wrist(0.1795, 0, 0.304);
+        Eigen::Vector3d tip = model.M.topRightCorner<3, 1>();
+        capsules = {{{0, Eigen::Vector3d(0, 0, 0), Eigen::Vector3d(0, 0, 0.1), 0.05},
+                     {2, Eigen::Vector3d(0, 0, 0.125), Eigen::Vector3d(0.045, 0, 0.304), 0.03},
+                     {4, Eigen::Vector3d(0.045, 0, 0.304), wrist, 0.03},
+                     {6, wrist + (tip - wrist).normalized() * 0.035, tip, 0.03}}};
+        pairs = {{{3, 0}, {3, 1}, {2, 0}}};
+    }
+
+    // 单个关节角的碰撞校验结果, theta 为 6 个关节弧度
+    uint8_t Check(const ArmModel &model, const double *theta) const {
+        Eigen::Matrix4d frames[7];
+        frames[0].setIdentity();
+        for (int j = 0; j < 6; j++) {
+            frames[j + 1] = frames[j] * exp6(model.Slist.col(j), theta[j]);
+        }
+        Eigen::Vector3d a[kCapsules], b[kCapsules];
+        for (int k = 0; k < kCapsules; k++) {
+            const Eigen::Matrix4d &T = frames[capsules[k].link];
+            a[k] = T.topLeftCorner<3, 3>() * capsules[k].a + T.topRightCorner<3, 1>();
+            b[k] = T.topLeftCorner<3, 3>() * capsules[k].b + T.topRightCorner<3, 1>();
+        }
+
+        uint8_t flags = 0;
+        if (self_collision) {
+            for (const auto &p : pairs) {
+                double clearance = capsules[p.first].radius + capsules[p.second].radius + margin;
+                if (collision::segment_distance(a[p.first], b[p.first], a[p.second], b[p.second]) < clearance) {
+                    flags |= kViolationSelfCollision;
+                    break;
+                }
+            }
+        }
+        // 底座固定不动, 不检查地面和禁入区
+        for (int k = 0; k < kCapsules; k++) {
+            if (capsules[k].link == 0) {
+                continue;
+            }
+            double clearance = capsules[k].radius + margin;
+            if (floor_enabled && std::min(a[k].z(), b[k].z()) - clearance < floor) {
+                flags |= kViolationFloor;
+            }
+            for (const auto &box : boxes) {
+                if (!(flags & kViolationKeepOut) && collision::segment_box_distance(a[k], b[k], box) < clearance) {
+                    flags |= kViolationKeepOut;
+                }
+            }
+        }
+        return flags;
+    }
+};
+
+// 校验一行关节数据 p (width 列: 6 个关节弧度, 第 7 列为夹爪直线位置, NaN 表示不控制)
+template <typename T>
+uint8_t validate_sample(const CollisionModel &collision_model, const ArmModel &model, const float *lower,
+                        const float *upper, const T *p, size_t width) {
+    double theta[6];
+    uint8_t flags = 0;
+    for (int j = 0; j < 6; j++) {
+        if (std::isnan(p[j])) {
+            return kViolationJointLimit;
+        }
+        theta[j] = static_cast<double>(p[j]);
+        if (p[j] < lower[j] || p[j] > upper[j]) {
+            flags |= kViolationJointLimit;
+        }
+    }
+    if (width > 6 && !std::isnan(p[6]) && (p[6] < kGripperLinearMin || p[6] > kGripperLinearMax)) {
+        flags |= kViolationJointLimit;
+    }
+    return flags | collision_model.Check(model, theta);
+}
+
+}  // namespace pysagittarius
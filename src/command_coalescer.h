@@ -0,0 +1,178 @@
+#pragma once
+
+// 串口写入合并
+// 开启后舵机弧度命令只更新待发送的设定值并立即返回, 写线程每次取出最新的设定值发送:
+// 还没发送就被新命令覆盖的值直接丢弃 (后到的值生效), 与上次发送值相差不超过死区的舵机不再发送.
+// 上次发送值只跟踪经过合并器的写入, 轨迹执行器等直接写入不会更新它.
+// 夹爪直线位置单独保存, 不经过死区, 与关节 1~6 同时待发送时一起交给 send
+
+#include <algorithm>
+#include <cmath>
+#include <condition_variable>
+#include <cstdint>
+#include <functional>
+#include <mutex>
+#include <thread>
+
+namespace pysagittarius {
+
+class CommandCoalescer {
+public:
+    // values[i] 为舵机 i + 1 的弧度, mask 的第 i 位表示发送舵机 i + 1; gripper 为夹爪直线位置, NaN 表示不发送
+    using SendFn = std::function<void(const float *values, uint32_t mask, float gripper)>;
+
+    struct Stats {
+        uint64_t submitted = 0;       // 提交的命令
+        uint64_t sent = 0;            // 实际发送的设定值
+        uint64_t coalesced = 0;       // 发送前被后续命令合并的命令
+        uint64_t suppressed = 0;      // 所有舵机都在死区内而没有发送的设定值
+        uint64_t joints_skipped = 0;  // 因死区没有发送的舵机数
+    };
+
+    explicit CommandCoalescer(SendFn send) : send_(std::move(send)) {}
+    ~CommandCoalescer() { Stop(); }
+
+    CommandCoalescer(const CommandCoalescer &) = delete;
+    CommandCoalescer &operator=(const CommandCoalescer &) = delete;
+
+    // deadband[7] 为每个舵机的死区 (弧度); 已经开启时只更新死区
+    void Start(const float *deadband) {
+        std::lock_guard<std::mutex> lifecycle(lifecycle_mutex_);
+        {
+            std::lock_guard<std::mutex> lock(mutex_);
+            std::copy(deadband, deadband + 7, deadband_);
+            if (running_) {
+                return;
+            }
+        }
+        // 上一个写线程已经退出, 回收后才能创建新线程
+        StopLocked();
+        std::lock_guard<std::mutex> lock(mutex_);
+        // 停止期间可能有直接写入, 上次发送值作废
+        sent_mask_ = 0;
+        running_ = true;
+        thread_ = std::thread(&CommandCoalescer::Run, this);
+    }
+
+    // 发送剩余的设定值后停止
+    void Stop() {
+        std::lock_guard<std::mutex> lifecycle(lifecycle_mutex_);
+        StopLocked();
+    }
+
+    bool Running() {
+        std::lock_guard<std::mutex> lock(mutex_);
+        return running_;
+    }
+
+    // 合并到待发送的设定值, 没有开启时返回 false, 由调用者直接发送
+    bool Submit(const float *values, uint32_t mask, float gripper = NAN) {
+        {
+            std::lock_guard<std::mutex> lock(mutex_);
+            if (!running_) {
+                return false;
+            }
+            stats_.submitted++;
+            if (Pending()) {
+                stats_.coalesced++;
+            }
+            for (int i = 0; i < 7; i++) {
+                if ((mask >> i) & 1u) {
+                    pending_[i] = values[i];
+                }
+            }
+            pending_mask_ |= mask;
+            if (!std::isnan(gripper)) {
+                pending_gripper_ = gripper;
+            }
+        }
+        wake_.notify_one();
+        return true;
+    }
+
+    Stats GetStats() {
+        std::lock_guard<std::mutex> lock(mutex_);
+        return stats_;
+    }
+
+    void ResetStats() {
+        std::lock_guard<std::mutex> lock(mutex_);
+        stats_ = Stats();
+    }
+
+private:
+    // 需要持有 lifecycle_mutex_
+    void StopLocked() {
+        {
+            std::lock_guard<std::mutex> lock(mutex_);
+            running_ = false;
+        }
+        wake_.notify_all();
+        if (thread_.joinable()) {
+            thread_.join();
+        }
+    }
+
+    bool Pending() const { return pending_mask_ != 0 || !std::isnan(pending_gripper_); }
+
+    void Run() {
+        std::unique_lock<std::mutex> lock(mutex_);
+        while (true) {
+            wake_.wait(lock, [this] { return Pending() || !running_; });
+            if (!Pending()) {
+                break;
+            }
+            float values[7];
+            std::copy(pending_, pending_ + 7, values);
+            uint32_t mask = pending_mask_;
+            float gripper = pending_gripper_;
+            pending_mask_ = 0;
+            pending_gripper_ = NAN;
+
+            uint32_t send_mask = 0;
+            for (int i = 0; i < 7; i++) {
+                if (!((mask >> i) & 1u)) {
+                    continue;
+                }
+                if (((sent_mask_ >> i) & 1u) && std::abs(values[i] - sent_[i]) <= deadband_[i]) {
+                    stats_.joints_skipped++;
+                } else {
+                    send_mask |= 1u << i;
+                }
+            }
+            if (send_mask == 0 && std::isnan(gripper)) {
+                stats_.suppressed++;
+                continue;
+            }
+            // 发送时不持有锁, 新命令可以继续合并
+            lock.unlock();
+            send_(values, send_mask, gripper);
+            lock.lock();
+            for (int i = 0; i < 7; i++) {
+                if ((send_mask >> i) & 1u) {
+                    sent_[i] = values[i];
+                }
+            }
+            sent_mask_ |= send_mask;
+            stats_.sent++;
+        }
+    }
+
+    SendFn send_;
+
+    // Start / Stop 可能同时从多个 Python 线程调用, 由 lifecycle_mutex_ 串行化, 保护 thread_
+    std::mutex lifecycle_mutex_;
+    std::thread thread_;
+    std::mutex mutex_;
+    std::condition_variable wake_;
+    bool running_ = false;
+    float pending_[7] = {0, 0, 0, 0, 0, 0, 0};
+    uint32_t pending_mask_ = 0;
+    float pending_gripper_ = NAN;
+    float sent_[7] = {0, 0, 0, 0, 0, 0, 0};
+    uint32_t sent_mask_ = 0;
+    float deadband_[7] = {0, 0, 0, 0, 0, 0, 0};
+    Stats stats_;
+};
+
+}  // namespace pysagittarius
@@ -0,0 +1,207 @@
+#pragma once
+
+// 逆解结果的 LRU 缓存
+// 键为量化后的目标位姿 (位置 + 旋转矩阵) 和工具偏移, 值为关节角; 可以保存到文件, 进程重启后重新加载
+
+#include <Eigen/Dense>
+#include <array>
+#include <cmath>
+#include <cstdint>
+#include <cstring>
+#include <fstream>
+#include <list>
+#include <mutex>
+#include <stdexcept>
+#include <string>
+#include <unordered_map>
+
+namespace pysagittarius {
+
+class IkCache {
+public:
+    // 工具偏移 3 个 + 位置 3 个 + 旋转矩阵 9 个
+    using Key = std::array<int64_t, 15>;
+
+    struct Stats {
+        size_t size;
+        uint64_t hits;
+        uint64_t misses;
+        uint64_t evictions;
+    };
+
+    IkCache(size_t max_size, double position_resolution, double angle_resolution)
+        : max_size_(max_size), position_resolution_(position_resolution), angle_resolution_(angle_resolution) {
+        if (max_size == 0 || !(position_resolution > 0) || !(angle_resolution > 0)) {
+            throw std::runtime_error("cache size and resolutions must be positive");
+        }
+    }
+
+    size_t max_size() const { return max_size_; }
+    double position_resolution() const { return position_resolution_; }
+    double angle_resolution() const { return angle_resolution_; }
+
+    Key MakeKey(const Eigen::Matrix4d &T, const float *offset) const {
+        Key key;
+        for (int i = 0; i < 3; i++) {
+            key[i] = Quantize(offset[i], position_resolution_);
+            key[3 + i] = Quantize(T(i, 3), position_resolution_);
+        }
+        // 旋转矩阵元素的变化量与转角 (弧度) 同量级
+        for (int i = 0; i < 9; i++) {
+            key[6 + i] = Quantize(T(i / 3, i % 3), angle_resolution_);
+        }
+        return key;
+    }
+
+    bool Get(const Key &key, float *theta) {
+        std::lock_guard<std::mutex> lock(mutex_);
+        auto it = index_.find(key);
+        if (it == index_.end()) {
+            misses_++;
+            return false;
+        }
+        hits_++;
+        entries_.splice(entries_.begin(), entries_, it->second);
+        std::copy(it->second->second.begin(), it->second->second.end(), theta);
+        return true;
+    }
+
+    void Put(const Key &key, const float *theta) {
+        std::lock_guard<std::mutex> lock(mutex_);
+        Insert(key, theta);
+    }
+
+    void Clear() {
+        std::lock_guard<std::mutex> lock(mutex_);
+        entries_.clear();
+        index_.clear();
+    }
+
+    Stats GetStats() {
+        std::lock_guard<std::mutex> lock(mutex_);
+        return Stats{entries_.size(), hits_, misses_, evictions_};
+    }
+
+    void ResetStats() {
+        std::lock_guard<std::mutex> lock(mutex_);
+        hits_ = misses_ = evictions_ = 0;
+    }
+
+    // 文件格式: 文件头 | 分辨率 2 个 double | 条目数 uint64 | 条目 (Key, float[6]), 最近使用的在前
+    void Save(const std::string &path) {
+        std::lock_guard<std::mutex> lock(mutex_);
+        std::ofstream out(path, std::ios::binary | std::ios::trunc);
+        if (!out) {
+            throw std::runtime_error("Failed to open " + path);
+        }
+        uint64_t count = entries_.size();
+        out.write(Magic(), kMagicSize);
+        Write(out, position_resolution_);
+        Write(out, angle_resolution_);
+        Write(out, count);
+        for (const auto &entry : entries_) {
+            out.write(reinterpret_cast<const char *>(entry.first.data()), sizeof(Key));
+            out.write(reinterpret_cast<const char *>(entry.second.data()), sizeof(Value));
+        }
+        if (!out) {
+            throw std::runtime_error("Failed to write " + path);
+        }
+    }
+
+    // 加载的条目排在现有条目之前, 返回加载的条目数; 分辨率必须与当前缓存一致
+    size_t Load(const std::string &path) {
+        std::ifstream in(path, std::ios::binary);
+        if (!in) {
+            throw std::runtime_error("Failed to open " + path);
+        }
+        char magic[kMagicSize];
+        double position_resolution, angle_resolution;
+        uint64_t count;
+        in.read(magic, sizeof(magic));
+        Read(in, position_resolution);
+        Read(in, angle_resolution);
+        Read(in, count);
+        if (!in || std::memcmp(magic, Magic(), kMagicSize) != 0) {
+            throw std::runtime_error(path + " is not an IK cache file");
+        }
+        if (position_resolution != position_resolution_ || angle_resolution != angle_resolution_) {
+            throw std::runtime_error(path + " was saved with a different cache resolution");
+        }
+        std::list<std::pair<Key, Value>> loaded;
+        for (uint64_t i = 0; i < count; i++) {
+            std::pair<Key, Value> entry;
+            in.read(reinterpret_cast<char *>(entry.first.data()), sizeof(Key));
+            in.read(reinterpret_cast<char *>(entry.second.data()), sizeof(Value));
+            if (!in) {
+                throw std::runtime_error(path + " is truncated");
+            }
+            loaded.push_back(entry);
+        }
+        std::lock_guard<std::mutex> lock(mutex_);
+        // 倒序插入, 使文件中靠前 (最近使用) 的条目最终排在最前
+        for (auto it = loaded.rbegin(); it != loaded.rend(); ++it) {
+            Insert(it->first, it->second.data());
+        }
+        return loaded.size();
+    }
+
+private:
+    using Value = std::array<float, 6>;
+
+    struct KeyHash {
+        size_t operator()(const Key &key) const {
+            uint64_t h = 1469598103934665603ull;
+            for (int64_t v : key) {
+                h = (h ^ static_cast<uint64_t>(v)) * 1099511628211ull;
+            }
+            return static_cast<size_t>(h);
+        }
+    };
+
+    static constexpr size_t kMagicSize = 8;
+    static const char *Magic() { return "PSIKCAC1"; }
+
+    static int64_t Quantize(double v, double resolution) { return static_cast<int64_t>(std::llround(v / resolution)); }
+
+    template <typename T>
+    static void Write(std::ofstream &out, const T &v) {
+        out.write(reinterpret_cast<const char *>(&v), sizeof(T));
+    }
+
+    template <typename T>
+    static void Read(std::ifstream &in, T &v) {
+        in.read(reinterpret_cast<char *>(&v), sizeof(T));
+    }
+
+    // 需要持有 mutex_
+    void Insert(const Key &key, const float *theta) {
+        auto it = index_.find(key);
+        if (it != index_.end()) {
+            std::copy(theta, theta + 6, it->second->second.begin());
+            entries_.splice(entries_.begin(), entries_, it->second);
+            return;
+        }
+        Value value;
+        std::copy(theta, theta + 6, value.begin());
+        entries_.emplace_front(key, value);
+        index_[key] = entries_.begin();
+        if (entries_.size() > max_size_) {
+            index_.erase(entries_.back().first);
+            entries_.pop_back();
+            evictions_++;
+        }
+    }
+
+    const size_t max_size_;
+    const double position_resolution_;
+    const double angle_resolution_;
+
+    std::mutex mutex_;
+    std::list<std::pair<Key, Value>> entries_;
+    std::unordered_map<Key, std::list<std::pair<Key, Value>>::iterator, KeyHash> index_;
+    uint64_t hits_ = 0;
+    uint64_t misses_ = 0;
+    uint64_t evictions_ = 0;
+};
+
+}  // namespace pysagittarius
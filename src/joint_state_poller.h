@@ -0,0 +1,153 @@
+#pragma once
+
+#include <algorithm>
+#include <atomic>
+#include <chrono>
+#include <condition_variable>
+#include <cstdint>
+#include <functional>
+#include <mutex>
+#include <stdexcept>
+#include <thread>
+
+namespace pysagittarius {
+
+// 单调时钟秒数, 与 Python 的 time.monotonic() 使用同一时钟
+inline double monotonic_seconds() {
+    return std::chrono::duration<double>(std::chrono::steady_clock::now().time_since_epoch()).count();
+}
+
+// 一次关节状态采样
+struct JointSample {
+    bool valid = false;
+    float js[7] = {0, 0, 0, 0, 0, 0, 0};
+    double stamp = 0.0;  // monotonic_seconds()
+    uint64_t seq = 0;    // 每次成功读取递增
+};
+
+// 后台关节状态轮询器
+// 工作线程按固定频率调用 read 刷新 7 关节缓存, 读取缓存只持有很短的内存锁, 不会等待串口
+class JointStatePoller {
+public:
+    using ReadFn = std::function<bool(float *)>;
+
+    explicit JointStatePoller(ReadFn read) : read_(std::move(read)) {}
+    ~JointStatePoller() { Stop(); }
+
+    JointStatePoller(const JointStatePoller &) = delete;
+    JointStatePoller &operator=(const JointStatePoller &) = delete;
+
+    // 已经在运行时先停止旧线程再按新参数启动
+    void Start(double rate_hz, double max_age_s) {
+        if (rate_hz <= 0) {
+            throw std::invalid_argument("rate_hz must be positive");
+        }
+        std::lock_guard<std::mutex> lifecycle(lifecycle_mutex_);
+        StopLocked();
+        period_s_ = 1.0 / rate_hz;
+        max_age_s_ = max_age_s;
+        {
+            std::lock_guard<std::mutex> lock(wake_mutex_);
+            running_ = true;
+        }
+        thread_ = std::thread(&JointStatePoller::Run, this);
+    }
+
+    void Stop() {
+        std::lock_guard<std::mutex> lifecycle(lifecycle_mutex_);
+        StopLocked();
+    }
+
+    bool Running() const { return running_; }
+    double Period() const { return period_s_; }
+    double MaxAge() const { return max_age_s_; }
+    uint64_t Failures() const { return failures_; }
+
+    // 最新缓存样本, 不触发串口读取
+    JointSample Latest() const {
+        std::lock_guard<std::mutex> lock(sample_mutex_);
+        return sample_;
+    }
+
+    // 缓存样本比 max_age_s 更旧 (或尚无样本) 时同步读取一次, 否则直接返回缓存
+    // max_age_s < 0 时使用 Start 时设置的阈值
+    JointSample Fresh(double max_age_s) {
+        if (max_age_s < 0) {
+            max_age_s = max_age_s_;
+        }
+        JointSample sample = Latest();
+        if (sample.valid && monotonic_seconds() - sample.stamp <= max_age_s) {
+            return sample;
+        }
+        return Poll();
+    }
+
+    // 同步读取一次并更新缓存, 失败时保留上一个有效样本
+    JointSample Poll() {
+        float js[7];
+        bool ok = read_(js);
+        double stamp = monotonic_seconds();
+        std::lock_guard<std::mutex> lock(sample_mutex_);
+        if (ok) {
+            std::copy(js, js + 7, sample_.js);
+            sample_.valid = true;
+            sample_.stamp = stamp;
+            sample_.seq++;
+            return sample_;
+        }
+        failures_++;
+        JointSample failed = sample_;
+        failed.valid = false;
+        return failed;
+    }
+
+private:
+    // 需要持有 lifecycle_mutex_
+    void StopLocked() {
+        {
+            std::lock_guard<std::mutex> lock(wake_mutex_);
+            running_ = false;
+        }
+        wake_.notify_all();
+        if (thread_.joinable()) {
+            thread_.join();
+        }
+    }
+
+    void Run() {
+        auto period = std::chrono::duration_cast<std::chrono::steady_clock::duration>(
+            std::chrono::duration<double>(period_s_.load()));
+        auto next = std::chrono::steady_clock::now();
+        std::unique_lock<std::mutex> lock(wake_mutex_);
+        while (running_) {
+            lock.unlock();
+            Poll();
+            lock.lock();
+            next += period;
+            auto now = std::chrono::steady_clock::now();
+            if (next < now) {
+                // 读取耗时超过周期时不补发, 直接从当前时刻重新计时
+                next = now;
+            }
+            wake_.wait_until(lock, next, [this]() { return !running_; });
+        }
+    }
+
+    ReadFn read_;
+    // Start / Stop 可能同时从多个 Python 线程调用, 由 lifecycle_mutex_ 串行化, 保护 thread_
+    std::mutex lifecycle_mutex_;
+    std::thread thread_;
+    std::atomic<bool> running_{false};
+    std::atomic<uint64_t> failures_{0};
+    // Python 线程在 Start 中写入, 轮询线程和 Fresh 读取
+    std::atomic<double> period_s_{0.02};
+    std::atomic<double> max_age_s_{0.1};
+
+    mutable std::mutex sample_mutex_;
+    JointSample sample_;
+
+    std::mutex wake_mutex_;
+    std::condition_variable wake_;
+};
+
+}  // namespace pysagittarius
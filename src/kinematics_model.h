@@ -0,0 +1,208 @@
+#pragma once
+
+// Sagittarius 机械臂的指数积运动学模型
+// 螺旋轴和零位位姿与 SDK 的 SagittariusArmKinematics 以及 pysagittarius/kinematics.py 保持一致,
+// 绑定层需要种子、雅可比等 SDK 未提供的功能时使用这里的实现
+
+#include <Eigen/Dense>
+#include <algorithm>
+#include <cmath>
+
+namespace pysagittarius {
+
+using Vector6d = Eigen::Matrix<double, 6, 1>;
+using Matrix6d = Eigen::Matrix<double, 6, 6>;
+
+struct ArmModel {
+    Matrix6d Slist;    // 空间坐标系螺旋轴, 每列为 (w, v)
+    Eigen::Matrix4d M;  // 零位末端位姿, 含工具偏移
+
+    explicit ArmModel(double x = 0, double y = 0, double z = 0) {
+        Slist << 0, 0, 0, 1, 0, 1,
+                 0, 1, 1, 0, 1, 0,
+                 1, 0, 0, 0, 0, 0,
+                 0, -0.125, -0.304, 0, -0.304, 0,
+                 0, 0, 0, 0.304, 0, 0.304,
+                 0, 0, 0.045, 0, 0.1795, 0;
+        M << 1, 0, 0, 0.2585 + x,
+             0, 1, 0, y,
+             0, 0, 1, 0.304 + z,
+             0, 0, 0, 1;
+    }
+};
+
+inline Eigen::Matrix3d skew(const Eigen::Vector3d &w) {
+    Eigen::Matrix3d m;
+    m << 0, -w(2), w(1),
+         w(2), 0, -w(0),
+         -w(1), w(0), 0;
+    return m;
+}
+
+// 单位转轴螺旋 S 转过 theta 的矩阵指数
+inline Eigen::Matrix4d exp6(const Vector6d &S, double theta) {
+    Eigen::Matrix3d w = skew(S.head<3>());
+    Eigen::Matrix3d w2 = w * w;
+    double s = std::sin(theta), c = 1 - std::cos(theta);
+    Eigen::Matrix4d T = Eigen::Matrix4d::Identity();
+    T.topLeftCorner<3, 3>() = Eigen::Matrix3d::Identity() + s * w + c * w2;
+    T.topRightCorner<3, 1>() = (Eigen::Matrix3d::Identity() * theta + c * w + (theta - s) * w2) * S.tail<3>();
+    return T;
+}
+
+inline Eigen::Matrix4d trans_inv(const Eigen::Matrix4d &T) {
+    Eigen::Matrix4d inv = Eigen::Matrix4d::Identity();
+    Eigen::Matrix3d Rt = T.topLeftCorner<3, 3>().transpose();
+    inv.topLeftCorner<3, 3>() = Rt;
+    inv.topRightCorner<3, 1>() = -Rt * T.topRightCorner<3, 1>();
+    return inv;
+}
+
+inline Matrix6d adjoint(const Eigen::Matrix4d &T) {
+    Matrix6d ad = Matrix6d::Zero();
+    Eigen::Matrix3d R = T.topLeftCorner<3, 3>();
+    ad.topLeftCorner<3, 3>() = R;
+    ad.bottomRightCorner<3, 3>() = R;
+    ad.bottomLeftCorner<3, 3>() = skew(T.topRightCorner<3, 1>()) * R;
+    return ad;
+}
+
+// 齐次变换的矩阵对数, 返回螺旋坐标 (w * theta, v * theta)
+inline Vector6d log6(const Eigen::Matrix4d &T) {
+    Eigen::Matrix3d R = T.topLeftCorner<3, 3>();
+    Eigen::Vector3d p = T.topRightCorner<3, 1>();
+    Vector6d V;
+    double cos_theta = std::max(-1.0, std::min(1.0, (R.trace() - 1) / 2));
+    double theta = std::acos(cos_theta);
+    if (theta < 1e-9) {
+        V << 0, 0, 0, p;
+        return V;
+    }
+    Eigen::Vector3d w;
+    if (M_PI - theta < 1e-6) {
+        // 转角接近 pi, 从对角元素恢复转轴
+        int k = 0;
+        R.diagonal().maxCoeff(&k);
+        w = (R.col(k) + Eigen::Matrix3d::Identity().col(k)) / std::sqrt(2 * (1 + R(k, k)));
+    } else {
+        w << R(2, 1) - R(1, 2), R(0, 2) - R(2, 0), R(1, 0) - R(0, 1);
+        w /= 2 * std::sin(theta);
+    }
+    Eigen::Matrix3d W = skew(w);
+    Eigen::Matrix3d Ginv = Eigen::Matrix3d::Identity() / theta - W / 2 +
+                           (1 / theta - 0.5 / std::tan(theta / 2)) * W * W;
+    V << w * theta, Ginv * p * theta;
+    return V;
+}
+
+inline Eigen::Matrix4d fkin_space(const ArmModel &model, const double *theta) {
+    Eigen::Matrix4d T = Eigen::Matrix4d::Identity();
+    for (int j = 0; j < 6; j++) {
+        T = T * exp6(model.Slist.col(j), theta[j]);
+    }
+    return T * model.M;
+}
+
+// 空间雅可比, 第 j 列为 Ad(e^[S1]θ1 ... e^[Sj-1]θj-1) Sj
+inline Matrix6d jacobian_space(const ArmModel &model, const double *theta) {
+    Matrix6d J;
+    Eigen::Matrix4d T = Eigen::Matrix4d::Identity();
+    for (int j = 0; j < 6; j++) {
+        J.col(j) = adjoint(T) * model.Slist.col(j);
+        T = T * exp6(model.Slist.col(j), theta[j]);
+    }
+    return J;
+}
+
+// 物体雅可比, 末端坐标系下表示: Jb = Ad(T_sb^-1) Js
+inline Matrix6d jacobian_body(const ArmModel &model, const double *theta) {
+    return adjoint(trans_inv(fkin_space(model, theta))) * jacobian_space(model, theta);
+}
+
+// 阻尼最小二乘的微分逆解: 末端以 twist (w, v) 运动 dt 秒, 关节角增量加到 theta 上
+// 距限位不足 margin 且仍朝限位运动的关节按剩余距离降低权重, 结果限制在限位内
+inline void velocity_step(const ArmModel &model, double theta[6], const Vector6d &twist, bool body, double dt,
+                          double damping, double margin, const float *lower, const float *upper) {
+    Matrix6d J = body ? jacobian_body(model, theta) : jacobian_space(model, theta);
+    Vector6d target = twist * dt;
+    Vector6d weight = Vector6d::Ones();
+    Vector6d dq;
+    for (int pass = 0; pass < 2; pass++) {
+        Matrix6d Jw = J * weight.asDiagonal();
+        dq = weight.asDiagonal() * Jw.transpose() *
+             (Jw * Jw.transpose() + damping * damping * Matrix6d::Identity()).ldlt().solve(target);
+        bool limited = false;
+        for (int j = 0; j < 6 && margin > 0; j++) {
+            double room = dq(j) > 0 ? upper[j] - theta[j] : theta[j] - lower[j];
+            if (dq(j) != 0 && room < margin) {
+                weight(j) = std::max(0.0, room) / margin;
+                limited = true;
+            }
+        }
+        if (!limited) {
+            break;
+        }
+    }
+    for (int j = 0; j < 6; j++) {
+        theta[j] = std::max<double>(lower[j], std::min<double>(upper[j], theta[j] + dq(j)));
+    }
+}
+
+// 姿态: R = Rz(yaw) Ry(pitch) Rx(roll), 角度为度, 与 SDK 的欧拉角接口一致
+inline Eigen::Matrix4d pose_from_euler(double x, double y, double z, double roll, double pitch, double yaw) {
+    Eigen::Matrix4d T = Eigen::Matrix4d::Identity();
+    T.topLeftCorner<3, 3>() = (Eigen::AngleAxisd(yaw * M_PI / 180, Eigen::Vector3d::UnitZ()) *
+                               Eigen::AngleAxisd(pitch * M_PI / 180, Eigen::Vector3d::UnitY()) *
+                               Eigen::AngleAxisd(roll * M_PI / 180, Eigen::Vector3d::UnitX()))
+                                  .toRotationMatrix();
+    T.topRightCorner<3, 1>() << x, y, z;
+    return T;
+}
+
+inline Eigen::Matrix4d pose_from_quaternion(double x, double y, double z, double ox, double oy, double oz, double ow) {
+    Eigen::Matrix4d T = Eigen::Matrix4d::Identity();
+    T.topLeftCorner<3, 3>() = Eigen::Quaterniond(ow, ox, oy, oz).normalized().toRotationMatrix();
+    T.topRightCorner<3, 1>() << x, y, z;
+    return T;
+}
+
+inline double wrap_angle(double a) { return std::atan2(std::sin(a), std::cos(a)); }
+
+struct IkResult {
+    bool success = false;
+    int iterations = 0;
+};
+
+// 牛顿-拉夫森数值逆解 (与 Modern Robotics 的 IKinSpace 相同), theta 为初值并写回结果
+// 收敛后角度归一化到 [-pi, pi], 超出关节限位视为失败
+inline IkResult ikin_space(const ArmModel &model, const Eigen::Matrix4d &T, double theta[6], double eomg, double ev,
+                           const float *lower, const float *upper, int max_iterations = 20) {
+    IkResult result;
+    Eigen::Map<Vector6d> th(theta);
+    auto twist = [&]() {
+        Eigen::Matrix4d Tsb = fkin_space(model, theta);
+        return Vector6d(adjoint(Tsb) * log6(trans_inv(Tsb) * T));
+    };
+    Vector6d Vs = twist();
+    bool err = Vs.head<3>().norm() > eomg || Vs.tail<3>().norm() > ev;
+    while (err && result.iterations < max_iterations) {
+        Matrix6d J = jacobian_space(model, theta);
+        th += J.completeOrthogonalDecomposition().pseudoInverse() * Vs;
+        result.iterations++;
+        Vs = twist();
+        err = Vs.head<3>().norm() > eomg || Vs.tail<3>().norm() > ev;
+    }
+    if (err) {
+        return result;
+    }
+    result.success = true;
+    for (int j = 0; j < 6; j++) {
+        theta[j] = wrap_angle(theta[j]);
+        if (theta[j] < lower[j] || theta[j] > upper[j]) {
+            result.success = false;
+        }
+    }
+    return result;
+}
+
+}  // namespace pysagittarius
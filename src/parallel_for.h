@@ -0,0 +1,68 @@
+#pragma once
+
+#include <algorithm>
+#include <cstddef>
+#include <exception>
+#include <thread>
+#include <vector>
+
+namespace pysagittarius {
+
+// 计算实际使用的工作线程数
+// num_threads <= 0 时使用全部硬件线程, 每个线程至少分到 min_chunk 个元素
+inline int resolve_num_threads(int num_threads, size_t n, size_t min_chunk = 1) {
+    if (num_threads <= 0) {
+        num_threads = static_cast<int>(std::thread::hardware_concurrency());
+        if (num_threads <= 0) {
+            num_threads = 1;
+        }
+    }
+    if (min_chunk == 0) {
+        min_chunk = 1;
+    }
+    size_t max_threads = std::max<size_t>(1, n / min_chunk);
+    return static_cast<int>(std::min<size_t>(static_cast<size_t>(num_threads), max_threads));
+}
+
+// 把 [0, n) 均匀切块, 每个工作线程调用一次 fn(begin, end)
+// 调用方负责在进入前释放 GIL, fn 内不能触碰 Python 对象
+template <typename Fn>
+void parallel_for(size_t n, int num_threads, size_t min_chunk, Fn fn) {
+    if (n == 0) {
+        return;
+    }
+    int threads = resolve_num_threads(num_threads, n, min_chunk);
+    if (threads == 1) {
+        fn(static_cast<size_t>(0), n);
+        return;
+    }
+
+    std::vector<std::thread> workers;
+    std::vector<std::exception_ptr> errors(threads);
+    workers.reserve(threads);
+    size_t chunk = (n + threads - 1) / threads;
+    for (int t = 0; t < threads; t++) {
+        size_t begin = t * chunk;
+        size_t end = std::min(n, begin + chunk);
+        if (begin >= end) {
+            break;
+        }
+        workers.emplace_back([&fn, &errors, t, begin, end]() {
+            try {
+                fn(begin, end);
+            } catch (...) {
+                errors[t] = std::current_exception();
+            }
+        });
+    }
+    for (auto &w : workers) {
+        w.join();
+    }
+    for (auto &e : errors) {
+        if (e) {
+            std::rethrow_exception(e);
+        }
+    }
+}
+
+}  // namespace pysagittarius
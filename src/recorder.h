@@ -0,0 +1,122 @@
+#pragma once
+
+// 命令和关节状态的环形记录文件
+// 文件通过 mmap 映射, 控制路径上每条记录只写入映射内存, 不分配内存也不调用 Python;
+// 写满后从头覆盖最旧的记录. pysagittarius/recording.py 按相同布局以 NumPy 结构化数组读取
+
+#include <fcntl.h>
+#include <sys/mman.h>
+#include <unistd.h>
+
+#include <atomic>
+#include <cerrno>
+#include <cstdint>
+#include <cstring>
+#include <new>
+#include <stdexcept>
+#include <string>
+
+#include "src/joint_state_poller.h"
+
+namespace pysagittarius {
+
+enum RecordKind : uint32_t {
+    kRecordAllServoRadian = 1,    // SetAllServoRadian, values[0..5]
+    kRecordServoRadianIndex = 2,  // SetServoRadianWithIndex, values[id - 1]
+    kRecordGripper = 3,           // arm_set_gripper_linear_position, values[6] 为直线位置 (米)
+    kRecordJointStatus = 4,       // GetCurrentJointStatus, values[0..6], status 为是否成功
+    kRecordArmGripper = 5,        // SetAllServoRadianAndGripper, values[0..5] 为关节, values[6] 为夹爪直线位置
+};
+
+// 文件头, 64 字节
+struct RecordingHeader {
+    char magic[8];
+    uint32_t version;
+    uint32_t record_size;
+    uint64_t capacity;
+    std::atomic<uint64_t> next;  // 已写入的记录总数 (含被覆盖的), 第 n 条记录位于 n % capacity
+    uint8_t reserved[32];
+};
+
+// 一条记录, 64 字节
+struct RecordEntry {
+    double stamp;               // monotonic_seconds()
+    std::atomic<uint64_t> seq;  // 写入时先清零, 写完后设为 n + 1; 读取时据此丢弃未写完或已被覆盖的记录
+    uint32_t kind;
+    uint32_t mask;              // values 中有效的元素, 第 i 位对应 values[i]
+    float values[7];
+    int32_t status;
+    uint32_t reserved[2];
+};
+
+static_assert(sizeof(RecordingHeader) == 64, "RecordingHeader must be 64 bytes");
+static_assert(sizeof(RecordEntry) == 64, "RecordEntry must be 64 bytes");
+
+class Recorder {
+public:
+    static constexpr uint32_t kVersion = 1;
+
+    Recorder(const std::string &path, uint64_t capacity) : path_(path) {
+        if (capacity == 0) {
+            throw std::runtime_error("capacity must be positive");
+        }
+        size_ = sizeof(RecordingHeader) + capacity * sizeof(RecordEntry);
+        int fd = ::open(path.c_str(), O_RDWR | O_CREAT | O_TRUNC, 0644);
+        if (fd < 0) {
+            throw std::runtime_error("Failed to open " + path + ": " + std::strerror(errno));
+        }
+        if (::ftruncate(fd, static_cast<off_t>(size_)) != 0) {
+            int err = errno;
+            ::close(fd);
+            throw std::runtime_error("Failed to resize " + path + ": " + std::strerror(err));
+        }
+        void *p = ::mmap(nullptr, size_, PROT_READ | PROT_WRITE, MAP_SHARED, fd, 0);
+        ::close(fd);
+        if (p == MAP_FAILED) {
+            throw std::runtime_error("Failed to map " + path + ": " + std::strerror(errno));
+        }
+        // 新文件内容全为 0, 即所有记录的 seq 都为 0 (未写入)
+        header_ = new (p) RecordingHeader();
+        std::memcpy(header_->magic, Magic(), sizeof(header_->magic));
+        header_->version = kVersion;
+        header_->record_size = sizeof(RecordEntry);
+        header_->capacity = capacity;
+        header_->next.store(0);
+        entries_ = reinterpret_cast<RecordEntry *>(static_cast<char *>(p) + sizeof(RecordingHeader));
+    }
+
+    ~Recorder() { ::munmap(header_, size_); }
+
+    Recorder(const Recorder &) = delete;
+    Recorder &operator=(const Recorder &) = delete;
+
+    const std::string &path() const { return path_; }
+    uint64_t capacity() const { return header_->capacity; }
+    uint64_t count() const { return header_->next.load(std::memory_order_relaxed); }
+
+    // values 中按 mask 写入有效元素, 其余置零; 可以从多个线程同时调用
+    void Append(uint32_t kind, uint32_t mask, const float *values, int32_t status = 0) {
+        uint64_t n = header_->next.fetch_add(1, std::memory_order_relaxed);
+        RecordEntry &e = entries_[n % header_->capacity];
+        e.seq.store(0, std::memory_order_relaxed);
+        std::atomic_thread_fence(std::memory_order_release);
+        e.stamp = monotonic_seconds();
+        e.kind = kind;
+        e.mask = mask;
+        for (int i = 0; i < 7; i++) {
+            e.values[i] = (mask >> i) & 1u ? values[i] : 0.0f;
+        }
+        e.status = status;
+        e.seq.store(n + 1, std::memory_order_release);
+    }
+
+    static const char *Magic() { return "PSREC001"; }
+
+private:
+    std::string path_;
+    size_t size_ = 0;
+    RecordingHeader *header_ = nullptr;
+    RecordEntry *entries_ = nullptr;
+};
+
+}  // namespace pysagittarius
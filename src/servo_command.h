@@ -0,0 +1,39 @@
+#pragma once
+
+// 按舵机编号下发的命令缓冲
+// 控制循环里反复 Set/Clear 后直接传给 SetServoRadianWithIndex, 不需要每个周期创建 ServoStruct 列表
+
+#include <stdexcept>
+
+#include "sagittarius_sdk/sdk_sagittarius_arm/sdk_sagittarius_arm_real.h"
+
+namespace pysagittarius {
+
+// SDK 的 SetServoRadianWithIndex 一次最多 6 个舵机
+constexpr int kMaxServoCommands = 6;
+
+class ServoCommandBuffer {
+public:
+    // 同一舵机重复设置时只保留最后的值
+    void Set(unsigned char id, float value) {
+        for (int i = 0; i < count; i++) {
+            if (servos[i].id == id) {
+                servos[i].value = value;
+                return;
+            }
+        }
+        if (count == kMaxServoCommands) {
+            throw std::runtime_error("Number of servos cannot exceed 6");
+        }
+        servos[count].id = id;
+        servos[count].value = value;
+        count++;
+    }
+
+    void Clear() { count = 0; }
+
+    ServoStruct servos[kMaxServoCommands];
+    int count = 0;
+};
+
+}  // namespace pysagittarius
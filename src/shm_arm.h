@@ -0,0 +1,430 @@
+#pragma once
+
+// 多进程共享一台机械臂的共享内存段
+// 服务进程独占串口, 把关节状态和舵机信息用顺序锁 (seqlock) 发布到 POSIX 共享内存, 读者不会阻塞服务进程;
+// 每个客户端占用一个槽位, 槽位内是单生产者单消费者的无锁命令队列. 服务进程没有命令时在 futex 上等待,
+// 客户端写入命令后按需唤醒
+
+#include <fcntl.h>
+#include <linux/futex.h>
+#include <signal.h>
+#include <sys/mman.h>
+#include <sys/stat.h>
+#include <sys/syscall.h>
+#include <unistd.h>
+
+#include <algorithm>
+#include <atomic>
+#include <chrono>
+#include <cerrno>
+#include <climits>
+#include <cstdint>
+#include <cstring>
+#include <mutex>
+#include <new>
+#include <stdexcept>
+#include <string>
+#include <thread>
+
+#include "src/joint_state_poller.h"
+
+namespace pysagittarius {
+namespace shm {
+
+constexpr int kMaxClients = 8;
+constexpr uint32_t kQueueCapacity = 256;  // 2 的幂
+constexpr uint32_t kVersion = 1;
+
+// 命令种类, 1~3 与记录文件 (src/recorder.h) 的 RecordKind 相同
+enum CommandKind : uint32_t {
+    kCmdAllServoRadian = 1,      // values[0..5]
+    kCmdServoRadianIndex = 2,    // values[id - 1], mask 的第 id - 1 位
+    kCmdGripper = 3,             // values[6] 为夹爪直线位置 (米)
+    kCmdControlTorque = 4,       // ints[0]: 1 为 lock, 0 为 free
+    kCmdServoVelocity = 5,       // ints[0]
+    kCmdServoAcceleration = 6,   // ints[0]
+    kCmdServoTorque = 7,         // ints[0..6]
+    kCmdFreeAfterDestructor = 8, // ints[0]
+    kCmdArmGripper = 9,          // values[0..5] 为关节, values[6] 为夹爪直线位置
+};
+
+// 一条命令, 64 字节
+struct Command {
+    uint32_t kind;
+    uint32_t mask;
+    float values[7];
+    int32_t ints[7];
+};
+
+static_assert(sizeof(Command) == 64, "Command must be 64 bytes");
+
+// 服务进程发布的状态
+struct ArmState {
+    double stamp;          // 关节状态读取时刻, monotonic_seconds()
+    uint64_t reads;        // 关节状态读取次数
+    int32_t js_valid;
+    float js[7];
+    double info_stamp;     // 舵机信息读取时刻
+    uint8_t info_valid[8];
+    int16_t info[7][4];
+    uint64_t commands;     // 已执行的命令数
+};
+
+// 客户端槽位: pid 为 0 表示空闲; head 只由客户端写, tail 只由服务进程写
+struct ClientSlot {
+    alignas(64) std::atomic<int32_t> pid;
+    std::atomic<uint64_t> dropped;  // 队列满时丢弃的命令数
+    alignas(64) std::atomic<uint64_t> head;
+    alignas(64) std::atomic<uint64_t> tail;
+    alignas(64) Command commands[kQueueCapacity];
+};
+
+struct Segment {
+    char magic[8];
+    uint32_t version;
+    uint32_t size;
+    std::atomic<int32_t> server_pid;
+    std::atomic<uint32_t> doorbell;        // 每写入一条命令加 1, 服务进程在上面 futex 等待
+    std::atomic<uint32_t> server_waiting;  // 服务进程正在等待, 客户端需要唤醒
+    std::atomic<double> heartbeat;         // 服务进程最近一次活动的 monotonic_seconds()
+    float lower_joint_limits[7];
+    float upper_joint_limits[7];
+    alignas(64) std::atomic<uint64_t> state_seq;  // 奇数表示正在写入
+    ArmState state;
+    ClientSlot clients[kMaxClients];
+};
+
+inline const char *Magic() { return "PSSHARM1"; }
+
+inline bool process_alive(int32_t pid) { return pid > 0 && (::kill(pid, 0) == 0 || errno == EPERM); }
+
+inline void futex_wait(std::atomic<uint32_t> &word, uint32_t expected, double timeout_s) {
+    timespec ts;
+    ts.tv_sec = static_cast<time_t>(timeout_s);
+    ts.tv_nsec = static_cast<long>((timeout_s - ts.tv_sec) * 1e9);
+    ::syscall(SYS_futex, reinterpret_cast<uint32_t *>(&word), FUTEX_WAIT, expected, &ts, nullptr, 0);
+}
+
+inline void futex_wake(std::atomic<uint32_t> &word) {
+    ::syscall(SYS_futex, reinterpret_cast<uint32_t *>(&word), FUTEX_WAKE, INT_MAX, nullptr, nullptr, 0);
+}
+
+// 映射共享内存段, create 为 true 时新建 (已存在时由调用者处理)
+inline Segment *map_segment(const std::string &name, bool create) {
+    int fd = create ? ::shm_open(name.c_str(), O_RDWR | O_CREAT | O_EXCL, 0666) : ::shm_open(name.c_str(), O_RDWR, 0);
+    if (fd < 0) {
+        return nullptr;
+    }
+    if (create && ::ftruncate(fd, sizeof(Segment)) != 0) {
+        int err = errno;
+        ::close(fd);
+        ::shm_unlink(name.c_str());
+        throw std::runtime_error("Failed to resize shared memory " + name + ": " + std::strerror(err));
+    }
+    struct stat st;
+    if (!create && (::fstat(fd, &st) != 0 || static_cast<size_t>(st.st_size) < sizeof(Segment))) {
+        ::close(fd);
+        throw std::runtime_error("Shared memory " + name + " is not an arm server segment");
+    }
+    void *p = ::mmap(nullptr, sizeof(Segment), PROT_READ | PROT_WRITE, MAP_SHARED, fd, 0);
+    ::close(fd);
+    if (p == MAP_FAILED) {
+        throw std::runtime_error("Failed to map shared memory " + name + ": " + std::strerror(errno));
+    }
+    return static_cast<Segment *>(p);
+}
+
+}  // namespace shm
+
+// 服务进程一侧: 创建共享内存段, 发布状态, 取出客户端命令
+class SharedArmServer {
+public:
+    SharedArmServer(const std::string &name, const float *lower, const float *upper) : name_(name) {
+        int err = 0;
+        for (int attempt = 0; attempt < kCreateAttempts && segment_ == nullptr; attempt++) {
+            segment_ = shm::map_segment(name, true);
+            err = errno;
+            if (segment_ != nullptr || err != EEXIST) {
+                break;
+            }
+            // 上一个服务进程没有正常退出时回收它留下的段
+            shm::Segment *old = shm::map_segment(name, false);
+            if (old == nullptr) {
+                if (errno == ENOENT) {
+                    // 旧的段在两次 shm_open 之间被删除, 重新创建
+                    continue;
+                }
+                throw std::runtime_error("Failed to open existing shared memory " + name + ": " +
+                                         std::strerror(errno));
+            }
+            bool alive = std::memcmp(old->magic, shm::Magic(), 8) == 0 && shm::process_alive(old->server_pid.load());
+            ::munmap(old, sizeof(shm::Segment));
+            if (alive) {
+                throw std::runtime_error("Another arm server is using " + name);
+            }
+            ::shm_unlink(name.c_str());
+        }
+        if (segment_ == nullptr) {
+            throw std::runtime_error("Failed to create shared memory " + name + ": " + std::strerror(err));
+        }
+        // 新建的段内容全为 0
+        new (segment_) shm::Segment();
+        segment_->version = shm::kVersion;
+        segment_->size = sizeof(shm::Segment);
+        std::copy(lower, lower + 7, segment_->lower_joint_limits);
+        std::copy(upper, upper + 7, segment_->upper_joint_limits);
+        segment_->heartbeat.store(monotonic_seconds());
+        segment_->server_pid.store(::getpid());
+        // 魔数最后写入, 客户端看到魔数时其余字段已经初始化
+        std::atomic_thread_fence(std::memory_order_release);
+        std::memcpy(segment_->magic, shm::Magic(), 8);
+    }
+
+    ~SharedArmServer() { Close(); }
+
+    // 删除共享内存段, 已连接的客户端不再收到更新; 之后其他方法抛出异常, 可以重复调用.
+    // 不能与其他方法同时调用
+    void Close() {
+        if (segment_ == nullptr) {
+            return;
+        }
+        segment_->server_pid.store(0);
+        ::munmap(segment_, sizeof(shm::Segment));
+        ::shm_unlink(name_.c_str());
+        segment_ = nullptr;
+    }
+
+    bool Closed() const { return segment_ == nullptr; }
+
+    SharedArmServer(const SharedArmServer &) = delete;
+    SharedArmServer &operator=(const SharedArmServer &) = delete;
+
+    const std::string &name() const { return name_; }
+
+    void PublishJointStatus(bool valid, const float *js) {
+        CheckOpen();
+        Write([&](shm::ArmState &s) {
+            s.stamp = monotonic_seconds();
+            s.reads++;
+            s.js_valid = valid;
+            std::copy(js, js + 7, s.js);
+        });
+    }
+
+    void PublishServoInfo(const bool *valid, const int16_t *info) {
+        CheckOpen();
+        Write([&](shm::ArmState &s) {
+            s.info_stamp = monotonic_seconds();
+            for (int i = 0; i < 7; i++) {
+                s.info_valid[i] = valid[i];
+                std::copy(info + 4 * i, info + 4 * i + 4, s.info[i]);
+            }
+        });
+    }
+
+    void Heartbeat() {
+        CheckOpen();
+        segment_->heartbeat.store(monotonic_seconds(), std::memory_order_relaxed);
+    }
+
+    // 按槽位轮流取出最多 max 条命令, 同一客户端的命令保持顺序
+    size_t PopCommands(shm::Command *out, size_t max) {
+        CheckOpen();
+        size_t n = 0;
+        bool more = true;
+        while (n < max && more) {
+            more = false;
+            for (auto &slot : segment_->clients) {
+                uint64_t tail = slot.tail.load(std::memory_order_relaxed);
+                if (n == max || tail == slot.head.load(std::memory_order_acquire)) {
+                    continue;
+                }
+                out[n++] = slot.commands[tail % shm::kQueueCapacity];
+                slot.tail.store(tail + 1, std::memory_order_release);
+                more = true;
+            }
+        }
+        if (n > 0) {
+            Write([n](shm::ArmState &s) { s.commands += n; });
+        }
+        return n;
+    }
+
+    // 所有队列都为空时等待客户端写入, 最多 timeout_s 秒; 返回是否有待处理的命令
+    bool WaitCommands(double timeout_s) {
+        CheckOpen();
+        if (Pending()) {
+            return true;
+        }
+        segment_->server_waiting.store(1);
+        uint32_t bell = segment_->doorbell.load();
+        if (!Pending() && timeout_s > 0) {
+            shm::futex_wait(segment_->doorbell, bell, timeout_s);
+        }
+        segment_->server_waiting.store(0);
+        return Pending();
+    }
+
+    // 回收进程已经退出的客户端槽位, 丢弃它们没有执行的命令; 返回回收的槽位数
+    int ReapClients() {
+        CheckOpen();
+        int reaped = 0;
+        for (auto &slot : segment_->clients) {
+            int32_t pid = slot.pid.load();
+            if (pid != 0 && !shm::process_alive(pid)) {
+                slot.tail.store(slot.head.load());
+                slot.pid.store(0);
+                reaped++;
+            }
+        }
+        return reaped;
+    }
+
+    int Clients() const {
+        CheckOpen();
+        int n = 0;
+        for (const auto &slot : segment_->clients) {
+            n += slot.pid.load() != 0;
+        }
+        return n;
+    }
+
+private:
+    static constexpr int kCreateAttempts = 3;
+
+    void CheckOpen() const {
+        if (segment_ == nullptr) {
+            throw std::runtime_error("Arm server " + name_ + " is closed");
+        }
+    }
+
+    bool Pending() const {
+        for (const auto &slot : segment_->clients) {
+            if (slot.tail.load(std::memory_order_relaxed) != slot.head.load(std::memory_order_acquire)) {
+                return true;
+            }
+        }
+        return false;
+    }
+
+    // 顺序锁写入: 序号变为奇数, 修改状态, 序号变为偶数
+    template <typename Fn>
+    void Write(Fn fn) {
+        uint64_t seq = segment_->state_seq.load(std::memory_order_relaxed);
+        segment_->state_seq.store(seq + 1, std::memory_order_relaxed);
+        std::atomic_thread_fence(std::memory_order_release);
+        fn(segment_->state);
+        segment_->state_seq.store(seq + 2, std::memory_order_release);
+        Heartbeat();
+    }
+
+    std::string name_;
+    shm::Segment *segment_ = nullptr;
+};
+
+// 客户端一侧: 占用一个槽位写入命令, 读取服务进程发布的状态
+class SharedArmClient {
+public:
+    explicit SharedArmClient(const std::string &name) : name_(name) {
+        segment_ = shm::map_segment(name, false);
+        if (segment_ == nullptr) {
+            throw std::runtime_error("No arm server at " + name + ": " + std::strerror(errno));
+        }
+        if (std::memcmp(segment_->magic, shm::Magic(), 8) != 0 || segment_->version != shm::kVersion) {
+            ::munmap(segment_, sizeof(shm::Segment));
+            throw std::runtime_error("Shared memory " + name + " is not an arm server segment");
+        }
+        std::atomic_thread_fence(std::memory_order_acquire);
+        const int32_t pid = ::getpid();
+        for (auto &slot : segment_->clients) {
+            int32_t expected = 0;
+            if (slot.pid.compare_exchange_strong(expected, pid)) {
+                slot_ = &slot;
+                break;
+            }
+        }
+        if (slot_ == nullptr) {
+            ::munmap(segment_, sizeof(shm::Segment));
+            throw std::runtime_error("All " + std::to_string(shm::kMaxClients) + " client slots of " + name +
+                                     " are in use");
+        }
+    }
+
+    ~SharedArmClient() {
+        slot_->pid.store(0);
+        ::munmap(segment_, sizeof(shm::Segment));
+    }
+
+    SharedArmClient(const SharedArmClient &) = delete;
+    SharedArmClient &operator=(const SharedArmClient &) = delete;
+
+    const std::string &name() const { return name_; }
+    const float *LowerJointLimits() const { return segment_->lower_joint_limits; }
+    const float *UpperJointLimits() const { return segment_->upper_joint_limits; }
+    uint64_t Dropped() const { return slot_->dropped.load(); }
+
+    // 关节状态超过 max_age 秒没有更新时视为读取失败
+    double MaxStateAge() const { return max_state_age_; }
+    void SetMaxStateAge(double max_age) { max_state_age_ = max_age; }
+
+    // 队列满时等待的最长时间 (秒)
+    double CommandTimeout() const { return command_timeout_; }
+    void SetCommandTimeout(double timeout) { command_timeout_ = timeout; }
+
+    // 写入命令队列, 队列满时等待服务进程取出命令, timeout_s 秒后仍然满则丢弃并返回 false;
+    // 同一进程内的多个线程依次写入
+    bool Push(const shm::Command &command, double timeout_s) {
+        {
+            std::lock_guard<std::mutex> lock(push_mutex_);
+            uint64_t head = slot_->head.load(std::memory_order_relaxed);
+            const double deadline = monotonic_seconds() + timeout_s;
+            while (head - slot_->tail.load(std::memory_order_acquire) >= shm::kQueueCapacity) {
+                if (monotonic_seconds() >= deadline) {
+                    slot_->dropped.fetch_add(1, std::memory_order_relaxed);
+                    return false;
+                }
+                std::this_thread::sleep_for(std::chrono::microseconds(100));
+            }
+            slot_->commands[head % shm::kQueueCapacity] = command;
+            slot_->head.store(head + 1, std::memory_order_release);
+        }
+        segment_->doorbell.fetch_add(1);
+        if (segment_->server_waiting.load()) {
+            shm::futex_wake(segment_->doorbell);
+        }
+        return true;
+    }
+
+    // 顺序锁读取: 读取前后序号相同且为偶数时数据完整, 否则重试
+    shm::ArmState State() const {
+        shm::ArmState state;
+        while (true) {
+            uint64_t before = segment_->state_seq.load(std::memory_order_acquire);
+            if (before & 1u) {
+                std::this_thread::yield();
+                continue;
+            }
+            std::memcpy(&state, &segment_->state, sizeof(state));
+            std::atomic_thread_fence(std::memory_order_acquire);
+            if (segment_->state_seq.load(std::memory_order_relaxed) == before) {
+                return state;
+            }
+        }
+    }
+
+    // 服务进程仍在运行, 且 max_age 秒内有过活动
+    bool ServerAlive(double max_age) const {
+        return shm::process_alive(segment_->server_pid.load()) &&
+               monotonic_seconds() - segment_->heartbeat.load(std::memory_order_relaxed) <= max_age;
+    }
+
+private:
+    std::string name_;
+    shm::Segment *segment_ = nullptr;
+    shm::ClientSlot *slot_ = nullptr;
+    double max_state_age_ = 0.5;
+    double command_timeout_ = 1.0;
+    std::mutex push_mutex_;
+};
+
+}  // namespace pysagittarius
@@ -0,0 +1,374 @@
+#pragma once
+
+#include <algorithm>
+#include <chrono>
+#include <cmath>
+#include <condition_variable>
+#include <cstdint>
+#include <deque>
+#include <functional>
+#include <limits>
+#include <mutex>
+#include <stdexcept>
+#include <string>
+#include <thread>
+#include <vector>
+
+#include "src/joint_state_poller.h"
+
+namespace pysagittarius {
+
+// 执行进度, 在路点切换和轨迹结束时通过回调上报
+struct TrajectoryProgress {
+    std::string state;        // "idle" / "running" / "done" / "cancelled" / "preempted"
+    size_t waypoint = 0;      // 已经经过的最后一个路点下标
+    size_t num_waypoints = 0;
+    double elapsed = 0.0;     // 轨迹开始后的秒数
+    double duration = 0.0;    // 轨迹总时长
+    uint64_t setpoints = 0;   // 已发送的设定点数量
+    double max_lateness = 0.0;  // 发送时刻相对计划节拍的最大延迟 (秒)
+};
+
+// 原生轨迹执行器
+// 路点为 6 个关节弧度加夹爪直线位置 (NaN 表示不控制夹爪), 工作线程按固定频率线性插值并发送设定点,
+// 循环中不调用任何 Python 代码; 进度回调在单独的通知线程中执行
+class TrajectoryExecutor {
+public:
+    // setpoint[0..5] 为关节弧度, setpoint[6] 为夹爪位置, send_gripper 表示夹爪设定值有变化
+    using SendFn = std::function<void(const float *setpoint, bool send_gripper)>;
+    // 读取机械臂当前的 7 个关节状态, 失败返回 false
+    using ReadFn = std::function<bool(float *js)>;
+    using ProgressFn = std::function<void(const TrajectoryProgress &)>;
+
+    TrajectoryExecutor(SendFn send, ReadFn read) : send_(std::move(send)), read_(std::move(read)) {}
+    ~TrajectoryExecutor() { Shutdown(); }
+
+    TrajectoryExecutor(const TrajectoryExecutor &) = delete;
+    TrajectoryExecutor &operator=(const TrajectoryExecutor &) = delete;
+
+    // 替换 (抢占) 当前轨迹, times 相对于当前时刻, 必须严格递增
+    // 若 times[0] > 0, 从起点插值到第一个路点: 抢占正在执行的轨迹时起点为它最后发送的设定点,
+    // 否则起点为机械臂当前的关节状态 (两次执行之间可能有直接写入); 起点不控制夹爪
+    void Execute(const double *times, const float *points, size_t n, size_t width, double rate_hz,
+                 ProgressFn progress) {
+        if (rate_hz <= 0) {
+            throw std::invalid_argument("rate_hz must be positive");
+        }
+        std::vector<Waypoint> waypoints = MakeWaypoints(times, points, n, width, 0.0);
+        bool running;
+        {
+            std::lock_guard<std::mutex> lock(mutex_);
+            running = state_ == "running";
+        }
+        // 串口读取不持有 mutex_, 工作线程可以继续发送
+        float current[7];
+        bool have_current = false;
+        if (!running && waypoints.front().t > 0) {
+            if (!read_(current)) {
+                throw std::runtime_error("Failed to read the current joint state for the trajectory start");
+            }
+            have_current = true;
+        }
+        {
+            std::lock_guard<std::mutex> lock(mutex_);
+            bool preempt = state_ == "running";
+            if (preempt) {
+                Notify(MakeProgress("preempted"));
+            }
+            waypoints_.clear();
+            if (waypoints.front().t > 0 && (have_current || have_last_)) {
+                Waypoint start;
+                start.t = 0.0;
+                if (have_current && !preempt) {
+                    std::copy(current, current + 6, start.q);
+                    start.q[6] = std::numeric_limits<float>::quiet_NaN();
+                } else {
+                    // 读取期间另一次 Execute 开始了轨迹, 或者原来的轨迹刚刚结束, 从最后的设定点继续
+                    std::copy(last_setpoint_, last_setpoint_ + 7, start.q);
+                }
+                waypoints_.push_back(start);
+            }
+            if (!preempt) {
+                // 空闲期间夹爪可能被直接写入, 第一个设定点总是发送夹爪
+                have_last_ = false;
+            }
+            waypoints_.insert(waypoints_.end(), waypoints.begin(), waypoints.end());
+            period_ = 1.0 / rate_hz;
+            progress_ = std::move(progress);
+            StartLocked();
+        }
+        EnsureThreads();
+        wake_.notify_all();
+    }
+
+    // 在当前轨迹末尾追加路点, times 相对于队列中最后一个路点; 空闲时等同于 Execute
+    void Append(const double *times, const float *points, size_t n, size_t width, double rate_hz) {
+        ProgressFn progress;
+        {
+            std::lock_guard<std::mutex> lock(mutex_);
+            progress = progress_;
+            if (state_ == "running" && !waypoints_.empty()) {
+                double offset = waypoints_.back().t;
+                std::vector<Waypoint> waypoints = MakeWaypoints(times, points, n, width, offset);
+                if (waypoints.front().t <= offset) {
+                    throw std::invalid_argument("Appended times must be positive");
+                }
+                waypoints_.insert(waypoints_.end(), waypoints.begin(), waypoints.end());
+                wake_.notify_all();
+                return;
+            }
+        }
+        Execute(times, points, n, width, rate_hz, std::move(progress));
+    }
+
+    // 停止发送设定点, 机械臂停在最后一次发送的位置
+    void Cancel() {
+        std::lock_guard<std::mutex> lock(mutex_);
+        if (state_ == "running") {
+            state_ = "cancelled";
+            Notify(MakeProgress(state_));
+            done_.notify_all();
+        }
+        wake_.notify_all();
+    }
+
+    // 等待轨迹结束, 超时返回 false; timeout_s < 0 表示一直等待
+    bool Wait(double timeout_s) {
+        std::unique_lock<std::mutex> lock(mutex_);
+        auto finished = [this]() { return state_ != "running"; };
+        if (timeout_s < 0) {
+            done_.wait(lock, finished);
+            return true;
+        }
+        return done_.wait_for(lock, std::chrono::duration<double>(timeout_s), finished);
+    }
+
+    TrajectoryProgress Status() const {
+        std::lock_guard<std::mutex> lock(mutex_);
+        return MakeProgress(state_);
+    }
+
+    void Shutdown() {
+        {
+            std::lock_guard<std::mutex> lock(mutex_);
+            if (state_ == "running") {
+                state_ = "cancelled";
+                done_.notify_all();
+            }
+            stop_ = true;
+        }
+        wake_.notify_all();
+        notify_cv_.notify_all();
+        if (worker_.joinable()) {
+            worker_.join();
+        }
+        if (notifier_.joinable()) {
+            notifier_.join();
+        }
+        std::lock_guard<std::mutex> lock(mutex_);
+        progress_ = nullptr;
+        events_.clear();
+    }
+
+private:
+    struct Waypoint {
+        double t = 0.0;
+        float q[7];
+    };
+
+    struct Event {
+        ProgressFn fn;
+        TrajectoryProgress progress;
+    };
+
+    static std::vector<Waypoint> MakeWaypoints(const double *times, const float *points, size_t n, size_t width,
+                                               double offset) {
+        if (n == 0) {
+            throw std::invalid_argument("Trajectory must contain at least one waypoint");
+        }
+        if (width != 6 && width != 7) {
+            throw std::invalid_argument("Trajectory points must have shape (N, 6) or (N, 7)");
+        }
+        std::vector<Waypoint> waypoints(n);
+        for (size_t i = 0; i < n; i++) {
+            if (!std::isfinite(times[i]) || times[i] < 0 || (i > 0 && times[i] <= times[i - 1])) {
+                throw std::invalid_argument("Trajectory times must be non-negative and strictly increasing");
+            }
+            waypoints[i].t = times[i] + offset;
+            std::copy(points + i * width, points + i * width + 6, waypoints[i].q);
+            waypoints[i].q[6] = width == 7 ? points[i * width + 6] : std::numeric_limits<float>::quiet_NaN();
+        }
+        return waypoints;
+    }
+
+    void StartLocked() {
+        state_ = "running";
+        index_ = 0;
+        t0_ = monotonic_seconds();
+        next_tick_ = t0_;
+        setpoints_ = 0;
+        max_lateness_ = 0.0;
+        generation_++;
+    }
+
+    TrajectoryProgress MakeProgress(const std::string &state) const {
+        TrajectoryProgress p;
+        p.state = state;
+        p.waypoint = index_;
+        p.num_waypoints = waypoints_.size();
+        p.elapsed = state_ == "running" ? monotonic_seconds() - t0_ : elapsed_;
+        p.duration = waypoints_.empty() ? 0.0 : waypoints_.back().t;
+        p.setpoints = setpoints_;
+        p.max_lateness = max_lateness_;
+        return p;
+    }
+
+    // 需要持有 mutex_
+    void Notify(const TrajectoryProgress &progress) {
+        if (!progress_) {
+            return;
+        }
+        events_.push_back(Event{progress_, progress});
+        notify_cv_.notify_one();
+    }
+
+    void EnsureThreads() {
+        std::lock_guard<std::mutex> lock(threads_mutex_);
+        if (!worker_.joinable()) {
+            worker_ = std::thread(&TrajectoryExecutor::Run, this);
+        }
+        if (!notifier_.joinable()) {
+            notifier_ = std::thread(&TrajectoryExecutor::RunNotifier, this);
+        }
+    }
+
+    // 需要持有 mutex_, 计算 t 时刻的插值设定点并推进路点下标
+    void Interpolate(double t, float *setpoint) {
+        while (index_ + 1 < waypoints_.size() && waypoints_[index_ + 1].t <= t) {
+            index_++;
+            Notify(MakeProgress("running"));
+        }
+        const Waypoint &a = waypoints_[index_];
+        if (index_ + 1 >= waypoints_.size() || t <= a.t) {
+            std::copy(a.q, a.q + 7, setpoint);
+            return;
+        }
+        const Waypoint &b = waypoints_[index_ + 1];
+        double s = (t - a.t) / (b.t - a.t);
+        for (int j = 0; j < 7; j++) {
+            if (std::isnan(a.q[j]) || std::isnan(b.q[j])) {
+                setpoint[j] = std::isnan(b.q[j]) ? a.q[j] : b.q[j];
+            } else {
+                setpoint[j] = static_cast<float>(a.q[j] + (b.q[j] - a.q[j]) * s);
+            }
+        }
+    }
+
+    void Run() {
+        std::unique_lock<std::mutex> lock(mutex_);
+        while (!stop_) {
+            if (state_ != "running") {
+                wake_.wait(lock, [this]() { return stop_ || state_ == "running"; });
+                continue;
+            }
+            uint64_t generation = generation_;
+            double now = monotonic_seconds();
+            max_lateness_ = std::max(max_lateness_, now - next_tick_);
+            double t = now - t0_;
+            float setpoint[7];
+            Interpolate(t, setpoint);
+            bool finished = t >= waypoints_.back().t;
+
+            bool send_gripper = !std::isnan(setpoint[6]) &&
+                                (!have_last_ || std::isnan(last_setpoint_[6]) ||
+                                 std::fabs(setpoint[6] - last_setpoint_[6]) > 1e-5f);
+            lock.unlock();
+            send_(setpoint, send_gripper);
+            lock.lock();
+
+            if (!(std::isnan(setpoint[6]) && have_last_)) {
+                std::copy(setpoint, setpoint + 7, last_setpoint_);
+            } else {
+                std::copy(setpoint, setpoint + 6, last_setpoint_);
+            }
+            have_last_ = true;
+            if (generation != generation_) {
+                // 发送期间被新轨迹抢占
+                continue;
+            }
+            setpoints_++;
+            elapsed_ = t;
+
+            if (state_ != "running") {
+                continue;
+            }
+            if (finished) {
+                index_ = waypoints_.size() - 1;
+                state_ = "done";
+                Notify(MakeProgress(state_));
+                done_.notify_all();
+                continue;
+            }
+
+            next_tick_ += period_;
+            double after = monotonic_seconds();
+            if (next_tick_ < after - period_) {
+                // 落后超过一个周期时不补发
+                next_tick_ = after;
+            }
+            auto deadline = std::chrono::steady_clock::time_point(
+                std::chrono::duration_cast<std::chrono::steady_clock::duration>(
+                    std::chrono::duration<double>(next_tick_)));
+            wake_.wait_until(lock, deadline, [this, generation]() {
+                return stop_ || generation != generation_ || state_ != "running";
+            });
+        }
+    }
+
+    void RunNotifier() {
+        std::unique_lock<std::mutex> lock(mutex_);
+        while (true) {
+            notify_cv_.wait(lock, [this]() { return stop_ || !events_.empty(); });
+            if (events_.empty()) {
+                return;
+            }
+            Event event = std::move(events_.front());
+            events_.pop_front();
+            lock.unlock();
+            event.fn(event.progress);
+            event = Event();
+            lock.lock();
+        }
+    }
+
+    SendFn send_;
+    ReadFn read_;
+    ProgressFn progress_;
+
+    mutable std::mutex mutex_;
+    std::condition_variable wake_;
+    std::condition_variable done_;
+    std::condition_variable notify_cv_;
+    std::deque<Event> events_;
+
+    std::mutex threads_mutex_;
+    std::thread worker_;
+    std::thread notifier_;
+    bool stop_ = false;
+
+    std::vector<Waypoint> waypoints_;
+    std::string state_ = "idle";
+    size_t index_ = 0;
+    uint64_t generation_ = 0;
+    double period_ = 0.02;
+    double t0_ = 0.0;
+    double next_tick_ = 0.0;
+    double elapsed_ = 0.0;
+    uint64_t setpoints_ = 0;
+    double max_lateness_ = 0.0;
+
+    bool have_last_ = false;
+    float last_setpoint_[7];
+};
+
+}  // namespace pysagittarius
@@ -0,0 +1,19 @@
+import numpy as np
+import pytest
+
+from pysagittarius.kinematics import LOWER_JOINT_LIMITS, UPPER_JOINT_LIMITS
+
+
+@pytest.fixture
+def rng():
+    return np.random.default_rng(0)
+
+
+@pytest.fixture
+def random_theta(rng):
+    """random_theta(n, margin) 返回 (n, 6) 个离限位至少 margin 弧度的关节角"""
+
+    def sample(n, margin=0.2):
+        return rng.uniform(LOWER_JOINT_LIMITS + margin, UPPER_JOINT_LIMITS - margin, size=(n, 6))
+
+    return sample
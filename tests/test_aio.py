@@ -0,0 +1,123 @@
+"""AsyncSagittariusArm: 单线程执行器上的串行调用, 超时, 取消和关闭"""
+
+import asyncio
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from pysagittarius.aio import AsyncSagittariusArm
+from pysagittarius.sim import SagittariusArmSim
+
+
+class _CountingSim(SagittariusArmSim):
+    """记录同时进行的串口调用数和执行线程"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.active = 0
+        self.max_active = 0
+        self.threads = set()
+        self._count_lock = threading.Lock()
+
+    def _io(self):
+        with self._count_lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+            self.threads.add(threading.current_thread().name)
+        try:
+            super()._io()
+        finally:
+            with self._count_lock:
+                self.active -= 1
+
+
+def test_calls_are_serialized():
+    sim = _CountingSim(latency=0.02)
+
+    async def main():
+        async with AsyncSagittariusArm(sim) as arm:
+            start = time.monotonic()
+            results = await asyncio.gather(*[arm.get_joint_status() for _ in range(5)],
+                                           *[arm.get_servo_info(id) for id in range(1, 6)])
+            return results, time.monotonic() - start
+
+    results, elapsed = asyncio.run(main())
+    assert all(success for success, _ in results)
+    assert sim.transactions == 10
+    assert sim.max_active == 1
+    assert len(sim.threads) == 1
+    assert elapsed >= 10 * 0.02
+
+
+def test_wait_for_timeout():
+    sim = _CountingSim(latency=0.2)
+
+    async def main():
+        async with AsyncSagittariusArm(sim, timeout=0.05) as arm:
+            start = time.monotonic()
+            with pytest.raises(asyncio.TimeoutError):
+                await arm.get_joint_status()
+            assert time.monotonic() - start < 0.15
+            # 单次调用的 timeout 覆盖默认值, 已经开始的调用在后台执行完毕后才轮到它
+            success, js = await arm.get_joint_status(timeout=5.0)
+            assert success
+            assert sim.transactions == 2
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(arm.call("GetCurrentJointStatus", timeout=5.0), 0.05)
+
+    asyncio.run(main())
+
+
+def test_cancel_queued_call():
+    sim = _CountingSim(latency=0.1)
+
+    async def main():
+        async with AsyncSagittariusArm(sim) as arm:
+            running = asyncio.ensure_future(arm.get_joint_status())
+            await asyncio.sleep(0.02)
+            queued = asyncio.ensure_future(arm.set_all_servo_radian([0.5] * 6))
+            await asyncio.sleep(0)
+            queued.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await queued
+            success, _ = await running
+            assert success
+
+    asyncio.run(main())
+    # 排队中的 SetAllServoRadian 被丢弃, 没有下发到舵机
+    assert sim.transactions == 1
+    np.testing.assert_array_equal(sim.joint_targets, np.zeros(7))
+
+
+def test_aclose_shuts_down_executor():
+    sim = _CountingSim(latency=0.05)
+
+    async def main():
+        arm = AsyncSagittariusArm(sim)
+        pending = asyncio.ensure_future(arm.get_joint_status())
+        await asyncio.sleep(0.01)
+        await arm.aclose()
+        # aclose 等待已经开始的调用结束
+        assert sim.transactions == 1
+        assert (await pending)[0]
+        with pytest.raises(RuntimeError):
+            await arm.get_joint_status()
+
+    asyncio.run(main())
+
+
+def test_async_with_closes():
+    sim = _CountingSim()
+
+    async def main():
+        async with AsyncSagittariusArm(sim) as arm:
+            await arm.set_all_servo_radian_and_gripper([0.1] * 6, -0.03)
+        with pytest.raises(RuntimeError):
+            await arm.get_joint_status()
+        return arm
+
+    arm = asyncio.run(main())
+    assert arm._executor._shutdown
+    np.testing.assert_allclose(sim.joint_targets[:6], 0.1)
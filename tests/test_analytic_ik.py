@@ -0,0 +1,46 @@
+"""解析 IK: 与正运动学往返, 并覆盖数值解法能求解的位姿"""
+
+import numpy as np
+import pytest
+
+pytest.importorskip("pysagittarius.pysagittarius")
+
+import pysagittarius as ps
+from pysagittarius.kinematics import LOWER_JOINT_LIMITS, UPPER_JOINT_LIMITS
+
+TOOL_OFFSETS = [(0.0, 0.0, 0.0), (0.05, 0.0, 0.02)]
+
+
+def _residual(kinematics, theta, M):
+    success, T = kinematics.getFKinMatrixBatch(theta)
+    assert success.all()
+    return np.abs(T - M).max(axis=(1, 2))
+
+
+@pytest.mark.parametrize("offset", TOOL_OFFSETS)
+def test_round_trip(offset, random_theta):
+    k = ps.SagittariusArmKinematics(*offset, solver="analytic")
+    assert k.solver == "analytic"
+    theta = random_theta(500, margin=0.05)
+    _, M = k.getFKinMatrixBatch(theta)
+    success, result = k.getIKinThetaMatrixBatch(M)
+    assert success.mean() >= 0.99
+    assert (_residual(k, result[success], M[success]) < 1e-4).all()
+
+
+@pytest.mark.parametrize("offset", TOOL_OFFSETS)
+def test_covers_numeric(offset, rng):
+    numeric = ps.SagittariusArmKinematics(*offset, solver="numeric")
+    analytic = ps.SagittariusArmKinematics(*offset, solver="analytic")
+    # 关节角范围比限位宽, 其中一部分位姿只能在 eomg/ev 误差内靠近限位边界求解
+    theta = rng.uniform(LOWER_JOINT_LIMITS - 0.3, UPPER_JOINT_LIMITS + 0.3, size=(2000, 6))
+    _, M = numeric.getFKinMatrixBatch(theta)
+
+    numeric_success, _ = numeric.getIKinThetaMatrixBatch(M)
+    analytic_success, result = analytic.getIKinThetaMatrixBatch(M)
+    assert numeric_success.any()
+    missed = numeric_success & ~analytic_success
+    assert not missed.any(), theta[missed]
+    solved = result[analytic_success]
+    assert ((solved >= LOWER_JOINT_LIMITS - 1e-6) & (solved <= UPPER_JOINT_LIMITS + 1e-6)).all()
+    assert (_residual(analytic, solved, M[analytic_success]) < 1e-3).all()
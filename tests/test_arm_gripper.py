@@ -0,0 +1,76 @@
+"""SetAllServoRadianAndGripper: 关节帧后紧跟夹爪帧, 其他线程同时读取时中间不插入其他帧; 仍是两次串口事务"""
+
+import threading
+import time
+
+import numpy as np
+import pytest
+
+pytest.importorskip("pysagittarius.pysagittarius")
+
+import pysagittarius as ps
+from pysagittarius import protocol
+from pysagittarius.sim import SagittariusArmSim, SimSerialServer
+
+CALLS = 50
+
+
+class _Commands:
+    """按顺序记录下位机收到的所有帧的命令字"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.cmds = []
+
+    def __call__(self, msg_type, cmd, data, stamp):
+        with self._lock:
+            self.cmds.append(cmd)
+
+
+def test_gripper_frame_follows_joint_frame_under_concurrent_reads():
+    commands = _Commands()
+    with SimSerialServer(on_frame=commands) as server:
+        arm = ps.SagittariusArmReal(server.port, 1000000, 0, 0)
+        stop = threading.Event()
+        failures = []
+
+        def read():
+            while not stop.is_set():
+                if not arm.GetCurrentJointStatus()[0]:
+                    failures.append("read")
+
+        readers = [threading.Thread(target=read, daemon=True) for _ in range(2)]
+        arm.StartJointStatePoller(rate_hz=500.0)
+        for t in readers:
+            t.start()
+        try:
+            for i in range(CALLS):
+                arm.SetAllServoRadianAndGripper([i / 100] * 6, -i / 1000)
+                time.sleep(0.002)
+        finally:
+            stop.set()
+            for t in readers:
+                t.join(timeout=10)
+            arm.StopJointStatePoller()
+        assert not failures
+        # 下位机按顺序处理帧, 读取返回时之前的写入都已记录
+        assert arm.GetCurrentJointStatus()[0]
+
+    cmds = commands.cmds
+    joints = [i for i, cmd in enumerate(cmds) if cmd == protocol.CMD_CONTROL_ALL_DEGREE]
+    assert len(joints) == CALLS
+    assert cmds.count(protocol.CMD_CONTROL_END_DEGREE) == CALLS
+    assert all(cmds[i + 1] == protocol.CMD_CONTROL_END_DEGREE for i in joints)
+    # 读取确实穿插在写入之间
+    between = cmds[joints[0]:joints[-1]]
+    assert between.count(protocol.CMD_GET_CURRENT_JOINT_STATUS) >= CALLS // 2
+    np.testing.assert_allclose(server.sim.joint_targets[6], -(CALLS - 1) / 1000 * 22.0, atol=np.radians(0.1))
+
+
+def test_sim_counts_two_transactions():
+    arm = SagittariusArmSim()
+    arm.SetAllServoRadianAndGripper([0.1] * 6, -0.02)
+    assert arm.transactions == 2
+    arm.SetAllServoRadian([0.1] * 6)
+    arm.arm_set_gripper_linear_position(-0.02)
+    assert arm.transactions == 4
@@ -0,0 +1,133 @@
+"""SagittariusArmGroup 连接两个仿真下位机: 分发写入, 并行读取和单台机械臂读取失败"""
+
+import threading
+import time
+
+import numpy as np
+import pytest
+
+pytest.importorskip("pysagittarius.pysagittarius")
+
+import pysagittarius as ps
+from pysagittarius import protocol
+from pysagittarius.sim import SimSerialServer
+
+RESOLUTION = np.radians(0.1)
+POSITIONS = np.array([
+    [0.1, -0.2, 0.3, -0.4, 0.5, -0.6],
+    [-0.3, 0.2, -0.1, 0.4, -0.5, 0.6],
+], dtype=np.float32)
+
+
+class _Frames:
+    """记录下位机收到的设定点帧: (stamp, cmd)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.frames = []
+
+    def __call__(self, msg_type, cmd, data, stamp):
+        if cmd in (protocol.CMD_CONTROL_ALL_DEGREE, protocol.CMD_CONTROL_END_DEGREE):
+            with self._lock:
+                self.frames.append((stamp, cmd))
+
+
+@pytest.fixture
+def frames():
+    return [_Frames(), _Frames()]
+
+
+@pytest.fixture
+def servers(frames):
+    with SimSerialServer(on_frame=frames[0]) as first, SimSerialServer(on_frame=frames[1]) as second:
+        yield [first, second]
+
+
+@pytest.fixture
+def group(servers):
+    return ps.SagittariusArmGroup([server.port for server in servers])
+
+
+def _flush(group):
+    # 下位机按顺序处理帧, 读取返回时之前的写入都已处理
+    assert group.GetCurrentJointStatus()[0].all()
+
+
+def test_ports_and_indexing(group, servers):
+    assert len(group) == 2
+    assert group.ports == [server.port for server in servers]
+    assert isinstance(group[1], ps.SagittariusArmReal)
+    with pytest.raises(IndexError):
+        group[2]
+
+
+def test_fan_out_writes(group, servers, frames):
+    skew = group.SetAllServoRadian(POSITIONS)
+    assert skew >= 0
+    _flush(group)
+    for server, row, received in zip(servers, POSITIONS, frames):
+        np.testing.assert_allclose(server.sim.joint_targets[:6], row, atol=RESOLUTION)
+        # 6 列时不控制夹爪
+        assert [cmd for _, cmd in received.frames] == [protocol.CMD_CONTROL_ALL_DEGREE]
+
+
+def test_gripper_column(group, servers, frames):
+    # 第 7 列为夹爪直线位置, NaN 表示这台机械臂不控制夹爪
+    positions = np.column_stack([POSITIONS, [-0.02, np.nan]]).astype(np.float32)
+    group.SetAllServoRadian(positions)
+    _flush(group)
+    assert [cmd for _, cmd in frames[0].frames] == [protocol.CMD_CONTROL_ALL_DEGREE, protocol.CMD_CONTROL_END_DEGREE]
+    assert [cmd for _, cmd in frames[1].frames] == [protocol.CMD_CONTROL_ALL_DEGREE]
+    assert servers[0].sim.joint_targets[6] == pytest.approx(-0.02 * 22.0, abs=1e-2)
+    assert servers[1].sim.joint_targets[6] == 0
+
+
+def test_scheduled_send(group, frames):
+    at = time.monotonic() + 0.1
+    group.SetAllServoRadian(POSITIONS, at=at)
+    assert time.monotonic() >= at
+    _flush(group)
+    for received in frames:
+        assert received.frames[0][0] >= at
+
+
+def test_wrong_shape(group):
+    with pytest.raises(RuntimeError, match=r"shape \(2, 6\) or \(2, 7\)"):
+        group.SetAllServoRadian(POSITIONS[:1])
+
+
+def test_gathered_reads(group, servers):
+    states = [np.append(row, 0.1 * (i + 1)) for i, row in enumerate(POSITIONS)]
+    for server, state in zip(servers, states):
+        server.sim.set_joint_state(state)
+    out = np.empty((2, 7), dtype=np.float32)
+    valid, js = group.GetCurrentJointStatus(out=out)
+    assert valid.tolist() == [True, True]
+    assert js is out
+    np.testing.assert_allclose(js, states, atol=RESOLUTION)
+    # 每一行与单独读取这台机械臂的结果相同
+    for i in range(2):
+        success, single = group[i].GetCurrentJointStatus()
+        assert success
+        np.testing.assert_allclose(js[i], single, atol=1e-6)
+
+
+def test_failed_read_is_reported_per_arm(group, servers):
+    servers[0].sim.set_joint_state(np.append(POSITIONS[0], 0))
+    # 第二台下位机不再响应
+    servers[1].stop()
+    valid, js = group.GetCurrentJointStatus()
+    assert valid.tolist() == [True, False]
+    np.testing.assert_allclose(js[0, :6], POSITIONS[0], atol=RESOLUTION)
+    np.testing.assert_array_equal(js[1], 0)
+
+    stats = group.latency_stats
+    assert [port["port"] for port in stats["ports"]] == group.ports
+    reads = [port["GetCurrentJointStatus"] for port in stats["ports"]]
+    assert [read["calls"] for read in reads] == [1, 1]
+    # 整组调用等待最慢的串口, 即没有响应的那台机械臂的读取超时
+    assert reads[1]["max"] > reads[0]["max"]
+    assert stats["GetCurrentJointStatus"]["max"] >= reads[1]["max"]
+
+    servers[1].start()
+    assert group.GetCurrentJointStatus()[0].all()
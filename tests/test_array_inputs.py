@@ -0,0 +1,127 @@
+"""float32/float64 和跨步输入的读取, out= 输出缓冲区及其错误信息"""
+
+import numpy as np
+import pytest
+
+pytest.importorskip("pysagittarius.pysagittarius")
+
+import pysagittarius as ps
+
+THETA = [0.1, -0.2, 0.3, -0.4, 0.5, -0.6]
+
+
+@pytest.fixture
+def k():
+    return ps.SagittariusArmKinematics()
+
+
+@pytest.mark.parametrize("theta", [
+    THETA,
+    tuple(THETA),
+    np.array(THETA, dtype=np.float32),
+    np.array(THETA, dtype=np.float64),
+    np.array(THETA + [9.0]),                            # 多余的元素被忽略
+    np.repeat(np.array(THETA), 2)[::2],                  # 跨步视图
+    np.array([THETA, THETA], dtype=np.float32).T[:, 1],  # 非连续列
+])
+def test_vector_inputs(k, theta):
+    expected = k.getJacobian(np.array(THETA, dtype=np.float32))
+    np.testing.assert_allclose(k.getJacobian(theta), expected, atol=1e-6)
+    np.testing.assert_allclose(k.getFKinMatrix(theta)[1], k.getFKinMatrix(THETA)[1], atol=1e-6)
+
+
+def test_integer_inputs(k):
+    np.testing.assert_allclose(k.getJacobian(np.zeros(6, dtype=np.int32)), k.getJacobian([0.0] * 6))
+    np.testing.assert_allclose(k.getJacobian(np.zeros(6, dtype=np.int64)), k.getJacobian([0.0] * 6))
+
+
+@pytest.mark.parametrize("bad, message", [
+    (["a"] * 6, "sequence of numbers, got list"),
+    (object(), "sequence of numbers, got object"),
+    (np.array(["a"] * 6, dtype=object), "dtype object cannot be converted"),
+])
+def test_vector_type_errors(k, bad, message):
+    with pytest.raises(TypeError, match=message):
+        k.getJacobian(bad)
+
+
+def test_vector_too_short(k):
+    with pytest.raises(RuntimeError, match="at least 6 elements"):
+        k.getJacobian(THETA[:5])
+    with pytest.raises(RuntimeError, match="at least 6 elements"):
+        k.getJacobian(np.array([THETA]))
+
+
+def test_batch_inputs(k, random_theta):
+    theta = random_theta(64)
+    expected_success, expected = k.getFKinMatrixBatch(theta.astype(np.float32))
+    wide = np.zeros((64, 12))
+    wide[:, ::2] = theta
+    for batch in (theta, theta.astype(np.float32), np.asfortranarray(theta), wide[:, ::2], theta.tolist()):
+        success, M = k.getFKinMatrixBatch(batch)
+        np.testing.assert_array_equal(success, expected_success)
+        np.testing.assert_allclose(M, expected, atol=1e-6)
+
+    _, M = k.getFKinMatrixBatch(theta)
+    success32, theta32 = k.getIKinThetaMatrixBatch(M.astype(np.float32))
+    success64, theta64 = k.getIKinThetaMatrixBatch(M)
+    assert success64.any()
+    # float32 输入的位姿有舍入误差, 可能收敛到另一组解, 比较正解
+    for success, result in ((success32, theta32), (success64, theta64)):
+        _, M_result = k.getFKinMatrixBatch(result[success])
+        np.testing.assert_allclose(M_result, M[success], atol=1e-3)
+
+
+def test_out_buffers(k):
+    out = np.empty((4, 4))
+    success, M = k.getFKinMatrix(THETA, out=out)
+    assert success
+    assert M is out
+    xyz, euler = np.empty(3, dtype=np.float32), np.empty(3, dtype=np.float32)
+    _, xyz_result, euler_result = k.getFKinEuler(THETA, xyz_out=xyz, euler_out=euler)
+    assert xyz_result is xyz and euler_result is euler
+    np.testing.assert_allclose(xyz, out[:3, 3], atol=1e-6)
+
+    theta = np.empty(6, dtype=np.float32)
+    success, result = k.getIKinThetaMatrix(out, out=theta)
+    assert success
+    assert result is theta
+
+    batch = np.empty((3, 4, 4))
+    _, M = k.getFKinMatrixBatch([THETA] * 3, out=batch)
+    assert M is batch
+    np.testing.assert_allclose(batch, np.broadcast_to(out, (3, 4, 4)))
+    thetas = np.empty((3, 6), dtype=np.float32)
+    _, result = k.getIKinThetaMatrixBatch(batch, out=thetas)
+    assert result is thetas
+
+
+@pytest.mark.parametrize("out, message", [
+    (np.empty((4, 4), dtype=np.float32), "out must be a C-contiguous float64 array"),
+    (np.empty((4, 4)).T, "out must be a C-contiguous float64 array"),
+    (np.empty((8, 4))[::2], "out must be a C-contiguous float64 array"),
+    (np.empty(16), r"out must have shape \(4, 4\)"),
+    (np.empty((4, 5)), r"out must have shape \(4, 4\)"),
+    ([[0.0] * 4] * 4, "out must be a C-contiguous float64 array"),
+])
+def test_out_errors(k, out, message):
+    with pytest.raises(RuntimeError, match=message):
+        k.getFKinMatrix(THETA, out=out)
+
+
+def test_out_named_errors(k):
+    with pytest.raises(RuntimeError, match=r"euler_out must have shape \(3,\)"):
+        k.getFKinEuler(THETA, euler_out=np.empty(4, dtype=np.float32))
+    with pytest.raises(RuntimeError, match="xyz_out must be a C-contiguous float32 array"):
+        k.getFKinEuler(THETA, xyz_out=np.empty(3))
+    with pytest.raises(RuntimeError, match=r"out must have shape \(6,\)"):
+        k.getIKinThetaEuler(0.25, 0.0, 0.2, 0.0, 30.0, 0.0, out=np.empty(7, dtype=np.float32))
+    with pytest.raises(RuntimeError, match=r"out must have shape \(2, 6\)"):
+        k.getIKinThetaEulerBatch([[0.25, 0.0, 0.2, 0.0, 30.0, 0.0]] * 2, out=np.empty((3, 6), dtype=np.float32))
+
+
+def test_out_read_only(k):
+    out = np.empty((4, 4))
+    out.setflags(write=False)
+    with pytest.raises(RuntimeError, match="out is read-only"):
+        k.getFKinMatrix(THETA, out=out)
@@ -0,0 +1,91 @@
+"""批量正解与逐个调用的单次正解, NumpyKinematics 结果一致, 包括 out= 和非连续输入"""
+
+import numpy as np
+import pytest
+
+pytest.importorskip("pysagittarius.pysagittarius")
+
+import pysagittarius as ps
+from pysagittarius.kinematics import NumpyKinematics
+
+OFFSETS = [(0.0, 0.0, 0.0), (0.02, -0.01, 0.03)]
+
+
+def _same_quaternion(actual, expected, atol):
+    # q 和 -q 表示同一旋转
+    sign = np.where(np.sum(actual * expected, axis=1) < 0, -1.0, 1.0)[:, np.newaxis]
+    np.testing.assert_allclose(actual * sign, expected, atol=atol)
+
+
+@pytest.mark.parametrize("offset", OFFSETS)
+@pytest.mark.parametrize("num_threads", [1, 4])
+def test_batch_matches_single(random_theta, offset, num_threads):
+    k = ps.SagittariusArmKinematics(*offset)
+    theta = random_theta(200).astype(np.float32)
+    success, M = k.getFKinMatrixBatch(theta, num_threads)
+    _, xyz, euler = k.getFKinEulerBatch(theta, num_threads)
+    _, xyz_q, quaternion = k.getFKinQuaternionBatch(theta, num_threads)
+    assert success.all()
+    for i in range(0, len(theta), 7):
+        np.testing.assert_array_equal(M[i], k.getFKinMatrix(theta[i])[1])
+        _, expected_xyz, expected_euler = k.getFKinEuler(theta[i])
+        np.testing.assert_array_equal(xyz[i], expected_xyz)
+        np.testing.assert_array_equal(euler[i], expected_euler)
+        _, expected_xyz, expected_quaternion = k.getFKinQuaternion(theta[i])
+        np.testing.assert_array_equal(xyz_q[i], expected_xyz)
+        np.testing.assert_array_equal(quaternion[i], expected_quaternion)
+
+
+@pytest.mark.parametrize("offset", OFFSETS)
+def test_batch_matches_numpy(random_theta, offset):
+    k, reference = ps.SagittariusArmKinematics(*offset), NumpyKinematics(*offset)
+    # 扩展模块按 float32 读取关节角, 取 float32 能精确表示的值才能比较到 1e-9
+    theta = random_theta(200).astype(np.float32).astype(np.float64)
+    success, M = k.getFKinMatrixBatch(theta)
+    expected_success, expected_M = reference.getFKinMatrixBatch(theta)
+    np.testing.assert_array_equal(success, expected_success)
+    np.testing.assert_allclose(M, expected_M, atol=1e-9)
+
+    _, xyz, euler = k.getFKinEulerBatch(theta)
+    _, expected_xyz, expected_euler = reference.getFKinEulerBatch(theta)
+    np.testing.assert_allclose(xyz, expected_xyz, atol=1e-6)
+    np.testing.assert_allclose(euler, expected_euler, atol=1e-3)
+
+    _, xyz, quaternion = k.getFKinQuaternionBatch(theta)
+    _, expected_xyz, expected_quaternion = reference.getFKinQuaternionBatch(theta)
+    np.testing.assert_allclose(xyz, expected_xyz, atol=1e-6)
+    _same_quaternion(quaternion, expected_quaternion, 1e-6)
+
+
+def test_numpy_rejects_nan():
+    theta = np.zeros((3, 6))
+    theta[1, 2] = np.nan
+    success, _ = NumpyKinematics().getFKinMatrixBatch(theta)
+    assert success.tolist() == [True, False, True]
+
+
+def test_batch_out_and_strided_input(random_theta):
+    k = ps.SagittariusArmKinematics()
+    theta = random_theta(50)
+    _, expected_M = k.getFKinMatrixBatch(theta)
+    _, expected_xyz, expected_euler = k.getFKinEulerBatch(theta)
+    _, _, expected_quaternion = k.getFKinQuaternionBatch(theta)
+
+    wide = np.zeros((50, 12))
+    wide[:, 1::2] = theta
+    extra = np.column_stack([theta, np.ones(50)])  # 第 7 列 (夹爪) 被忽略
+    M = np.empty((50, 4, 4))
+    xyz, euler = np.empty((50, 3), dtype=np.float32), np.empty((50, 3), dtype=np.float32)
+    quaternion = np.empty((50, 4), dtype=np.float32)
+    for batch in (wide[:, 1::2], np.asfortranarray(theta), theta[::-1][::-1], extra):
+        M[:] = np.nan
+        _, M_result = k.getFKinMatrixBatch(batch, out=M)
+        assert M_result is M
+        np.testing.assert_allclose(M, expected_M, atol=1e-6)
+        _, xyz_result, euler_result = k.getFKinEulerBatch(batch, xyz_out=xyz, euler_out=euler)
+        assert xyz_result is xyz and euler_result is euler
+        np.testing.assert_allclose(xyz, expected_xyz, atol=1e-6)
+        np.testing.assert_allclose(euler, expected_euler, atol=1e-4)
+        _, _, quaternion_result = k.getFKinQuaternionBatch(batch, quaternion_out=quaternion)
+        assert quaternion_result is quaternion
+        np.testing.assert_allclose(quaternion, expected_quaternion, atol=1e-6)
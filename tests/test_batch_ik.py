@@ -0,0 +1,92 @@
+"""批量逆解与逐个调用的单次逆解结果一致, 包括初值, out= 和非连续输入"""
+
+import numpy as np
+import pytest
+
+pytest.importorskip("pysagittarius.pysagittarius")
+
+import pysagittarius as ps
+from pysagittarius.kinematics import fkin_space, matrix_to_euler, matrix_to_quaternion
+
+
+@pytest.fixture
+def k():
+    return ps.SagittariusArmKinematics()
+
+
+@pytest.fixture
+def poses(random_theta):
+    """(theta, M (N, 4, 4), euler (N, 6), quaternion (N, 7)), 位姿都是可达的"""
+    theta = random_theta(32)
+    M = fkin_space(theta)
+    euler = np.column_stack([M[:, :3, 3], matrix_to_euler(M)])
+    quaternion = np.column_stack([M[:, :3, 3], matrix_to_quaternion(M)])
+    return theta, M, euler, quaternion
+
+
+def _single(k, kind, row, seed=None):
+    if kind == "matrix":
+        return k.getIKinThetaMatrix(row, seed=seed)
+    if kind == "euler":
+        return k.getIKinThetaEuler(*row, seed=seed)
+    return k.getIKinThetaQuaternion(*row, seed=seed)
+
+
+def _batch(k, kind, rows, **kwargs):
+    method = {"matrix": k.getIKinThetaMatrixBatch, "euler": k.getIKinThetaEulerBatch,
+              "quaternion": k.getIKinThetaQuaternionBatch}[kind]
+    return method(rows, **kwargs)
+
+
+def _rows(poses, kind):
+    _, M, euler, quaternion = poses
+    return {"matrix": M, "euler": euler, "quaternion": quaternion}[kind]
+
+
+@pytest.mark.parametrize("kind", ["matrix", "euler", "quaternion"])
+@pytest.mark.parametrize("num_threads", [1, 4])
+def test_batch_matches_single(k, poses, kind, num_threads):
+    rows = _rows(poses, kind).astype(np.float32)
+    success, theta = _batch(k, kind, rows, num_threads=num_threads)
+    assert success.mean() > 0.8
+    for i, row in enumerate(rows):
+        expected_success, expected = _single(k, kind, row)
+        assert success[i] == expected_success
+        if expected_success:
+            np.testing.assert_array_equal(theta[i], expected)
+
+
+@pytest.mark.parametrize("kind", ["matrix", "euler", "quaternion"])
+def test_batch_matches_single_seeded(k, poses, kind):
+    # 单次调用的欧拉角和四元数参数是 float32, 批量输入也用 float32 才能逐位比较
+    rows = _rows(poses, kind).astype(np.float32)
+    seeds = (poses[0] + 0.05).astype(np.float32)
+    success, theta = _batch(k, kind, rows, seed=seeds)
+    assert success.all()
+    for i, row in enumerate(rows):
+        expected_success, expected = _single(k, kind, row, seed=seeds[i])
+        assert expected_success
+        np.testing.assert_allclose(theta[i], expected, atol=1e-6)
+
+
+def test_batch_out_and_strided_input(k, poses):
+    _, M, euler, _ = poses
+    expected_success, expected = k.getIKinThetaEulerBatch(euler.astype(np.float32))
+    # 非连续视图和 Fortran 顺序的数组先转换, 结果与连续数组相同
+    wide = np.zeros((len(euler), 12), dtype=np.float32)
+    wide[:, ::2] = euler
+    out = np.empty((len(euler), 6), dtype=np.float32)
+    for rows in (wide[:, ::2], np.asfortranarray(euler.astype(np.float32)), euler.astype(np.float32).tolist()):
+        out[:] = np.nan
+        success, theta = k.getIKinThetaEulerBatch(rows, out=out)
+        assert theta is out
+        np.testing.assert_array_equal(success, expected_success)
+        np.testing.assert_array_equal(out[success], expected[success])
+
+    M = M.astype(np.float32)
+    expected_success, expected = k.getIKinThetaMatrixBatch(M)
+    matrices = np.zeros((len(M), 4, 8), dtype=np.float32)
+    matrices[:, :, ::2] = M
+    success, theta = k.getIKinThetaMatrixBatch(matrices[:, :, ::2])
+    np.testing.assert_array_equal(success, expected_success)
+    np.testing.assert_array_equal(theta[success], expected[success])
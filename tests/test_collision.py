@@ -0,0 +1,122 @@
+"""validateTrajectory: 已知的碰撞 / 无碰撞关节角, 地面, 禁入区, 安全距离和越过限位的轨迹"""
+
+import numpy as np
+import pytest
+
+pytest.importorskip("pysagittarius.pysagittarius")
+
+import pysagittarius as ps
+from pysagittarius.kinematics import LOWER_JOINT_LIMITS, UPPER_JOINT_LIMITS
+
+OK = 0
+LIMIT = ps.VIOLATION_JOINT_LIMIT
+SELF = ps.VIOLATION_SELF_COLLISION
+FLOOR = ps.VIOLATION_FLOOR
+KEEP_OUT = ps.VIOLATION_KEEP_OUT
+
+ZERO = [0, 0, 0, 0, 0, 0]
+# 小臂折回, 夹爪碰到大臂和底座
+FOLDED = [0, 0, 1.7, 0, 0, 0]
+# 大臂前倾, 夹爪低于底座平面
+REACH_DOWN = [0, 1.35, 0, 0, 0, 0]
+# 零位时夹爪末端 (含工具偏移) 的位置
+TIP = np.array([0.2585, 0, 0.304])
+
+
+@pytest.fixture(scope="module")
+def k():
+    return ps.SagittariusArmKinematics()
+
+
+def _check(k, theta, **kwargs):
+    return k.validateTrajectory(np.array([theta], dtype=np.float32), **kwargs)[0]
+
+
+@pytest.mark.parametrize("theta, expected", [
+    (ZERO, OK),
+    ([0.5, 0.3, -0.4, 0.2, 0.6, -0.3], OK),
+    (FOLDED, SELF),
+    (REACH_DOWN, FLOOR),
+    ([2.5, 0, 0, 0, 0, 0], LIMIT),
+    ([0, 0, 0, 0, -1.9, 0], LIMIT),
+    ([0, 0, 1.9, 0, 0, 0], LIMIT | SELF),
+    ([0, np.nan, 0, 0, 0, 0], LIMIT),
+    # 第 7 列为夹爪直线位置, NaN 表示不控制夹爪
+    (ZERO + [-0.03], OK),
+    (ZERO + [np.nan], OK),
+    (ZERO + [0.01], LIMIT),
+    (ZERO + [-0.07], LIMIT),
+])
+def test_known_configurations(k, theta, expected):
+    assert _check(k, theta, floor=0.0) == expected
+
+
+def test_checks_can_be_disabled(k):
+    assert _check(k, FOLDED, self_collision=False) == OK
+    # floor 为 None (默认) 时不检查地面
+    assert _check(k, REACH_DOWN) == OK
+    assert _check(k, REACH_DOWN, floor=-0.2) == OK
+
+
+def test_keep_out_boxes(k):
+    around_tip = np.concatenate([TIP - 0.02, TIP + 0.02])
+    assert _check(k, ZERO, boxes=[around_tip]) == KEEP_OUT
+    # 底座不动, 包住底座的长方体不算进入
+    assert _check(k, ZERO, boxes=[[-0.06, -0.06, 0.0, 0.06, 0.06, 0.08]]) == OK
+    # 与夹爪末端相距 4 cm, 大于胶囊体半径 3 cm; 多个长方体中任意一个被进入都算违反
+    ahead = np.concatenate([TIP + [0.04, -0.05, -0.05], TIP + [0.1, 0.05, 0.05]])
+    assert _check(k, ZERO, boxes=[ahead]) == OK
+    assert _check(k, ZERO, boxes=[ahead, around_tip]) == KEEP_OUT
+    assert _check(k, ZERO, boxes=[ahead], margin=0.02) == KEEP_OUT
+
+
+def test_margin(k):
+    # 小臂折回到 1.35 rad 时夹爪与大臂还有间隙, 要求 2 cm 的安全距离时不够
+    near = [0, 0, 1.35, 0, 0, 0]
+    assert _check(k, near) == OK
+    assert _check(k, near, margin=0.02) == SELF
+    # 大臂前倾 0.88 rad 时夹爪在地面之上, 不到 2 cm
+    lean = [0, 0.88, 0, 0, 0, 0]
+    assert _check(k, lean, floor=0.0) == OK
+    assert _check(k, lean, floor=0.0, margin=0.02) == FLOOR
+
+
+def test_trajectory_crossing_joint_limit(k):
+    # 关节 1 从 -1.5 转到 2.5 rad, 只有超过上限的样本违反限位
+    q = np.linspace(-1.5, 2.5, 41, dtype=np.float32)
+    theta = np.zeros((len(q), 6), dtype=np.float32)
+    theta[:, 0] = q
+    flags = k.validateTrajectory(theta, floor=0.0)
+    np.testing.assert_array_equal(flags, np.where(q > UPPER_JOINT_LIMITS[0], LIMIT, OK))
+    assert flags.dtype == np.uint8 and flags.shape == (41,)
+
+
+def test_trajectory_folding_into_collision(k):
+    # 小臂从 0 折回到 1.9 rad: 先发生自碰撞, 超过关节 3 的上限后两者都违反
+    q = np.linspace(0, 1.9, 191, dtype=np.float32)
+    theta = np.zeros((len(q), 6), dtype=np.float32)
+    theta[:, 2] = q
+    flags = k.validateTrajectory(theta)
+    collides = (flags & SELF).astype(bool)
+    first = np.argmax(collides)
+    assert 1.3 < q[first] < 1.45
+    np.testing.assert_array_equal(collides, q >= q[first])
+    np.testing.assert_array_equal(flags & LIMIT, np.where(q > UPPER_JOINT_LIMITS[2], LIMIT, 0))
+    assert np.all(flags & (FLOOR | KEEP_OUT) == 0)
+
+
+def test_batch_matches_single_samples(k):
+    rng = np.random.default_rng(7)
+    theta = rng.uniform(np.array(LOWER_JOINT_LIMITS) - 0.2, np.array(UPPER_JOINT_LIMITS) + 0.2,
+                        size=(600, 6)).astype(np.float32)
+    boxes = [[0.15, -0.1, 0.0, 0.3, 0.1, 0.1]]
+    out = np.empty(len(theta), dtype=np.uint8)
+    flags = k.validateTrajectory(theta, floor=0.0, boxes=boxes, num_threads=4, out=out)
+    assert flags is out
+    # 各种结果都出现过, 多线程与单线程, float64 与 float32 输入的结果相同
+    assert np.any(flags == OK)
+    assert all(np.any(flags & bit) for bit in (LIMIT, SELF, FLOOR, KEEP_OUT))
+    np.testing.assert_array_equal(k.validateTrajectory(theta, floor=0.0, boxes=boxes, num_threads=1), flags)
+    np.testing.assert_array_equal(k.validateTrajectory(theta.astype(np.float64), floor=0.0, boxes=boxes), flags)
+    single = [_check(k, row, floor=0.0, boxes=boxes) for row in theta[:50]]
+    np.testing.assert_array_equal(single, flags[:50])
@@ -0,0 +1,98 @@
+"""EnableCommandCoalescing 的死区参数: 标量, 0 维数组和逐舵机数组"""
+
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from pysagittarius.sim import SagittariusArmSim, SimSerialServer
+
+DEADBANDS = [
+    0.05,
+    np.float32(0.05),
+    np.array(0.05),
+    [0.05] * 6,
+    np.full(7, 0.05),
+]
+
+
+def _wait_until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+@pytest.fixture(params=["sim", "real"])
+def arm(request):
+    if request.param == "sim":
+        arm = SagittariusArmSim()
+        yield arm, arm
+        arm.DisableCommandCoalescing()
+        return
+    pytest.importorskip("pysagittarius.pysagittarius")
+    import pysagittarius as ps
+
+    with SimSerialServer() as server:
+        arm = ps.SagittariusArmReal(server.port, 1000000, 0, 0)
+        yield arm, server.sim
+        arm.DisableCommandCoalescing()
+
+
+@pytest.mark.parametrize("deadband", DEADBANDS, ids=["float", "numpy-scalar", "0-d", "list", "array"])
+def test_deadband(arm, deadband):
+    arm, sim = arm
+    arm.EnableCommandCoalescing(deadband)
+    assert arm.command_coalescing
+    stats = lambda: arm.command_coalescing_stats
+
+    arm.SetAllServoRadian([0.1] * 6)
+    _wait_until(lambda: stats()["sent"] == 1)
+    _wait_until(lambda: np.allclose(sim.joint_targets[:6], 0.1, atol=1e-3))
+    # 离上次写入不超过死区, 不下发
+    arm.SetAllServoRadian([0.12] * 6)
+    _wait_until(lambda: stats()["suppressed"] == 1)
+    arm.SetAllServoRadian([0.2] * 6)
+    _wait_until(lambda: stats()["sent"] == 2)
+    _wait_until(lambda: np.allclose(sim.joint_targets[:6], 0.2, atol=1e-3))
+    assert stats()["submitted"] == 3
+
+
+@pytest.mark.parametrize("deadband", [[0.05] * 5, np.zeros((1, 6)), np.zeros(8)])
+def test_deadband_shape_error(arm, deadband):
+    arm, _ = arm
+    with pytest.raises(RuntimeError, match="scalar or have 6 or 7 elements"):
+        arm.EnableCommandCoalescing(deadband)
+
+
+def test_concurrent_enable_disable(arm):
+    arm, sim = arm
+    errors = []
+
+    def worker(i):
+        try:
+            for j in range(20):
+                if i % 3 == 0:
+                    arm.DisableCommandCoalescing()
+                elif i % 3 == 1:
+                    arm.EnableCommandCoalescing(0.0)
+                else:
+                    arm.SetAllServoRadian([j / 100] * 6)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=30)
+    assert not any(t.is_alive() for t in threads), "deadlock"
+    assert not errors, errors[0]
+    # 之后仍能正常开启并通过写线程下发
+    arm.EnableCommandCoalescing(0.0)
+    assert arm.command_coalescing
+    arm.SetAllServoRadian([0.3] * 6)
+    _wait_until(lambda: np.allclose(sim.joint_targets[:6], 0.3, atol=1e-3))
+    arm.DisableCommandCoalescing()
+    assert not arm.command_coalescing
@@ -0,0 +1,135 @@
+"""SagittariusArmReal 的阻塞调用和写入调用释放 GIL: 在伪终端仿真下位机上运行"""
+
+import threading
+import time
+
+import numpy as np
+import pytest
+
+pytest.importorskip("pysagittarius.pysagittarius")
+
+import pysagittarius as ps
+from pysagittarius.sim import SimSerialServer
+
+POSE = np.array([0.1, -0.2, 0.3, -0.4, 0.5, -0.6, -0.5])
+# 关节角以 0.1 度编码
+RESOLUTION = np.radians(0.1)
+
+
+class _Ticker:
+    """后台 Python 线程, 只能在持有 GIL 时计数"""
+
+    def __init__(self):
+        self.count = 0
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while self._running:
+            self.count += 1
+
+    def stop(self):
+        self._running = False
+        self._thread.join()
+
+
+@pytest.fixture
+def latency():
+    return 0.02
+
+
+@pytest.fixture
+def arm(latency):
+    with SimSerialServer(latency=latency) as server:
+        server.sim.set_joint_state(POSE)
+        yield ps.SagittariusArmReal(server.port, 1000000, 0, 0)
+
+
+@pytest.mark.parametrize("call", [
+    lambda arm: arm.GetServoInfo(1),
+    lambda arm: arm.GetServoInfo(9, timeout_ms=200),
+    lambda arm: arm.GetCurrentJointStatus(),
+    lambda arm: arm.GetAllServoInfo(),
+])
+def test_blocking_call_releases_gil(arm, call):
+    ticker = _Ticker()
+    try:
+        time.sleep(0.01)
+        before = ticker.count
+        start = time.monotonic()
+        call(arm)
+        elapsed = time.monotonic() - start
+        ticks = ticker.count - before
+    finally:
+        ticker.stop()
+    # 调用确实阻塞了, 且期间另一个线程一直在运行
+    assert elapsed >= 0.015
+    assert ticks > 1000
+
+
+@pytest.mark.parametrize("call", [
+    lambda arm: arm.SetAllServoRadian(POSE[:6]),
+    lambda arm: arm.SetAllServoRadianAndGripper(POSE[:6], -0.02),
+    lambda arm: arm.SetServoRadianWithIndex(ids=[1, 2], values=[0.1, 0.2]),
+    lambda arm: arm.arm_set_gripper_linear_position(-0.02),
+    lambda arm: arm.ControlTorque("lock"),
+    lambda arm: arm.SetServoTorque([1000] * 7),
+    lambda arm: arm.SetServoVelocity(500),
+    lambda arm: arm.SetServoAcceleration(5),
+], ids=["SetAllServoRadian", "SetAllServoRadianAndGripper", "SetServoRadianWithIndex",
+        "arm_set_gripper_linear_position", "ControlTorque", "SetServoTorque", "SetServoVelocity",
+        "SetServoAcceleration"])
+def test_write_call_releases_gil(arm, call):
+    # 写入本身不等应答, 让另一个线程占住串口, 写入调用等待串口锁期间必须已经释放 GIL
+    blocker = threading.Thread(target=arm.GetServoInfo, args=(9, 200), daemon=True)
+    blocker.start()
+    time.sleep(0.02)
+    ticker = _Ticker()
+    try:
+        time.sleep(0.01)
+        before = ticker.count
+        start = time.monotonic()
+        call(arm)
+        elapsed = time.monotonic() - start
+        ticks = ticker.count - before
+    finally:
+        ticker.stop()
+        blocker.join()
+    assert elapsed >= 0.1
+    assert ticks > 1000
+
+
+@pytest.mark.parametrize("latency", [0.002])
+def test_concurrent_reads(arm):
+    errors = []
+    calls = 0
+    lock = threading.Lock()
+
+    def worker(id):
+        nonlocal calls
+        try:
+            for i in range(10):
+                success, js = arm.GetCurrentJointStatus()
+                assert success
+                np.testing.assert_allclose(js, POSE, atol=RESOLUTION)
+                success, info = arm.GetServoInfo(id)
+                assert success
+                assert info.tolist() == [0, 0, 12, 100]
+                # 所有舵机共用 timeout_ms 的期限, 其中包括等待其他线程释放串口的时间
+                valid, infos = arm.GetAllServoInfo(timeout_ms=5000, servo_timeout_ms=200)
+                assert valid.all()
+                assert (infos == [0, 0, 12, 100]).all()
+                with lock:
+                    calls += 3
+        except AssertionError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(id,), daemon=True) for id in range(1, 7)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=60)
+    assert not any(t.is_alive() for t in threads), "deadlock"
+    assert not errors, errors[0]
+    assert calls == 6 * 10 * 3
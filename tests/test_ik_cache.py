@@ -0,0 +1,157 @@
+"""单位姿 IK 的 LRU 缓存"""
+
+import numpy as np
+import pytest
+
+pytest.importorskip("pysagittarius.pysagittarius")
+
+import pysagittarius as ps
+
+POSES = [
+    (0.25, 0.0, 0.2, 0.0, 30.0, 0.0),
+    (0.25, 0.05, 0.2, 0.0, 30.0, 0.0),
+    (0.3, 0.0, 0.15, 0.0, 45.0, 0.0),
+    (0.2, -0.05, 0.25, 10.0, 20.0, 0.0),
+]
+
+
+def _stats(k):
+    stats = k.cache_stats
+    return stats["hits"], stats["misses"], stats["evictions"], stats["size"]
+
+
+def test_disabled_by_default():
+    k = ps.SagittariusArmKinematics()
+    assert k.cache_stats is None
+    with pytest.raises(RuntimeError, match="not enabled"):
+        k.saveCache("unused")
+
+
+def test_hit_and_miss():
+    k = ps.SagittariusArmKinematics()
+    k.enableCache(max_size=8, position_resolution=1e-4, angle_resolution=1e-3)
+    success, first = k.getIKinThetaEuler(*POSES[0])
+    assert success
+    assert _stats(k) == (0, 1, 0, 1)
+
+    success, again = k.getIKinThetaEuler(*POSES[0])
+    assert success
+    np.testing.assert_array_equal(again, first)
+    # 分辨率以内的差别命中同一个条目
+    x, y, z, roll, pitch, yaw = POSES[0]
+    k.getIKinThetaEuler(x + 2e-5, y, z, roll, pitch, yaw)
+    assert _stats(k) == (2, 1, 0, 1)
+
+    # 带初值的调用不经过缓存
+    k.getIKinThetaEuler(*POSES[0], seed=first)
+    assert _stats(k) == (2, 1, 0, 1)
+
+    k.getIKinThetaEuler(*POSES[1])
+    assert _stats(k) == (2, 2, 0, 2)
+
+    k.clearCache()
+    assert k.cache_stats["size"] == 0
+
+
+def test_tool_offset_is_part_of_key(tmp_path):
+    k = ps.SagittariusArmKinematics()
+    k.enableCache()
+    k.getIKinThetaEuler(*POSES[0])
+    k.saveCache(str(tmp_path / "cache.bin"))
+
+    offset = ps.SagittariusArmKinematics(0.02, 0.0, 0.0)
+    offset.enableCache()
+    offset.loadCache(str(tmp_path / "cache.bin"))
+    offset.getIKinThetaEuler(*POSES[0])
+    assert _stats(offset)[:2] == (0, 1)
+
+
+def test_lru_eviction():
+    k = ps.SagittariusArmKinematics()
+    k.enableCache(max_size=3)
+    for pose in POSES[:3]:
+        assert k.getIKinThetaEuler(*pose)[0]
+    # 访问 POSES[0] 后, 最久未使用的是 POSES[1]
+    k.getIKinThetaEuler(*POSES[0])
+    k.getIKinThetaEuler(*POSES[3])
+    assert _stats(k) == (1, 4, 1, 3)
+
+    k.getIKinThetaEuler(*POSES[0])
+    k.getIKinThetaEuler(*POSES[2])
+    assert _stats(k)[:2] == (3, 4)
+    k.getIKinThetaEuler(*POSES[1])
+    assert _stats(k) == (3, 5, 2, 3)
+
+
+def test_save_load_round_trip(tmp_path):
+    path = str(tmp_path / "cache.bin")
+    k = ps.SagittariusArmKinematics()
+    k.enableCache(max_size=16, position_resolution=1e-4, angle_resolution=1e-3)
+    solutions = [k.getIKinThetaEuler(*pose)[1] for pose in POSES]
+    k.saveCache(path)
+
+    loaded = ps.SagittariusArmKinematics()
+    loaded.enableCache(max_size=16, position_resolution=1e-4, angle_resolution=1e-3)
+    assert loaded.loadCache(path) == len(POSES)
+    assert loaded.cache_stats["size"] == len(POSES)
+    for pose, expected in zip(POSES, solutions):
+        success, theta = loaded.getIKinThetaEuler(*pose)
+        assert success
+        np.testing.assert_array_equal(theta, expected)
+    assert _stats(loaded)[:2] == (len(POSES), 0)
+
+
+def test_load_errors(tmp_path):
+    path = str(tmp_path / "cache.bin")
+    k = ps.SagittariusArmKinematics()
+    k.enableCache(position_resolution=1e-4, angle_resolution=1e-3)
+    k.getIKinThetaEuler(*POSES[0])
+    k.saveCache(path)
+
+    other = ps.SagittariusArmKinematics()
+    other.enableCache(position_resolution=1e-3, angle_resolution=1e-3)
+    with pytest.raises(RuntimeError, match="different cache resolution"):
+        other.loadCache(path)
+    assert other.cache_stats["size"] == 0
+
+    (tmp_path / "garbage.bin").write_bytes(b"not a cache file at all")
+    with pytest.raises(RuntimeError, match="not an IK cache file"):
+        other.loadCache(str(tmp_path / "garbage.bin"))
+    with pytest.raises(RuntimeError, match="Failed to open"):
+        other.loadCache(str(tmp_path / "missing.bin"))
+
+
+def test_hit_is_solved_for_the_exact_pose():
+    k = ps.SagittariusArmKinematics()
+    k.enableCache(position_resolution=0.01, angle_resolution=0.05)
+    x, y, z, roll, pitch, yaw = POSES[0]
+    success, cached = k.getIKinThetaEuler(*POSES[0])
+    assert success
+    # 同一量化格内的另一个位姿: 命中后以缓存的解为初值求解, 返回的是这个位姿的解而不是缓存的解
+    target = (x + 0.004, y, z - 0.004, roll, pitch + 1.0, yaw)
+    success, theta = k.getIKinThetaEuler(*target)
+    assert success
+    assert _stats(k)[:2] == (1, 1)
+    _, xyz, euler = k.getFKinEuler(theta)
+    np.testing.assert_allclose(xyz, target[:3], atol=1e-3)
+    np.testing.assert_allclose(euler, target[3:], atol=0.1)
+    assert 0 < np.max(np.abs(theta - cached)) < 0.1
+
+
+def test_tracking_seed_bypasses_cache():
+    # 这个位姿有两组解 (腕部翻转), 无初值的解缓存后, 跟踪初值在另一组解附近时应返回另一组解
+    pose = (0.2502, 0.1466, 0.1564, -15.47, 5.74, 54.43)
+    k = ps.SagittariusArmKinematics()
+    k.enableCache()
+    success, cached = k.getIKinThetaEuler(*pose)
+    assert success
+    branches = k.getIKinThetaBranchesEuler(*pose)
+    other = max(branches, key=lambda b: np.max(np.abs(b - cached)))
+    assert np.max(np.abs(other - cached)) > 1.0
+
+    k.setTrackingMode(True, seed=other)
+    before = _stats(k)
+    success, theta = k.getIKinThetaEuler(*pose)
+    assert success
+    np.testing.assert_allclose(theta, other, atol=1e-2)
+    assert _stats(k) == before
@@ -0,0 +1,79 @@
+"""带初值的 IK 和跟踪模式"""
+
+import numpy as np
+import pytest
+
+pytest.importorskip("pysagittarius.pysagittarius")
+
+import pysagittarius as ps
+
+
+def _poses(kinematics, theta):
+    success, M = kinematics.getFKinMatrixBatch(theta)
+    assert success.all()
+    return M
+
+
+def _residual(kinematics, theta, M):
+    return np.abs(_poses(kinematics, theta) - M).max(axis=(1, 2))
+
+
+def test_seed_converges_to_nearby_solution(random_theta, rng):
+    k = ps.SagittariusArmKinematics()
+    theta = random_theta(50)
+    M = _poses(k, theta)
+    for i in range(len(theta)):
+        seed = theta[i] + rng.normal(0, 0.05, 6)
+        success, result = k.getIKinThetaMatrix(M[i], seed=seed)
+        assert success
+        assert _residual(k, result[None], M[i:i + 1])[0] < 1e-3
+        # 收敛到初值所在的分支
+        np.testing.assert_allclose(result, theta[i], atol=0.1)
+
+
+def test_seeded_success_rate(random_theta, rng):
+    k = ps.SagittariusArmKinematics()
+    theta = random_theta(200)
+    M = _poses(k, theta)
+    unseeded, _ = k.getIKinThetaMatrixBatch(M)
+    seeded, result = k.getIKinThetaMatrixBatch(M, seed=theta + rng.normal(0, 0.05, theta.shape))
+    assert seeded.mean() >= 0.99
+    assert seeded.mean() >= unseeded.mean()
+    assert (_residual(k, result[seeded], M[seeded]) < 1e-3).all()
+
+
+def test_chain_follows_path():
+    k = ps.SagittariusArmKinematics()
+    s = np.linspace(0, 1, 100)[:, None]
+    theta = (1 - s) * [0.2, 0.3, 0.2, 0.1, 0.4, 0.1] + s * [0.8, -0.2, 0.6, -0.5, 0.2, 0.9]
+    M = _poses(k, theta)
+    success, result = k.getIKinThetaMatrixBatch(M, seed=theta[0], chain=True)
+    assert success.all()
+    # 相邻的解连续, 没有跳到其他分支
+    assert np.abs(np.diff(result, axis=0)).max() < 0.05
+    np.testing.assert_allclose(result, theta, atol=0.1)
+
+
+def test_tracking_mode():
+    k = ps.SagittariusArmKinematics()
+    assert k.tracking_seed is None
+    start = np.array([0.1, 0.2, 0.3, -0.2, 0.3, 0.5])
+    k.setTrackingMode(True, seed=start)
+    np.testing.assert_allclose(k.tracking_seed, start, atol=1e-6)
+
+    _, xyz, euler = k.getFKinEuler(start)
+    previous = start
+    for dy in np.linspace(0.0, 0.05, 20):
+        success, theta = k.getIKinThetaEuler(xyz[0], xyz[1] + dy, xyz[2], *euler)
+        assert success
+        assert np.abs(theta - previous).max() < 0.1
+        np.testing.assert_allclose(k.tracking_seed, theta)
+        previous = theta
+
+    # 失败的求解不会覆盖初值
+    success, _ = k.getIKinThetaEuler(2.0, 0.0, 0.2, 0.0, 0.0, 0.0)
+    assert not success
+    np.testing.assert_allclose(k.tracking_seed, previous)
+
+    k.setTrackingMode(False)
+    assert k.tracking_seed is None
@@ -0,0 +1,88 @@
+"""getJacobian 与有限差分比较, cartesianVelocityStep 的末端位移"""
+
+import numpy as np
+import pytest
+
+pytest.importorskip("pysagittarius.pysagittarius")
+
+import pysagittarius as ps
+from pysagittarius.kinematics import LOWER_JOINT_LIMITS, UPPER_JOINT_LIMITS, fkin_space
+
+
+def _fk(theta):
+    return fkin_space(theta)[0]
+
+
+def _unskew(W):
+    return np.array([W[2, 1], W[0, 2], W[1, 0]])
+
+
+def _numeric_jacobian(theta, frame, h=1e-6):
+    T = _fk(theta)
+    J = np.zeros((6, 6))
+    for j in range(6):
+        step = np.zeros(6)
+        step[j] = h
+        dT = (_fk(theta + step) - _fk(theta - step)) / (2 * h)
+        # 空间坐标系 [V] = dT T^-1, 物体坐标系 [V] = T^-1 dT
+        V = dT @ np.linalg.inv(T) if frame == "space" else np.linalg.inv(T) @ dT
+        J[:3, j] = _unskew(V[:3, :3])
+        J[3:, j] = V[:3, 3]
+    return J
+
+
+@pytest.mark.parametrize("frame", ["space", "body"])
+def test_jacobian_matches_finite_differences(frame, random_theta):
+    k = ps.SagittariusArmKinematics()
+    for theta in random_theta(20):
+        J = k.getJacobian(theta, frame)
+        assert J.shape == (6, 6)
+        assert J.dtype == np.float64
+        np.testing.assert_allclose(J, _numeric_jacobian(theta, frame), atol=1e-6)
+
+
+def test_jacobian_out():
+    k = ps.SagittariusArmKinematics()
+    out = np.empty((6, 6))
+    theta = [0.1, 0.2, 0.3, 0.4, 0.5, 0.6]
+    assert k.getJacobian(theta, "body", out=out) is out
+    np.testing.assert_allclose(out, _numeric_jacobian(np.array(theta), "body"), atol=1e-6)
+
+
+@pytest.mark.parametrize("frame", ["space", "body"])
+def test_velocity_step_displacement(frame):
+    k = ps.SagittariusArmKinematics()
+    theta = np.array([0.2, 0.1, 0.4, 0.3, 0.6, -0.2])
+    T = _fk(theta)
+    v = np.array([0.05, -0.02, 0.03])
+    dt = 0.02
+    result = k.cartesianVelocityStep(theta, np.concatenate([np.zeros(3), v]), dt, frame)
+    assert result.dtype == np.float32
+    T1 = _fk(result)
+    # 角速度为零时末端平移 v dt (物体坐标系下的 v 需要转到空间坐标系), 姿态不变
+    expected = v * dt if frame == "space" else T[:3, :3] @ v * dt
+    np.testing.assert_allclose(T1[:3, 3] - T[:3, 3], expected, atol=2e-5)
+    np.testing.assert_allclose(T1[:3, :3], T[:3, :3], atol=1e-3)
+
+
+def test_velocity_step_rotation():
+    k = ps.SagittariusArmKinematics()
+    theta = np.array([0.2, 0.1, 0.4, 0.3, 0.6, -0.2])
+    T = _fk(theta)
+    w = np.array([0.0, 0.0, 0.5])
+    dt = 0.02
+    result = k.cartesianVelocityStep(theta, np.concatenate([w, np.zeros(3)]), dt, "body")
+    T1 = _fk(result)
+    # 绕末端 z 轴转动, 末端位置只有二阶误差
+    np.testing.assert_allclose(T1[:3, 3], T[:3, 3], atol=1e-4)
+    R = np.linalg.inv(T[:3, :3]) @ T1[:3, :3]
+    assert np.arctan2(R[1, 0], R[0, 0]) == pytest.approx(w[2] * dt, abs=1e-4)
+
+
+def test_velocity_step_respects_limits():
+    k = ps.SagittariusArmKinematics()
+    theta = UPPER_JOINT_LIMITS - 0.01
+    for _ in range(50):
+        theta = k.cartesianVelocityStep(theta, [1.0, 1.0, 1.0, 0.2, 0.2, 0.2], 0.05)
+        assert (theta >= LOWER_JOINT_LIMITS - 1e-6).all()
+        assert (theta <= UPPER_JOINT_LIMITS + 1e-6).all()
@@ -0,0 +1,154 @@
+"""后台关节状态轮询: 缓存读取, max_age 超时后同步读取, seq/stamp 的推进, 停止和重新启动"""
+
+import threading
+import time
+
+import numpy as np
+import pytest
+
+pytest.importorskip("pysagittarius.pysagittarius")
+
+import pysagittarius as ps
+from pysagittarius import protocol
+from pysagittarius.sim import SimSerialServer
+
+POSE = np.array([0.1, -0.2, 0.3, -0.4, 0.5, -0.6, -0.5])
+RESOLUTION = np.radians(0.1)
+
+
+class _Reads:
+    """统计下位机收到的 GetCurrentJointStatus 请求"""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, msg_type, cmd, data, stamp):
+        if cmd == protocol.CMD_GET_CURRENT_JOINT_STATUS:
+            self.count += 1
+
+
+@pytest.fixture
+def reads():
+    return _Reads()
+
+
+@pytest.fixture
+def arm(reads):
+    with SimSerialServer(on_frame=reads) as server:
+        server.sim.set_joint_state(POSE)
+        arm = ps.SagittariusArmReal(server.port, 1000000, 0, 0)
+        yield arm
+        arm.StopJointStatePoller()
+
+
+def _wait_for_seq(arm, seq, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        sample = arm.GetCachedJointStatus(max_age=60.0)
+        if sample[3] >= seq:
+            return sample
+        assert time.monotonic() < deadline, "poller did not advance"
+        time.sleep(0.005)
+
+
+def test_cached_read_without_poller_reads_once(arm, reads):
+    success, js, stamp, seq = arm.GetCachedJointStatus()
+    assert success
+    assert seq == 1
+    assert reads.count == 1
+    np.testing.assert_allclose(js, POSE, atol=RESOLUTION)
+    assert abs(time.monotonic() - stamp) < 0.5
+    assert not arm.joint_state_poller_running
+
+
+def test_poller_advances_seq_and_stamp(arm, reads):
+    arm.StartJointStatePoller(rate_hz=100.0, max_age=1.0)
+    assert arm.joint_state_poller_running
+    _, _, stamp1, seq1 = _wait_for_seq(arm, 1)
+    success, js, stamp2, seq2 = _wait_for_seq(arm, seq1 + 5)
+    assert success
+    np.testing.assert_allclose(js, POSE, atol=RESOLUTION)
+    assert stamp2 > stamp1
+    # 100 Hz 下 5 次读取大约 50 ms
+    assert 0.03 < stamp2 - stamp1 < 0.5
+    assert stamp2 <= time.monotonic()
+    assert reads.count >= seq2
+
+
+def test_cached_reads_do_not_touch_the_port(arm, reads):
+    arm.StartJointStatePoller(rate_hz=2.0, max_age=10.0)
+    _, _, _, seq = _wait_for_seq(arm, 1)
+    before = reads.count
+    out = np.empty(7, dtype=np.float32)
+    for _ in range(200):
+        success, js, _, cached_seq = arm.GetCachedJointStatus(out=out)
+        assert success and js is out
+        assert cached_seq in (seq, seq + 1)
+    # 200 次缓存读取期间最多有一次后台读取
+    assert reads.count - before <= 1
+
+
+def test_max_age_forces_a_fresh_read(arm, reads):
+    arm.StartJointStatePoller(rate_hz=1.0, max_age=10.0)
+    _, _, stamp, seq = _wait_for_seq(arm, 1)
+    time.sleep(0.02)
+    before = reads.count
+    success, _, fresh_stamp, fresh_seq = arm.GetCachedJointStatus(max_age=0.01)
+    assert success
+    assert fresh_seq == seq + 1
+    assert fresh_stamp > stamp
+    assert reads.count == before + 1
+    # 新样本足够新, 默认阈值 (Start 时的 max_age) 下直接返回缓存
+    assert arm.GetCachedJointStatus()[3] == fresh_seq
+    assert reads.count == before + 1
+
+
+def test_stop_and_restart(arm):
+    arm.StartJointStatePoller(rate_hz=200.0)
+    _wait_for_seq(arm, 3)
+    arm.StopJointStatePoller()
+    assert not arm.joint_state_poller_running
+    seq = arm.GetCachedJointStatus(max_age=60.0)[3]
+    time.sleep(0.05)
+    assert arm.GetCachedJointStatus(max_age=60.0)[3] == seq
+
+    arm.StartJointStatePoller(rate_hz=200.0)
+    assert arm.joint_state_poller_running
+    _wait_for_seq(arm, seq + 3)
+    # 运行中再次启动时替换原来的线程
+    arm.StartJointStatePoller(rate_hz=50.0)
+    assert arm.joint_state_poller_running
+    arm.StopJointStatePoller()
+    arm.StopJointStatePoller()
+    assert not arm.joint_state_poller_running
+
+
+def test_concurrent_start_stop(arm):
+    errors = []
+
+    def worker(i):
+        try:
+            for _ in range(20):
+                if i % 2:
+                    arm.StartJointStatePoller(rate_hz=500.0)
+                else:
+                    arm.StopJointStatePoller()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=30)
+    assert not any(t.is_alive() for t in threads), "deadlock"
+    assert not errors, errors[0]
+    arm.StartJointStatePoller(rate_hz=200.0)
+    seq = arm.GetCachedJointStatus(max_age=60.0)[3]
+    _wait_for_seq(arm, seq + 2)
+
+
+def test_invalid_rate(arm):
+    with pytest.raises(ValueError, match="rate_hz must be positive"):
+        arm.StartJointStatePoller(rate_hz=0.0)
+    assert not arm.joint_state_poller_running
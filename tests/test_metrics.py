@@ -0,0 +1,129 @@
+"""调用统计 (-DPYSAGITTARIUS_METRICS 编译): get_metrics / reset_metrics / Prometheus 输出, 后台线程按来源分开统计"""
+
+import re
+import time
+
+import numpy as np
+import pytest
+
+pytest.importorskip("pysagittarius.pysagittarius")
+
+import pysagittarius as ps
+from pysagittarius.sim import SimSerialServer
+
+pytestmark = pytest.mark.skipif(not ps.metrics_enabled, reason="built without PYSAGITTARIUS_METRICS")
+
+READ = "SagittariusArmReal.GetCurrentJointStatus"
+WRITE = "SagittariusArmReal.SetAllServoRadian"
+
+
+@pytest.fixture
+def arm():
+    with SimSerialServer() as server:
+        arm = ps.SagittariusArmReal(server.port, 1000000, 0, 0)
+        ps.reset_metrics()
+        yield arm
+        arm.StopJointStatePoller()
+        arm.DisableCommandCoalescing()
+        arm.CancelTrajectory()
+
+
+def _calls(key):
+    return ps.get_metrics().get(key, {}).get("calls", 0)
+
+
+def _prometheus():
+    """{(指标名, 标签字符串): 值} 和 {指标名: 类型}"""
+    values, types = {}, {}
+    for line in ps.metrics_prometheus().splitlines():
+        if line.startswith("# TYPE"):
+            _, _, name, kind = line.split()
+            types[name] = kind
+        elif line and not line.startswith("#"):
+            name, labels, value = re.match(r"(\w+)\{(.*)\} (\S+)$", line).groups()
+            values[name, labels] = float(value)
+    return values, types
+
+
+def _labels(method, source="python"):
+    return 'method="%s",source="%s"' % (method, source)
+
+
+def test_python_calls_are_counted(arm):
+    for _ in range(3):
+        arm.GetCurrentJointStatus()
+    assert not arm.GetServoInfo(9, 20)[0]
+    metrics = ps.get_metrics()
+    stats = metrics[READ]
+    assert stats["calls"] == 3
+    assert stats["method"] == READ and stats["source"] == "python"
+    assert stats["failures"] == 0
+    assert 0 < stats["p50"] <= stats["max"]
+    assert stats["total"] == pytest.approx(stats["mean"] * 3)
+    assert metrics["SagittariusArmReal.GetServoInfo"]["timeouts"] == 1
+
+
+def test_poller_calls_use_their_own_label(arm):
+    arm.StartJointStatePoller(rate_hz=200.0)
+    time.sleep(0.1)
+    arm.StopJointStatePoller()
+    assert _calls(READ) == 0
+    assert _calls(READ + "[poller]") >= 5
+    assert ps.get_metrics()[READ + "[poller]"]["source"] == "poller"
+
+
+def test_coalescer_and_executor_calls_use_their_own_label(arm):
+    arm.EnableCommandCoalescing(0.0)
+    arm.SetAllServoRadian([0.1] * 6)
+    deadline = time.monotonic() + 2.0
+    while _calls(WRITE + "[coalescer]") == 0:
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+    arm.DisableCommandCoalescing()
+
+    arm.ExecuteTrajectory([0.1], np.array([[0.2, 0, 0, 0, 0, 0]], dtype=np.float32), 50.0)
+    assert arm.WaitTrajectory(2.0)
+    assert _calls(WRITE + "[executor]") >= 3
+    # Python 线程没有直接写入串口
+    assert _calls(WRITE) == 0
+
+
+def test_reset_keeps_prometheus_counters_monotonic(arm):
+    for _ in range(4):
+        arm.GetCurrentJointStatus()
+    before, types = _prometheus()
+    assert types["pysagittarius_calls_total"] == "counter"
+    assert types["pysagittarius_call_latency_seconds"] == "summary"
+    assert types["pysagittarius_call_latency_max_seconds"] == "gauge"
+    total = before["pysagittarius_calls_total", _labels(READ)]
+    assert total >= 4
+    assert before["pysagittarius_call_latency_seconds_count", _labels(READ)] == total
+
+    ps.reset_metrics()
+    assert _calls(READ) == 0
+    assert ps.get_metrics()[READ]["max"] == 0
+    arm.GetCurrentJointStatus()
+    assert _calls(READ) == 1
+    after, _ = _prometheus()
+    # 导出的 counter 和 summary 的 _count/_sum 是累计值, 重置后不会变小
+    assert after["pysagittarius_calls_total", _labels(READ)] == total + 1
+    assert after["pysagittarius_call_latency_seconds_count", _labels(READ)] == total + 1
+    assert (after["pysagittarius_call_latency_seconds_sum", _labels(READ)]
+            >= before["pysagittarius_call_latency_seconds_sum", _labels(READ)])
+
+
+def test_ik_iterations_only_count_seeded_solves():
+    k = ps.SagittariusArmKinematics()
+    theta = np.array([0.1, 0.2, -0.3, 0.1, 0.4, 0.0], dtype=np.float32)
+    _, xyz, euler = k.getFKinEuler(theta)
+    ps.reset_metrics()
+    assert k.getIKinThetaEuler(*xyz, *euler)[0]
+    name = "SagittariusArmKinematics.getIKinThetaEuler"
+    # SDK 求解器不返回迭代次数
+    assert ps.get_metrics()[name]["ik_iterations"] == 0
+    assert k.getIKinThetaEuler(*xyz, *euler, seed=theta + 0.05)[0]
+    stats = ps.get_metrics()[name]
+    assert stats["calls"] == 2
+    assert stats["ik_iterations"] > 0
+    values, _ = _prometheus()
+    assert values["pysagittarius_ik_iterations_total", _labels(name)] >= stats["ik_iterations"]
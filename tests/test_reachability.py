@@ -0,0 +1,75 @@
+"""可达性地图的生成, 保存和加载"""
+
+import numpy as np
+import pytest
+
+from pysagittarius import reachability
+from pysagittarius.kinematics import NumpyKinematics
+
+
+@pytest.fixture(scope="module")
+def workspace():
+    return reachability.build(samples=20000, voxel_size=0.02, x=0.01, seed=0)
+
+
+def test_build(workspace):
+    assert len(workspace) == 20000
+    assert workspace.offset == (0.01, 0.0, 0.0)
+    # 每个样本都落在自己的体素里, 且该体素可达
+    assert workspace.reachable(workspace.position).all()
+    ijk, inside = workspace._voxel(workspace.position)
+    assert inside.all()
+    flat = np.ravel_multi_index(ijk.T, workspace.shape)
+    index = np.arange(len(workspace))
+    assert ((workspace.voxel_start[flat] <= index) & (index < workspace.voxel_start[flat + 1])).all()
+    # 样本的位姿与关节角一致
+    _, position, _ = NumpyKinematics(0.01, 0.0, 0.0).getFKinQuaternionBatch(workspace.theta[:100])
+    np.testing.assert_allclose(position, workspace.position[:100], atol=1e-5)
+    assert not workspace.is_reachable(2.0, 0.0, 0.0)
+
+
+def test_save_load_round_trip(workspace, tmp_path):
+    path = str(tmp_path / "workspace.map")
+    workspace.save(path)
+    loaded = reachability.load(path)
+
+    np.testing.assert_array_equal(loaded.origin, workspace.origin)
+    assert loaded.voxel_size == workspace.voxel_size
+    assert loaded.offset == workspace.offset
+    assert loaded.shape == workspace.shape
+    for name in reachability._ARRAYS:
+        array = getattr(loaded, name)
+        assert isinstance(array, np.memmap)
+        assert array.dtype == getattr(workspace, name).dtype
+        np.testing.assert_array_equal(array, getattr(workspace, name))
+
+    rng = np.random.default_rng(1)
+    targets = workspace.position[rng.integers(0, len(workspace), 20)] + rng.normal(0, 0.01, (20, 3))
+    np.testing.assert_array_equal(loaded.reachable(targets), workspace.reachable(targets))
+    q = np.array([0.0, 0.2588, 0.0, 0.9659])
+    for xyz in targets:
+        np.testing.assert_array_equal(loaded.nearest(xyz, q, k=5), workspace.nearest(xyz, q, k=5))
+        seed = loaded.seed(*xyz, quaternion=q)
+        if seed is not None:
+            np.testing.assert_array_equal(seed, workspace.seed(*xyz, quaternion=q))
+
+
+def test_load_rejects_other_files(tmp_path):
+    path = tmp_path / "other.bin"
+    path.write_bytes(b"PSIKCAC1" + bytes(64))
+    with pytest.raises(ValueError, match="not a reachability map"):
+        reachability.load(str(path))
+
+
+def test_seeded_ik(workspace):
+    pytest.importorskip("pysagittarius.pysagittarius")
+    import pysagittarius as ps
+
+    k = ps.SagittariusArmKinematics(0.01, 0.0, 0.0)
+    theta = np.array(workspace.theta[1234], dtype=np.float64)
+    _, xyz, euler = k.getFKinEuler(theta)
+    success, result = workspace.getIKinThetaEuler(k, *xyz, *euler)
+    assert success
+    _, xyz_result, _ = k.getFKinEuler(result)
+    np.testing.assert_allclose(xyz_result, xyz, atol=1e-3)
+    assert workspace.getIKinThetaEuler(k, 2.0, 0.0, 0.0, 0.0, 0.0, 0.0)[0] is False
@@ -0,0 +1,162 @@
+"""命令记录: 记录 -> 读取 -> 回放, 检查时间戳, 记录内容和回放时下位机收到的帧"""
+
+import struct
+import threading
+import time
+
+import numpy as np
+import pytest
+
+pytest.importorskip("pysagittarius.pysagittarius")
+
+import pysagittarius as ps
+from pysagittarius import protocol, recording
+from pysagittarius.sim import SagittariusArmSim, SimSerialServer
+
+RESOLUTION = np.radians(0.1)
+JOINTS = np.array([0.1, -0.2, 0.3, -0.4, 0.5, -0.6], dtype=np.float32)
+GRIPPER = np.float32(-0.02)
+ARM_GRIPPER = np.array([0.2, 0.1, -0.1, 0.0, 0.3, 0.2, -0.03], dtype=np.float32)
+INDEX_IDS = np.array([2, 7])
+INDEX_VALUES = np.array([0.25, -0.5], dtype=np.float32)
+
+
+class _Frames:
+    """记录下位机收到的设定点帧: (stamp, cmd, payload)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.frames = []
+
+    def __call__(self, msg_type, cmd, data, stamp):
+        if cmd in (protocol.CMD_CONTROL_ALL_DEGREE, protocol.CMD_CONTROL_END_DEGREE, protocol.CMD_CONTROL_ID_DEGREE):
+            with self._lock:
+                self.frames.append((stamp, cmd, bytes(data)))
+
+
+def _issue(arm):
+    """依次发出每种命令, 返回每条命令调用前后的 time.monotonic() 和读到的关节状态"""
+    calls = [
+        lambda: arm.SetAllServoRadian(JOINTS),
+        lambda: arm.SetServoRadianWithIndex(ids=INDEX_IDS, values=INDEX_VALUES),
+        lambda: arm.arm_set_gripper_linear_position(float(GRIPPER)),
+        lambda: arm.SetAllServoRadianAndGripper(ARM_GRIPPER),
+    ]
+    windows = []
+    for call in calls:
+        before = time.monotonic()
+        call()
+        windows.append((before, time.monotonic()))
+        time.sleep(0.05)
+    before = time.monotonic()
+    success, js = arm.GetCurrentJointStatus()
+    windows.append((before, time.monotonic()))
+    assert success
+    return windows, js
+
+
+def _check_records(records, windows, js):
+    kinds = [recording.KIND_ALL_SERVO_RADIAN, recording.KIND_SERVO_RADIAN_INDEX, recording.KIND_GRIPPER,
+             recording.KIND_ARM_GRIPPER, recording.KIND_JOINT_STATUS]
+    assert records["kind"].tolist() == kinds
+    assert records["seq"].tolist() == list(range(1, 6))
+    for record, (before, after) in zip(records, windows):
+        assert before <= record["stamp"] <= after
+    assert np.all(np.diff(records["stamp"]) >= 0.05)
+
+    assert records["mask"].tolist() == [0x3F, 0x42, 0x40, 0x7F, 0x7F]
+    np.testing.assert_array_equal(records["values"][0], np.append(JOINTS, 0))
+    np.testing.assert_array_equal(records["values"][1], [0, 0.25, 0, 0, 0, 0, -0.5])
+    np.testing.assert_array_equal(records["values"][2], [0, 0, 0, 0, 0, 0, GRIPPER])
+    np.testing.assert_array_equal(records["values"][3], ARM_GRIPPER)
+    np.testing.assert_array_equal(records["values"][4], js)
+    assert records["status"][4] == 1
+
+
+@pytest.fixture
+def real_arm():
+    with SimSerialServer() as server:
+        yield ps.SagittariusArmReal(server.port, 1000000, 0, 0)
+
+
+@pytest.mark.parametrize("backend", ["real", "sim"])
+def test_record_and_read(tmp_path, backend, request):
+    arm = request.getfixturevalue("real_arm") if backend == "real" else SagittariusArmSim()
+    path = str(tmp_path / "run.rec")
+    arm.StartRecording(path, capacity=64)
+    assert arm.recording_path == path
+    windows, js = _issue(arm)
+    arm.StopRecording()
+    assert arm.recording_path is None
+    # 停止后的调用不再记录
+    arm.SetAllServoRadian(JOINTS)
+
+    rec = recording.load(path)
+    assert rec.capacity == 64
+    assert rec.count == len(rec) == 5
+    _check_records(rec.ordered(), windows, js)
+    assert len(rec.commands()) == 4
+    np.testing.assert_array_equal(rec.joint_states()["values"], [js])
+
+
+def test_ring_keeps_the_newest_records(tmp_path, real_arm):
+    path = str(tmp_path / "ring.rec")
+    real_arm.StartRecording(path, capacity=4)
+    for i in range(10):
+        real_arm.SetAllServoRadian(np.full(6, i / 10, dtype=np.float32))
+    rec = recording.load(path)
+    assert rec.count == 10
+    assert len(rec) == 4
+    records = rec.ordered()
+    assert records["seq"].tolist() == [7, 8, 9, 10]
+    np.testing.assert_array_equal(records["values"][:, 0], np.float32([0.6, 0.7, 0.8, 0.9]))
+
+
+def test_replay_sends_the_recorded_frames(tmp_path, real_arm):
+    path = str(tmp_path / "run.rec")
+    real_arm.StartRecording(path)
+    _issue(real_arm)
+    real_arm.StopRecording()
+    rec = recording.load(path)
+    commands = rec.commands()
+
+    frames = _Frames()
+    with SimSerialServer(on_frame=frames) as server:
+        target = ps.SagittariusArmReal(server.port, 1000000, 0, 0)
+        assert recording.replay(rec, target, speed=1.0) == 4
+        # 下位机按顺序处理帧, 读取返回时之前的写入都已记录
+        assert target.GetCurrentJointStatus()[0]
+
+    cmds = [cmd for _, cmd, _ in frames.frames]
+    assert cmds == [protocol.CMD_CONTROL_ALL_DEGREE, protocol.CMD_CONTROL_ID_DEGREE, protocol.CMD_CONTROL_END_DEGREE,
+                    protocol.CMD_CONTROL_ALL_DEGREE, protocol.CMD_CONTROL_END_DEGREE]
+    payloads = [data for _, _, data in frames.frames]
+    np.testing.assert_allclose(protocol.unpack_radians(payloads[0])[:6], JOINTS, atol=RESOLUTION)
+    ids, values = zip(*(struct.unpack_from("<Bh", payloads[1], offset) for offset in range(0, len(payloads[1]) - 2, 3)))
+    assert list(ids) == INDEX_IDS.tolist()
+    np.testing.assert_allclose([protocol.decidegree_to_radian(v) for v in values], INDEX_VALUES, atol=RESOLUTION)
+    np.testing.assert_allclose(protocol.unpack_radians(payloads[2])[0] / 22.0, GRIPPER, atol=1e-3)
+    np.testing.assert_allclose(protocol.unpack_radians(payloads[3])[:6], ARM_GRIPPER[:6], atol=RESOLUTION)
+    np.testing.assert_allclose(protocol.unpack_radians(payloads[4])[0] / 22.0, ARM_GRIPPER[6], atol=1e-3)
+
+    # 回放保持记录的时间间隔
+    stamps = np.array([stamp for stamp, _, _ in frames.frames])
+    sent = stamps[[0, 1, 2, 3]] - stamps[0]
+    recorded = commands["stamp"] - commands["stamp"][0]
+    np.testing.assert_allclose(sent, recorded, atol=0.02)
+
+
+def test_replay_without_waiting(tmp_path):
+    arm = SagittariusArmSim()
+    path = str(tmp_path / "run.rec")
+    arm.StartRecording(path)
+    _issue(arm)
+    arm.StopRecording()
+
+    target = SagittariusArmSim()
+    start = time.monotonic()
+    assert recording.replay(recording.load(path), target, speed=0) == 4
+    assert time.monotonic() - start < 0.1
+    # 最后一条命令是 SetAllServoRadianAndGripper, 夹爪目标为舵机弧度
+    expected = np.append(ARM_GRIPPER[:6], ARM_GRIPPER[6] * 22.0)
+    np.testing.assert_allclose(target.joint_targets, expected, atol=1e-6)
@@ -0,0 +1,102 @@
+"""共享内存机械臂服务: 命令转发, 关闭时删除共享内存段, 回收残留的段"""
+
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pytest
+
+pytest.importorskip("pysagittarius.pysagittarius")
+
+import pysagittarius as ps
+from pysagittarius.server import ArmServer
+from pysagittarius.sim import SagittariusArmSim
+
+
+@pytest.fixture
+def name(request):
+    name = "/pysagittarius-test-%d-%s" % (os.getpid(), request.node.name.replace("[", "-").rstrip("]"))
+    yield name
+    if os.path.exists("/dev/shm" + name):
+        os.unlink("/dev/shm" + name)
+
+
+def test_round_trip(name):
+    sim = SagittariusArmSim()
+    with ArmServer(sim, name, info_rate_hz=0) as server:
+        client = ps.SagittariusArmClient(name)
+        assert server.clients == 1
+        client.SetAllServoRadianAndGripper([0.1, 0.2, 0.3, 0.4, 0.5, 0.6], -0.02)
+        deadline = time.monotonic() + 2.0
+        while server.stats["commands"] == 0 and time.monotonic() < deadline:
+            server.step(timeout=0.05)
+        np.testing.assert_allclose(sim.joint_targets[:6], [0.1, 0.2, 0.3, 0.4, 0.5, 0.6])
+        server.step(timeout=0.0)
+        success, js = client.GetCurrentJointStatus()
+        assert success
+        assert js.shape == (7,)
+        del client
+
+
+def test_close_unlinks_segment(name):
+    server = ArmServer(SagittariusArmSim(), name, info_rate_hz=0)
+    assert os.path.exists("/dev/shm" + name)
+    server.close()
+    # 不依赖垃圾回收, close() 返回时段已经删除
+    assert server._shm.closed
+    assert not os.path.exists("/dev/shm" + name)
+    with pytest.raises(RuntimeError, match="No arm server"):
+        ps.SagittariusArmClient(name)
+    with pytest.raises(RuntimeError, match="is closed"):
+        server.step(timeout=0.0)
+    server.close()
+
+
+def test_replaces_segment_of_dead_server(name):
+    # 子进程创建段后直接退出, 不删除段
+    code = ("import os, pysagittarius as ps; s = ps.SharedArmServer(%r, [0] * 7, [0] * 7); os._exit(0)" % name)
+    subprocess.run([sys.executable, "-c", code], check=True, cwd=os.path.dirname(os.path.dirname(ps.__file__)))
+    assert os.path.exists("/dev/shm" + name)
+    server = ps.SharedArmServer(name, [-1] * 7, [1] * 7)
+    client = ps.SagittariusArmClient(name)
+    assert client.lower_joint_limits == [-1] * 7
+    del client
+    server.Close()
+
+
+def test_refuses_live_server(name):
+    server = ps.SharedArmServer(name, [0] * 7, [0] * 7)
+    with pytest.raises(RuntimeError, match="Another arm server is using"):
+        ps.SharedArmServer(name, [0] * 7, [0] * 7)
+    server.Close()
+    assert not os.path.exists("/dev/shm" + name)
+
+
+def test_refuses_foreign_segment(name):
+    with open("/dev/shm" + name, "wb") as f:
+        f.write(b"not an arm server")
+    with pytest.raises(RuntimeError, match="not an arm server segment"):
+        ps.SharedArmServer(name, [0] * 7, [0] * 7)
+
+
+def test_servo_info_is_read_from_the_published_state(name):
+    sim = SagittariusArmSim()
+    sim.offline_servos = {3}
+    with ArmServer(sim, name, info_rate_hz=100.0, info_timeout_ms=50) as server:
+        client = ps.SagittariusArmClient(name)
+        server.step(timeout=0.0)
+        valid, info = client.GetAllServoInfo()
+        assert np.flatnonzero(~valid).tolist() == [2]
+        assert info.shape == (7, 4)
+        success, row = client.GetServoInfo(1)
+        assert success
+        np.testing.assert_array_equal(row, info[0])
+        assert not client.GetServoInfo(3)[0]
+        # 只读取共享内存, 不接受超时参数
+        with pytest.raises(TypeError):
+            client.GetServoInfo(1, timeout_ms=500)
+        with pytest.raises(TypeError):
+            client.GetAllServoInfo(timeout_ms=100)
+        del client
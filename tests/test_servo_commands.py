@@ -0,0 +1,164 @@
+"""SetServoRadianWithIndex 的各种输入经过串口后的帧内容, 以及错误的 dtype / 形状"""
+
+import struct
+import threading
+
+import numpy as np
+import pytest
+
+pytest.importorskip("pysagittarius.pysagittarius")
+
+import pysagittarius as ps
+from pysagittarius import protocol
+from pysagittarius.sim import SagittariusArmSim, SimSerialServer
+
+IDS = [2, 5, 7]
+VALUES = [0.1, -0.25, 0.5]
+RESOLUTION = np.radians(0.1)
+
+
+class _IndexFrames:
+    """记录下位机收到的 CMD_CONTROL_ID_DEGREE 帧, 每帧解码为 [(id, 弧度), ...]"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.frames = []
+
+    def __call__(self, msg_type, cmd, data, stamp):
+        if cmd != protocol.CMD_CONTROL_ID_DEGREE:
+            return
+        commands = []
+        for offset in range(0, len(data) - 2, 3):
+            id, value = struct.unpack_from("<Bh", data, offset)
+            commands.append((id, protocol.decidegree_to_radian(value)))
+        with self._lock:
+            self.frames.append(commands)
+
+
+@pytest.fixture
+def frames():
+    return _IndexFrames()
+
+
+@pytest.fixture
+def server(frames):
+    with SimSerialServer(on_frame=frames) as server:
+        yield server
+
+
+@pytest.fixture
+def arm(server):
+    return ps.SagittariusArmReal(server.port, 1000000, 0, 0)
+
+
+def _sent(arm, frames):
+    # 下位机按顺序处理帧, 读取返回时之前的写入都已记录
+    assert arm.GetCurrentJointStatus()[0]
+    assert len(frames.frames) == 1
+    ids, values = zip(*frames.frames[0])
+    return list(ids), np.array(values)
+
+
+def _structured(ids=IDS, values=VALUES):
+    commands = np.zeros(len(ids), dtype=ps.SERVO_COMMAND_DTYPE)
+    commands["id"], commands["value"] = ids, values
+    return commands
+
+
+def _buffer():
+    buffer = ps.ServoCommandBuffer()
+    for id, value in zip(IDS, VALUES):
+        buffer.set(id, value)
+    return buffer
+
+
+def _servo_structs():
+    servos = []
+    for id, value in zip(IDS, VALUES):
+        sv = ps.ServoStruct()
+        sv.id, sv.value = id, value
+        servos.append(sv)
+    return servos
+
+
+def _strided():
+    # 每隔一条的非连续视图
+    wide = np.zeros(2 * len(IDS), dtype=ps.SERVO_COMMAND_DTYPE)
+    wide[::2] = _structured()
+    wide[1::2]["id"] = 1
+    return wide[::2]
+
+
+def _packed():
+    # 紧凑布局 (没有填充字节) 和 float64 值, 字段按名字读取
+    return np.array(list(zip(IDS, VALUES)), dtype=[("id", "u1"), ("value", "<f8")])
+
+
+INPUTS = {
+    "structured": lambda: dict(sv_list=_structured()),
+    "strided": lambda: dict(sv_list=_strided()),
+    "packed": lambda: dict(sv_list=_packed()),
+    "buffer": lambda: dict(sv_list=_buffer()),
+    "servo_structs": lambda: dict(sv_list=_servo_structs()),
+    "ids_values": lambda: dict(ids=np.array(IDS), values=np.array(VALUES)),
+    "ids_values_strided": lambda: dict(ids=np.repeat(IDS, 2)[::2], values=np.repeat(VALUES, 2)[::2]),
+    "lists": lambda: dict(ids=IDS, values=VALUES),
+}
+
+
+@pytest.mark.parametrize("make", INPUTS.values(), ids=list(INPUTS))
+def test_frame_contents(arm, server, frames, make):
+    arm.SetServoRadianWithIndex(**make())
+    ids, values = _sent(arm, frames)
+    assert ids == IDS
+    np.testing.assert_allclose(values, VALUES, atol=RESOLUTION)
+    targets = server.sim.joint_targets
+    np.testing.assert_allclose(targets[np.array(IDS) - 1], VALUES, atol=RESOLUTION)
+
+
+@pytest.mark.parametrize("make", [_structured, _buffer, _strided], ids=["structured", "buffer", "strided"])
+def test_num_sends_a_prefix(arm, frames, make):
+    arm.SetServoRadianWithIndex(make(), 2)
+    ids, values = _sent(arm, frames)
+    assert ids == IDS[:2]
+    np.testing.assert_allclose(values, VALUES[:2], atol=RESOLUTION)
+
+
+def test_buffer_is_reusable(arm, frames):
+    buffer = _buffer()
+    buffer.set(5, 0.3)
+    buffer.assign(np.array([1, 3]), np.array([0.2, -0.2]))
+    arm.SetServoRadianWithIndex(buffer)
+    assert _sent(arm, frames)[0] == [1, 3]
+    np.testing.assert_array_equal(buffer.ids, [1, 3])
+
+
+@pytest.fixture(params=["real", "sim"])
+def any_arm(request):
+    if request.param == "sim":
+        yield SagittariusArmSim()
+        return
+    with SimSerialServer() as server:
+        yield ps.SagittariusArmReal(server.port, 1000000, 0, 0)
+
+
+@pytest.mark.parametrize("bad, error, message", [
+    (np.array([(1.5, 0.1)], dtype=[("id", "f8"), ("value", "f8")]), TypeError, "integer id field"),
+    (np.array([(1, b"x")], dtype=[("id", "u1"), ("value", "S1")]), TypeError, "numeric value field"),
+    (np.zeros((2, 2)), TypeError, "id and value fields"),
+    (np.zeros(2, dtype=[("a", "u1"), ("b", "f4")]), TypeError, "id and value fields"),
+    (np.zeros((2, 2), dtype=ps.SERVO_COMMAND_DTYPE), RuntimeError, "1-D structured array"),
+    (np.zeros(7, dtype=ps.SERVO_COMMAND_DTYPE), RuntimeError, "cannot exceed 6"),
+])
+def test_rejects_wrong_dtype_and_shape(any_arm, bad, error, message):
+    with pytest.raises(error, match=message):
+        any_arm.SetServoRadianWithIndex(bad)
+
+
+def test_rejects_bad_num(any_arm):
+    with pytest.raises(RuntimeError, match="num exceeds"):
+        any_arm.SetServoRadianWithIndex(_structured(), 4)
+    with pytest.raises(RuntimeError, match="non-negative"):
+        any_arm.SetServoRadianWithIndex(_structured(), -1)
+    with pytest.raises(RuntimeError, match="either sv_list or both"):
+        any_arm.SetServoRadianWithIndex(_structured(), ids=IDS)
@@ -0,0 +1,112 @@
+"""GetAllServoInfo: 所有查询共用一个时限, 掉线的舵机返回无效并在下一次调用时排到最后查询"""
+
+import threading
+import time
+
+import numpy as np
+import pytest
+
+pytest.importorskip("pysagittarius.pysagittarius")
+
+import pysagittarius as ps
+from pysagittarius import protocol
+from pysagittarius.sim import SagittariusArmSim, SimSerialServer
+
+SLACK = 0.05
+
+
+class _Queries:
+    """按顺序记录下位机收到的 GetServoInfo 请求的舵机 id"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.ids = []
+
+    def __call__(self, msg_type, cmd, data, stamp):
+        if cmd == protocol.CMD_GET_SERVO_RT_INFO and data:
+            with self._lock:
+                self.ids.append(data[0])
+
+    def take(self):
+        with self._lock:
+            ids, self.ids = self.ids, []
+        return ids
+
+
+@pytest.fixture
+def queries():
+    return _Queries()
+
+
+@pytest.fixture
+def server(queries):
+    with SimSerialServer(on_frame=queries) as server:
+        yield server
+
+
+@pytest.fixture
+def arm(server):
+    return ps.SagittariusArmReal(server.port, 1000000, 0, 0)
+
+
+def _timed(call):
+    start = time.monotonic()
+    result = call()
+    return result, time.monotonic() - start
+
+
+def test_all_servos_answer(arm, queries):
+    (valid, info), elapsed = _timed(lambda: arm.GetAllServoInfo(timeout_ms=500, servo_timeout_ms=100))
+    assert valid.all()
+    assert info.shape == (7, 4) and info.dtype == np.int16
+    # 电压字段不为 0
+    assert np.all(info[:, 2] > 0)
+    assert queries.take() == list(range(1, 8))
+    assert elapsed < 0.1
+
+
+def test_offline_servo_is_reported_and_queried_last(arm, server, queries):
+    server.sim.offline_servos = {3}
+    (valid, info), elapsed = _timed(lambda: arm.GetAllServoInfo(timeout_ms=200, servo_timeout_ms=60))
+    assert np.flatnonzero(~valid).tolist() == [2]
+    np.testing.assert_array_equal(info[2], 0)
+    # 只有掉线的舵机等待了 servo_timeout_ms
+    assert 0.06 - 0.005 <= elapsed < 0.06 + SLACK
+    assert queries.take() == [1, 2, 3, 4, 5, 6, 7]
+
+    (valid, _), _ = _timed(lambda: arm.GetAllServoInfo(timeout_ms=200, servo_timeout_ms=60))
+    assert np.flatnonzero(~valid).tolist() == [2]
+    assert queries.take() == [1, 2, 4, 5, 6, 7, 3]
+
+    # 舵机恢复后重新按顺序查询
+    server.sim.offline_servos = set()
+    assert arm.GetAllServoInfo(timeout_ms=200, servo_timeout_ms=60)[0].all()
+    queries.take()
+    assert arm.GetAllServoInfo(timeout_ms=200, servo_timeout_ms=60)[0].all()
+    assert queries.take() == list(range(1, 8))
+
+
+def test_shared_deadline(arm, server, queries):
+    # 两个掉线的舵机的等待超过总时限: 第二个只等剩余的时间, 之后的舵机不再查询, 调用在 timeout_ms 内返回
+    server.sim.offline_servos = {2, 5}
+    (valid, _), elapsed = _timed(lambda: arm.GetAllServoInfo(timeout_ms=100, servo_timeout_ms=80))
+    assert np.flatnonzero(~valid).tolist() == [1, 4, 5, 6]
+    assert 0.1 - 0.005 <= elapsed < 0.1 + SLACK
+    assert queries.take() == [1, 2, 3, 4, 5]
+
+    # 没有查询的舵机不算掉线: 下一次先查询其他舵机, 掉线的排在最后
+    (valid, _), elapsed = _timed(lambda: arm.GetAllServoInfo(timeout_ms=100, servo_timeout_ms=80))
+    assert np.flatnonzero(~valid).tolist() == [1, 4]
+    assert elapsed < 0.1 + SLACK
+    assert queries.take() == [1, 3, 4, 6, 7, 2, 5]
+
+
+def test_sim_offline_servos():
+    arm = SagittariusArmSim()
+    arm.offline_servos = {4}
+    (valid, info), elapsed = _timed(lambda: arm.GetAllServoInfo(timeout_ms=100, servo_timeout_ms=30))
+    assert np.flatnonzero(~valid).tolist() == [3]
+    np.testing.assert_array_equal(info[3], 0)
+    assert 0.03 - 0.005 <= elapsed < 0.03 + SLACK
+    assert not arm.GetServoInfo(4, timeout_ms=10)[0]
+    assert arm.GetServoInfo(5, timeout_ms=10)[0]
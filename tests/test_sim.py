@@ -0,0 +1,82 @@
+"""仿真舵机的梯形速度曲线 (解析解) 和 CheckUpperLowerWithIndex 的舵机 id 检查"""
+
+import time
+
+import numpy as np
+import pytest
+
+from pysagittarius import sim
+from pysagittarius.sim import SagittariusArmSim, _trapezoid
+
+V, A = 2.0, 5.0
+
+
+@pytest.mark.parametrize("t, expected", [
+    # 加速段: x = a t^2 / 2
+    (0.2, (0.1, 1.0, A)),
+    # 匀速段: 0.4 s 加速到 V 走过 0.4 rad
+    (0.5, (0.4 + 0.1 * V, V, 0.0)),
+    # 减速段结束 (0.4 + 0.3 + 0.4 s) 后停在目标上
+    (1.1 + 1e-6, (1.0, 0.0, 0.0)),
+    (10.0, (1.0, 0.0, 0.0)),
+])
+def test_trapezoid_from_rest(t, expected):
+    np.testing.assert_allclose(_trapezoid(0.0, 0.0, 1.0, V, A, t), expected, atol=1e-5)
+
+
+def test_trapezoid_triangle_profile():
+    # 距离太短达不到 V: 峰值速度 sqrt(A d), 用时 2 sqrt(d / A)
+    distance = 0.2
+    peak_time = np.sqrt(distance / A)
+    pos, vel, _ = _trapezoid(0.0, 0.0, distance, V, A, peak_time)
+    assert pos == pytest.approx(distance / 2)
+    assert vel == pytest.approx(np.sqrt(A * distance))
+    assert _trapezoid(0.0, 0.0, distance, V, A, 2 * peak_time + 1e-6)[:2] == pytest.approx((distance, 0.0))
+
+
+@pytest.mark.parametrize("vel, target", [
+    (-1.0, 1.0),  # 背离目标: 先减速到 0 再折返
+    (3.0, 1.0),  # 超过速度上限: 先减速到 V
+    (2.0, 0.1),  # 来不及停下: 越过目标后折返
+    (1.0, 0.0),  # 已在目标上但仍在运动
+])
+def test_trapezoid_split_matches_single_call(vel, target):
+    # 分多次推进与一次推进的结果相同, 最终都停在目标上
+    expected = _trapezoid(0.0, vel, target, V, A, 0.73)
+    pos, v = 0.0, vel
+    for _ in range(73):
+        pos, v, acc = _trapezoid(pos, v, target, V, A, 0.01)
+    np.testing.assert_allclose((pos, v, acc), expected, atol=1e-6)
+    assert abs(v) <= max(abs(vel), V) + 1e-9
+    assert _trapezoid(0.0, vel, target, V, A, 5.0)[:2] == pytest.approx((target, 0.0))
+
+
+def test_advance_cost_does_not_grow_with_elapsed_time(monkeypatch):
+    arm = SagittariusArmSim(vel=0, acc=0)
+    arm.SetAllServoRadian([1.0, -1.0, 0.5, 0, 0, 0])
+    now = time.monotonic()
+    # 假设过去了一天: 逐步积分需要 8.64e7 步, 解析解与很短的间隔一样快
+    monkeypatch.setattr(sim.time, "monotonic", lambda: now + 86400.0)
+    start = time.perf_counter()
+    _, js = arm.GetCurrentJointStatus()
+    assert time.perf_counter() - start < 0.05
+    np.testing.assert_allclose(js[:6], [1.0, -1.0, 0.5, 0, 0, 0], atol=1e-6)
+
+
+def test_motion_reaches_target_on_time():
+    arm = SagittariusArmSim(vel=0, acc=0)
+    arm.SetAllServoRadian([0.5, 0, 0, 0, 0, 0])
+    _, js = arm.GetCurrentJointStatus()
+    assert 0.0 <= js[0] < 0.5
+    time.sleep(1.0)
+    _, js = arm.GetCurrentJointStatus()
+    np.testing.assert_allclose(js[:6], [0.5, 0, 0, 0, 0, 0], atol=1e-6)
+
+
+@pytest.mark.parametrize("servo_id", [0, 8, 255])
+def test_check_with_index_rejects_invalid_ids(servo_id):
+    arm = SagittariusArmSim()
+    assert arm.CheckUpperLowerWithIndex(ids=[1, 2], values=[0.0, 0.0])
+    # id 0 不能被当作最后一个舵机检查
+    assert not arm.CheckUpperLowerWithIndex(ids=[servo_id], values=[0.0])
+    assert not arm.CheckUpperLowerWithIndex(ids=[1, servo_id], values=[0.0, 0.0])
@@ -0,0 +1,60 @@
+"""plan_joint / plan_cartesian 输出样本的差分速度和加速度不超过舵机限制"""
+
+import math
+
+import numpy as np
+import pytest
+
+from pysagittarius import trajectory
+from pysagittarius.limits import servo_acceleration_limit, servo_velocity_limit
+
+VEL, ACC = 1000, 10
+
+
+def _rates(traj):
+    t, q = traj.times, traj.points[:, :6].astype(np.float64)
+    v = np.diff(q, axis=0) / np.diff(t)[:, np.newaxis]
+    a = 2 * np.diff(v, axis=0) / (t[2:] - t[:-2])[:, np.newaxis]
+    return np.max(np.abs(v)), np.max(np.abs(a))
+
+
+def _assert_within_limits(traj):
+    v, a = _rates(traj)
+    assert v <= servo_velocity_limit(VEL) * (1 + 1e-3)
+    assert a <= servo_acceleration_limit(ACC) * (1 + 1e-3)
+
+
+@pytest.mark.parametrize("profile", trajectory.PROFILES)
+def test_plan_joint_within_limits(profile, random_theta):
+    points = random_theta(4)
+    traj = trajectory.plan_joint(points, profile=profile, vel=VEL, acc=ACC)
+    _assert_within_limits(traj)
+    np.testing.assert_allclose(traj.points[0, :6], points[0], atol=1e-6)
+    np.testing.assert_allclose(traj.points[-1, :6], points[-1], atol=1e-6)
+
+
+def test_plan_joint_duration_not_stretched():
+    # 单关节最小加加速度曲线: 峰值速度 1.875 D / T, 峰值加速度 5.7735 D / T^2
+    distance = 1.0
+    traj = trajectory.plan_joint([[0.0] * 6, [distance] + [0.0] * 5], vel=VEL, acc=ACC)
+    expected = max(1.875 * distance / servo_velocity_limit(VEL),
+                   math.sqrt(5.7735 * distance / servo_acceleration_limit(ACC)))
+    assert traj.duration == pytest.approx(expected, rel=0.02)
+
+
+@pytest.mark.parametrize("profile", trajectory.PROFILES)
+@pytest.mark.parametrize("waypoints", [
+    [[0.25, 0, 0.2, 0, 30, 0], [0.3, 0.1, 0.15, 0, 30, 0]],
+    [[0.25, 0, 0.2, 0, 30, 0], [0.3, 0.0, 0.15, 0, 30, 0]],
+])
+def test_plan_cartesian_within_limits(profile, waypoints):
+    pytest.importorskip("pysagittarius.pysagittarius")
+    import pysagittarius as ps
+
+    k = ps.SagittariusArmKinematics()
+    ok, seed = k.getIKinThetaEuler(*waypoints[0])
+    assert ok
+    traj = trajectory.plan_cartesian(waypoints, kinematics=k, seed=seed, profile=profile, vel=VEL, acc=ACC)
+    _assert_within_limits(traj)
+    _, xyz, _ = k.getFKinEuler(traj.points[-1, :6])
+    np.testing.assert_allclose(xyz, waypoints[-1][:3], atol=2e-3)
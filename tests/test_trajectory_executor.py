@@ -0,0 +1,233 @@
+"""原生轨迹执行器: 下发帧的节拍和插值, 起点, 取消, 抢占, 追加和进度回调的顺序"""
+
+import threading
+import time
+
+import numpy as np
+import pytest
+
+pytest.importorskip("pysagittarius.pysagittarius")
+
+import pysagittarius as ps
+from pysagittarius import protocol
+from pysagittarius.sim import SimSerialServer
+
+RATE = 50.0
+RESOLUTION = np.radians(0.1)
+
+
+class _Frames:
+    """记录下位机收到的设定点帧: (stamp, cmd, 弧度列表)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._frames = []
+
+    def __call__(self, msg_type, cmd, data, stamp):
+        if cmd in (protocol.CMD_CONTROL_ALL_DEGREE, protocol.CMD_CONTROL_END_DEGREE):
+            with self._lock:
+                self._frames.append((stamp, cmd, protocol.unpack_radians(data)))
+
+    def joints(self):
+        """关节帧的 (stamp (K,), q (K, 6))"""
+        with self._lock:
+            frames = [f for f in self._frames if f[1] == protocol.CMD_CONTROL_ALL_DEGREE]
+        return np.array([f[0] for f in frames]), np.array([f[2] for f in frames]).reshape(-1, 6)
+
+    def grippers(self):
+        with self._lock:
+            return [f[2][0] for f in self._frames if f[1] == protocol.CMD_CONTROL_END_DEGREE]
+
+    def clear(self):
+        with self._lock:
+            self._frames.clear()
+
+
+class _Progress:
+    def __init__(self):
+        self.events = []
+        self._lock = threading.Lock()
+
+    def __call__(self, progress):
+        with self._lock:
+            self.events.append(dict(progress))
+
+    def states(self):
+        with self._lock:
+            return [e["state"] for e in self.events]
+
+
+@pytest.fixture
+def frames():
+    return _Frames()
+
+
+@pytest.fixture
+def server(frames):
+    with SimSerialServer(on_frame=frames) as server:
+        yield server
+
+
+@pytest.fixture
+def arm(server):
+    arm = ps.SagittariusArmReal(server.port, 1000000, 0, 0)
+    yield arm
+    arm.CancelTrajectory()
+
+
+def _joint1(value):
+    return np.array([[value, 0, 0, 0, 0, 0]], dtype=np.float32)
+
+
+def _finish(arm):
+    assert arm.WaitTrajectory(2.0)
+    # 下位机按顺序处理帧, 读取返回时之前发送的设定点帧都已记录
+    assert arm.GetCurrentJointStatus()[0]
+
+
+def _wait_until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+def test_timing_and_interpolation(arm, server, frames):
+    server.sim.set_joint_state([-0.3, 0, 0, 0, 0, 0, 0])
+    arm.ExecuteTrajectory([0.5], _joint1(0.0), RATE)
+    _finish(arm)
+    stamps, q = frames.joints()
+    # t = 0 和 t = 0.5 之间每 20 ms 一个设定点
+    assert abs(len(stamps) - (0.5 * RATE + 1)) <= 2
+    intervals = np.diff(stamps)
+    assert abs(np.mean(intervals) - 1 / RATE) < 0.002
+    assert np.max(intervals) < 3 / RATE
+    # 从当前关节状态出发, 关节 1 以 0.6 rad/s 随时间线性变化到终点; 第一个节拍可能因线程启动略有延迟
+    np.testing.assert_allclose(q[0, 0], -0.3, atol=0.6 * 2 / RATE)
+    np.testing.assert_allclose(q[-1], 0.0, atol=RESOLUTION)
+    slope, intercept = np.polyfit(stamps[:-1], q[:-1, 0], 1)
+    assert slope == pytest.approx(0.6, rel=0.05)
+    np.testing.assert_allclose(q[:-1, 0], slope * stamps[:-1] + intercept, atol=0.6 * 0.005 + 2 * RESOLUTION)
+    assert np.all(np.diff(q[:, 0]) >= -RESOLUTION)
+    status = arm.GetTrajectoryStatus()
+    assert status["state"] == "done"
+    assert status["setpoints"] == len(stamps)
+
+
+def test_start_follows_direct_writes(arm, server, frames):
+    # 轨迹结束后直接写入的位置才是下一条轨迹的起点, 而不是执行器最后发送的设定点
+    arm.ExecuteTrajectory([0.1], _joint1(0.3), RATE)
+    _finish(arm)
+    arm.SetAllServoRadian([-0.3, 0, 0, 0, 0, 0])
+    _wait_until(lambda: abs(arm.GetCurrentJointStatus()[1][0] + 0.3) < 2 * RESOLUTION)
+    frames.clear()
+    arm.ExecuteTrajectory([0.5], _joint1(0.0), RATE)
+    _finish(arm)
+    _, q = frames.joints()
+    np.testing.assert_allclose(q[0, 0], -0.3, atol=2 * RESOLUTION)
+    assert np.all(q[:, 0] <= RESOLUTION)
+
+
+def test_first_waypoint_at_zero_is_sent_directly(arm, server, frames):
+    server.sim.set_joint_state([-0.3, 0, 0, 0, 0, 0, 0])
+    arm.ExecuteTrajectory([0.0, 0.2], np.vstack([_joint1(0.1), _joint1(0.2)]), RATE)
+    _finish(arm)
+    _, q = frames.joints()
+    np.testing.assert_allclose(q[0, 0], 0.1, atol=RESOLUTION)
+
+
+def test_gripper_sent_only_on_change(arm, frames):
+    points = np.zeros((3, 7), dtype=np.float32)
+    points[:, 6] = [-0.02, -0.02, -0.04]
+    arm.ExecuteTrajectory([0.0, 0.1, 0.2], points, RATE)
+    _finish(arm)
+    grippers = np.array(frames.grippers()) / 22.0
+    # 第一个设定点发送夹爪, 之后只在夹爪设定值变化 (0.1~0.2 s 的插值段) 时发送
+    np.testing.assert_allclose(grippers[0], -0.02, atol=1e-3)
+    np.testing.assert_allclose(grippers[-1], -0.04, atol=1e-3)
+    assert len(grippers) <= 0.1 * RATE + 3
+    assert len(grippers) < len(frames.joints()[0])
+
+
+def test_cancel(arm, frames):
+    progress = _Progress()
+    arm.ExecuteTrajectory([2.0], _joint1(1.0), RATE, progress)
+    time.sleep(0.2)
+    arm.CancelTrajectory()
+    assert arm.WaitTrajectory(0.5)
+    count = len(frames.joints()[0])
+    time.sleep(0.1)
+    # 取消后不再发送设定点, 机械臂停在最后的设定点
+    assert len(frames.joints()[0]) <= count + 1
+    status = arm.GetTrajectoryStatus()
+    assert status["state"] == "cancelled"
+    assert 0.15 < status["elapsed"] < 0.5
+    _, q = frames.joints()
+    assert 0.0 < q[-1, 0] < 0.3
+    _wait_until(lambda: "cancelled" in progress.states())
+    assert progress.states()[-1] == "cancelled"
+
+
+def test_preempt(arm, frames):
+    first, second = _Progress(), _Progress()
+    arm.ExecuteTrajectory([1.0], _joint1(1.0), RATE, first)
+    time.sleep(0.3)
+    arm.ExecuteTrajectory([0.3], _joint1(-0.2), RATE, second)
+    _finish(arm)
+    _, q = frames.joints()
+    # 新轨迹从被抢占轨迹最后的设定点继续, 没有跳变
+    speed = (q[:, 0].max() + 0.2) / 0.3
+    assert np.max(np.abs(np.diff(q[:, 0]))) < 1.5 * speed / RATE + 2 * RESOLUTION
+    np.testing.assert_allclose(q[-1, 0], -0.2, atol=RESOLUTION)
+    _wait_until(lambda: second.states()[-1:] == ["done"])
+    assert first.states() == ["preempted"]
+    assert second.states() == ["running", "done"]
+
+
+def test_append(arm, frames):
+    progress = _Progress()
+    arm.ExecuteTrajectory([0.2], _joint1(0.2), RATE, progress)
+    arm.AppendTrajectory([0.2], _joint1(0.4), RATE)
+    status = arm.GetTrajectoryStatus()
+    assert status["num_waypoints"] == 3
+    assert status["duration"] == pytest.approx(0.4)
+    _finish(arm)
+    stamps, q = frames.joints()
+    assert 0.35 < stamps[-1] - stamps[0] < 0.5
+    np.testing.assert_allclose(q[-1, 0], 0.4, atol=RESOLUTION)
+    assert np.all(np.diff(q[:, 0]) >= -RESOLUTION)
+    _wait_until(lambda: progress.states()[-1:] == ["done"])
+    # 起点 -> 0.2 -> 0.4: 经过两个路点后结束
+    assert progress.states() == ["running", "running", "done"]
+    assert [e["waypoint"] for e in progress.events] == [1, 2, 2]
+
+
+def test_append_when_idle_executes(arm, frames):
+    arm.AppendTrajectory([0.1], _joint1(0.1), RATE)
+    _finish(arm)
+    np.testing.assert_allclose(frames.joints()[1][-1, 0], 0.1, atol=RESOLUTION)
+
+
+def test_progress_order(arm):
+    progress = _Progress()
+    points = np.vstack([_joint1(0.0), _joint1(0.1), _joint1(0.2)])
+    arm.ExecuteTrajectory([0.0, 0.1, 0.2], points, RATE, progress)
+    _finish(arm)
+    _wait_until(lambda: progress.states()[-1:] == ["done"])
+    assert progress.states() == ["running", "running", "done"]
+    assert [e["waypoint"] for e in progress.events] == [1, 2, 2]
+    assert all(e["num_waypoints"] == 3 for e in progress.events)
+    # 经过路点的时刻不早于路点的时间
+    assert np.all(np.array([e["elapsed"] for e in progress.events]) >= [0.1 - 1e-3, 0.2 - 1e-3, 0.2 - 1e-3])
+    assert progress.events[-1]["duration"] == pytest.approx(0.2)
+
+
+@pytest.mark.parametrize("times, points, message", [
+    ([], np.zeros((0, 6)), "at least one waypoint"),
+    ([0.2, 0.1], np.zeros((2, 6)), "strictly increasing"),
+    ([-0.1], np.zeros((1, 6)), "non-negative"),
+    ([0.1], np.zeros((1, 5)), r"shape \(N, 6\) or \(N, 7\)"),
+])
+def test_invalid_trajectory(arm, times, points, message):
+    with pytest.raises((ValueError, RuntimeError), match=message):
+        arm.ExecuteTrajectory(times, points)